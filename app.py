@@ -113,14 +113,18 @@ def main():
     print("\n请选择评估模式：")
     print("1. 快速模式（ReflectAgent 简单评估，速度快）")
     print("2. 深度模式（5个 Specialists 并行深度分析，质量高）")
+    print("3. 合并模式（深度检查合并为单次调用，省 token）")
     while True:
-        eval_choice = input("请输入选项 (1/2，默认2): ").strip()
+        eval_choice = input("请输入选项 (1/2/3，默认2): ").strip()
         if eval_choice == "1":
             evaluation_mode = "fast"
             break
         elif eval_choice in ("", "2"):
             evaluation_mode = "deep"
             break
+        elif eval_choice == "3":
+            evaluation_mode = "fused"
+            break
         else:
             print("无效选项，请重新输入")
 
@@ -234,11 +238,7 @@ def main():
 
             # 保存检查点
             node_state["workflow_id"] = CLI_WORKFLOW_ID
-            node_state["current_node"] = node_name
-            if "novel_storage" in node_state and hasattr(node_state["novel_storage"], "base_dir"):
-                node_state["novel_title"] = node_state["novel_storage"].base_dir.name.replace("_storage", "")
-            state_manager.save_checkpoint(CLI_WORKFLOW_ID, node_state)
-            state_manager.save_state(CLI_WORKFLOW_ID, node_state)
+            state_manager.record_step(CLI_WORKFLOW_ID, node_name, node_state)
 
         # 使用 stream 迭代执行
         import time
@@ -0,0 +1,47 @@
+"""
+导出入口：将 result/{title}_storage/ 中的小说导出为 TXT / Markdown / EPUB
+
+章节从存储逐章流式写出，内存占用与小说长度无关。
+
+用法:
+    python app_export.py --title 我的小说 --format epub
+    python app_export.py --title 我的小说 --format txt --output ./my_novel.txt
+    python app_export.py --title 我的小说 --split --output ./my_novel/
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from src.export import NovelExporter, EXPORT_FORMATS
+from src.storage import NovelStorage, sanitize_novel_title
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="导出已生成的小说")
+    parser.add_argument("--title", required=True, type=str, help="小说标题（对应 result/{title}_storage/）")
+    parser.add_argument("--format", default="txt", choices=EXPORT_FORMATS, help="导出格式（默认 txt）")
+    parser.add_argument("--output", default=None, type=str, help="输出路径（默认 result/{标题}_{时间戳}.{格式}）")
+    parser.add_argument("--split", action="store_true", help="分章导出为多个 TXT 文件（--output 视为目录）")
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+
+    storage_dir = Path("result") / f"{sanitize_novel_title(args.title)}_storage"
+    if not storage_dir.exists():
+        print(f"❌ 未找到小说存储目录: {storage_dir}")
+        sys.exit(1)
+
+    exporter = NovelExporter(NovelStorage(args.title))
+    if args.split:
+        output_dir = args.output or str(Path("result") / exporter.default_filename("txt").rsplit(".", 1)[0])
+        main_file, chapter_paths = exporter.export_chapter_files(output_dir)
+        print(f"✅ 已导出 {len(chapter_paths)} 个章节文件到目录：{main_file.parent}")
+    else:
+        path = exporter.export(args.format, args.output)
+        print(f"✅ 已导出：{path}")
+
+
+if __name__ == "__main__":
+    main()
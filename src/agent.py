@@ -13,12 +13,20 @@ from src.model_manager import ModelManager
 from src.config_loader import BaseConfig
 from src.thinking_logger import log_agent_thinking
 from src.evaluation_reporter import EvaluationReporter
+from src.summary import RollingSummaries
+from src.utils import estimate_tokens
 from src.agents.base import BaseAgent
 from src.client_pool import get_current_client_id
 from src.log_config import loggers
 
 agent_logger = loggers['specialist']
 
+# 注入写作 prompt 的前文段落（BM25 检索）
+RELATED_PASSAGES_TOP_K = 5
+RELATED_PASSAGES_TOKENS = 600
+# 本章出场角色连续多少章未出现时在 prompt 中提醒
+ABSENT_WARN_CHAPTERS = 10
+
 
 def log_agent_call(agent_name: str, method_name: str):
     """装饰器：记录Agent方法调用"""
@@ -525,6 +533,9 @@ class WriterAgent(BaseAgent):
             "character_list": ', '.join(outline.characters),
             "pre_summary": outline.chapters[current_chapter_index-1].summary if current_chapter_index > 0 else "无",
             "pre_context": pre_chapter,
+            "story_so_far": RollingSummaries(state.novel_storage).context_for(current_chapter_index, outline),
+            "related_passages": self._retrieve_related_passages(state, outline.chapters[current_chapter_index], current_chapter_index),
+            "character_presence": self._character_presence(state, outline.chapters[current_chapter_index], current_chapter_index),
             "post_summary": outline.chapters[current_chapter_index+1].summary if current_chapter_index < len(outline.chapters)-1 else "无",
             "chapter_outline_title": outline.chapters[current_chapter_index].title,
             "chapter_outline_key_events": ', '.join(outline.chapters[current_chapter_index].key_events),
@@ -578,6 +589,52 @@ class WriterAgent(BaseAgent):
 
         return params
     
+    def _retrieve_related_passages(self, state: NovelState, chapter_outline: ChapterOutline, current_chapter_index: int) -> str:
+        """BM25 检索与本章关键事件/角色相关的前文段落，按 token 预算截取"""
+        queries = [*chapter_outline.key_events, *chapter_outline.characters_involved]
+        try:
+            # 上一章已由 pre_context 和前情提要覆盖，只检索更早的章节
+            passages = state.novel_storage.chapter_index.retrieve_passages(
+                queries, top_k=RELATED_PASSAGES_TOP_K, before_chapter=current_chapter_index
+            )
+        except Exception as e:
+            agent_logger.debug(f"[WriterAgent] 前文段落检索失败: {e}")
+            return "无"
+
+        lines, used = [], 0
+        for chapter_number, text, _ in passages:
+            line = f"（第{chapter_number}章）{text}"
+            cost = estimate_tokens(line)
+            if used + cost > RELATED_PASSAGES_TOKENS:
+                continue
+            lines.append(line)
+            used += cost
+        return "\n".join(lines) if lines else "无"
+
+    def _character_presence(self, state: NovelState, chapter_outline: ChapterOutline, current_chapter_index: int) -> str:
+        """根据角色出场索引提示本章角色的登场情况（首次登场 / 久未出场）"""
+        names = list(chapter_outline.characters_involved or [])
+        if not names:
+            return "无"
+        # 章节在存储中从 1 开始编号
+        chapter_number = current_chapter_index + 1
+        try:
+            index = state.novel_storage.chapter_index
+            new = set(index.new_characters(names, chapter_number))
+            absent = index.absent_characters(names, chapter_number, ABSENT_WARN_CHAPTERS)
+        except Exception as e:
+            agent_logger.debug(f"[WriterAgent] 角色出场索引读取失败: {e}")
+            return "无"
+
+        lines = []
+        for name in names:
+            if name in new:
+                lines.append(f"- {name}：首次登场，需交代身份")
+            elif name in absent:
+                gap = absent[name]
+                lines.append(f"- {name}：已有{gap}章未出场（上次在第{chapter_number - gap - 1}章），重新登场时交代其去向")
+        return "\n".join(lines) if lines else "无"
+
     def _generate_base_prompt(self, template: str, params: Dict, error_message: str = None) -> str:
         """生成基础写作提示词"""
         prompt = template.format(**params)
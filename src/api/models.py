@@ -77,6 +77,8 @@ class CharacterGraphNode(BaseModel):
     """角色关系图节点"""
     id: str
     name: str
+    appearances: int = 0  # 出场章数（来自角色出场索引）
+    last_chapter: Optional[int] = None  # 最近出场章节
 
 
 class CharacterGraphLink(BaseModel):
@@ -84,6 +86,7 @@ class CharacterGraphLink(BaseModel):
     source: str
     target: str
     type: str
+    weight: int = 0  # 同段落共同出场次数
 
 
 class CharacterGraphData(BaseModel):
@@ -160,6 +160,62 @@ async def resume_novel_from_storage(novel_title: str):
     }
 
 
+@router.get("/novels/{novel_title}/export")
+async def export_novel(novel_title: str, format: str = "txt"):
+    """流式导出小说（txt / md / epub）
+
+    章节从 result/{title}_storage/ 逐章读取并直接写入响应流，不在内存中拼接整本小说
+    """
+    from urllib.parse import quote
+    from fastapi.responses import StreamingResponse
+    from src.export import NovelExporter, EXPORT_FORMATS, MEDIA_TYPES
+    from src.storage import NovelStorage
+
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"不支持的导出格式，可选: {', '.join(EXPORT_FORMATS)}")
+
+    try:
+        storage = NovelStorage(novel_title)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not storage.has_outline():
+        raise HTTPException(status_code=404, detail="小说不存在或无大纲")
+
+    exporter = NovelExporter(storage)
+    filename = quote(exporter.default_filename(format))
+    return StreamingResponse(
+        exporter.iter_bytes(format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{filename}"}
+    )
+
+
+@router.get("/novels/{novel_title}/search")
+async def search_novel(novel_title: str, q: str, limit: int = 50):
+    """全文检索：返回短语出现的章节、位置以及最后一次出现的位置（基于倒排索引，不读取正文）"""
+    from src.storage import NovelStorage
+
+    try:
+        storage = NovelStorage(novel_title)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not storage.has_outline():
+        raise HTTPException(status_code=404, detail="小说不存在或无大纲")
+
+    result = storage.chapter_index.search(q)
+    last = (max(result), result[max(result)][-1]) if result else None
+    return {
+        "query": q,
+        "total": sum(len(p) for p in result.values()),
+        "chapter_count": len(result),
+        "last_occurrence": {"chapter_index": last[0], "offset": last[1]} if last else None,
+        "occurrences": [
+            {"chapter_index": chapter, "positions": positions[:limit]}
+            for chapter, positions in list(result.items())[:limit]
+        ]
+    }
+
+
 @router.post("/novels/{workflow_id}/resume")
 async def resume_novel(workflow_id: str):
     """恢复中断的工作流继续执行"""
@@ -344,6 +400,24 @@ async def get_character_graph(workflow_id: str):
                 type=rel.relationship_type
             ))
 
+    # 用角色出场索引补充出场统计和共同出场边
+    stats = storage.chapter_index.appearance_stats()
+    cooccurrence = storage.chapter_index.cooccurrence_counts()
+    for node in nodes:
+        info = stats.get(node.name)
+        if info:
+            node.appearances = info["chapters"]
+            node.last_chapter = info["last_chapter"]
+    linked = set()
+    for link in links:
+        pair = tuple(sorted((link.source, link.target)))
+        link.weight = cooccurrence.get(pair, 0)
+        linked.add(pair)
+    for (a, b), count in sorted(cooccurrence.items()):
+        if (a, b) in linked or a not in seen_nodes or b not in seen_nodes:
+            continue
+        links.append(CharacterGraphLink(source=a, target=b, type="同场", weight=count))
+
     return CharacterGraphData(nodes=nodes, links=links)
 
 
@@ -0,0 +1,109 @@
+"""
+目录索引 - 为列表类接口维护的小型 JSON 摘要
+
+result/ 下的小说和工作流越来越多时，逐个打开 JSON、统计章节文件的代价会随之线性增长。
+这里在写入时顺带维护一份摘要（key -> 字典），列表接口只需读取一个文件。
+索引文件不存在时由调用方扫描一次重建。
+"""
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+NOVELS_CATALOG_NAME = "novels_catalog.json"
+
+
+class JsonCatalog:
+    """JSON 目录索引，原子写入，读取按文件修改时间缓存
+
+    Args:
+        path: 索引文件路径
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._cache: Optional[Dict[str, dict]] = None
+        self._cache_mtime: Optional[int] = None
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def _read(self) -> Dict[str, dict]:
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        if self._cache is not None and self._cache_mtime == mtime:
+            return self._cache
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            logger.warning(f"[Catalog] 索引文件损坏，已忽略: {self.path}")
+            data = {}
+        self._cache, self._cache_mtime = data, mtime
+        return data
+
+    def _write(self, data: Dict[str, dict]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, default=str)
+        tmp_path.replace(self.path)
+        self._cache, self._cache_mtime = data, self.path.stat().st_mtime_ns
+
+    def all(self) -> Dict[str, dict]:
+        """全部条目（只读，请勿修改返回值）"""
+        with self._lock:
+            return self._read()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            return self._read().get(key)
+
+    def update(self, key: str, mutate: Callable[[Optional[dict]], Optional[dict]]):
+        """读-改-写单个条目；mutate 返回 None 表示删除该条目"""
+        with self._lock:
+            data = dict(self._read())
+            entry = mutate(dict(data[key]) if key in data else None)
+            if entry is None:
+                if key not in data:
+                    return
+                data.pop(key)
+            else:
+                data[key] = entry
+            self._write(data)
+
+    def upsert(self, key: str, fields: dict):
+        """合并字段到条目"""
+        self.update(key, lambda entry: {**(entry or {}), **fields})
+
+    def remove(self, key: str):
+        self.update(key, lambda entry: None)
+
+    def replace_all(self, data: Dict[str, dict]):
+        with self._lock:
+            self._write(dict(data))
+
+
+_catalogs: Dict[Path, JsonCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(path: Path) -> JsonCatalog:
+    """获取索引文件对应的 JsonCatalog（同一路径进程内共享同一实例，共用写锁）"""
+    path = Path(path).resolve()
+    with _catalogs_lock:
+        if path not in _catalogs:
+            _catalogs[path] = JsonCatalog(path)
+        return _catalogs[path]
+
+
+def get_novel_catalog(result_dir: Path) -> JsonCatalog:
+    """获取 result 目录对应的小说索引（进程内共享同一实例）"""
+    return get_catalog(Path(result_dir) / NOVELS_CATALOG_NAME)
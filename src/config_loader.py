@@ -14,12 +14,21 @@ class AgentModelConfig(BaseModel):
 
     @classmethod
     def from_env(cls) -> "AgentModelConfig":
-        """从环境变量加载配置"""
-        return cls(
-            supervisor_model=os.getenv("SUPERVISOR_MODEL", "claude-sonnet-4-6"),
-            writer_model=os.getenv("WRITER_MODEL", "claude-sonnet-4-6"),
-            specialist_model=os.getenv("SPECIALIST_MODEL", "claude-haiku-4-5"),
-        )
+        """从环境变量加载配置（只有设置了的环境变量计入显式配置，见 role_model）"""
+        env = {
+            "supervisor_model": "SUPERVISOR_MODEL",
+            "writer_model": "WRITER_MODEL",
+            "specialist_model": "SPECIALIST_MODEL",
+        }
+        return cls(**{field: os.environ[name] for field, name in env.items() if os.getenv(name)})
+
+    def role_model(self, role: str) -> Optional[str]:
+        """角色的显式模型名，未配置时返回 None（沿用 ModelConfig.model_name）
+
+        默认值是 Anthropic 模型名，配置的端点不一定提供，因此不会被自动使用。
+        """
+        field = f"{role}_model"
+        return getattr(self, field) if field in self.model_fields_set else None
 
 
 class ModelConfig(BaseModel):
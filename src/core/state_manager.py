@@ -1,6 +1,7 @@
 """
 状态管理器 - 工作流状态的持久化和恢复
 """
+import hashlib
 import json
 import threading
 from datetime import datetime
@@ -9,8 +10,61 @@ from typing import Optional
 from enum import Enum
 
 from src.core.progress import WorkflowStatus
+from src.catalog import get_catalog, get_novel_catalog
 from pydantic import BaseModel
 
+# 目录索引中保存的工作流状态摘要字段
+_STATE_SUMMARY_FIELDS = (
+    "user_intent", "_created_at", "_saved_at", "status", "current_node",
+    "progress", "error", "novel_title", "current_chapter_index",
+)
+_CHECKPOINT_SUMMARY_FIELDS = (
+    "workflow_id", "saved_at", "user_intent", "current_node", "status",
+    "novel_title", "current_chapter_index",
+)
+
+# 检查点字段及首次保存时的默认值
+_CHECKPOINT_DEFAULTS = {
+    # 用户与配置
+    "user_intent": "", "min_chapters": 10, "max_attempts": 10, "gradio_mode": False,
+    # 大纲生成
+    "raw_outline": None, "validated_outline": None, "outline_validated_error": None,
+    # 分卷大纲
+    "raw_master_outline": None, "current_volume_index": 0, "raw_volume_chapters": None,
+    "validated_chapters": [],
+    # 角色档案
+    "row_characters": None, "validated_characters": None, "characters_validated_error": None,
+    # 章节内容
+    "current_chapter_index": 0, "completed_chapters": [], "raw_current_chapter": None,
+    "validated_chapter_draft": None, "current_chapter_validated_error": None,
+    # 评估反馈
+    "evaluate_attempt": 0, "raw_chapter_evaluation": None, "validated_evaluation": None,
+    "evaluation_validated_error": None,
+    # 实体生成
+    "raw_entities": None, "entities_validated_error": None,
+    # 反馈控制
+    "outline_feedback_request": None, "outline_feedback_id": None, "outline_feedback_action": None,
+    "outline_modified": None, "outline_feedback_error": None,
+    "character_feedback_request": None, "character_feedback_id": None, "character_feedback_action": None,
+    "character_modified": None, "character_feedback_error": None,
+    "chapter_feedback_request": None, "chapter_feedback_id": None, "chapter_feedback_action": None,
+    "chapter_modified": None, "chapter_feedback_error": None,
+    # 重试计数
+    "attempt": 0,
+    # 当前节点
+    "current_node": "",
+}
+
+# 已保存在 NovelStorage 中的字段：内容一致时检查点只记录引用（字段 -> NovelStorage 加载方法）
+_STORAGE_REF_FIELDS = {
+    "validated_outline": "load_outline",
+    "validated_characters": "load_characters",
+}
+
+# 章节草稿与原始章节文本：每步都可能变化且体积大，写入 NovelStorage（按章节号覆盖），检查点只记录引用
+_STORAGE_DRAFT_FIELDS = ("validated_chapter_draft", "raw_current_chapter")
+_DRAFT_REF = "storage:checkpoint_draft"
+
 
 class WorkflowInfo(BaseModel):
     """工作流信息摘要"""
@@ -29,10 +83,68 @@ class WorkflowInfo(BaseModel):
 class StateManager:
     """状态管理器 - 支持工作流中断和恢复"""
 
+    # 增量日志累计多少步后合并为一次完整快照
+    CHECKPOINT_COMPACT_EVERY = 50
+
     def __init__(self, storage_dir: str = "result/workflows"):
         self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(parents=True, exist_ok=True)
         self._lock = threading.Lock()
+        # 工作流目录索引：workflow_id -> {"state": 摘要, "checkpoint": 摘要}
+        # 同一目录的多个 StateManager 共享同一实例，读-改-写由同一把锁串行化
+        self._catalog = get_catalog(self.storage_dir / "_catalog.json")
+        # 检查点内存缓存 workflow_id -> (文件签名, 快照 + 已重放的增量)，用于计算增量；
+        # 文件签名与磁盘不一致（其他进程/实例写入过）时重新读取
+        self._checkpoint_cache: dict = {}
+        self._checkpoint_log_lines: dict = {}
+        self._ref_cache: dict = {}
+
+    def _catalog_set(self, workflow_id: str, parts: dict) -> None:
+        """更新目录索引中某个工作流的状态/检查点摘要（parts: {"state"/"checkpoint": 摘要}），两者都为空时删除条目"""
+        if not self._catalog.exists():
+            self._rebuild_catalog()
+
+        def mutate(entry: Optional[dict]) -> Optional[dict]:
+            entry = entry or {}
+            entry.update(parts)
+            if not entry.get("state") and not entry.get("checkpoint"):
+                return None
+            return entry
+
+        self._catalog.update(workflow_id, mutate)
+
+    def _rebuild_catalog(self) -> dict:
+        """扫描工作流目录重建索引（索引缺失时调用一次）"""
+        entries: dict = {}
+        for path in self.storage_dir.glob("*.json"):
+            if path.name.startswith("_"):
+                continue
+            try:
+                if path.stem.endswith("_checkpoint"):
+                    # 只为生成摘要读取一次，不放入检查点缓存
+                    loaded = self._load_checkpoint_files(path.stem[:-len("_checkpoint")])
+                    data = loaded[0] if loaded else {}
+                else:
+                    with open(path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+            except (json.JSONDecodeError, OSError):
+                continue
+            if path.stem.endswith("_checkpoint"):
+                workflow_id = data.get("workflow_id", path.stem[:-len("_checkpoint")])
+                entries.setdefault(workflow_id, {})["checkpoint"] = {
+                    k: data.get(k) for k in _CHECKPOINT_SUMMARY_FIELDS if k in data
+                }
+            else:
+                entries.setdefault(path.stem, {})["state"] = {
+                    k: data.get(k) for k in _STATE_SUMMARY_FIELDS if k in data
+                }
+        self._catalog.replace_all(entries)
+        return entries
+
+    def _catalog_entries(self) -> dict:
+        if not self._catalog.exists():
+            return self._rebuild_catalog()
+        return self._catalog.all()
 
     def _workflow_path(self, workflow_id: str) -> Path:
         """获取工作流状态文件路径"""
@@ -45,12 +157,18 @@ class StateManager:
             workflow_id: 工作流ID
             state_data: 状态字典
         """
+        self._catalog_set(workflow_id, {"state": self._write_state(workflow_id, state_data)})
+
+    def _write_state(self, workflow_id: str, state_data: dict) -> dict:
+        """写入状态文件，返回目录索引摘要（不更新索引）"""
         with self._lock:
             path = self._workflow_path(workflow_id)
             # 添加时间戳
             state_data["_saved_at"] = datetime.now().isoformat()
             with open(path, "w", encoding="utf-8") as f:
                 json.dump(state_data, f, ensure_ascii=False, indent=2, default=str)
+            summary = {k: state_data.get(k) for k in _STATE_SUMMARY_FIELDS if k in state_data}
+        return json.loads(json.dumps(summary, default=str))
 
     def load_state(self, workflow_id: str) -> Optional[dict]:
         """从磁盘加载工作流状态
@@ -79,10 +197,11 @@ class StateManager:
         """
         with self._lock:
             path = self._workflow_path(workflow_id)
-            if path.exists():
-                path.unlink()
-                return True
-            return False
+            if not path.exists():
+                return False
+            path.unlink()
+        self._catalog_set(workflow_id, {"state": None})
+        return True
 
     def list_workflows(self, status: Optional[WorkflowStatus] = None) -> list[WorkflowInfo]:
         """列出所有工作流
@@ -94,50 +213,58 @@ class StateManager:
             工作流信息列表
         """
         workflows = []
-        with self._lock:
-            for path in self.storage_dir.glob("*.json"):
-                try:
-                    with open(path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                    info = WorkflowInfo(
-                        workflow_id=path.stem,
-                        user_intent=data.get("user_intent", ""),
-                        created_at=datetime.fromisoformat(data.get("_created_at", datetime.now().isoformat())),
-                        updated_at=datetime.fromisoformat(data.get("_saved_at", datetime.now().isoformat())),
-                        status=WorkflowStatus(data.get("status", "pending")),
-                        current_node=data.get("current_node"),
-                        progress=data.get("progress", 0.0),
-                        error=data.get("error"),
-                        novel_title=data.get("novel_title"),
-                        current_chapter_index=data.get("current_chapter_index", 0)
-                    )
-                    if status is None or info.status == status:
-                        workflows.append(info)
-                except (json.JSONDecodeError, ValueError, OSError):
-                    continue
+        for workflow_id, entry in self._catalog_entries().items():
+            data = entry.get("state")
+            if not data:
+                continue
+            try:
+                info = WorkflowInfo(
+                    workflow_id=workflow_id,
+                    user_intent=data.get("user_intent") or "",
+                    created_at=datetime.fromisoformat(data.get("_created_at") or datetime.now().isoformat()),
+                    updated_at=datetime.fromisoformat(data.get("_saved_at") or datetime.now().isoformat()),
+                    status=WorkflowStatus(data.get("status") or "pending"),
+                    current_node=data.get("current_node"),
+                    progress=data.get("progress") or 0.0,
+                    error=data.get("error"),
+                    novel_title=data.get("novel_title"),
+                    current_chapter_index=data.get("current_chapter_index") or 0
+                )
+            except ValueError:
+                continue
+            if status is None or info.status == status:
+                workflows.append(info)
         return sorted(workflows, key=lambda w: w.updated_at, reverse=True)
 
     def list_existing_novels(self) -> list[dict]:
-        """扫描 result/ 目录，列出所有已存在的小说（可用于断点恢复）
+        """列出所有已存在的小说（可用于断点恢复）
+
+        读取 result/novels_catalog.json（NovelStorage 写入时维护），索引缺失时扫描一次 result/ 重建
 
         Returns:
             已存在小说的信息列表
         """
-        from src.storage import NovelStorage
+        from src.storage import rebuild_novel_catalog
 
-        novels = []
         result_path = Path("result")
-
         if not result_path.exists():
-            return novels
+            return []
 
-        for storage_path in result_path.glob("*_storage"):
-            try:
-                title = storage_path.name.replace("_storage", "")
-                storage = NovelStorage(title)
-                novels.append(storage.get_storage_info())
-            except Exception:
+        catalog = get_novel_catalog(result_path)
+        entries = catalog.all() if catalog.exists() else rebuild_novel_catalog()
+
+        novels = []
+        for title, info in entries.items():
+            # 目录已被手动删除的小说不再列出
+            if not (result_path / f"{title}_storage").exists():
                 continue
+            novels.append({
+                "title": info.get("title", title),
+                "chapter_count": info.get("chapter_count", 0),
+                "has_outline": info.get("has_outline", False),
+                "has_characters": info.get("has_characters", False),
+                "codec": info.get("codec", "none"),
+            })
 
         return sorted(novels, key=lambda x: x.get("title", ""))
 
@@ -187,114 +314,221 @@ class StateManager:
         self.save_state(workflow_id, state)
 
     def _checkpoint_path(self, workflow_id: str) -> Path:
-        """获取检查点文件路径"""
+        """获取检查点快照文件路径"""
         return self.storage_dir / f"{workflow_id}_checkpoint.json"
 
+    def _checkpoint_log_path(self, workflow_id: str) -> Path:
+        """获取检查点增量日志路径（每行一个 JSON 增量）"""
+        return self.storage_dir / f"{workflow_id}_checkpoint.log"
+
+    @staticmethod
+    def _serialize_value(v):
+        """序列化值，支持 Pydantic 模型和 datetime"""
+        if hasattr(v, 'model_dump'):
+            return v.model_dump(mode="json")
+        elif isinstance(v, datetime):
+            return v.isoformat()
+        elif isinstance(v, list):
+            return [StateManager._serialize_value(item) for item in v]
+        elif isinstance(v, dict):
+            return {k: StateManager._serialize_value(val) for k, val in v.items()}
+        else:
+            return v
+
+    def _storage_ref(self, workflow_id: str, novel_title: Optional[str], field: str, value):
+        """字段内容与 NovelStorage 中已保存的一致时，只记录引用
+
+        同一内容只比对一次（按内容摘要缓存），避免每步都读取存储文件
+        """
+        if not novel_title or value is None:
+            return value
+        digest = hashlib.sha1(json.dumps(value, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        cache_key = (workflow_id, field)
+        cached = self._ref_cache.get(cache_key)
+        if cached and cached[0] == digest:
+            return cached[1]
+
+        from src.storage import NovelStorage
+        rep = value
+        try:
+            storage = NovelStorage(novel_title)
+            loader = getattr(storage, _STORAGE_REF_FIELDS[field])
+            stored = loader()
+            if stored is not None:
+                stored = self._serialize_value(stored)
+                if stored == value:
+                    rep = {"$ref": f"storage:{_STORAGE_REF_FIELDS[field]}"}
+        except (ValueError, OSError):
+            pass
+        self._ref_cache[cache_key] = (digest, rep)
+        return rep
+
+    def _storage_draft_ref(self, workflow_id: str, novel_title: Optional[str], chapter_index: int, field: str, value):
+        """把章节草稿字段写入 NovelStorage 并返回引用（内容未变化时不重复写入），存储不可用时原样返回"""
+        if not novel_title or value is None:
+            return value
+        from src.storage import NovelStorage
+        digest = hashlib.sha1(json.dumps(value, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        cache_key = (workflow_id, field)
+        rep = {"$ref": _DRAFT_REF, "chapter": chapter_index}
+        if self._ref_cache.get(cache_key) == (digest, rep):
+            return rep
+        try:
+            NovelStorage(novel_title).save_checkpoint_draft(chapter_index, field, value)
+        except (ValueError, OSError):
+            return value
+        self._ref_cache[cache_key] = (digest, rep)
+        return rep
+
+    def _resolve_refs(self, data: dict) -> dict:
+        """将检查点中的存储引用还原为实际内容"""
+        from src.storage import NovelStorage
+        resolved = dict(data)
+        for field in _STORAGE_DRAFT_FIELDS:
+            value = resolved.get(field)
+            if not (isinstance(value, dict) and value.get("$ref") == _DRAFT_REF):
+                continue
+            try:
+                storage = NovelStorage(resolved.get("novel_title") or "")
+                resolved[field] = storage.load_checkpoint_draft(value["chapter"], field)
+            except (ValueError, OSError):
+                resolved[field] = None
+        for field, loader_name in _STORAGE_REF_FIELDS.items():
+            value = resolved.get(field)
+            if not (isinstance(value, dict) and "$ref" in value):
+                continue
+            try:
+                loaded = getattr(NovelStorage(resolved.get("novel_title") or ""), loader_name)()
+                resolved[field] = self._serialize_value(loaded)
+            except (ValueError, OSError):
+                resolved[field] = None
+        return resolved
+
+    def _checkpoint_signature(self, workflow_id: str) -> tuple:
+        """快照与增量日志的 (st_mtime_ns, st_size)，文件不存在时为 None"""
+        signature = []
+        for path in (self._checkpoint_path(workflow_id), self._checkpoint_log_path(workflow_id)):
+            try:
+                stat = path.stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _load_checkpoint_files(self, workflow_id: str) -> Optional[tuple]:
+        """从磁盘读取快照并重放增量日志，返回 (数据, 增量行数)"""
+        snapshot_path = self._checkpoint_path(workflow_id)
+        log_path = self._checkpoint_log_path(workflow_id)
+        if not snapshot_path.exists() and not log_path.exists():
+            return None
+
+        data: dict = {}
+        if snapshot_path.exists():
+            try:
+                with open(snapshot_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (json.JSONDecodeError, IOError):
+                return None
+
+        log_lines = 0
+        if log_path.exists():
+            with open(log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        data.update(json.loads(line))
+                        log_lines += 1
+                    except json.JSONDecodeError:
+                        # 写入中断导致的不完整行
+                        continue
+        return data, log_lines
+
+    def _read_checkpoint(self, workflow_id: str) -> Optional[dict]:
+        """读取快照并重放增量日志（未还原存储引用）
+
+        缓存只在文件签名未变化时使用，其他进程或 StateManager 实例写入后会重新读取
+        """
+        signature = self._checkpoint_signature(workflow_id)
+        cached = self._checkpoint_cache.get(workflow_id)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        loaded = self._load_checkpoint_files(workflow_id)
+        if loaded is None:
+            self._checkpoint_cache.pop(workflow_id, None)
+            self._checkpoint_log_lines.pop(workflow_id, None)
+            return None
+        data, log_lines = loaded
+        self._checkpoint_cache[workflow_id] = (signature, data)
+        self._checkpoint_log_lines[workflow_id] = log_lines
+        return data
+
+    def _compact_checkpoint(self, workflow_id: str, data: dict) -> None:
+        """写入完整快照并清空增量日志"""
+        path = self._checkpoint_path(workflow_id)
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, default=str)
+        tmp_path.replace(path)
+        self._checkpoint_log_path(workflow_id).unlink(missing_ok=True)
+        self._checkpoint_log_lines[workflow_id] = 0
+
     def save_checkpoint(self, workflow_id: str, state_data: dict) -> None:
-        """保存工作流检查点 - 包含完整的 NovelState 可序列化字段
+        """保存工作流检查点
+
+        只记录本步变化的字段，以追加方式写入增量日志，每 CHECKPOINT_COMPACT_EVERY 步合并为一次快照。
+        state_data 中未出现的字段沿用上一次的值（与 LangGraph 节点只返回部分状态一致）；
+        大纲、角色档案与 NovelStorage 中已保存的内容一致时只记录引用；
+        章节草稿与原始章节文本写入 NovelStorage，检查点只记录引用。
 
         Args:
             workflow_id: 工作流ID
-            state_data: 状态字典（包含可序列化的检查点数据）
+            state_data: 状态字典（通常是某个节点返回的部分状态）
         """
-        import copy
-
-        def serialize_value(v):
-            """序列化值，支持 Pydantic 模型和 datetime"""
-            if hasattr(v, 'model_dump'):
-                return v.model_dump()
-            elif isinstance(v, datetime):
-                return v.isoformat()
-            elif isinstance(v, list):
-                return [serialize_value(item) for item in v]
-            elif isinstance(v, dict):
-                return {k: serialize_value(val) for k, val in v.items()}
-            else:
-                return v
-
-        # 从 state_data 中提取完整检查点字段
-        checkpoint_data = {
-            "workflow_id": workflow_id,
-            "saved_at": datetime.now().isoformat(),
-
-            # 用户与配置
-            "user_intent": state_data.get("user_intent", ""),
-            "min_chapters": state_data.get("min_chapters", 10),
-            "max_attempts": state_data.get("max_attempts", 10),
-            "gradio_mode": state_data.get("gradio_mode", False),
-
-            # 大纲生成
-            "raw_outline": state_data.get("raw_outline"),
-            "validated_outline": serialize_value(state_data.get("validated_outline")),
-            "outline_validated_error": state_data.get("outline_validated_error"),
-
-            # 分卷大纲
-            "raw_master_outline": state_data.get("raw_master_outline"),
-            "current_volume_index": state_data.get("current_volume_index", 0),
-            "raw_volume_chapters": state_data.get("raw_volume_chapters"),
-            "validated_chapters": serialize_value(state_data.get("validated_chapters", [])),
-
-            # 角色档案
-            "row_characters": state_data.get("row_characters"),
-            "validated_characters": serialize_value(state_data.get("validated_characters")),
-            "characters_validated_error": state_data.get("characters_validated_error"),
-
-            # 章节内容
-            "current_chapter_index": state_data.get("current_chapter_index", 0),
-            "completed_chapters": state_data.get("completed_chapters", []),
-            "raw_current_chapter": state_data.get("raw_current_chapter"),
-            "validated_chapter_draft": serialize_value(state_data.get("validated_chapter_draft")),
-            "current_chapter_validated_error": state_data.get("current_chapter_validated_error"),
-
-            # 评估反馈
-            "evaluate_attempt": state_data.get("evaluate_attempt", 0),
-            "raw_chapter_evaluation": state_data.get("raw_chapter_evaluation"),
-            "validated_evaluation": serialize_value(state_data.get("validated_evaluation")),
-            "evaluation_validated_error": state_data.get("evaluation_validated_error"),
-
-            # 实体生成
-            "raw_entities": state_data.get("raw_entities"),
-            "entities_validated_error": state_data.get("entities_validated_error"),
-
-            # 反馈控制
-            "outline_feedback_request": state_data.get("outline_feedback_request"),
-            "outline_feedback_id": state_data.get("outline_feedback_id"),
-            "outline_feedback_action": state_data.get("outline_feedback_action"),
-            "outline_modified": state_data.get("outline_modified"),
-            "outline_feedback_error": state_data.get("outline_feedback_error"),
-
-            "character_feedback_request": state_data.get("character_feedback_request"),
-            "character_feedback_id": state_data.get("character_feedback_id"),
-            "character_feedback_action": state_data.get("character_feedback_action"),
-            "character_modified": state_data.get("character_modified"),
-            "character_feedback_error": state_data.get("character_feedback_error"),
-
-            "chapter_feedback_request": state_data.get("chapter_feedback_request"),
-            "chapter_feedback_id": state_data.get("chapter_feedback_id"),
-            "chapter_feedback_action": state_data.get("chapter_feedback_action"),
-            "chapter_modified": state_data.get("chapter_modified"),
-            "chapter_feedback_error": state_data.get("chapter_feedback_error"),
-
-            # 重试计数
-            "attempt": state_data.get("attempt", 0),
-
-            # 当前节点
-            "current_node": state_data.get("current_node", ""),
+        self._catalog_set(workflow_id, {"checkpoint": self._write_checkpoint(workflow_id, state_data)})
+
+    def _write_checkpoint(self, workflow_id: str, state_data: dict) -> dict:
+        """写入检查点增量/快照，返回目录索引摘要（不更新索引）"""
+        # 只取本次出现的字段
+        fields = {
+            key: self._serialize_value(state_data[key])
+            for key in _CHECKPOINT_DEFAULTS if key in state_data
         }
 
         # 获取小说标题（从 novel_storage 或 state）
         if "novel_storage" in state_data and state_data["novel_storage"]:
-            checkpoint_data["novel_title"] = state_data["novel_storage"].base_dir.name.replace("_storage", "")
+            fields["novel_title"] = state_data["novel_storage"].base_dir.name.replace("_storage", "")
         elif "novel_title" in state_data:
-            checkpoint_data["novel_title"] = state_data["novel_title"]
+            fields["novel_title"] = state_data["novel_title"]
 
         with self._lock:
-            path = self._checkpoint_path(workflow_id)
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(checkpoint_data, f, ensure_ascii=False, indent=2, default=str)
+            previous = self._read_checkpoint(workflow_id)
+            base = previous if previous is not None else {"workflow_id": workflow_id, **_CHECKPOINT_DEFAULTS}
+            novel_title = fields.get("novel_title", base.get("novel_title"))
+            for field in _STORAGE_REF_FIELDS:
+                if field in fields:
+                    fields[field] = self._storage_ref(workflow_id, novel_title, field, fields[field])
+            chapter_index = fields.get("current_chapter_index", base.get("current_chapter_index", 0))
+            for field in _STORAGE_DRAFT_FIELDS:
+                if field in fields:
+                    fields[field] = self._storage_draft_ref(workflow_id, novel_title, chapter_index, field, fields[field])
+
+            delta = {k: v for k, v in fields.items() if base.get(k) != v}
+            delta["saved_at"] = datetime.now().isoformat()
+            merged = {**base, **delta}
+
+            if previous is None or self._checkpoint_log_lines.get(workflow_id, 0) >= self.CHECKPOINT_COMPACT_EVERY:
+                self._compact_checkpoint(workflow_id, merged)
+            else:
+                with open(self._checkpoint_log_path(workflow_id), "a", encoding="utf-8") as f:
+                    f.write(json.dumps(delta, ensure_ascii=False, separators=(",", ":"), default=str) + "\n")
+                self._checkpoint_log_lines[workflow_id] = self._checkpoint_log_lines.get(workflow_id, 0) + 1
+            # 以写入后的文件签名缓存，下次读取时可直接复用
+            self._checkpoint_cache[workflow_id] = (self._checkpoint_signature(workflow_id), merged)
+
+        return {k: merged.get(k) for k in _CHECKPOINT_SUMMARY_FIELDS if k in merged}
 
     def load_checkpoint(self, workflow_id: str) -> Optional[dict]:
-        """加载工作流检查点
+        """加载工作流检查点（快照 + 增量日志，存储引用会被还原）
 
         Args:
             workflow_id: 工作流ID
@@ -303,14 +537,10 @@ class StateManager:
             检查点字典，如果不存在返回 None
         """
         with self._lock:
-            path = self._checkpoint_path(workflow_id)
-            if not path.exists():
-                return None
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                return None
+            data = self._read_checkpoint(workflow_id)
+        if data is None:
+            return None
+        return self._resolve_refs(data)
 
     def has_checkpoint(self, workflow_id: str) -> bool:
         """检查是否存在可恢复的检查点
@@ -321,7 +551,7 @@ class StateManager:
         Returns:
             是否存在检查点
         """
-        return self._checkpoint_path(workflow_id).exists()
+        return self._checkpoint_path(workflow_id).exists() or self._checkpoint_log_path(workflow_id).exists()
 
     def clear_checkpoint(self, workflow_id: str) -> bool:
         """清除工作流检查点（工作流正常完成后调用）
@@ -333,11 +563,53 @@ class StateManager:
             是否成功删除
         """
         with self._lock:
-            path = self._checkpoint_path(workflow_id)
-            if path.exists():
-                path.unlink()
-                return True
-            return False
+            self._checkpoint_cache.pop(workflow_id, None)
+            self._checkpoint_log_lines.pop(workflow_id, None)
+            for key in [k for k in self._ref_cache if k[0] == workflow_id]:
+                self._ref_cache.pop(key)
+            removed = False
+            for path in (self._checkpoint_path(workflow_id), self._checkpoint_log_path(workflow_id)):
+                if path.exists():
+                    path.unlink()
+                    removed = True
+            if not removed:
+                return False
+        self._catalog_set(workflow_id, {"checkpoint": None})
+        return True
+
+    def record_step(
+        self,
+        workflow_id: str,
+        node_name: str,
+        node_state: dict,
+        progress: Optional[float] = None
+    ) -> None:
+        """记录一个节点步骤
+
+        检查点只追加本步变化的字段；状态文件只合并摘要字段（保留 config 等元数据），
+        不再把整段节点输出写入状态文件。
+
+        Args:
+            workflow_id: 工作流ID
+            node_name: 节点名称
+            node_state: 节点返回的状态
+            progress: 进度 0.0~1.0
+        """
+        node_state["current_node"] = node_name
+        if hasattr(node_state.get("novel_storage"), "base_dir"):
+            node_state["novel_title"] = node_state["novel_storage"].base_dir.name.replace("_storage", "")
+        checkpoint_summary = self._write_checkpoint(workflow_id, node_state)
+
+        state = self.load_state(workflow_id) or {}
+        for key in _STATE_SUMMARY_FIELDS:
+            if key in node_state and not key.startswith("_"):
+                state[key] = node_state[key]
+        state["status"] = node_state.get("status") or WorkflowStatus.RUNNING.value
+        if progress is not None:
+            state["progress"] = progress
+        state_summary = self._write_state(workflow_id, state)
+        # 检查点与状态摘要一次写入目录索引
+        self._catalog_set(workflow_id, {"checkpoint": checkpoint_summary, "state": state_summary})
 
     def get_interrupted_workflows(self) -> list["WorkflowInfo"]:
         """获取所有可恢复的工作流（存在检查点的中断工作流）
@@ -346,49 +618,40 @@ class StateManager:
             可恢复工作流列表
         """
         workflows = []
-        with self._lock:
-            for path in self.storage_dir.glob("*_checkpoint.json"):
-                try:
-                    with open(path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-
-                    # 从检查点获取基本信息和状态
-                    workflow_id = data.get("workflow_id", path.stem.replace("_checkpoint", ""))
-                    state_path = self._workflow_path(workflow_id)
-
-                    # 加载工作流状态文件获取最新信息
-                    if state_path.exists():
-                        with open(state_path, "r", encoding="utf-8") as sf:
-                            state = json.load(sf)
-                        created_at = datetime.fromisoformat(state.get("_created_at", datetime.now().isoformat()))
-                        updated_at = datetime.fromisoformat(state.get("_saved_at", datetime.now().isoformat()))
-                        user_intent = state.get("user_intent", "")
-                        current_node = data.get("current_node", "")
-                        progress = state.get("progress", 0.0)
-                        status = WorkflowStatus(data.get("status", "running"))
-                    else:
-                        created_at = datetime.fromisoformat(data.get("saved_at", datetime.now().isoformat()))
-                        updated_at = datetime.fromisoformat(data.get("saved_at", datetime.now().isoformat()))
-                        user_intent = data.get("user_intent", "")
-                        current_node = data.get("current_node", "")
-                        progress = 0.0
-                        status = WorkflowStatus.RUNNING
-
-                    info = WorkflowInfo(
-                        workflow_id=workflow_id,
-                        user_intent=user_intent,
-                        created_at=created_at,
-                        updated_at=updated_at,
-                        status=status,
-                        current_node=current_node,
-                        progress=progress,
-                        error=None,
-                        novel_title=data.get("novel_title"),
-                        current_chapter_index=data.get("current_chapter_index", 0)
-                    )
-                    workflows.append(info)
-                except (json.JSONDecodeError, ValueError, OSError):
-                    continue
+        for workflow_id, entry in self._catalog_entries().items():
+            data = entry.get("checkpoint")
+            if not data:
+                continue
+            try:
+                # 优先使用工作流状态中的最新信息
+                state = entry.get("state")
+                if state:
+                    created_at = datetime.fromisoformat(state.get("_created_at") or datetime.now().isoformat())
+                    updated_at = datetime.fromisoformat(state.get("_saved_at") or datetime.now().isoformat())
+                    user_intent = state.get("user_intent") or ""
+                    progress = state.get("progress") or 0.0
+                    status = WorkflowStatus(data.get("status") or "running")
+                else:
+                    created_at = datetime.fromisoformat(data.get("saved_at") or datetime.now().isoformat())
+                    updated_at = created_at
+                    user_intent = data.get("user_intent") or ""
+                    progress = 0.0
+                    status = WorkflowStatus.RUNNING
+
+                workflows.append(WorkflowInfo(
+                    workflow_id=workflow_id,
+                    user_intent=user_intent,
+                    created_at=created_at,
+                    updated_at=updated_at,
+                    status=status,
+                    current_node=data.get("current_node") or "",
+                    progress=progress,
+                    error=None,
+                    novel_title=data.get("novel_title"),
+                    current_chapter_index=data.get("current_chapter_index") or 0
+                ))
+            except ValueError:
+                continue
 
         return sorted(workflows, key=lambda w: w.updated_at, reverse=True)
 
@@ -12,6 +12,7 @@ from typing import Optional, Callable, Iterator, Any, AsyncIterator
 from datetime import datetime
 
 from src.workflow import create_workflow
+from src.supervisor_node import release_supervisor
 from src.config_loader import ModelConfig, BaseConfig
 from src.core.state_manager import StateManager
 from src.storage import NovelStorage
@@ -212,7 +213,11 @@ class WorkflowService:
         agent_config = BaseConfig(**agent_config_data) if agent_config_data else None
 
         # 创建工作流（从检查点恢复时）
-        workflow = create_workflow(model_config, agent_config, execution_mode=state.get("execution_mode", "serial"))
+        workflow = create_workflow(
+            model_config, agent_config,
+            execution_mode=state.get("execution_mode", "serial"),
+            workflow_id=workflow_id
+        )
 
         # 订阅进度
         if progress_callback:
@@ -310,19 +315,8 @@ class WorkflowService:
                 for node_name, node_state in step.items():
                     node_state["workflow_id"] = workflow_id
                     node_state["status"] = WorkflowStatus.RUNNING.value
-                    self.state_manager.save_state(workflow_id, node_state)
-
-                    node_state["current_node"] = node_name
-                    node_state["novel_title"] = node_state.get("novel_storage", state.get("novel_title", "")).base_dir.name.replace("_storage", "") if hasattr(node_state.get("novel_storage"), "base_dir") else ""
-                    self.state_manager.save_checkpoint(workflow_id, node_state)
-
                     progress = self._calculate_progress(node_name, node_state, agent_config)
-                    self.state_manager.update_status(
-                        workflow_id,
-                        WorkflowStatus.RUNNING,
-                        current_node=node_name,
-                        progress=progress
-                    )
+                    self.state_manager.record_step(workflow_id, node_name, node_state, progress=progress)
 
                     emit_progress(
                         workflow_id=workflow_id,
@@ -380,6 +374,7 @@ class WorkflowService:
             raise
 
         finally:
+            release_supervisor(workflow_id)
             if progress_callback:
                 self._progress_emitter.unsubscribe(progress_callback)
 
@@ -521,7 +516,11 @@ class WorkflowService:
         agent_config = BaseConfig(**agent_config_data) if agent_config_data else None
 
         # 创建工作流（execute_streaming恢复时）
-        workflow = create_workflow(model_config, agent_config, execution_mode=state.get("execution_mode", "serial"))
+        workflow = create_workflow(
+            model_config, agent_config,
+            execution_mode=state.get("execution_mode", "serial"),
+            workflow_id=workflow_id
+        )
 
         # 订阅进度
         if progress_callback:
@@ -624,24 +623,11 @@ class WorkflowService:
                         break
 
                 for node_name, node_state in step.items():
-                    # 保存当前状态
+                    # 保存检查点增量与状态摘要（用于断点续传）
                     node_state["workflow_id"] = workflow_id
                     node_state["status"] = WorkflowStatus.RUNNING.value
-                    self.state_manager.save_state(workflow_id, node_state)
-
-                    # 保存检查点（用于断点续传）
-                    node_state["current_node"] = node_name
-                    node_state["novel_title"] = node_state.get("novel_storage", state.get("novel_title", "")).base_dir.name.replace("_storage", "") if hasattr(node_state.get("novel_storage"), "base_dir") else ""
-                    self.state_manager.save_checkpoint(workflow_id, node_state)
-
-                    # 计算进度
                     progress = self._calculate_progress(node_name, node_state, agent_config)
-                    self.state_manager.update_status(
-                        workflow_id,
-                        WorkflowStatus.RUNNING,
-                        current_node=node_name,
-                        progress=progress
-                    )
+                    self.state_manager.record_step(workflow_id, node_name, node_state, progress=progress)
 
                     # 发布进度事件
                     emit_progress(
@@ -701,6 +687,7 @@ class WorkflowService:
             raise
 
         finally:
+            release_supervisor(workflow_id)
             # 取消订阅
             if progress_callback:
                 self._progress_emitter.unsubscribe(progress_callback)
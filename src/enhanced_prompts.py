@@ -156,6 +156,8 @@ ENHANCED_WRITER_COMPREHENSIVE_REWRITE_PROMPT = """你是资深小说创作专家
 2. 章节要求：【{chapter_outline_title}】；关键事件【{chapter_outline_key_events}】
 3. 角色信息：【{character}】
 4. 上下文：前文【{pre_context}】，后文【{post_summary}】
+5. 前情提要：
+{story_so_far}
 
 ## 重写要求
 1. 从全新角度构思章节结构
@@ -0,0 +1,323 @@
+"""
+小说导出 - 从 NovelStorage 逐章流式导出 TXT / Markdown / EPUB
+
+导出过程不会一次性加载全部章节：章节按顺序从存储中读取，
+每写完一章就把产生的字节交给调用方（写文件或 HTTP 流式响应），
+因此内存占用与小说长度无关。
+"""
+import logging
+import os
+import uuid
+import zipfile
+import zlib
+from datetime import datetime, timezone
+from html import escape
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from src.model import Character, ChapterContent, NovelOutline
+from src.storage import NovelStorage
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("txt", "md", "epub")
+
+MEDIA_TYPES = {
+    "txt": "text/plain; charset=utf-8",
+    "md": "text/markdown; charset=utf-8",
+    "epub": "application/epub+zip",
+}
+
+
+class _ZipStreamSink:
+    """zipfile 的不可 seek 输出目标，缓存写入的字节供生成器取走"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # 提供 tell 让 zipfile 从已写入的字节之后开始计算条目偏移
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _write_epub_mimetype(sink: _ZipStreamSink) -> zipfile.ZipInfo:
+    """手写 EPUB 的 mimetype 条目（位于 zip 开头、不压缩、无数据描述符）
+
+    zipfile 写入不可 seek 的目标时会为所有条目设置标志位 3（大小写在数据之后），
+    EPUB 规范要求 mimetype 的本地文件头中直接带有 CRC 和大小，因此在打开 ZipFile 之前手写
+    """
+    data = MEDIA_TYPES["epub"].encode("ascii")
+    info = zipfile.ZipInfo("mimetype")
+    info.compress_type = zipfile.ZIP_STORED
+    info.flag_bits = 0
+    info.external_attr = 0o600 << 16
+    info.CRC = zlib.crc32(data)
+    info.file_size = info.compress_size = len(data)
+    info.header_offset = sink.tell()
+    sink.write(info.FileHeader() + data)
+    return info
+
+
+class NovelExporter:
+    """小说导出器
+
+    Args:
+        storage: 小说存储
+    """
+
+    def __init__(self, storage: NovelStorage):
+        self.storage = storage
+        self.outline: Optional[NovelOutline] = storage.load_outline()
+        self.characters: List[Character] = storage.load_characters() or []
+
+    @property
+    def title(self) -> str:
+        if self.outline:
+            return self.outline.title.split('.')[-1]
+        return self.storage.get_novel_title()
+
+    def default_filename(self, fmt: str) -> str:
+        return f"{self.title.replace(' ', '_').replace('/', '_')}.{fmt}"
+
+    def iter_bytes(self, fmt: str) -> Iterator[bytes]:
+        """按格式逐块生成导出内容
+
+        Raises:
+            ValueError: 不支持的导出格式
+        """
+        if fmt == "txt":
+            return self._encode(self._iter_txt())
+        if fmt == "md":
+            return self._encode(self._iter_markdown())
+        if fmt == "epub":
+            return self._iter_epub()
+        raise ValueError(f"不支持的导出格式: {fmt}，可选: {', '.join(EXPORT_FORMATS)}")
+
+    def export(self, fmt: str, output_path: Optional[str] = None) -> Path:
+        """导出到文件
+
+        Args:
+            fmt: 导出格式（txt / md / epub）
+            output_path: 输出路径，默认 result/{标题}_{时间戳}.{格式}
+
+        Returns:
+            输出文件路径
+        """
+        chunks = self.iter_bytes(fmt)
+        if not output_path:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            stem = self.default_filename(fmt).rsplit(".", 1)[0]
+            output_path = os.path.join("result", f"{stem}_{timestamp}.{fmt}")
+        path = Path(output_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        logger.info(f"[NovelExporter] 已导出 {fmt}: {path}")
+        return path
+
+    def export_chapter_files(self, output_dir: str) -> Tuple[Path, List[Path]]:
+        """分章导出：大纲和角色写入 00_main_info.txt，每章一个 TXT 文件
+
+        Returns:
+            (主信息文件路径, 章节文件路径列表)
+        """
+        out_dir = Path(output_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        main_file_path = out_dir / "00_main_info.txt"
+        with open(main_file_path, "w", encoding="utf-8") as f:
+            for text in self._iter_txt_header():
+                f.write(text)
+
+        chapter_paths = []
+        for i, (_, chapter) in enumerate(self.storage.iter_chapters(), 1):
+            chapter_title = chapter.title.replace(' ', '_').replace('/', '_')
+            chapter_path = out_dir / f"{i:02d}_{chapter_title}.txt"
+            with open(chapter_path, "w", encoding="utf-8") as f:
+                f.write(self._txt_chapter(i, chapter))
+            chapter_paths.append(chapter_path)
+        return main_file_path, chapter_paths
+
+    # ========== TXT ==========
+
+    @staticmethod
+    def _encode(texts: Iterator[str]) -> Iterator[bytes]:
+        for text in texts:
+            yield text.encode("utf-8")
+
+    def _iter_txt_header(self) -> Iterator[str]:
+        outline = self.outline
+        if outline:
+            yield "=" * 50 + "\n"
+            yield "【小说大纲】\n"
+            yield "=" * 50 + "\n"
+            yield f"标题: {outline.title}\n"
+            yield f"类型: {outline.genre}\n"
+            yield f"主题: {outline.theme}\n"
+            yield f"背景: {outline.setting}\n\n"
+            yield "情节概要:\n"
+            yield f"{outline.plot_summary}\n\n"
+
+        if self.characters:
+            yield "\n" + "=" * 50 + "\n"
+            yield "【角色档案】\n"
+            yield "=" * 50 + "\n"
+            for char in self.characters:
+                yield (
+                    f"角色名称: {char.name}\n"
+                    f"背景: {char.background}\n"
+                    f"性格: {char.personality}\n"
+                    f"目标: {', '.join(char.goals)}\n"
+                    f"冲突: {', '.join(char.conflicts)}\n"
+                    f"成长弧线: {char.arc}\n\n"
+                )
+
+    @staticmethod
+    def _txt_chapter(i: int, chapter: ChapterContent) -> str:
+        return f"第{i}章: {chapter.title}\n" + "-" * 40 + "\n" + f"{chapter.content}\n\n"
+
+    def _iter_txt(self) -> Iterator[str]:
+        yield from self._iter_txt_header()
+        yield "\n" + "=" * 50 + "\n"
+        yield "【章节内容】\n"
+        yield "=" * 50 + "\n"
+        for i, (_, chapter) in enumerate(self.storage.iter_chapters(), 1):
+            yield self._txt_chapter(i, chapter)
+
+    # ========== Markdown ==========
+
+    def _iter_markdown(self) -> Iterator[str]:
+        yield f"# {self.title}\n\n"
+        outline = self.outline
+        if outline:
+            yield f"- **类型**: {outline.genre}\n"
+            yield f"- **主题**: {outline.theme}\n"
+            yield f"- **背景**: {outline.setting}\n\n"
+            yield f"## 情节概要\n\n{outline.plot_summary}\n\n"
+
+        if self.characters:
+            yield "## 角色档案\n\n"
+            for char in self.characters:
+                yield (
+                    f"### {char.name}\n\n"
+                    f"- **背景**: {char.background}\n"
+                    f"- **性格**: {char.personality}\n"
+                    f"- **目标**: {', '.join(char.goals)}\n"
+                    f"- **冲突**: {', '.join(char.conflicts)}\n"
+                    f"- **成长弧线**: {char.arc}\n\n"
+                )
+
+        for i, (_, chapter) in enumerate(self.storage.iter_chapters(), 1):
+            yield f"## 第{i}章 {chapter.title}\n\n{chapter.content.strip()}\n\n"
+
+    # ========== EPUB ==========
+
+    def _iter_epub(self) -> Iterator[bytes]:
+        """EPUB 3：章节逐个写入 zip，目录和 OPF 在最后写入（zip 条目顺序除 mimetype 外不受限制）"""
+        sink = _ZipStreamSink()
+        chapters: List[Tuple[str, str]] = []  # (文件名, 标题)
+        mimetype = _write_epub_mimetype(sink)
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            # 登记到中央目录
+            zf.filelist.append(mimetype)
+            zf.NameToInfo[mimetype.filename] = mimetype
+            zf.writestr("META-INF/container.xml", _CONTAINER_XML)
+            zf.writestr("OEBPS/info.xhtml", self._xhtml("简介", self._info_body()))
+            yield sink.drain()
+
+            for i, (_, chapter) in enumerate(self.storage.iter_chapters(), 1):
+                name = f"chapter_{i:04d}.xhtml"
+                heading = f"第{i}章 {chapter.title}"
+                with zf.open(f"OEBPS/{name}", "w") as entry:
+                    entry.write(self._xhtml_head(heading).encode("utf-8"))
+                    entry.write(f"<h2>{escape(heading)}</h2>\n".encode("utf-8"))
+                    for para in chapter.content.splitlines():
+                        if para.strip():
+                            entry.write(f"<p>{escape(para.strip())}</p>\n".encode("utf-8"))
+                    entry.write(_XHTML_TAIL.encode("utf-8"))
+                chapters.append((name, heading))
+                yield sink.drain()
+
+            zf.writestr("OEBPS/nav.xhtml", self._nav(chapters))
+            zf.writestr("OEBPS/content.opf", self._opf(chapters))
+        yield sink.drain()
+
+    def _info_body(self) -> str:
+        parts = [f"<h1>{escape(self.title)}</h1>"]
+        if self.outline:
+            parts.append(f"<p>类型: {escape(self.outline.genre)}</p>")
+            parts.append(f"<p>主题: {escape(self.outline.theme)}</p>")
+            parts.append(f"<p>背景: {escape(self.outline.setting)}</p>")
+            parts.append(f"<h2>情节概要</h2><p>{escape(self.outline.plot_summary)}</p>")
+        if self.characters:
+            parts.append("<h2>角色档案</h2>")
+            for char in self.characters:
+                parts.append(f"<h3>{escape(char.name)}</h3><p>{escape(char.background)}</p>")
+        return "\n".join(parts)
+
+    @staticmethod
+    def _xhtml_head(title: str) -> str:
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<!DOCTYPE html>\n'
+            '<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops" lang="zh-CN">\n'
+            f'<head><meta charset="utf-8"/><title>{escape(title)}</title></head>\n<body>\n'
+        )
+
+    def _xhtml(self, title: str, body: str) -> str:
+        return self._xhtml_head(title) + body + "\n" + _XHTML_TAIL
+
+    def _nav(self, chapters: List[Tuple[str, str]]) -> str:
+        items = ['<li><a href="info.xhtml">简介</a></li>']
+        items += [f'<li><a href="{name}">{escape(heading)}</a></li>' for name, heading in chapters]
+        body = '<nav epub:type="toc" id="toc"><h1>目录</h1><ol>\n' + "\n".join(items) + "\n</ol></nav>"
+        return self._xhtml("目录", body)
+
+    def _opf(self, chapters: List[Tuple[str, str]]) -> str:
+        modified = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        book_id = uuid.uuid5(uuid.NAMESPACE_URL, self.storage.get_novel_title())
+        manifest = [
+            '<item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>',
+            '<item id="info" href="info.xhtml" media-type="application/xhtml+xml"/>',
+        ]
+        spine = ['<itemref idref="info"/>']
+        for i, (name, _) in enumerate(chapters, 1):
+            manifest.append(f'<item id="ch{i}" href="{name}" media-type="application/xhtml+xml"/>')
+            spine.append(f'<itemref idref="ch{i}"/>')
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="bookid">\n'
+            '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">\n'
+            f'<dc:identifier id="bookid">urn:uuid:{book_id}</dc:identifier>\n'
+            f'<dc:title>{escape(self.title)}</dc:title>\n'
+            '<dc:language>zh-CN</dc:language>\n'
+            f'<meta property="dcterms:modified">{modified}</meta>\n'
+            '</metadata>\n'
+            '<manifest>\n' + "\n".join(manifest) + '\n</manifest>\n'
+            '<spine>\n' + "\n".join(spine) + '\n</spine>\n'
+            '</package>\n'
+        )
+
+
+_CONTAINER_XML = (
+    '<?xml version="1.0" encoding="utf-8"?>\n'
+    '<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">\n'
+    '<rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/></rootfiles>\n'
+    '</container>\n'
+)
+
+_XHTML_TAIL = "</body>\n</html>\n"
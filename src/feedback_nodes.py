@@ -2,7 +2,7 @@
 统一反馈系统 - 合并 outline_feedback_nodes.py, character_feedback_nodes.py, chapter_feedback_nodes.py
 通过泛型设计减少代码重复，提高可维护性
 """
-from typing import Dict, Any, Literal, TypeVar, Generic, Optional
+from typing import Dict, Any, Callable, Literal, TypeVar, Generic, Optional, Union
 from src.state import NovelState
 from src.model import NovelOutline, Character, ChapterContent
 from src.log_config import loggers
@@ -79,10 +79,17 @@ def create_feedback_node(
     feedback_request_attr: str,
     feedback_action_attr: str,
     feedback_error_attr: str,
-    file_path_template: str,
-    feedback_type_name: str
+    file_path_template: Union[str, Callable[[NovelState], str]],
+    feedback_type_name: str,
+    load_modified: Optional[Callable[[NovelState], Any]] = None
 ):
-    """创建-反馈节点"""
+    """创建-反馈节点
+
+    Args:
+        file_path_template: 供用户查看/修改的文件路径模板；为函数时调用它导出可编辑文件并返回路径
+        load_modified: 用户修改完成后读取修改内容的函数（返回 None 表示未修改），
+            未提供时修改直接作用于存储文件，由后续节点读取
+    """
 
     def feedback_node(state: NovelState) -> Dict[str, Any]:
         """通用反馈节点 - 等待用户确认或修改内容"""
@@ -100,12 +107,10 @@ def create_feedback_node(
                 }
             else:
                 # 命令行模式：请求用户交互
-                current_index = getattr(state, 'current_chapter_index', 0)
-                file_path = file_path_template.format(
-                    title=state.novel_storage.load_outline().title,
-                    index=current_index + 1,
-                    index_padded=f"{current_index + 1:04d}"
-                )
+                if callable(file_path_template):
+                    file_path = file_path_template(state)
+                else:
+                    file_path = file_path_template.format(title=state.novel_storage.load_outline().title)
 
                 step = input(f"您可以查看{file_path}文件，如果需要修改可以直接对源文件内容修改！\n请确认{feedback_type_name}无误，是否需要修改？\n(y(修改)/r(重新生成/n(不做改变)\n")
                 feedback_request = feedback_manager.request_feedback(
@@ -114,10 +119,15 @@ def create_feedback_node(
                     state=state
                 )
 
+                modified_content = None
                 if step.lower() == "y":
                     # 请求用户反馈
                     input("如果您修改完了，回车继续后续流程")
                     action = "continue"
+                    if load_modified is not None:
+                        modified_content = load_modified(state)
+                        if modified_content is not None:
+                            action = "modify"
                 elif step.lower() == "r":
                     action = "regenerate"
                 else:
@@ -127,7 +137,7 @@ def create_feedback_node(
                 feedback_submit = feedback_manager.submit_feedback(
                     feedback_id=feedback_request["feedback_id"],
                     action= action,
-                    modified_content=None
+                    modified_content=modified_content
                 )
 
                 return {
@@ -148,9 +158,14 @@ def create_process_feedback_node(
     feedback_id_attr: str,
     feedback_action_attr: str,
     feedback_error_attr: str,
-    feedback_type_name: str
+    feedback_type_name: str,
+    raw_attr: Optional[str] = None
 ):
-    """创建-处理反馈结果节点"""
+    """创建-处理反馈结果节点
+
+    Args:
+        raw_attr: 与 content_attr 对应的原始 JSON 文本字段，用户修改内容时一并更新
+    """
 
     def process_feedback_node(state: NovelState) -> Dict[str, Any]:
         """处理反馈结果"""
@@ -177,17 +192,20 @@ def create_process_feedback_node(
 
             action = feedback.get("action", "continue")
 
-            # 暂未启用
+            # 用户编辑了导出文件（目前用于章节内容）
             if action == "modify" and "modified_content" in feedback:
                 # 用户修改了内容
                 modified_content = feedback["modified_content"]
                 logger.info(f"用户修改了{feedback_type_name}，应用修改")
 
-                return {
+                result = {
                     **base_result,
                     content_attr: modified_content,
                     feedback_action_attr: "success"
                 }
+                if raw_attr:
+                    result[raw_attr] = json.dumps(modified_content.model_dump(), ensure_ascii=False)
+                return result
             elif action == "regenerate":
                 # 用户要求重新生成
                 logger.info(f"用户要求重新生成{feedback_type_name}")
@@ -288,14 +306,36 @@ check_character_feedback_node = create_check_feedback_node(
     feedback_error_attr="character_feedback_error"
 )
 
+def _export_chapter_draft(state: NovelState) -> str:
+    """导出当前章节草稿为未编码 JSON：章节在接受前尚未写入存储，且启用压缩编码时存储文件无法直接编辑"""
+    chapter_number = state.current_chapter_index + 1
+    chapter = state.validated_chapter_draft or state.novel_storage.load_chapter(chapter_number)
+    if chapter is None:
+        return str(state.novel_storage.base_dir)
+    return str(state.novel_storage.export_editable_chapter(chapter_number, chapter))
+
+
+def _load_chapter_draft(state: NovelState) -> Optional[ChapterContent]:
+    """读取用户编辑后的章节草稿，未改动或格式错误时返回 None（沿用原草稿）"""
+    try:
+        chapter = state.novel_storage.load_editable_chapter(state.current_chapter_index + 1)
+    except ValueError as e:
+        logger.warning(f"章节编辑文件格式错误，沿用原内容: {e}")
+        return None
+    if chapter is None or chapter == state.validated_chapter_draft:
+        return None
+    return chapter
+
+
 chapter_feedback_node = create_feedback_node(
     feedback_manager=chapter_feedback_manager,
     feedback_id_attr="chapter_feedback_id",
     feedback_request_attr="chapter_feedback_request",
     feedback_action_attr="chapter_feedback_action",
     feedback_error_attr="chapter_feedback_error",
-    file_path_template="result/{title}_storage/chapters_json/{index_padded}.json",
-    feedback_type_name="章节内容"
+    file_path_template=_export_chapter_draft,
+    feedback_type_name="章节内容",
+    load_modified=_load_chapter_draft
 )
 
 process_chapter_feedback_node = create_process_feedback_node(
@@ -304,7 +344,8 @@ process_chapter_feedback_node = create_process_feedback_node(
     feedback_id_attr="chapter_feedback_id",
     feedback_action_attr="chapter_feedback_action",
     feedback_error_attr="chapter_feedback_error",
-    feedback_type_name="章节内容"
+    feedback_type_name="章节内容",
+    raw_attr="raw_current_chapter"
 )
 
 check_chapter_feedback_node = create_check_feedback_node(
@@ -316,7 +357,7 @@ check_chapter_feedback_node = create_check_feedback_node(
 def check_chapter_feedback_deep_mode_node(state: NovelState) -> Literal["success", "retry", "failure", "deep_skip"]:
     """检查章节反馈处理结果，deep模式下跳过评估链直接进入supervisor"""
     if state.gradio_mode:
-        return "deep_skip" if state.evaluation_mode == "deep" else "success"
+        return "deep_skip" if state.evaluation_mode in ("deep", "fused") else "success"
 
     logger.info(f"检查反馈处理结果: chapter_feedback_action = {getattr(state, 'chapter_feedback_action', None)}; chapter_feedback_error = {getattr(state, 'chapter_feedback_error', None)}")
 
@@ -326,7 +367,7 @@ def check_chapter_feedback_deep_mode_node(state: NovelState) -> Literal["success
     action = getattr(state, 'chapter_feedback_action', None)
     if action == "success" or action is None:
         # deep模式跳过评估链，直接进入supervisor_node
-        if state.evaluation_mode == "deep":
+        if state.evaluation_mode in ("deep", "fused"):
             return "deep_skip"
         return "success"
     elif action == "retry":
@@ -1,5 +1,5 @@
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
 from typing import List, Optional, Any, Literal, Dict
 from datetime import datetime
 
@@ -426,6 +426,9 @@ class WorldRuleSet(BaseModel):
     novel_title: str = ""
     rules: List[WorldRule] = []
 
+    # 编译后的规则匹配器（src.rule_engine），规则列表变化时重建
+    _compiled: Any = PrivateAttr(default=None)
+
     def add_rule(self, rule: WorldRule) -> None:
         """添加规则，自动检测冲突"""
         # 简单的冲突检测：同类型、同主体的规则
@@ -450,15 +453,16 @@ class WorldRuleSet(BaseModel):
 
     def check_violation(self, content: str, context: dict = None) -> List[dict]:
         """检查内容是否违反任何规则"""
-        violations = []
-        for rule in self.rules:
-            if rule.check(content, context):
-                violations.append({
-                    "rule": rule,
-                    "severity": rule.severity,
-                    "description": f"违反世界规则: {rule.description}"
-                })
-        return violations
+        from src.rule_engine import compile_rules
+        self._compiled = compile_rules(self.rules, self._compiled)
+        return [
+            {
+                "rule": rule,
+                "severity": rule.severity,
+                "description": f"违反世界规则: {rule.description}"
+            }
+            for rule in self._compiled.violated_rules(content, context)
+        ]
 
     def get_rules_for_subject(self, subject: str) -> List[WorldRule]:
         """获取指定主体的所有规则"""
@@ -492,6 +496,26 @@ class ConsistencyNote(BaseModel):
     created_at: Optional[datetime] = None
 
 
+class _TrackedList(list):
+    """原地修改后标记 dirty 的列表（供 StoryBibleContent 判断角色弧线索引是否需要重建）"""
+    dirty = True
+
+
+def _mark_dirty(name: str):
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        self.dirty = True
+        return method(self, *args, **kwargs)
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend",
+              "insert", "pop", "remove", "clear", "sort", "reverse"):
+    setattr(_TrackedList, _name, _mark_dirty(_name))
+
+
 class StoryBibleContent(BaseModel):
     """StoryBible内容模型 - 多Agent共享知识库"""
     novel_title: str = ""           # 小说标题
@@ -500,11 +524,17 @@ class StoryBibleContent(BaseModel):
     plot_threads: List[PlotThread] = []
 
     # 角色弧线
-    character_arcs: List[CharacterArc] = []
+    character_arcs: List[CharacterArc] = Field(default_factory=_TrackedList)
 
-    # 世界状态历史
+    # 世界状态历史（近期明细，更早的已归档到冷存储）
     world_states: List[WorldState] = []
 
+    # 已归档世界状态的分卷汇总 {卷索引: 汇总}
+    world_state_summaries: Dict[int, Dict[str, Any]] = {}
+
+    # 已归档到冷存储的条目数 {"world_states": n, "entities": n}
+    archived_counts: Dict[str, int] = {}
+
     # 世界规则
     world_rules: List[WorldRule] = []
 
@@ -520,6 +550,9 @@ class StoryBibleContent(BaseModel):
     # 最后更新时间
     last_updated: datetime = None
 
+    _arc_index: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _compiled_rules: Any = PrivateAttr(default=None)
+
     def get_active_plot_threads(self) -> List[PlotThread]:
         """获取活跃情节线"""
         return [t for t in self.plot_threads if t.is_active()]
@@ -528,12 +561,41 @@ class StoryBibleContent(BaseModel):
         """获取未解伏笔"""
         return [t for t in self.plot_threads if t.status == "foreshadowed"]
 
+    @field_validator("character_arcs", mode="after")
+    @classmethod
+    def _track_character_arcs(cls, arcs: List[CharacterArc]) -> List[CharacterArc]:
+        return _TrackedList(arcs)
+
     def get_character_arc(self, name: str) -> Optional[CharacterArc]:
         """获取指定角色弧线"""
-        for arc in self.character_arcs:
-            if arc.name == name:
-                return arc
-        return None
+        arcs = self.character_arcs
+        pos = self._arc_positions().get(name)
+        if pos is not None and arcs[pos].name != name:
+            # 弧线对象被原地改名，索引过期
+            if isinstance(arcs, _TrackedList):
+                arcs.dirty = True
+            pos = self._arc_positions().get(name)
+        return arcs[pos] if pos is not None else None
+
+    def upsert_character_arc(self, arc: CharacterArc) -> None:
+        """按角色名替换已有弧线，不存在时追加（同步维护索引，不触发重建）"""
+        arcs = self.character_arcs
+        if self.get_character_arc(arc.name) is not None:
+            list.__setitem__(arcs, self._arc_index[arc.name], arc)
+        else:
+            self._arc_index[arc.name] = len(arcs)
+            list.append(arcs, arc)
+
+    def _arc_positions(self) -> Dict[str, int]:
+        """角色名 -> 列表下标 的索引，列表被修改（dirty）时重建；直接赋值的普通列表无法跟踪，每次重建"""
+        arcs = self.character_arcs
+        if getattr(arcs, "dirty", True):
+            self._arc_index = {}
+            for i, arc in enumerate(arcs):
+                self._arc_index.setdefault(arc.name, i)
+            if isinstance(arcs, _TrackedList):
+                arcs.dirty = False
+        return self._arc_index
 
     def get_latest_world_state(self) -> Optional[WorldState]:
         """获取最新世界状态"""
@@ -566,15 +628,16 @@ class StoryBibleContent(BaseModel):
 
     def check_world_rule_violations(self, content: str, context: dict = None) -> List[dict]:
         """检查内容是否违反世界规则"""
-        violations = []
-        for rule in self.world_rules:
-            if rule.check(content, context):
-                violations.append({
-                    "rule": rule,
-                    "severity": rule.severity,
-                    "description": f"违反世界规则: {rule.description}"
-                })
-        return violations
+        from src.rule_engine import compile_rules
+        self._compiled_rules = compile_rules(self.world_rules, self._compiled_rules)
+        return [
+            {
+                "rule": rule,
+                "severity": rule.severity,
+                "description": f"违反世界规则: {rule.description}"
+            }
+            for rule in self._compiled_rules.violated_rules(content, context)
+        ]
 
     def get_overdue_foreshadows(self, current_chapter: int) -> List[PlotThread]:
         """获取逾期未回收的伏笔"""
@@ -1,12 +1,14 @@
 from abc import ABC, abstractmethod
 from transformers import pipeline, AutoTokenizer
 from typing import Dict, Any, Optional, List
+import copy
 import time
 import logging
 import asyncio
 import anthropic
 from openai import OpenAI, AsyncOpenAI
 from src.config_loader import BaseConfig
+from src.prompt_cache import flatten_content, record_usage, to_anthropic_messages, to_openai_messages
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +24,12 @@ class ModelManager(ABC):
         """异步生成（用于并行场景）"""
         pass
 
+    def with_model(self, model_name: str) -> "ModelManager":
+        """同一端点换用另一个模型：共享客户端、连接池与并发限制，只替换模型名"""
+        clone = copy.copy(self)
+        clone.model_name = model_name
+        return clone
+
 # 本地模型管理
 class LocalModelManager(ModelManager):
 
@@ -50,12 +58,17 @@ class LocalModelManager(ModelManager):
         """本地模型的同步转异步实现（无并行收益）"""
         return self.generate(messages, params)
 
+    def with_model(self, model_name: str) -> "ModelManager":
+        """本地模型已加载到显存，不支持按角色切换"""
+        logger.warning(f"本地模型不支持按角色切换模型，忽略 {model_name}")
+        return self
+
     def _messages_to_prompt(self, messages: List[Dict[str, Any]]) -> str:
         """Convert a messages list to a single prompt string."""
         parts = []
         for msg in messages:
             role = msg.get("role", "user")
-            content = msg.get("content", "")
+            content = flatten_content(msg.get("content", ""))
             if role == "system":
                 parts.append(f"System: {content}")
             elif role == "user":
@@ -137,11 +150,12 @@ class APIModelManager(ModelManager):
             try:
                 response = self.client.chat.completions.create(
                     model=self.model_name,
-                    messages=messages,
+                    messages=to_openai_messages(messages),
                     temperature=params.temperature,
                     top_p=params.top_p,
                     max_tokens=params.max_new_tokens
                 )
+                record_usage(response)
                 if not response.choices or not response.choices[0].message:
                     raise Exception(f"API 返回空响应: {response}")
                 return response.choices[0].message.content
@@ -156,11 +170,12 @@ class APIModelManager(ModelManager):
         """异步使用 OpenAI SDK 生成内容"""
         response = await self.async_client.chat.completions.create(
             model=self.model_name,
-            messages=messages,
+            messages=to_openai_messages(messages),
             temperature=params.temperature,
             top_p=params.top_p,
             max_tokens=params.max_new_tokens
         )
+        record_usage(response)
         if not response.choices:
             raise Exception(f"API 返回空 choices: {response}")
         if not response.choices[0]:
@@ -174,18 +189,7 @@ class APIModelManager(ModelManager):
 
     def _generate_anthropic(self, messages: List[Dict[str, Any]], params: BaseConfig) -> str:
         """使用 Anthropic SDK 生成内容"""
-        anthropic_messages = []
-        system_prompt = ""
-
-        for msg in messages:
-            role = msg.get("role", "user")
-            content = msg.get("content", "")
-            if role == "system":
-                system_prompt = content
-            elif role == "user":
-                anthropic_messages.append({"role": "user", "content": content})
-            elif role == "assistant":
-                anthropic_messages.append({"role": "assistant", "content": content})
+        system_prompt, anthropic_messages = to_anthropic_messages(messages)
 
         for attempt in range(self.max_retries):
             try:
@@ -196,6 +200,7 @@ class APIModelManager(ModelManager):
                     temperature=params.temperature,
                     max_tokens=params.max_new_tokens
                 )
+                record_usage(response)
                 # 处理多种类型的 content block
                 if not response.content:
                     raise Exception(f"API 返回空 content: {response}")
@@ -216,18 +221,7 @@ class APIModelManager(ModelManager):
 
     async def _async_generate_anthropic(self, messages: List[Dict[str, Any]], params: BaseConfig) -> str:
         """异步使用 Anthropic SDK 生成内容"""
-        anthropic_messages = []
-        system_prompt = ""
-
-        for msg in messages:
-            role = msg.get("role", "user")
-            content = msg.get("content", "")
-            if role == "system":
-                system_prompt = content
-            elif role == "user":
-                anthropic_messages.append({"role": "user", "content": content})
-            elif role == "assistant":
-                anthropic_messages.append({"role": "assistant", "content": content})
+        system_prompt, anthropic_messages = to_anthropic_messages(messages)
 
         response = await self.async_client.messages.create(
             model=self.model_name,
@@ -236,6 +230,7 @@ class APIModelManager(ModelManager):
             temperature=params.temperature,
             max_tokens=params.max_new_tokens
         )
+        record_usage(response)
         # 处理多种类型的 content block
         if not response.content:
             raise Exception(f"API 返回空 content: {response}")
@@ -322,28 +317,18 @@ class ClientPoolModelManager(ModelManager):
         client = self.client_pool._clients[0]
         response = client.chat.completions.create(
             model=self.model_name,
-            messages=messages,
+            messages=to_openai_messages(messages),
             temperature=params.temperature,
             top_p=params.top_p,
             max_tokens=params.max_new_tokens
         )
+        record_usage(response)
         return self._extract_content(response)
 
     def _generate_anthropic_with_messages(self, messages: List[Dict[str, Any]], params: BaseConfig) -> str:
         """使用同步客户端生成（第一个客户端）"""
         client = self.client_pool._clients[0]
-        anthropic_messages = []
-        system_prompt = ""
-
-        for msg in messages:
-            role = msg.get("role", "user")
-            content = msg.get("content", "")
-            if role == "system":
-                system_prompt = content
-            elif role == "user":
-                anthropic_messages.append({"role": "user", "content": content})
-            elif role == "assistant":
-                anthropic_messages.append({"role": "assistant", "content": content})
+        system_prompt, anthropic_messages = to_anthropic_messages(messages)
 
         response = client.messages.create(
             model=self.model_name,
@@ -352,6 +337,7 @@ class ClientPoolModelManager(ModelManager):
             temperature=params.temperature,
             max_tokens=params.max_new_tokens
         )
+        record_usage(response)
         return self._extract_anthropic_content(response)
 
     async def _async_generate_openai_with_client(
@@ -365,11 +351,12 @@ class ClientPoolModelManager(ModelManager):
             try:
                 response = await client.chat.completions.create(
                     model=self.model_name,
-                    messages=messages,
+                    messages=to_openai_messages(messages),
                     temperature=params.temperature,
                     top_p=params.top_p,
                     max_tokens=params.max_new_tokens
                 )
+                record_usage(response)
                 return self._extract_content(response)
             except Exception as e:
                 logger.warning(f"[ClientPool] API 调用失败 (尝试 {attempt + 1}/{self.max_retries}): {str(e)[:100]}")
@@ -386,18 +373,7 @@ class ClientPoolModelManager(ModelManager):
         params: BaseConfig
     ) -> str:
         """使用指定客户端异步生成 Anthropic"""
-        anthropic_messages = []
-        system_prompt = ""
-
-        for msg in messages:
-            role = msg.get("role", "user")
-            content = msg.get("content", "")
-            if role == "system":
-                system_prompt = content
-            elif role == "user":
-                anthropic_messages.append({"role": "user", "content": content})
-            elif role == "assistant":
-                anthropic_messages.append({"role": "assistant", "content": content})
+        system_prompt, anthropic_messages = to_anthropic_messages(messages)
 
         for attempt in range(self.max_retries):
             try:
@@ -408,6 +384,7 @@ class ClientPoolModelManager(ModelManager):
                     temperature=params.temperature,
                     max_tokens=params.max_new_tokens
                 )
+                record_usage(response)
                 return self._extract_anthropic_content(response)
             except Exception as e:
                 logger.warning(f"[ClientPool] API 调用失败 (尝试 {attempt + 1}/{self.max_retries}): {str(e)[:100]}")
@@ -546,11 +523,12 @@ class MultiKeyManager(ModelManager):
         client = self._async_clients[key]
         response = await client.chat.completions.create(
             model=self.model_name,
-            messages=messages,
+            messages=to_openai_messages(messages),
             temperature=params.temperature,
             top_p=params.top_p,
             max_tokens=params.max_new_tokens
         )
+        record_usage(response)
         if not response.choices:
             raise Exception(f"API 返回空 choices")
         if not response.choices[0] or not hasattr(response.choices[0], 'message') or response.choices[0].message is None:
@@ -568,17 +546,7 @@ class MultiKeyManager(ModelManager):
     ) -> str:
         """使用指定 Key 的异步 Anthropic 生成"""
         client = self._async_clients[key]
-        anthropic_messages = []
-        system_prompt = ""
-        for msg in messages:
-            role = msg.get("role", "user")
-            content = msg.get("content", "")
-            if role == "system":
-                system_prompt = content
-            elif role == "user":
-                anthropic_messages.append({"role": "user", "content": content})
-            elif role == "assistant":
-                anthropic_messages.append({"role": "assistant", "content": content})
+        system_prompt, anthropic_messages = to_anthropic_messages(messages)
         response = await client.messages.create(
             model=self.model_name,
             system=system_prompt,
@@ -586,6 +554,7 @@ class MultiKeyManager(ModelManager):
             temperature=params.temperature,
             max_tokens=params.max_new_tokens
         )
+        record_usage(response)
         if not response.content:
             raise Exception(f"API 返回空 content")
         result_text = ""
@@ -607,6 +576,28 @@ class MultiKeyManager(ModelManager):
 PooledManager = ClientPoolModelManager  # 单 Key 多客户端池
 
 
+# =============================================================================
+# 按角色的模型管理器
+# =============================================================================
+
+# writer: 写作；supervisor: 综合评估（ReflectionChecker / FusedChecker）；specialist: 检查型 SubAgent
+MODEL_ROLES = ("writer", "supervisor", "specialist")
+
+
+class ModelManagerRegistry:
+    """按角色提供模型管理器，未单独配置的角色使用默认管理器"""
+
+    def __init__(self, default: ModelManager, managers: Optional[Dict[str, ModelManager]] = None):
+        self.default = default
+        self._managers = dict(managers or {})
+
+    def get(self, role: str) -> ModelManager:
+        return self._managers.get(role, self.default)
+
+    def model_name(self, role: str) -> Optional[str]:
+        return getattr(self.get(role), "model_name", None)
+
+
 # =============================================================================
 # 工厂函数
 # =============================================================================
@@ -669,3 +660,32 @@ def create_model_manager(config, execution_mode: str = "serial") -> ModelManager
         model_name=config.model_name,
         api_type=config.api_type
     )
+
+
+def create_model_registry(config, execution_mode: str = "serial", agent_models=None) -> ModelManagerRegistry:
+    """创建按角色的模型管理器注册表
+
+    角色模型来自 AgentModelConfig（SUPERVISOR_MODEL / WRITER_MODEL / SPECIALIST_MODEL），
+    与默认管理器同一端点，通过 with_model 共享连接池和限流；同名模型的角色共用一个管理器。
+
+    Args:
+        config: ModelConfig 实例
+        execution_mode: 执行模式，"serial" 或 "parallel"
+        agent_models: AgentModelConfig 实例，默认从环境变量加载的全局配置
+    """
+    default = create_model_manager(config, execution_mode)
+    if agent_models is None:
+        from src.config_loader import AgentModelConfig as agent_models
+
+    managers: Dict[str, ModelManager] = {}
+    by_model: Dict[str, ModelManager] = {}
+    for role in MODEL_ROLES:
+        model_name = agent_models.role_model(role)
+        if not model_name or model_name == config.model_name or config.model_type != "api":
+            continue
+        if model_name not in by_model:
+            by_model[model_name] = default.with_model(model_name)
+        managers[role] = by_model[model_name]
+        logger.info(f"[ModelRegistry] {role} 使用模型 {model_name}")
+    return ModelManagerRegistry(default, managers)
+
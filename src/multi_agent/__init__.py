@@ -25,6 +25,7 @@ from src.multi_agent.sub_agents import (
     PlotThreadChecker,
     WorldStateChecker,
     ReflectionChecker,
+    FusedChecker,
 )
 
 __all__ = [
@@ -43,4 +44,5 @@ __all__ = [
     "PlotThreadChecker",
     "WorldStateChecker",
     "ReflectionChecker",
+    "FusedChecker",
 ]
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+超长章节分窗审查 - 按段落切分重叠窗口，逐窗检查后合并
+
+检查型 SubAgent 把整章正文放进一次调用，章节很长时单次调用耗时随之增长，
+还可能超出上下文窗口；ReflectionChecker 过去只看前 1500 字，后半章的问题无从判断。
+这里按段落边界把章节切成带重叠的窗口，各窗口并发检查，
+再把窗口内的行号换算回全文行号，按定位去重合并为一份报告。
+
+段落即正文中的一行（与 ConsistencyChecker 的"第N行"定位一致）。
+"""
+import logging
+from dataclasses import dataclass, replace
+from typing import List, Optional
+
+from src.multi_agent.incremental import _relocate, issue_line, split_paragraphs
+from src.multi_agent.types import SubAgentReport
+
+logger = logging.getLogger(__name__)
+
+# 单个窗口的字数上限，不超过该长度的章节整章检查
+CHUNK_CHARS = 4000
+# 相邻窗口重叠的段落数，避免跨窗口边界的问题被漏掉
+OVERLAP_PARAGRAPHS = 2
+
+
+@dataclass
+class ChapterWindow:
+    """章节窗口：start 为首段在全文中的行号（0-based）"""
+    start: int
+    paragraphs: List[str]
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.paragraphs)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.paragraphs)
+
+
+def split_windows(
+    chapter: str,
+    max_chars: int = CHUNK_CHARS,
+    overlap: int = OVERLAP_PARAGRAPHS
+) -> List[ChapterWindow]:
+    """按段落边界切分窗口；单个超长段落自成一个窗口，不在段内截断"""
+    paragraphs = split_paragraphs(chapter)
+    if len(chapter) <= max_chars:
+        return [ChapterWindow(0, paragraphs)]
+
+    windows = []
+    start = 0
+    while start < len(paragraphs):
+        end, size = start, 0
+        while end < len(paragraphs) and (end == start or size + len(paragraphs[end]) + 1 <= max_chars):
+            size += len(paragraphs[end]) + 1
+            end += 1
+        windows.append(ChapterWindow(start, paragraphs[start:end]))
+        if end >= len(paragraphs):
+            break
+        start = max(start + 1, end - overlap)
+    return windows
+
+
+def _issue_key(issue) -> tuple:
+    if not isinstance(issue, dict):
+        return ("", str(issue))
+    line = issue_line(issue)
+    if line is not None:
+        return (issue.get("type", ""), line)
+    return (issue.get("type", ""), str(issue.get("issue", "")))
+
+
+def merge_window_reports(windows: List[ChapterWindow], reports: List[Optional[SubAgentReport]]) -> SubAgentReport:
+    """把各窗口的报告换算为全文行号并合并；失败的窗口以 None 表示"""
+    issues, updates, reasonings, confidences = [], [], [], []
+    parse_failed = False
+    # 问题键 → 首次出现的窗口序号
+    seen = {}
+    world_state = None
+    base = None
+    for index, (window, report) in enumerate(zip(windows, reports)):
+        if report is None:
+            continue
+        base = base or report
+        for issue in report.issues:
+            line = issue_line(issue)
+            if line is not None and line <= len(window.paragraphs):
+                issue = _relocate(issue, window.start + line)
+            key = _issue_key(issue)
+            if key in seen and (issue_line(issue) is None or seen[key] != index):
+                # 重叠区域被相邻窗口重复报告的同一行同类问题只保留一个；
+                # 同一窗口在同一行报告的多个同类问题是不同的问题，全部保留
+                continue
+            seen.setdefault(key, index)
+            issues.append(issue)
+        for update in report.updates:
+            if isinstance(update, dict) and update.get("type") == "world_state_update":
+                # 章末的世界状态以最后一个窗口为准
+                world_state = update
+            elif update not in updates:
+                updates.append(update)
+        if report.reasoning:
+            reasonings.append(f"[第{window.start + 1}-{window.end}行] {report.reasoning}")
+        confidences.append(report.confidence)
+        # 任一窗口响应无法解析，合并结果都不完整
+        parse_failed = parse_failed or report.parse_failed
+
+    if base is None:
+        raise ValueError("所有窗口检查均失败")
+    if world_state is not None:
+        updates.append(world_state)
+    return replace(
+        base,
+        issues=issues,
+        updates=updates,
+        reasoning="; ".join(reasonings),
+        confidence=min(confidences),
+        parse_failed=parse_failed,
+    )
+
+
+def review_excerpt(chapter: str, max_chars: int = CHUNK_CHARS) -> str:
+    """供综合评估使用的章节文本：不超长时为全文，否则从每个窗口开头均匀摘取，覆盖整章"""
+    if len(chapter) <= max_chars:
+        return chapter
+    windows = split_windows(chapter, max_chars // 2, overlap=0)
+    share = max(max_chars // len(windows), 1)
+    parts = []
+    for window in windows:
+        taken, used = [], 0
+        for paragraph in window.paragraphs:
+            if taken and used + len(paragraph) > share:
+                break
+            taken.append(paragraph[:share])
+            used += len(paragraph) + 1
+        parts.append(f"……（第{window.start + 1}-{window.end}行摘录）……")
+        parts.extend(taken)
+    return "\n".join(parts)
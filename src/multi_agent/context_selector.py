@@ -0,0 +1,138 @@
+"""
+StoryBible 上下文选择器 - 按相关度排序、在 token 预算内装箱
+
+load_from_outline 会为每个章节大纲生成一条情节线，长篇小说的角色弧线和情节线会线性增长。
+全量注入时 prompt 随章节数膨胀，这里按与本章的相关度给条目打分，只保留预算内价值最高的条目，
+使注入的上下文长度与小说长度无关。
+
+打分依据：
+- 与本章 characters_involved / key_events / summary 的重叠
+- 时间上的接近程度（情节线铺设章节、预期回收范围）
+- 逾期未回收的伏笔（is_overdue）
+"""
+import logging
+from typing import Iterable, List, Optional, Set, Tuple, TypeVar
+
+from src.model import ChapterOutline, CharacterArc, PlotThread
+from src.utils import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 打分权重
+INVOLVED_CHARACTER_WEIGHT = 10.0   # 角色出现在本章 characters_involved 中
+MENTIONED_WEIGHT = 3.0             # 名称出现在本章事件/摘要文本中
+RELATION_WEIGHT = 1.5              # 与本章出场角色存在关系
+OVERLAP_WEIGHT = 6.0               # 情节线与本章文本的 bigram 重叠率
+OVERDUE_WEIGHT = 8.0               # 逾期未回收的伏笔
+PAYOFF_WINDOW_WEIGHT = 5.0         # 本章处于预期回收范围内
+RECENCY_WEIGHT = 3.0               # 铺设章节越近越高
+RECENCY_HALF_LIFE = 10             # 相隔多少章时 recency 衰减为一半
+STATUS_WEIGHTS = {"active": 2.0, "foreshadowed": 1.0, "resolved": 0.0}
+
+
+def _bigrams(text: str) -> Set[str]:
+    text = "".join(ch for ch in text if not ch.isspace())
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def _parse_range(value: str) -> Optional[Tuple[int, int]]:
+    parts = (value or "").split("-")
+    try:
+        if len(parts) == 2:
+            return int(parts[0].strip()), int(parts[1].strip())
+        if len(parts) == 1 and parts[0].strip():
+            n = int(parts[0].strip())
+            return n, n
+    except ValueError:
+        pass
+    return None
+
+
+class ChapterFocus:
+    """本章焦点：从章节大纲中提取的角色与文本特征
+
+    Args:
+        chapter_index: 章节索引（0-based）
+        chapter_outline: 本章大纲（可为空，此时只按时间与逾期打分）
+    """
+
+    def __init__(self, chapter_index: int, chapter_outline: Optional[ChapterOutline] = None):
+        self.chapter_index = chapter_index
+        # PlotThread 的章节号从 1 开始
+        self.chapter_number = chapter_index + 1
+        self.characters: Set[str] = set()
+        self.text = ""
+        if chapter_outline is not None:
+            self.characters = set(chapter_outline.characters_involved or [])
+            self.text = " ".join([
+                chapter_outline.title, chapter_outline.summary,
+                *chapter_outline.key_events, chapter_outline.setting,
+            ])
+        self.grams = _bigrams(self.text)
+
+    def overlap(self, text: str) -> float:
+        """文本与本章的 bigram 重叠率（相对于条目自身）"""
+        grams = _bigrams(text)
+        if not grams or not self.grams:
+            return 0.0
+        return len(grams & self.grams) / len(grams)
+
+
+def score_character_arc(arc: CharacterArc, focus: ChapterFocus) -> float:
+    """角色弧线得分"""
+    score = 0.0
+    if arc.name in focus.characters:
+        score += INVOLVED_CHARACTER_WEIGHT
+    elif arc.name and arc.name in focus.text:
+        score += MENTIONED_WEIGHT
+    if focus.characters & set(arc.relationships):
+        score += RELATION_WEIGHT
+    return score
+
+
+def score_plot_thread(thread: PlotThread, focus: ChapterFocus) -> float:
+    """情节线得分"""
+    score = STATUS_WEIGHTS.get(thread.status, 0.0)
+    text = " ".join([thread.name, thread.description, *thread.key_events, *thread.foreshadow_keywords])
+    score += OVERLAP_WEIGHT * focus.overlap(text)
+    if any(keyword and keyword in focus.text for keyword in thread.foreshadow_keywords):
+        score += MENTIONED_WEIGHT
+
+    if thread.is_resolved():
+        return score
+
+    if thread.is_overdue(focus.chapter_number):
+        score += OVERDUE_WEIGHT
+    payoff = _parse_range(thread.expected_payoff_range)
+    if payoff and payoff[0] <= focus.chapter_number <= payoff[1]:
+        score += PAYOFF_WINDOW_WEIGHT
+
+    distance = abs(focus.chapter_number - (thread.introduced_chapter or thread.setup_chapter))
+    score += RECENCY_WEIGHT * RECENCY_HALF_LIFE / (RECENCY_HALF_LIFE + distance)
+    return score
+
+
+def select_lines(
+    entries: Iterable[Tuple[T, float, str]],
+    token_budget: int
+) -> Tuple[List[Tuple[T, str]], int]:
+    """按得分从高到低把 (条目, 得分, 渲染行) 装入 token 预算
+
+    入选条目保持原有顺序，使相邻章节的输出尽量稳定。
+
+    Returns:
+        ([(条目, 渲染行), ...], 被省略的条目数)
+    """
+    entries = list(entries)
+    order = sorted(range(len(entries)), key=lambda i: (-entries[i][1], i))
+    chosen, used = [], 0
+    for i in order:
+        cost = estimate_tokens(entries[i][2]) + 1
+        if used + cost > token_budget:
+            continue
+        chosen.append(i)
+        used += cost
+    chosen.sort()
+    return [(entries[i][0], entries[i][2]) for i in chosen], len(entries) - len(chosen)
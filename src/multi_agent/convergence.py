@@ -0,0 +1,230 @@
+"""
+修订收敛控制 - 判断同一章节的修订循环是否还值得继续
+
+Supervisor 要求修订后章节会回到 write_chapter 重写，再次审查，
+过去只有审查通过才会退出循环：评分停在 6.8 附近的章节会被反复全量重写。
+RevisionController 记录每章各轮审查的 quality_score 与问题集合，
+在以下情况停止修订，接受本章评分最高的一稿（通常就是当前稿）：
+- 修订轮数达到上限（NovelState.max_revision_loops，已修订次数以 NovelState.supervisor_recheck_count 为准）
+- 本轮问题与上一轮基本相同（重写没有解决问题）
+- 评分提升小于 epsilon（已收敛）
+- 全书修订 token 预算不足以再进行一轮
+
+修订成本 = 重写的估算 token 数（按章节字数）+ 复审实际消耗的输入 token 数。
+"""
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from src.multi_agent.types import ReviewResult
+from src.utils import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# 两轮之间评分提升低于该值视为已收敛
+SCORE_EPSILON = 0.3
+# 本轮问题中与上一轮相同的比例不低于该值视为问题重复
+REPEAT_RATIO = 0.8
+# 全书修订 token 预算，0 表示不限
+DEFAULT_TOKEN_BUDGET = 400_000
+DEFAULT_MAX_LOOPS = 3
+
+# 停止原因
+STOP_MAX_LOOPS = "max_loops"
+STOP_REPEATED = "repeated"
+STOP_CONVERGED = "converged"
+STOP_BUDGET = "budget"
+
+_STOP_MESSAGES = {
+    STOP_MAX_LOOPS: "达到最大修订轮数",
+    STOP_REPEATED: "修订后问题重复出现",
+    STOP_CONVERGED: "评分提升低于阈值，已收敛",
+    STOP_BUDGET: "全书修订 token 预算不足",
+}
+
+_NOISE = re.compile(r"[\s\W_]+", re.UNICODE)
+
+
+def issue_signatures(result: ReviewResult) -> FrozenSet[str]:
+    """问题集合：类别 + 去掉空白标点后的问题描述前缀（行号在重写后会变化，不参与比较）"""
+    signatures = set()
+    for suggestion in result.suggestions:
+        text = _NOISE.sub("", suggestion.issue or "")[:24]
+        if text:
+            signatures.add(f"{suggestion.category.value}:{text}")
+    return frozenset(signatures)
+
+
+@dataclass
+class RevisionStats:
+    """单章修订统计
+
+    Attributes:
+        rounds: 审查轮数（含首次审查）
+        revisions: 要求重写的次数
+        scores: 各轮 quality_score
+        issue_counts: 各轮问题数
+        tokens: 该章修订消耗的 token 数（首次审查不计）
+        stop_reason: 停止修订的原因，审查直接通过时为空
+    """
+    chapter_index: int
+    rounds: int = 0
+    revisions: int = 0
+    scores: List[float] = field(default_factory=list)
+    issue_counts: List[int] = field(default_factory=list)
+    tokens: int = 0
+    stop_reason: str = ""
+
+    def to_dict(self) -> Dict:
+        return {
+            "chapter_index": self.chapter_index,
+            "rounds": self.rounds,
+            "revisions": self.revisions,
+            "scores": [round(s, 2) for s in self.scores],
+            "issue_counts": list(self.issue_counts),
+            "tokens": self.tokens,
+            "stop_reason": self.stop_reason,
+        }
+
+
+@dataclass
+class DraftSnapshot:
+    """某一轮审查的稿件：chapter 为审查的正文，draft 为调用方附带的对象（如 ChapterContent）"""
+    score: float
+    chapter: str
+    result: ReviewResult
+    draft: Any = None
+
+
+@dataclass
+class RevisionDecision:
+    """本轮审查后的决定：revise 为 False 且 stop_reason 非空时表示放弃修订
+
+    best 非空时表示之前某一稿评分更高，应接受该稿而不是当前稿
+    """
+    revise: bool
+    stop_reason: str = ""
+    best: Optional[DraftSnapshot] = None
+
+    @property
+    def message(self) -> str:
+        return _STOP_MESSAGES.get(self.stop_reason, "")
+
+
+class RevisionController:
+    """修订收敛控制器
+
+    Args:
+        epsilon: 评分最小提升
+        repeat_ratio: 判定问题重复的相同比例
+        token_budget: 全书修订 token 预算，0 表示不限
+        max_loops: 单章最多修订轮数
+    """
+
+    def __init__(
+        self,
+        epsilon: float = SCORE_EPSILON,
+        repeat_ratio: float = REPEAT_RATIO,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        max_loops: int = DEFAULT_MAX_LOOPS,
+    ):
+        self.epsilon = epsilon
+        self.repeat_ratio = repeat_ratio
+        self.token_budget = token_budget
+        self.max_loops = max_loops
+        self.spent_tokens = 0
+        self._issues: Dict[int, FrozenSet[str]] = {}
+        self._best: Dict[int, DraftSnapshot] = {}
+        self.stats: Dict[int, RevisionStats] = {}
+
+    def observe(
+        self,
+        chapter_index: int,
+        chapter: str,
+        result: ReviewResult,
+        review_tokens: int = 0,
+        revisions: Optional[int] = None,
+        draft: Any = None,
+    ) -> RevisionDecision:
+        """记录一轮审查并决定是否继续修订
+
+        Args:
+            chapter: 本轮审查的章节正文（用于估算重写成本）
+            review_tokens: 本轮审查实际消耗的输入 token 数
+            revisions: 本章已修订次数（NovelState.supervisor_recheck_count）；断点恢复后内存统计会清零，以此为准
+            draft: 与本轮正文对应的稿件对象，停止修订时用于回退到评分最高的一稿
+        """
+        if chapter_index not in self._issues:
+            # 新章节，或该章已接受后再次审查（如重新生成），重新开始统计
+            self.stats[chapter_index] = RevisionStats(chapter_index)
+            self._best.pop(chapter_index, None)
+        stats = self.stats[chapter_index]
+        if revisions is not None:
+            stats.revisions = revisions
+        issues = issue_signatures(result)
+        previous_issues = self._issues.get(chapter_index)
+        previous_score = stats.scores[-1] if stats.scores else None
+
+        round_cost = estimate_tokens(chapter) + review_tokens
+        if stats.rounds:
+            # 首次审查是写作流程的固定成本，之后每一轮都是修订带来的
+            stats.tokens += round_cost
+            self.spent_tokens += round_cost
+        stats.rounds += 1
+        stats.scores.append(result.quality_score)
+        stats.issue_counts.append(len(issues))
+        self._issues[chapter_index] = issues
+        best = self._best.get(chapter_index)
+        if best is None or result.quality_score > best.score:
+            best = self._best[chapter_index] = DraftSnapshot(result.quality_score, chapter, result, draft)
+
+        if not result.needs_revision:
+            return RevisionDecision(revise=False)
+
+        stop_reason = self._stop_reason(stats, issues, previous_issues, previous_score, round_cost)
+        if stop_reason:
+            stats.stop_reason = stop_reason
+            # 修订让评分下降或停滞时，接受之前评分最高的一稿
+            earlier_best = best if best.score > result.quality_score else None
+            return RevisionDecision(revise=False, stop_reason=stop_reason, best=earlier_best)
+        stats.revisions += 1
+        return RevisionDecision(revise=True)
+
+    def _stop_reason(
+        self,
+        stats: RevisionStats,
+        issues: FrozenSet[str],
+        previous_issues: Optional[FrozenSet[str]],
+        previous_score: Optional[float],
+        round_cost: int,
+    ) -> str:
+        if stats.revisions >= self.max_loops:
+            return STOP_MAX_LOOPS
+        if previous_issues is not None and issues:
+            if len(issues & previous_issues) / len(issues) >= self.repeat_ratio:
+                return STOP_REPEATED
+        if previous_score is not None and stats.scores[-1] - previous_score < self.epsilon:
+            return STOP_CONVERGED
+        if self.token_budget and self.spent_tokens + round_cost > self.token_budget:
+            return STOP_BUDGET
+        return ""
+
+    def finish(self, chapter_index: int) -> Optional[RevisionStats]:
+        """章节接受后结束该章的修订记录，返回其统计"""
+        self._issues.pop(chapter_index, None)
+        self._best.pop(chapter_index, None)
+        stats = self.stats.get(chapter_index)
+        if stats is not None and stats.rounds > 1:
+            logger.info(
+                f"[RevisionController] 第 {chapter_index+1} 章修订 {stats.revisions} 次，"
+                f"评分 {' → '.join(f'{s:.1f}' for s in stats.scores)}，"
+                f"消耗 {stats.tokens} tokens"
+                + (f"，停止原因: {_STOP_MESSAGES[stats.stop_reason]}" if stats.stop_reason else "")
+                + f"；全书已用 {self.spent_tokens}/{self.token_budget or '不限'} tokens"
+            )
+        return stats
+
+    def report(self) -> Dict[str, Dict]:
+        """各章修订统计（键为章节号，从 1 开始）"""
+        return {str(index + 1): stats.to_dict() for index, stats in sorted(self.stats.items())}
@@ -0,0 +1,243 @@
+"""
+检查调度规划 - 用规则预判哪些检查型 SubAgent 需要调用 LLM
+
+每章都调用全部 4 个检查 Agent，其中不少调用其实无事可查：
+本章没有涉及任何未回收伏笔时 PlotThreadChecker 无从判断，
+出场角色都没有弧线阶段时 CharacterArcChecker 也没有可对照的设定。
+这里根据 StoryBible 状态和廉价的文本信号（复用各检查器已有的规则方法）
+在派发前决定每个检查器是否需要 LLM 调用，被跳过的检查器只输出规则检查结果。
+
+EarlyDecisionPolicy 用于提前决策：某个检查器的 LLM 明确报告了高严重程度、高把握的问题时，
+修订已成定局，其余检查可以取消，也无需再调用 ReflectionChecker。
+按类型推断的优先级和规则检查命中（不带 severity/confidence）不触发提前决策。
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from src.multi_agent.context_selector import ChapterFocus, _parse_range
+from src.multi_agent.types import CheckCategory, Priority, SubAgentReport
+
+logger = logging.getLogger(__name__)
+
+# 被跳过的检查器报告的置信度（只有规则结果）
+SKIPPED_CONFIDENCE = 0.6
+
+_PRIORITY_RANK = {Priority.LOW: 0, Priority.MEDIUM: 1, Priority.HIGH: 2}
+
+# 问题中未标注优先级时，按问题类型推断（与 ReflectionChecker._generate_suggestions 的分级一致）
+_TYPE_PRIORITY = {
+    "timeline": Priority.HIGH,
+    "consistency": Priority.HIGH,
+    "arc": Priority.MEDIUM,
+    "plot_thread": Priority.MEDIUM,
+}
+
+_SEVERITY_ALIASES = {
+    "critical": Priority.HIGH,
+    "error": Priority.HIGH,
+    "严重": Priority.HIGH,
+    "高": Priority.HIGH,
+    "warning": Priority.MEDIUM,
+    "中": Priority.MEDIUM,
+    "低": Priority.LOW,
+}
+
+_CATEGORIES = {
+    "ConsistencyChecker": CheckCategory.CONSISTENCY,
+    "CharacterArcChecker": CheckCategory.CHARACTER_ARC,
+    "PlotThreadChecker": CheckCategory.PLOT_THREAD,
+    "WorldStateChecker": CheckCategory.WORLD_STATE,
+}
+
+
+@dataclass
+class CheckDecision:
+    """单个检查器的调度决定"""
+    agent_name: str
+    needed: bool
+    reason: str
+
+
+@dataclass
+class DispatchStats:
+    """调度统计：跳过率与估算节省时间"""
+    planned: int = 0
+    skipped: int = 0
+    saved_seconds: float = 0.0
+    # 各检查器实际执行的平均耗时，用于估算跳过节省的时间
+    latency: Dict[str, float] = field(default_factory=dict)
+    runs: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def skip_rate(self) -> float:
+        return self.skipped / self.planned if self.planned else 0.0
+
+    def record_run(self, agent_name: str, seconds: float) -> None:
+        n = self.runs.get(agent_name, 0) + 1
+        self.runs[agent_name] = n
+        avg = self.latency.get(agent_name, 0.0)
+        self.latency[agent_name] = avg + (seconds - avg) / n
+
+    def record_plan(self, decisions: List[CheckDecision]) -> None:
+        self.planned += len(decisions)
+        for decision in decisions:
+            if not decision.needed:
+                self.skipped += 1
+                self.saved_seconds += self.latency.get(decision.agent_name, 0.0)
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "planned": self.planned,
+            "skipped": self.skipped,
+            "skip_rate": round(self.skip_rate, 3),
+            "saved_seconds": round(self.saved_seconds, 2),
+        }
+
+
+def reported_priority(issue: dict) -> Optional[Priority]:
+    """LLM 在问题中明确标注的优先级（priority/severity 字段），未标注或无法识别时为 None"""
+    for key in ("priority", "severity"):
+        value = str(issue.get(key) or "").strip().lower()
+        if not value:
+            continue
+        try:
+            return Priority(value)
+        except ValueError:
+            if value in _SEVERITY_ALIASES:
+                return _SEVERITY_ALIASES[value]
+    return None
+
+
+def issue_priority(issue: dict) -> Priority:
+    """问题的优先级：优先取 priority/severity 字段，否则按类型推断"""
+    return reported_priority(issue) or _TYPE_PRIORITY.get(issue.get("type", ""), Priority.LOW)
+
+
+def reported_confidence(issue: dict) -> Optional[float]:
+    """LLM 对单个问题给出的把握程度，缺失或无法解析时为 None"""
+    try:
+        return float(issue["confidence"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+@dataclass
+class EarlyDecisionPolicy:
+    """提前决策阈值（由 NovelState.early_decision_* 配置）
+
+    Attributes:
+        enabled: 是否启用提前决策
+        min_priority: LLM 标注的严重程度达到该值的问题才视为阻断问题
+        min_confidence: LLM 对该问题的把握达到该值才采信
+    """
+    enabled: bool = False
+    min_priority: Priority = Priority.HIGH
+    min_confidence: float = 0.8
+
+    def blocking_issues(self, report: SubAgentReport) -> List[dict]:
+        """报告中足以确定需要修订的问题（未启用或没有达到阈值的问题时为空）"""
+        if not self.enabled:
+            return []
+        threshold = _PRIORITY_RANK[Priority(self.min_priority)]
+        blocking = []
+        for issue in report.issues:
+            if not isinstance(issue, dict):
+                continue
+            priority = reported_priority(issue)
+            confidence = reported_confidence(issue)
+            if priority is None or confidence is None:
+                continue
+            if _PRIORITY_RANK[priority] >= threshold and confidence >= self.min_confidence:
+                blocking.append(issue)
+        return blocking
+
+
+class CheckPlanner:
+    """检查调度规划器
+
+    Args:
+        check_agents: WritingSupervisor 的检查型 SubAgent 列表（复用其规则方法）
+    """
+
+    def __init__(self, check_agents: list):
+        self.agents = {agent.agent_name: agent for agent in check_agents}
+        self._rules = {
+            "ConsistencyChecker": self._plan_consistency,
+            "CharacterArcChecker": self._plan_character_arc,
+            "PlotThreadChecker": self._plan_plot_thread,
+            "WorldStateChecker": self._plan_world_state,
+        }
+
+    def plan(self, storybible, chapter: str, chapter_index: int, chapter_outline=None) -> List[CheckDecision]:
+        """为每个检查器给出是否需要调用 LLM 的决定（顺序与 check_agents 一致）"""
+        focus = ChapterFocus(chapter_index, chapter_outline)
+        decisions = []
+        for name in self.agents:
+            rule = self._rules.get(name)
+            if rule is None:
+                decisions.append(CheckDecision(name, True, "无预检规则"))
+                continue
+            needed, reason = rule(storybible, chapter, focus)
+            decisions.append(CheckDecision(name, needed, reason))
+        return decisions
+
+    def _plan_consistency(self, storybible, chapter: str, focus: ChapterFocus):
+        # 角色行为、地点跳跃等内部一致性无法用规则排除，始终检查
+        timeline_issues = self.agents["ConsistencyChecker"]._check_timeline_consistency(chapter)
+        if timeline_issues:
+            return True, f"规则发现 {len(timeline_issues)} 个时间线问题"
+        return True, "章节内部一致性需要 LLM 判断"
+
+    def _plan_character_arc(self, storybible, chapter: str, focus: ChapterFocus):
+        staged = [name for name, arc in storybible._character_arcs.items() if arc.arc_stages]
+        present = [name for name in staged if name in focus.characters or name in chapter]
+        if present:
+            return True, f"出场角色有弧线阶段: {', '.join(present[:3])}"
+        emotional_states = self.agents["CharacterArcChecker"]._extract_emotional_states(chapter)
+        if emotional_states:
+            return True, "检测到情感状态变化"
+        return False, "出场角色没有弧线阶段"
+
+    def _plan_plot_thread(self, storybible, chapter: str, focus: ChapterFocus):
+        checker = self.agents["PlotThreadChecker"]
+        for thread in storybible.get_unresolved_plot_threads():
+            if thread.is_overdue(focus.chapter_number):
+                return True, f"伏笔逾期: {thread.name}"
+            payoff = _parse_range(thread.expected_payoff_range)
+            if payoff and payoff[0] <= focus.chapter_number <= payoff[1]:
+                return True, f"处于伏笔回收范围: {thread.name}"
+            if checker._check_payoff(chapter, thread):
+                return True, f"正文提及伏笔: {thread.name}"
+            thread_text = " ".join([thread.name, thread.description, *thread.key_events])
+            if any(name and name in thread_text for name in focus.characters):
+                return True, f"伏笔涉及本章角色: {thread.name}"
+        return False, "没有与本章相关的未回收伏笔"
+
+    def _plan_world_state(self, storybible, chapter: str, focus: ChapterFocus):
+        if storybible.get_latest_world_state() is None and not storybible._world_rules:
+            return False, "尚无世界状态与规则可对照"
+        if storybible._world_rules and storybible.check_world_rule_violations(chapter):
+            return True, "规则匹配到疑似世界观冲突"
+        if self.agents["WorldStateChecker"]._extract_world_state(chapter, focus.chapter_index):
+            return True, "检测到地点/时间变化"
+        latest = storybible.get_latest_world_state()
+        if latest and latest.location and latest.location not in chapter:
+            return True, "本章未出现上一章所在地点"
+        return False, "地点与时间没有变化"
+
+    def skipped_report(self, decision: CheckDecision, chapter: str, chapter_index: int) -> Optional[SubAgentReport]:
+        """被跳过的检查器只输出规则检查结果（保持 StoryBible 更新与问题汇总不变）"""
+        agent = self.agents[decision.agent_name]
+        issues, updates = agent.rule_findings(chapter, chapter_index)
+        category = _CATEGORIES.get(decision.agent_name)
+        if category is None:
+            return None
+        return SubAgentReport(
+            agent_name=decision.agent_name,
+            category=category,
+            issues=issues,
+            updates=updates,
+            reasoning=f"规则预检跳过 LLM 检查: {decision.reason}",
+            confidence=SKIPPED_CONFIDENCE,
+        )
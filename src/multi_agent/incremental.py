@@ -0,0 +1,197 @@
+"""
+修订稿增量复审 - 段落级 diff，只复查改动区域
+
+supervisor_node 判定需要修订后，WriterAgent 往往只按建议改动少数段落，
+但重写后的章节会被全部检查器从头审查一遍。这里保存上一稿的段落哈希和各检查器报告，
+对新稿做段落级 diff：检查器只收到改动段落及其前后窗口拼成的摘录，
+未改动区域的问题按新行号继续保留。
+
+段落即正文中的一行（与 ConsistencyChecker 的"第N行"定位一致）。
+"""
+import difflib
+import hashlib
+import logging
+import re
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Set
+
+from src.multi_agent.types import SubAgentReport
+
+logger = logging.getLogger(__name__)
+
+# 改动段落前后一并复查的行数
+CONTEXT_LINES = 3
+# 改动超过该比例时直接全量审查
+MAX_CHANGED_RATIO = 0.5
+# 摘录中省略未改动段落的占位行
+ELISION = "……（省略未改动的段落）……"
+
+_LOCATION_RE = re.compile(r"第(\d+)[行段]")
+
+
+def split_paragraphs(text: str) -> List[str]:
+    return text.split("\n")
+
+
+def paragraph_hashes(paragraphs: List[str]) -> List[str]:
+    return [hashlib.sha1(p.strip().encode("utf-8")).hexdigest() for p in paragraphs]
+
+
+def issue_line(issue) -> Optional[int]:
+    """问题定位的行号（1-based），无法定位时返回 None"""
+    if not isinstance(issue, dict):
+        return None
+    match = _LOCATION_RE.search(str(issue.get("location") or ""))
+    return int(match.group(1)) if match else None
+
+
+def _relocate(issue: dict, line: int) -> dict:
+    location = _LOCATION_RE.sub(lambda m: f"第{line}{m.group(0)[-1]}", issue["location"], count=1)
+    return dict(issue, location=location)
+
+
+def _is_world_state(update) -> bool:
+    return isinstance(update, dict) and update.get("type") == "world_state_update"
+
+
+@dataclass
+class DraftRecord:
+    """上一稿的段落哈希及其审查报告"""
+    chapter_index: int
+    hashes: List[str]
+    reports: List[SubAgentReport] = field(default_factory=list)
+
+
+class IncrementalPlan:
+    """新稿相对上一稿的增量复审计划
+
+    Args:
+        previous: 上一稿记录
+        chapter: 新稿全文
+        context_lines: 改动段落前后一并复查的行数
+    """
+
+    def __init__(self, previous: DraftRecord, chapter: str, context_lines: int = CONTEXT_LINES):
+        self.previous = previous
+        self.paragraphs = split_paragraphs(chapter)
+        self.hashes = paragraph_hashes(self.paragraphs)
+
+        # 未改动段落：旧行号 -> 新行号（0-based）
+        self.old_to_new: Dict[int, int] = {}
+        self.changed: Set[int] = set()
+        matcher = difflib.SequenceMatcher(None, previous.hashes, self.hashes, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                self.old_to_new.update(zip(range(i1, i2), range(j1, j2)))
+            elif j2 > j1:
+                self.changed.update(range(j1, j2))
+            elif self.paragraphs:
+                # 纯删除：复查删除处前后的衔接
+                self.changed.add(min(j1, len(self.paragraphs) - 1))
+
+        self.window: Set[int] = {
+            k for i in self.changed
+            for k in range(max(0, i - context_lines), min(len(self.paragraphs), i + context_lines + 1))
+        }
+        self.excerpt, self._line_map = self._build_excerpt()
+
+    @property
+    def changed_ratio(self) -> float:
+        return len(self.changed) / max(len(self.paragraphs), 1)
+
+    @property
+    def worthwhile(self) -> bool:
+        """有改动且改动比例不大时才值得增量复审"""
+        return bool(self.changed) and self.changed_ratio <= MAX_CHANGED_RATIO
+
+    def _build_excerpt(self):
+        lines: List[str] = []
+        line_map: List[Optional[int]] = []
+        previous = None
+        for k in sorted(self.window):
+            if previous is None and k > 0 or previous is not None and k > previous + 1:
+                lines.append(ELISION)
+                line_map.append(None)
+            lines.append(self.paragraphs[k])
+            line_map.append(k)
+            previous = k
+        if previous is not None and previous < len(self.paragraphs) - 1:
+            lines.append(ELISION)
+            line_map.append(None)
+        return "\n".join(lines), line_map
+
+    def remap(self, report: SubAgentReport) -> SubAgentReport:
+        """把基于摘录的报告中的行号换算为新稿行号"""
+        issues = []
+        for issue in report.issues:
+            line = issue_line(issue)
+            if line is not None and 0 < line <= len(self._line_map) and self._line_map[line - 1] is not None:
+                issue = _relocate(issue, self._line_map[line - 1] + 1)
+            issues.append(issue)
+        return replace(report, issues=issues)
+
+    def merge(self, reports: List[SubAgentReport]) -> List[SubAgentReport]:
+        """并入上一稿中仍然有效的问题和更新
+
+        定位在未改动、且不在本次复查窗口内的问题按新行号保留；
+        定位在改动区域或无法定位的问题以本次复查结果为准。
+        """
+        previous = {r.agent_name: r for r in self.previous.reports}
+        merged = []
+        for report in reports:
+            old = previous.get(report.agent_name)
+            if old is None:
+                merged.append(report)
+                continue
+            issues = list(report.issues)
+            carried = 0
+            for issue in old.issues:
+                line = issue_line(issue)
+                new_index = self.old_to_new.get(line - 1) if line is not None else None
+                if new_index is None or new_index in self.window:
+                    continue
+                issue = _relocate(issue, new_index + 1)
+                if issue not in issues:
+                    issues.append(issue)
+                    carried += 1
+            updates = list(report.updates)
+            for update in old.updates:
+                # 只沿用定位在复查窗口外未改动段落的更新；世界状态以全文重新提取的为准（见 refresh_rules）
+                if _is_world_state(update):
+                    continue
+                line = issue_line(update)
+                new_index = self.old_to_new.get(line - 1) if line is not None else None
+                if new_index is None or new_index in self.window:
+                    continue
+                update = _relocate(update, new_index + 1)
+                if update not in updates:
+                    updates.append(update)
+            reasoning = report.reasoning
+            if carried:
+                reasoning += f"; 沿用上一稿未改动段落的 {carried} 个问题"
+            merged.append(replace(report, issues=issues, updates=updates, reasoning=reasoning))
+        return merged
+
+    def refresh_rules(self, reports: List[SubAgentReport], agents: list, chapter_index: int) -> List[SubAgentReport]:
+        """规则检查（时间线、世界状态提取）在摘录上执行过：去掉这部分结果，改用全文重新计算"""
+        agents_by_name = {agent.agent_name: agent for agent in agents}
+        full_text = "\n".join(self.paragraphs)
+        refreshed = []
+        for report in reports:
+            agent = agents_by_name.get(report.agent_name)
+            if agent is None:
+                refreshed.append(report)
+                continue
+            excerpt_issues, excerpt_updates = agent.rule_findings(self.excerpt, chapter_index)
+            excerpt_issues = self.remap(replace(report, issues=excerpt_issues)).issues
+            full_issues, full_updates = agent.rule_findings(full_text, chapter_index)
+
+            issues = [issue for issue in report.issues if issue not in excerpt_issues]
+            issues.extend(issue for issue in full_issues if issue not in issues)
+            updates = [
+                update for update in report.updates
+                if not _is_world_state(update) and update not in excerpt_updates
+            ]
+            updates.extend(full_updates)
+            refreshed.append(replace(report, issues=issues, updates=updates))
+        return refreshed
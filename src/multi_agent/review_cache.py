@@ -0,0 +1,139 @@
+"""
+审查结果缓存 - 章节内容与 StoryBible 都未变化时直接复用上次审查
+
+断点恢复、瞬时错误后的重试、force_accpet 等路径会对逐字节相同的章节、
+在未变化的 StoryBible 上重新调用 WritingSupervisor.review。
+这里以 (章节 sha256, 章节索引, StoryBible 内容摘要, 检查器 prompt 版本, 审查模式) 为键
+缓存 ReviewResult 和 SubAgentReport，命中时不发起任何 LLM 调用。
+
+缓存保存在 result/{title}_storage/review_cache.json，按最近使用淘汰，条目数有上限。
+"""
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+from src.multi_agent.types import ReviewResult, SubAgentReport
+
+logger = logging.getLogger(__name__)
+
+# 修改任一检查器 / ReflectionChecker / FusedChecker 的 prompt 或解析逻辑时递增，使旧缓存失效
+REVIEW_PROMPT_VERSION = 7
+DEFAULT_MAX_ENTRIES = 256
+
+
+def _encode(value: Any) -> Any:
+    """报告 updates 中可能带有 Pydantic 对象（如 WorldState），按类名编码"""
+    if hasattr(value, "model_dump"):
+        return {"__model__": type(value).__name__, "data": value.model_dump(mode="json")}
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "__model__" in value:
+            import src.model as model_module
+            return getattr(model_module, value["__model__"]).model_validate(value["data"])
+        return {k: _decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+class ReviewCache:
+    """审查结果缓存（LRU）
+
+    Args:
+        path: 持久化文件路径，None 时只保存在内存中
+        max_entries: 最多保留的条目数
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path) if path else None
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._loaded = self.path is None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        chapter: str,
+        chapter_index: int,
+        bible_fingerprint: str,
+        mode: str = "split",
+        early_decision: bool = False,
+        incremental: bool = False
+    ) -> str:
+        """缓存键；提前决策与增量复审会改变审查结果的完整程度，也计入键中"""
+        chapter_digest = hashlib.sha256(chapter.encode("utf-8")).hexdigest()
+        raw = (
+            f"{chapter_digest}|{chapter_index}|{bible_fingerprint}|{REVIEW_PROMPT_VERSION}|{mode}"
+            f"|early={int(early_decision)}|incremental={int(incremental)}"
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._entries = OrderedDict(data.get("entries", []))
+        except (OSError, ValueError) as e:
+            logger.warning(f"[ReviewCache] 读取缓存失败，忽略: {e}")
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        if not self.path.parent.exists():
+            # 小说目录尚未创建（只读访问），不单独为缓存创建目录
+            return
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"entries": list(self._entries.items())}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def get(self, key: str) -> Optional[Tuple[List[SubAgentReport], ReviewResult]]:
+        self._load()
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        try:
+            reports = [SubAgentReport.from_dict(_decode(r)) for r in entry["reports"]]
+            return reports, ReviewResult.from_dict(entry["result"])
+        except Exception as e:
+            logger.warning(f"[ReviewCache] 缓存条目损坏，丢弃: {e}")
+            del self._entries[key]
+            return None
+
+    def put(self, key: str, reports: List[SubAgentReport], result: ReviewResult) -> None:
+        self._load()
+        self._entries[key] = {
+            "reports": [_encode(r.to_dict()) for r in reports],
+            "result": result.to_dict(),
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        try:
+            self._save()
+        except OSError as e:
+            logger.warning(f"[ReviewCache] 写入缓存失败: {e}")
+
+    def __len__(self) -> int:
+        self._load()
+        return len(self._entries)
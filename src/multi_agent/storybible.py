@@ -3,27 +3,267 @@ StoryBible - 清晰的世界观管理类
 
 重构自 SharedBlackboard，分离世界观管理职责。
 """
+import bisect
+import hashlib
+import itertools
 import logging
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
 from src.model import (
     PlotThread, CharacterArc, WorldState, WorldRule,
-    EntityContent, StoryBibleContent, NovelOutline
+    EntityContent, StoryBibleContent, NovelOutline, ChapterOutline
 )
+from src.multi_agent.context_selector import (
+    ChapterFocus, score_character_arc, score_plot_thread, select_lines, _parse_range
+)
+from src.rule_engine import CompiledRuleSet, compile_rules
+from src.utils import estimate_tokens
 
 logger = logging.getLogger(__name__)
 
+# 分层上下文的渲染分段（按 format_layered_context 中的输出顺序）
+_CONTEXT_SECTIONS = ("world_rules", "character_arcs", "plot_threads", "world_state")
 
-class StoryBible:
-    """清晰的世界观管理类"""
+# 写时复制的容器分组：快照/分支与原对象共享这些容器，先写的一方只复制自己要改的那组
+_COW_GROUPS = {
+    "character_arcs": ("_character_arcs",),
+    "plot_threads": ("_plot_threads", "_threads_by_status", "_payoff_deadlines"),
+    "world_states": ("_world_states", "_world_state_keys", "_world_states_sorted", "_world_state_summaries"),
+    "world_rules": ("_world_rules",),
+    "entities": ("_entities", "_entities_by_chapter"),
+}
+# 嵌套容器需要连同内层一起复制
+_NESTED_COPY = {
+    "_threads_by_status": lambda d: {k: v.copy() for k, v in d.items()},
+    "_entities_by_chapter": lambda d: {k: list(v) for k, v in d.items()},
+}
 
-    def __init__(self):
+
+class StoryBible:
+    """清晰的世界观管理类
+
+    Args:
+        context_token_budget: 角色弧线 + 情节线在注入上下文中的 token 预算，
+            超出时按与本章的相关度筛选；None 或 0 表示不限制
+    """
+
+    # 默认预算：约 60~80 条角色/情节线
+    DEFAULT_CONTEXT_TOKEN_BUDGET = 1500
+    # 保留多少个历史快照用于回滚
+    MAX_SNAPSHOTS = 16
+    # compact_history 保留的明细条数，更早的归档到冷存储（世界状态另按卷汇总）
+    WORLD_STATE_RETENTION = 30
+    ENTITY_RETENTION = 50
+    # 卷摘要中最多列出的地点/势力数
+    SUMMARY_MAX_ITEMS = 8
+
+    def __init__(self, context_token_budget: Optional[int] = DEFAULT_CONTEXT_TOKEN_BUDGET):
+        self.context_token_budget = context_token_budget
         self._character_arcs: Dict[str, CharacterArc] = {}
         self._plot_threads: Dict[str, PlotThread] = {}
         self._world_states: List[WorldState] = []
+        # 已归档世界状态的分卷汇总 {卷索引: {"start", "end", "locations", "times", "factions"}}
+        self._world_state_summaries: Dict[int, Dict[str, Any]] = {}
+        # 冷存储（NovelStorage），提供 archive_* / load_archived_* 方法
+        self._archive = None
+        # 已归档的条目数，作为归档写入的起始序号（重复归档同一批条目时冷存储据此跳过）
+        self._archived_world_states = 0
+        self._archived_entities = 0
         self._world_rules: List[WorldRule] = []
         self._entities: List[EntityContent] = []
+        # 各分段渲染结果缓存，只在对应数据变化时失效
+        self._section_cache: Dict[str, str] = {}
+        # 查询索引：世界状态按章节排序（可二分），实体按章节分桶，
+        # 情节线按状态分桶，伏笔按预期回收上限排序（逾期查询只看前缀）
+        self._world_state_keys: List[int] = []
+        self._world_states_sorted: List[WorldState] = []
+        self._entities_by_chapter: Dict[int, List[EntityContent]] = {}
+        self._threads_by_status: Dict[str, Dict[str, PlotThread]] = {}
+        self._payoff_deadlines: List[Tuple[int, int, str]] = []
+        self._deadline_seq = itertools.count()
+        # 世界规则编译结果，规则列表变化时重建
+        self._compiled_rules: Optional[CompiledRuleSet] = None
+        # 版本与写时复制状态
+        self._version = 0
+        self._shared: set = set()
+        self._frozen = False
+        self._delta: Optional[List[Tuple[str, tuple]]] = None
+        self._base_version = 0
+        self._snapshots: "OrderedDict[int, StoryBible]" = OrderedDict()
+        # (版本号, 内容摘要)，版本变化或回滚时失效
+        self._fingerprint: Optional[Tuple[int, str]] = None
+
+    def _invalidate(self, *sections: str) -> None:
+        """使指定分段的渲染缓存失效（不传参数则全部失效）"""
+        if not sections:
+            self._section_cache.clear()
+            return
+        for section in sections:
+            self._section_cache.pop(section, None)
+
+    def invalidate_context_cache(self) -> None:
+        """直接修改了角色弧线/情节线对象（未经过 update_* 方法）时调用"""
+        self._reindex_plot_threads()
+        self._invalidate()
+
+    # ==================== 版本快照 ====================
+
+    @property
+    def version(self) -> int:
+        """每次修改递增的版本号"""
+        return self._version
+
+    @property
+    def base_version(self) -> int:
+        """分支/快照创建时所基于的版本"""
+        return self._base_version
+
+    def fingerprint(self) -> str:
+        """当前内容的摘要
+
+        版本号只在进程内单调递增，回滚或重新加载后会与旧内容重复；
+        需要跨进程比较 StoryBible 是否变化时（如审查结果缓存）使用内容摘要，按版本缓存。
+        """
+        if self._fingerprint is None or self._fingerprint[0] != self._version:
+            # last_updated 是导出时刻，不属于内容
+            raw = self.to_content().model_dump_json(exclude={"last_updated"}).encode("utf-8")
+            self._fingerprint = (self._version, hashlib.sha256(raw).hexdigest())
+        return self._fingerprint[1]
+
+    def _clone(self, frozen: bool, record: bool) -> "StoryBible":
+        """与当前对象共享全部容器的副本（写时复制，不做深拷贝）"""
+        clone = StoryBible.__new__(StoryBible)
+        clone.__dict__.update(self.__dict__)
+        clone._section_cache = dict(self._section_cache)
+        clone._shared = set(_COW_GROUPS)
+        clone._frozen = frozen
+        clone._delta = [] if record else None
+        clone._base_version = self._version
+        clone._snapshots = OrderedDict()
+        self._shared = set(_COW_GROUPS)
+        return clone
+
+    def snapshot(self) -> "StoryBible":
+        """当前版本的只读快照，可供多个并行写作任务读取，并可用于 rollback"""
+        snap = self._snapshots.get(self._version)
+        if snap is None:
+            snap = self._clone(frozen=True, record=False)
+            self._snapshots[self._version] = snap
+            while len(self._snapshots) > self.MAX_SNAPSHOTS:
+                self._snapshots.popitem(last=False)
+        return snap
+
+    def fork(self) -> "StoryBible":
+        """可写分支：修改只影响分支本身，并被记录为增量，之后用 commit 按顺序应用"""
+        return self._clone(frozen=False, record=True)
+
+    def commit(self, branch: "StoryBible") -> int:
+        """把分支记录的增量按顺序应用到当前对象，返回应用后的版本号"""
+        self._check_writable()
+        for method, args in branch._delta or []:
+            getattr(self, method)(*args)
+        logger.debug(
+            f"[StoryBible] 提交分支增量 {len(branch._delta or [])} 项 "
+            f"(基于 v{branch.base_version}, 当前 v{self._version})"
+        )
+        branch._delta = []
+        return self._version
+
+    def rollback(self, version: int) -> None:
+        """回滚到 snapshot() 保存过的版本"""
+        self._check_writable()
+        snap = self._snapshots.get(version)
+        if snap is None:
+            raise KeyError(f"StoryBible 没有版本 {version} 的快照")
+        for attrs in _COW_GROUPS.values():
+            for attr in attrs:
+                setattr(self, attr, getattr(snap, attr))
+        self._archived_world_states = snap._archived_world_states
+        self._archived_entities = snap._archived_entities
+        self._shared = set(_COW_GROUPS)
+        snap._shared = set(_COW_GROUPS)
+        self._version = version
+        self._fingerprint = None
+        for v in [v for v in self._snapshots if v > version]:
+            del self._snapshots[v]
+        self._invalidate()
+        logger.info(f"[StoryBible] 已回滚到版本 {version}")
+
+    def _check_writable(self) -> None:
+        if self._frozen:
+            raise RuntimeError("StoryBible 快照只读，请使用 fork() 获取可写分支")
+
+    def _mutate(self, method: Optional[str], args: tuple, *groups: str) -> None:
+        """修改前调用：检查可写、复制仍共享的容器、递增版本、记录增量"""
+        self._check_writable()
+        for group in groups:
+            if group in self._shared:
+                for attr in _COW_GROUPS[group]:
+                    value = getattr(self, attr)
+                    copier = _NESTED_COPY.get(attr)
+                    setattr(self, attr, copier(value) if copier else value.copy())
+                self._shared.discard(group)
+        self._version += 1
+        if method and self._delta is not None:
+            self._delta.append((method, args))
+
+    # ==================== 查询索引 ====================
+
+    def _rebuild_indexes(self) -> None:
+        """按当前数据重建全部查询索引"""
+        self._world_state_keys = []
+        self._world_states_sorted = []
+        for state in self._world_states:
+            self._index_world_state(state)
+        self._entities_by_chapter = {}
+        for entity in self._entities:
+            self._index_entity(entity)
+        self._reindex_plot_threads()
+
+    def _reindex_plot_threads(self) -> None:
+        self._threads_by_status = {}
+        self._payoff_deadlines = []
+        for thread in self._plot_threads.values():
+            self._index_plot_thread(thread)
+
+    def _index_world_state(self, state: WorldState) -> None:
+        # bisect_right 保证同一章节的多个状态保持追加顺序
+        pos = bisect.bisect_right(self._world_state_keys, state.chapter_index)
+        self._world_state_keys.insert(pos, state.chapter_index)
+        self._world_states_sorted.insert(pos, state)
+
+    def _index_entity(self, entity: EntityContent) -> None:
+        chapter_index = getattr(entity, "chapter_index", None)
+        if chapter_index is not None:
+            self._entities_by_chapter.setdefault(chapter_index, []).append(entity)
+
+    @staticmethod
+    def _payoff_deadline(thread: PlotThread) -> Optional[int]:
+        """预期回收范围上限；与 PlotThread.is_overdue 一致，只认 "a-b" 形式"""
+        payoff = _parse_range(thread.expected_payoff_range)
+        if payoff and "-" in thread.expected_payoff_range:
+            return payoff[1]
+        return None
+
+    def _index_plot_thread(self, thread: PlotThread, previous: Optional[PlotThread] = None) -> None:
+        """(重新)登记情节线的状态分桶和逾期队列；previous 为被替换的旧对象"""
+        for bucket in self._threads_by_status.values():
+            bucket.pop(thread.id, None)
+        self._threads_by_status.setdefault(thread.status, {})[thread.id] = thread
+
+        deadline = self._payoff_deadline(previous or thread)
+        if deadline is not None:
+            i = bisect.bisect_left(self._payoff_deadlines, (deadline, -1, ""))
+            while i < len(self._payoff_deadlines) and self._payoff_deadlines[i][0] == deadline:
+                if self._payoff_deadlines[i][2] == thread.id:
+                    del self._payoff_deadlines[i]
+                else:
+                    i += 1
+        deadline = self._payoff_deadline(thread)
+        if thread.is_foreshadowed() and deadline is not None:
+            bisect.insort(self._payoff_deadlines, (deadline, next(self._deadline_seq), thread.id))
 
     def load_from_outline(self, outline: NovelOutline) -> None:
         """从大纲初始化 StoryBible"""
@@ -72,6 +312,7 @@ class StoryBible:
 
     def load_from_content(self, content: StoryBibleContent) -> None:
         """从 StoryBibleContent 加载"""
+        self._mutate("load_from_content", (content,), *_COW_GROUPS)
         # 角色弧线
         for arc in content.character_arcs:
             self._character_arcs[arc.name] = arc
@@ -82,6 +323,9 @@ class StoryBible:
 
         # 世界状态
         self._world_states = content.world_states.copy()
+        self._world_state_summaries = dict(content.world_state_summaries)
+        self._archived_world_states = content.archived_counts.get("world_states", 0)
+        self._archived_entities = content.archived_counts.get("entities", 0)
 
         # 世界规则
         self._world_rules = content.world_rules.copy()
@@ -89,14 +333,19 @@ class StoryBible:
         # 实体
         self._entities = content.entities.copy()
 
+        self._rebuild_indexes()
+        self._invalidate()
+
     def to_content(self) -> StoryBibleContent:
         """导出为 StoryBibleContent"""
         return StoryBibleContent(
             plot_threads=list(self._plot_threads.values()),
             character_arcs=list(self._character_arcs.values()),
             world_states=self._world_states.copy(),
+            world_state_summaries=dict(self._world_state_summaries),
             world_rules=self._world_rules.copy(),
             entities=self._entities.copy(),
+            archived_counts={"world_states": self._archived_world_states, "entities": self._archived_entities},
             last_updated=datetime.now()
         )
 
@@ -104,7 +353,9 @@ class StoryBible:
 
     def add_character_arc(self, arc: CharacterArc) -> None:
         """添加角色弧线"""
+        self._mutate("add_character_arc", (arc,), "character_arcs")
         self._character_arcs[arc.name] = arc
+        self._invalidate("character_arcs")
         logger.debug(f"[StoryBible] 添加角色弧线: {arc.name}")
 
     def get_character_arc(self, name: str) -> Optional[CharacterArc]:
@@ -114,7 +365,9 @@ class StoryBible:
     def update_character_arc(self, arc: CharacterArc) -> None:
         """更新角色弧线"""
         if arc.name in self._character_arcs:
+            self._mutate("update_character_arc", (arc,), "character_arcs")
             self._character_arcs[arc.name] = arc
+            self._invalidate("character_arcs")
             logger.debug(f"[StoryBible] 更新角色弧线: {arc.name}")
 
     def get_all_character_arcs(self) -> Dict[str, CharacterArc]:
@@ -125,7 +378,11 @@ class StoryBible:
 
     def add_plot_thread(self, thread: PlotThread) -> None:
         """添加情节线"""
+        self._mutate("add_plot_thread", (thread,), "plot_threads")
+        previous = self._plot_threads.get(thread.id)
         self._plot_threads[thread.id] = thread
+        self._index_plot_thread(thread, previous)
+        self._invalidate("plot_threads")
         logger.debug(f"[StoryBible] 添加情节线: {thread.name}")
 
     def get_plot_thread(self, thread_id: str) -> Optional[PlotThread]:
@@ -134,23 +391,41 @@ class StoryBible:
 
     def get_active_plot_threads(self) -> List[PlotThread]:
         """获取活跃的情节线"""
-        return [t for t in self._plot_threads.values() if t.is_active()]
+        return list(self._threads_by_status.get("active", {}).values())
 
     def get_unresolved_plot_threads(self) -> List[PlotThread]:
         """获取未解决的情节线（伏笔）"""
-        return [t for t in self._plot_threads.values() if not t.is_resolved()]
+        return [
+            t for status, bucket in self._threads_by_status.items() if status != "resolved"
+            for t in bucket.values()
+        ]
 
     def get_overdue_plot_threads(self, current_chapter: int) -> List[PlotThread]:
-        """获取逾期未回收的伏笔"""
-        return [t for t in self._plot_threads.values() if t.is_overdue(current_chapter)]
+        """获取逾期未回收的伏笔（按预期回收上限排序）"""
+        end = bisect.bisect_left(self._payoff_deadlines, (current_chapter, -1, ""))
+        overdue, seen = [], set()
+        for _, _, thread_id in self._payoff_deadlines[:end]:
+            thread = self._plot_threads.get(thread_id)
+            # 绕过 resolve_plot_thread 直接改状态的情节线在这里跳过
+            if thread is not None and thread_id not in seen and thread.is_overdue(current_chapter):
+                seen.add(thread_id)
+                overdue.append(thread)
+        return overdue
 
     def resolve_plot_thread(self, thread_id: str, payoff_chapter: int) -> None:
         """标记伏笔为已回收"""
         thread = self._plot_threads.get(thread_id)
         if thread:
-            thread.status = "resolved"
-            thread.payoff_chapter = payoff_chapter
-            thread.actual_payoff_chapter = payoff_chapter
+            self._mutate("resolve_plot_thread", (thread_id, payoff_chapter), "plot_threads")
+            # 替换而不是原地修改，快照中的旧对象保持不变
+            thread = thread.model_copy(update={
+                "status": "resolved",
+                "payoff_chapter": payoff_chapter,
+                "actual_payoff_chapter": payoff_chapter,
+            })
+            self._plot_threads[thread_id] = thread
+            self._index_plot_thread(thread)
+            self._invalidate("plot_threads")
             logger.info(f"[StoryBible] 伏笔已回收: {thread.name} (在第{payoff_chapter}章)")
         else:
             logger.warning(f"[StoryBible] 尝试回收未知伏笔: {thread_id}")
@@ -159,7 +434,10 @@ class StoryBible:
 
     def append_world_state(self, state: WorldState) -> None:
         """追加世界状态"""
+        self._mutate("append_world_state", (state,), "world_states")
         self._world_states.append(state)
+        self._index_world_state(state)
+        self._invalidate("world_state")
         logger.debug(f"[StoryBible] 追加世界状态: 第{state.chapter_index}章")
 
     def get_latest_world_state(self) -> Optional[WorldState]:
@@ -167,42 +445,165 @@ class StoryBible:
         return self._world_states[-1] if self._world_states else None
 
     def get_world_states_in_range(self, start: int, end: int) -> List[WorldState]:
-        """获取指定章节范围的世界状态"""
-        return [s for s in self._world_states if start <= s.chapter_index <= end]
+        """获取指定章节范围的世界状态（按章节排序），早于内存窗口的部分从冷存储读取"""
+        lo = bisect.bisect_left(self._world_state_keys, start)
+        hi = bisect.bisect_right(self._world_state_keys, end)
+        states = self._world_states_sorted[lo:hi]
+        oldest = self._world_state_keys[0] if self._world_state_keys else None
+        if self._archive is not None and self._world_state_summaries and (oldest is None or start <= oldest):
+            archived = self._archive.load_archived_world_states(start, end)
+            states = sorted(archived, key=lambda s: s.chapter_index) + states
+        return states
+
+    def get_world_state_summaries(self) -> Dict[int, Dict[str, Any]]:
+        """已归档世界状态的分卷汇总"""
+        return dict(self._world_state_summaries)
+
+    # ==================== 保留策略 ====================
+
+    def attach_archive(self, archive) -> None:
+        """设置冷存储（NovelStorage），用于按需查询已归档的历史"""
+        self._archive = archive
+
+    def compact_history(self, archive=None) -> int:
+        """把超出保留窗口的世界状态和实体归档到冷存储
+
+        世界状态先按卷（summary.ARC_SIZE 章）合并进分卷汇总，再整体移出内存，
+        使内存占用和 StoryBible 的保存/加载时间不随章节数增长。
+        归档写入带起始序号：归档后、保存 StoryBible 前中断时，重新加载的旧 StoryBible
+        会再次归档同一批条目，冷存储按序号跳过已写入的部分，不会重复。
+
+        Returns:
+            归档的条目数
+        """
+        from src.summary import ARC_SIZE
+
+        archive = archive or self._archive
+        if archive is None:
+            return 0
+        self._archive = archive
+
+        moved = 0
+        overflow = len(self._world_states) - self.WORLD_STATE_RETENTION
+        if overflow > 0:
+            self._mutate(None, (), "world_states")
+            # 按章节顺序归档最早的状态
+            old = self._world_states_sorted[:overflow]
+            old_ids = {id(state) for state in old}
+            archive.archive_world_states(old, start=self._archived_world_states)
+            self._archived_world_states += len(old)
+            for state in old:
+                volume = state.chapter_index // ARC_SIZE
+                self._world_state_summaries[volume] = self._merge_world_state_summary(
+                    self._world_state_summaries.get(volume), state
+                )
+            self._world_states = [s for s in self._world_states if id(s) not in old_ids]
+            self._world_state_keys = self._world_state_keys[overflow:]
+            self._world_states_sorted = self._world_states_sorted[overflow:]
+            self._invalidate("world_state")
+            moved += len(old)
+
+        overflow = len(self._entities) - self.ENTITY_RETENTION
+        if overflow > 0:
+            self._mutate(None, (), "entities")
+            archive.archive_entities(self._entities[:overflow], start=self._archived_entities)
+            self._archived_entities += overflow
+            self._entities = self._entities[overflow:]
+            self._entities_by_chapter = {}
+            for entity in self._entities:
+                self._index_entity(entity)
+            moved += overflow
+
+        if moved:
+            logger.info(f"[StoryBible] 已归档 {moved} 条历史记录: {self.summary()}")
+        return moved
+
+    def _merge_world_state_summary(self, summary: Optional[Dict[str, Any]], state: WorldState) -> Dict[str, Any]:
+        """把一条世界状态并入卷汇总（返回新字典，不修改旧对象）"""
+        summary = dict(summary or {
+            "start": state.chapter_index, "end": state.chapter_index,
+            "locations": [], "times": [], "factions": [],
+        })
+        summary["start"] = min(summary["start"], state.chapter_index)
+        summary["end"] = max(summary["end"], state.chapter_index)
+        locations = list(summary["locations"])
+        if state.location and (not locations or locations[-1] != state.location):
+            locations.append(state.location)
+        summary["locations"] = locations[-self.SUMMARY_MAX_ITEMS:]
+        times = list(summary["times"])
+        if state.time:
+            # 只保留最早和最新的时间描述
+            times = [times[0], state.time] if times else [state.time]
+        summary["times"] = times
+        factions = list(summary["factions"])
+        factions += [f for f in state.active_factions if f not in factions]
+        summary["factions"] = factions[-self.SUMMARY_MAX_ITEMS:]
+        return summary
+
+    @staticmethod
+    def _world_state_summary_line(summary: Dict[str, Any]) -> str:
+        parts = [f"第{summary['start'] + 1}-{summary['end'] + 1}章"]
+        if summary["locations"]:
+            parts.append("地点 " + "→".join(summary["locations"]))
+        if summary["times"]:
+            parts.append("时间 " + "~".join(summary["times"]))
+        if summary["factions"]:
+            parts.append("势力 " + "、".join(summary["factions"]))
+        return "；".join(parts)
 
     # ==================== 世界规则 ====================
 
     def add_world_rule(self, rule: WorldRule) -> None:
         """添加世界规则"""
+        self._mutate("add_world_rule", (rule,), "world_rules")
         self._world_rules.append(rule)
+        self._invalidate("world_rules")
 
     def check_world_rule_violations(self, content: str, context: Dict = None) -> List[Dict]:
         """检查内容是否违反世界规则"""
-        violations = []
-        for rule in self._world_rules:
-            if rule.check(content, context):
-                violations.append({
-                    "rule": rule,
-                    "severity": rule.severity
-                })
-        return violations
+        self._compiled_rules = compile_rules(self._world_rules, self._compiled_rules)
+        return [
+            {"rule": rule, "severity": rule.severity}
+            for rule in self._compiled_rules.violated_rules(content, context)
+        ]
 
     # ==================== 实体 ====================
 
     def append_entity(self, entity: EntityContent) -> None:
         """追加实体"""
+        self._mutate("append_entity", (entity,), "entities")
         self._entities.append(entity)
+        self._index_entity(entity)
 
     def get_all_entities(self) -> List[EntityContent]:
-        """获取所有实体"""
+        """获取所有实体（含已归档到冷存储的部分，按追加顺序）"""
+        if self._archive is not None and self._archived_entities:
+            return self._archive.load_archived_entities() + self._entities
         return self._entities.copy()
 
     def get_entities_for_chapter(self, chapter_index: int) -> List[EntityContent]:
-        """获取指定章节的实体"""
-        return [e for e in self._entities if e.chapter_index == chapter_index]
+        """获取指定章节的实体，早于内存窗口的部分从冷存储读取"""
+        entities = list(self._entities_by_chapter.get(chapter_index, []))
+        oldest = min(self._entities_by_chapter) if self._entities_by_chapter else None
+        if self._archive is not None and self._archived_entities and (oldest is None or chapter_index <= oldest):
+            archived = [
+                e for e in self._archive.load_archived_entities()
+                if getattr(e, "chapter_index", None) == chapter_index
+            ]
+            entities = archived + entities
+        return entities
 
     # ==================== 上下文获取 ====================
 
+    def writer_context(self, chapter_index: int, chapter_outline: Optional[ChapterOutline] = None) -> Dict[str, Any]:
+        """WriterAgent 需要的 StoryBible 数据（注入 state._story_bible_data）"""
+        return {
+            'character_arcs': list(self._character_arcs.values()),
+            'plot_threads': list(self._plot_threads.values()),
+            'world_states': list(self._world_states),
+            'layered_context': self.format_layered_context(chapter_index, chapter_outline),
+        }
+
     def get_context_for_chapter(self, chapter_index: int) -> Dict[str, Any]:
         """分层注入：按变化频率分三层获取章节写作上下文
 
@@ -234,7 +635,7 @@ class StoryBible:
             },
             "layer1": {
                 "character_arcs": self._character_arcs.copy(),
-                "resolved_threads": [t for t in self._plot_threads.values() if t.is_resolved()],
+                "resolved_threads": list(self._threads_by_status.get("resolved", {}).values()),
             },
             "layer2": {
                 "world_state": self.get_latest_world_state(),
@@ -244,59 +645,143 @@ class StoryBible:
             },
         }
 
-    def format_layered_context(self, chapter_index: int) -> str:
+    def format_layered_context(
+        self,
+        chapter_index: int,
+        chapter_outline: Optional[ChapterOutline] = None,
+        token_budget: Optional[int] = None
+    ) -> str:
         """将分层上下文格式化为可注入 prompt 的文本
 
+        各分段单独缓存，只在对应的数据变化时重新渲染；
+        数据未变时 Layer 0/1 的文本逐字节一致，便于模型服务端的 prompt 缓存命中。
+        角色弧线和情节线超出 token 预算时，按与本章大纲的相关度筛选（见 context_selector），
+        注入长度不再随小说篇幅增长。
+
         Args:
             chapter_index: 章节索引（0-based）
+            chapter_outline: 本章大纲，用于相关度打分（可选）
+            token_budget: 角色弧线 + 情节线的 token 预算，默认使用 context_token_budget
 
         Returns:
             格式化的文本，可直接注入到 WriterAgent 的 prompt 中
         """
-        ctx = self.get_context_for_chapter(chapter_index)
-        lines = []
-
-        # Layer 0: 静态约束（最重要，放在最前面）
-        lines.append("## 世界观规则（硬约束）")
-        if ctx["layer0"]["world_rules"]:
-            for rule in ctx["layer0"]["world_rules"]:
+        budget = self.context_token_budget if token_budget is None else token_budget
+        arcs_text = self._render_section("character_arcs")
+        threads_text = self._render_section("plot_threads")
+        if budget and estimate_tokens(arcs_text) + estimate_tokens(threads_text) > budget:
+            arcs_text, threads_text = self._render_selected(chapter_index, chapter_outline, budget)
+
+        return "\n".join([
+            self._render_section("world_rules"),
+            arcs_text,
+            threads_text,
+            self._render_section("world_state"),
+        ])
+
+    def _render_section(self, section: str) -> str:
+        text = self._section_cache.get(section)
+        if text is None:
+            text = getattr(self, f"_render_{section}")()
+            self._section_cache[section] = text
+        return text
+
+    @staticmethod
+    def _arc_line(name: str, arc: CharacterArc) -> str:
+        stage = arc.get_current_stage()
+        stage_info = f"当前阶段：{stage.stage_name}" if stage else "无阶段信息"
+        return f"- {name}：{arc.emotional_state} | {stage_info}"
+
+    @staticmethod
+    def _thread_lines(thread: PlotThread) -> Dict[str, str]:
+        """情节线在各分组（resolved/active/unresolved）下的渲染行"""
+        lines = {}
+        if thread.is_resolved():
+            lines["resolved"] = f"- [已回收] {thread.name}"
+        else:
+            lines["unresolved"] = f"- [伏笔] {thread.name}（预期在第{thread.expected_payoff_range}章回收）"
+        if thread.is_active():
+            lines["active"] = f"- [进行] {thread.name}"
+        return lines
+
+    def _render_world_rules(self) -> str:
+        """Layer 0: 静态约束（最重要，放在最前面）"""
+        lines = ["## 世界观规则（硬约束）"]
+        if self._world_rules:
+            for rule in self._world_rules:
                 severity_marker = "【严重】" if rule.severity == "error" else "【警告】"
                 lines.append(f"- {severity_marker}{rule.description}")
         else:
             lines.append("- 无")
         lines.append("")
+        return "\n".join(lines)
 
-        # Layer 1: 慢变状态
-        lines.append("## 角色状态")
-        if ctx["layer1"]["character_arcs"]:
-            for name, arc in ctx["layer1"]["character_arcs"].items():
-                stage = arc.get_current_stage()
-                stage_info = f"当前阶段：{stage.stage_name}" if stage else "无阶段信息"
-                lines.append(f"- {name}：{arc.emotional_state} | {stage_info}")
+    def _render_character_arcs(self, arcs: Optional[List[CharacterArc]] = None, omitted: int = 0) -> str:
+        """Layer 1: 慢变状态"""
+        arcs = list(self._character_arcs.values()) if arcs is None else arcs
+        lines = ["## 角色状态"]
+        if arcs:
+            lines.extend(self._arc_line(arc.name, arc) for arc in arcs)
         else:
             lines.append("- 无")
-
+        if omitted:
+            lines.append(f"- （另有 {omitted} 个与本章关系较小的角色未列出）")
         lines.append("")
-        lines.append("## 情节线/伏笔状态")
-        if ctx["layer1"]["resolved_threads"]:
-            lines.append("已解决：")
-            for t in ctx["layer1"]["resolved_threads"]:
-                lines.append(f"- [已回收] {t.name}")
-        if ctx["layer2"]["active_threads"]:
-            lines.append("进行中：")
-            for t in ctx["layer2"]["active_threads"]:
-                lines.append(f"- [进行] {t.name}")
-        if ctx["layer2"]["unresolved_threads"]:
-            lines.append("伏笔：")
-            for t in ctx["layer2"]["unresolved_threads"]:
-                lines.append(f"- [伏笔] {t.name}（预期在第{t.expected_payoff_range}章回收）")
-        if not ctx["layer1"]["resolved_threads"] and not ctx["layer2"]["active_threads"] and not ctx["layer2"]["unresolved_threads"]:
+        return "\n".join(lines)
+
+    def _render_plot_threads(self, threads: Optional[List[PlotThread]] = None, omitted: int = 0) -> str:
+        """Layer 1/2: 情节线（一次遍历完成分组）"""
+        threads = self._plot_threads.values() if threads is None else threads
+        groups = {"resolved": [], "active": [], "unresolved": []}
+        for t in threads:
+            for group, line in self._thread_lines(t).items():
+                groups[group].append(line)
+
+        lines = ["## 情节线/伏笔状态"]
+        for group, header in (("resolved", "已解决："), ("active", "进行中："), ("unresolved", "伏笔：")):
+            if groups[group]:
+                lines.append(header)
+                lines.extend(groups[group])
+        if not any(groups.values()):
             lines.append("- 无")
+        if omitted:
+            lines.append(f"- （另有 {omitted} 条与本章关系较小的情节线未列出）")
         lines.append("")
+        return "\n".join(lines)
 
-        # Layer 2: 快变状态
-        lines.append("## 当前世界状态")
-        ws = ctx["layer2"]["world_state"]
+    def _render_selected(
+        self,
+        chapter_index: int,
+        chapter_outline: Optional[ChapterOutline],
+        budget: int
+    ) -> tuple:
+        """按相关度在预算内选出角色弧线和情节线，返回 (角色分段, 情节线分段)"""
+        focus = ChapterFocus(chapter_index, chapter_outline)
+        entries = [
+            (arc, score_character_arc(arc, focus), self._arc_line(name, arc))
+            for name, arc in self._character_arcs.items()
+        ]
+        entries += [
+            (t, score_plot_thread(t, focus), "\n".join(self._thread_lines(t).values()))
+            for t in self._plot_threads.values()
+        ]
+        selected, _ = select_lines(entries, budget)
+
+        arcs = [item for item, _ in selected if isinstance(item, CharacterArc)]
+        threads = [item for item, _ in selected if isinstance(item, PlotThread)]
+        logger.debug(
+            f"[StoryBible] 第{chapter_index + 1}章上下文筛选: "
+            f"角色 {len(arcs)}/{len(self._character_arcs)}, 情节线 {len(threads)}/{len(self._plot_threads)}"
+        )
+        return (
+            self._render_character_arcs(arcs, len(self._character_arcs) - len(arcs)),
+            self._render_plot_threads(threads, len(self._plot_threads) - len(threads)),
+        )
+
+    def _render_world_state(self) -> str:
+        """Layer 2: 快变状态"""
+        lines = ["## 当前世界状态"]
+        ws = self.get_latest_world_state()
         if ws:
             lines.append(f"- 地点：{ws.location}")
             lines.append(f"- 时间：{ws.time}")
@@ -305,7 +790,9 @@ class StoryBible:
                 lines.append(f"- 描述：{ws.description}")
         else:
             lines.append("- 无")
-
+        if self._world_state_summaries:
+            latest = self._world_state_summaries[max(self._world_state_summaries)]
+            lines.append(f"- 此前变迁：{self._world_state_summary_line(latest)}")
         return "\n".join(lines)
 
     # ==================== 更新机制 ====================
@@ -329,6 +816,8 @@ class StoryBible:
                         char_name = update.get("character")
                         arc = self.get_character_arc(char_name)
                         if arc:
+                            # 复制后再推进，快照中的旧对象保持不变
+                            arc = arc.model_copy()
                             arc.advance_stage()
                             self.update_character_arc(arc)
 
@@ -1,5 +1,5 @@
 """
-Sub-Agents 模块 - 4个检查型 + 1个评估型
+Sub-Agents 模块 - 4个检查型 + 1个评估型 + 1个合并型
 """
 from src.multi_agent.sub_agents.base import BaseSubAgent
 from src.multi_agent.sub_agents.consistency import ConsistencyChecker
@@ -7,6 +7,7 @@ from src.multi_agent.sub_agents.character_arc import CharacterArcChecker
 from src.multi_agent.sub_agents.plot_thread import PlotThreadChecker
 from src.multi_agent.sub_agents.world_state import WorldStateChecker
 from src.multi_agent.sub_agents.reflection import ReflectionChecker
+from src.multi_agent.sub_agents.fused import FusedChecker
 
 __all__ = [
     "BaseSubAgent",
@@ -15,4 +16,5 @@ __all__ = [
     "PlotThreadChecker",
     "WorldStateChecker",
     "ReflectionChecker",
+    "FusedChecker",
 ]
\ No newline at end of file
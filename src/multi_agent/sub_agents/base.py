@@ -1,17 +1,62 @@
 """
 Base SubAgent - 所有检查型 SubAgent 的基类
+
+同一次审查的各 SubAgent 共用一个提示词前缀（review_prefix：上下文 + 章节正文），
+各自的审查要求放在前缀之后，使服务端前缀缓存 / Anthropic cache_control 能够命中。
 """
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import Dict, Any, Optional, List
 import logging
 import time
 import json
 
 from src.multi_agent.types import SubAgentReport, CheckCategory
+from src.prompt_cache import cached_block, text_block
 from src.thinking_logger import log_agent_thinking
+from src.tool import PARSE_FAILED, PARSE_OK, parse_json_response
 
 logger = logging.getLogger(__name__)
 
+# LLM 响应无法解析时报告的 reasoning 前缀与置信度（不伪造问题，避免格式噪声触发修订）
+PARSE_FAILED_REASONING = "LLM 响应解析失败"
+PARSE_FAILED_CONFIDENCE = 0.3
+
+# 所有审查 SubAgent 共用的系统提示（属于共享前缀，不能包含检查器各自的要求）
+REVIEW_SYSTEM_PROMPT = """你是一位专业的小说审查专家，与其他审查专家共同审查同一章节。
+下面先给出上下文信息和章节正文，随后是你负责的审查任务，请只按任务要求输出。"""
+
+
+def as_list(value) -> list:
+    """LLM 返回的列表字段：缺失为空列表，单个对象包装为列表"""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def normalize_issues(value, default_type: str) -> List[Dict[str, Any]]:
+    """问题列表规范化：字符串转为问题对象，丢弃没有描述的残缺条目（截断修补可能产生）"""
+    issues = []
+    for issue in as_list(value):
+        if isinstance(issue, str):
+            issue = {"type": default_type, "issue": issue}
+        if isinstance(issue, dict) and issue.get("issue"):
+            issues.append(issue)
+    return issues
+
+
+@lru_cache(maxsize=8)
+def review_prefix(chapter: str, chapter_index: int, context_text: str) -> str:
+    """一次审查的规范前缀：各 SubAgent 收到逐字节相同的内容"""
+    return f"""【章节索引】
+{chapter_index}
+
+【上下文信息】
+{context_text}
+
+【章节内容】
+{chapter}"""
+
 
 class BaseSubAgent(ABC):
     """检查型 SubAgent 的基类"""
@@ -30,25 +75,37 @@ class BaseSubAgent(ABC):
         system_prompt: str,
         user_prompt: str,
         chapter_index: int,
-        require_json: bool = False
+        require_json: bool = False,
+        shared_prefix: Optional[str] = None
     ) -> str:
         """调用 LLM 进行思考
 
         Args:
-            system_prompt: 系统提示
+            system_prompt: 系统提示（给出 shared_prefix 时作为审查任务放在前缀之后）
             user_prompt: 用户提示
             chapter_index: 章节索引
             require_json: 是否需要 JSON 输出
+            shared_prefix: 本次审查的共享前缀（见 review_prefix）
 
         Returns:
             LLM 响应内容
         """
-        messages = [{"role": "system", "content": system_prompt}]
-
         if require_json:
             user_prompt += "\n\n请以 JSON 格式输出，包含 issues 和 reasoning 字段。"
 
-        messages.append({"role": "user", "content": user_prompt})
+        if shared_prefix is None:
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ]
+            prompt_content = f"【系统提示】\n{system_prompt}\n\n【用户提示】\n{user_prompt}"
+        else:
+            task = f"【审查任务】\n{system_prompt}\n\n{user_prompt}"
+            messages = [
+                {"role": "system", "content": REVIEW_SYSTEM_PROMPT},
+                {"role": "user", "content": [cached_block(shared_prefix), text_block(task)]},
+            ]
+            prompt_content = f"【系统提示】\n{REVIEW_SYSTEM_PROMPT}\n\n【共享前缀】\n{shared_prefix}\n\n{task}"
 
         # 获取配置（如果有的话）
         config = getattr(self, 'config', None)
@@ -69,13 +126,22 @@ class BaseSubAgent(ABC):
         log_agent_thinking(
             agent_name=self.agent_name,
             node_name="check",
-            prompt_content=f"【系统提示】\n{system_prompt}\n\n【用户提示】\n{user_prompt}",
+            prompt_content=prompt_content,
             response_content=response,
             chapter_index=chapter_index
         )
 
         return response
 
+    def _parse_json(self, response: str) -> Optional[Dict[str, Any]]:
+        """宽松解析 LLM 响应中的 JSON 对象，失败时返回 None（计入 json_parse_stats）"""
+        parsed, status = parse_json_response(response, source=self.agent_name, require_object=True)
+        if status == PARSE_FAILED:
+            logger.warning(f"[{self.agent_name}] {PARSE_FAILED_REASONING}，不采纳本次结果: {str(response)[:200]}")
+        elif status != PARSE_OK:
+            logger.info(f"[{self.agent_name}] LLM 响应格式有误，已修复解析（{status}）")
+        return parsed
+
     async def _log_thinking(
         self,
         prompt_content: str,
@@ -100,13 +166,21 @@ class BaseSubAgent(ABC):
             error_message=error
         )
 
+    def rule_findings(self, chapter: str, chapter_index: int) -> tuple:
+        """只依赖正文的规则检查结果 (issues, updates)
+
+        增量复审时检查器只看到摘录，这部分结果需在全文上重新计算（见 IncrementalPlan.refresh_rules）
+        """
+        return [], []
+
     def _create_report(
         self,
         category: CheckCategory,
         issues: list = None,
         updates: list = None,
         reasoning: str = "",
-        confidence: float = 0.5
+        confidence: float = 0.5,
+        parse_failed: bool = False
     ) -> SubAgentReport:
         """创建标准化的 SubAgentReport"""
         return SubAgentReport(
@@ -115,7 +189,8 @@ class BaseSubAgent(ABC):
             issues=issues or [],
             updates=updates or [],
             reasoning=reasoning,
-            confidence=confidence
+            confidence=confidence,
+            parse_failed=parse_failed
         )
 
 
@@ -6,7 +6,9 @@ CharacterArcChecker - 检查角色弧线是否推进
 import logging
 from typing import Dict, Any, List
 
-from src.multi_agent.sub_agents.base import BaseSubAgent
+from src.multi_agent.sub_agents.base import (
+    BaseSubAgent, PARSE_FAILED_CONFIDENCE, PARSE_FAILED_REASONING, as_list, normalize_issues, review_prefix,
+)
 from src.multi_agent.types import SubAgentReport, CheckCategory
 
 logger = logging.getLogger(__name__)
@@ -35,56 +37,32 @@ class CharacterArcChecker(BaseSubAgent):
 3. 角色关系变化是否合理且有铺垫
 
 请以 JSON 格式输出：
-- updates: 弧线推进更新列表，包含 character、action、from_stage、to_stage
-- issues: 发现的问题列表
+- updates: 弧线推进更新列表，包含 character、action、from_stage、to_stage、location（所在行，如"第3行"）
+- issues: 发现的问题列表，包含 type、issue、location、suggestion、severity(严重程度：high/medium/low，只有必须返工的问题标 high)、confidence(对该问题的把握 0-1)
 - reasoning: 分析理由"""
 
-        user_prompt = f"""请分析以下章节的角色弧线推进情况：
-
-【章节内容】
-{chapter}
-
-【上下文信息】
-{context_text}
-
-请检查角色情感状态、关键时刻、关系变化，输出 JSON 格式。"""
+        user_prompt = "请分析以上章节的角色弧线推进情况，检查角色情感状态、关键时刻、关系变化，输出 JSON 格式。"
 
         # 调用 LLM 进行分析
         response = await self._call_llm(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
             chapter_index=chapter_index,
-            require_json=True
+            require_json=True,
+            shared_prefix=review_prefix(chapter, chapter_index, context_text)
         )
 
-        # 解析 LLM 响应
-        updates = []
-        issues = []
-        reasoning = "LLM 角色弧线分析完成"
-
-        try:
-            import json as json_module
-            response_clean = response.strip()
-            if response_clean.startswith("```json"):
-                response_clean = response_clean[7:]
-            if response_clean.endswith("```"):
-                response_clean = response_clean[:-3]
-            response_clean = response_clean.strip()
-
-            parsed = json_module.loads(response_clean)
-            updates = parsed.get("updates", [])
-            issues = parsed.get("issues", [])
+        # 解析 LLM 响应（解析失败时不伪造问题，只降低置信度）
+        parsed = self._parse_json(response)
+        if parsed is None:
+            updates, issues = [], []
+            reasoning = PARSE_FAILED_REASONING
+            confidence = PARSE_FAILED_CONFIDENCE
+        else:
+            updates = as_list(parsed.get("updates"))
+            issues = normalize_issues(parsed.get("issues"), "arc")
             reasoning = parsed.get("reasoning", "LLM 分析完成")
-        except Exception as e:
-            logger.warning(f"LLM 响应解析失败: {e}")
-            if "正常" in response or "没有" in response:
-                updates = []
-            else:
-                issues.append({
-                    "type": "character_arc",
-                    "issue": f"LLM 分析响应解析失败",
-                    "suggestion": "请人工检查角色弧线"
-                })
+            confidence = 0.85
 
         # 补充：基于规则的角色情感提取检查
         emotional_states = self._extract_emotional_states(chapter)
@@ -96,7 +74,8 @@ class CharacterArcChecker(BaseSubAgent):
             issues=issues,
             updates=updates,
             reasoning=reasoning,
-            confidence=0.85
+            confidence=confidence,
+            parse_failed=parsed is None
         )
 
     def _extract_emotional_states(self, chapter: str) -> Dict[str, List[str]]:
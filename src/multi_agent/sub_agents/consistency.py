@@ -3,22 +3,31 @@ ConsistencyChecker - 检查章节内部一致性（时间线、角色行为）
 
 只检查章节内部一致性，不检查角色档案匹配。
 角色档案是设定，章节不需要显式提及所有设定值。
+挂载全书索引（ChapterIndex）后，会附上前文中本章角色的相关段落，供判断角色行为是否前后一致。
 """
 import re
 import logging
 from typing import Dict, Any, List
 
-from src.multi_agent.sub_agents.base import BaseSubAgent
+from src.multi_agent.sub_agents.base import (
+    BaseSubAgent, PARSE_FAILED_CONFIDENCE, PARSE_FAILED_REASONING, normalize_issues, review_prefix,
+)
 from src.multi_agent.types import SubAgentReport, CheckCategory, Suggestion, Priority
 
 logger = logging.getLogger(__name__)
 
+# 附带的前文相关段落数与最大字数
+RELATED_PASSAGES_TOP_K = 3
+RELATED_PASSAGES_CHARS = 900
+
 
 class ConsistencyChecker(BaseSubAgent):
     """章节内部一致性检查器"""
 
     def __init__(self, model_manager=None):
         super().__init__(model_manager, "ConsistencyChecker")
+        # 全书倒排索引（WritingSupervisor.attach_chapter_index 挂载），未挂载时只看本章
+        self.novel_index = None
 
     async def check(self, chapter: str, context_text: str, chapter_index: int) -> SubAgentReport:
         """
@@ -36,77 +45,78 @@ class ConsistencyChecker(BaseSubAgent):
 3. 地点一致性：检查角色移动是否合理，是否有突兀的地点跳跃
 
 请以 JSON 格式输出，包含以下字段：
-- issues: 问题列表，每个问题包含 type(问题类型)、issue(问题描述)、location(位置)、suggestion(修改建议)
+- issues: 问题列表，每个问题包含 type(问题类型)、issue(问题描述)、location(位置)、suggestion(修改建议)、severity(严重程度：high/medium/low，只有必须返工的问题标 high)、confidence(对该问题的把握 0-1)
 - reasoning: 分析理由
 
 如果没有发现问题，issues 为空数组。"""
 
-        user_prompt = f"""请分析以下章节的一致性问题：
-
-【章节内容】
-{chapter}
-
-【上下文信息】
-{context_text}
-
-请仔细检查时间线、角色行为和地点的一致性，并给出具体的问题位置和修改建议。输出 JSON 格式。"""
+        user_prompt = "请仔细检查以上章节的时间线、角色行为和地点的一致性，并给出具体的问题位置和修改建议。输出 JSON 格式。"
+        related = self._related_passages(chapter, chapter_index)
+        if related:
+            # 放在共享前缀之后，不影响各检查器的前缀缓存
+            user_prompt = f"【前文相关段落】\n{related}\n\n{user_prompt}"
 
         # 调用 LLM 进行分析
         response = await self._call_llm(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
             chapter_index=chapter_index,
-            require_json=True
+            require_json=True,
+            shared_prefix=review_prefix(chapter, chapter_index, context_text)
         )
 
-        # 解析 LLM 响应
-        issues = []
-        reasoning = "LLM 分析完成"
-
-        try:
-            import json as json_module
-            # 尝试从响应中提取 JSON
-            response_clean = response.strip()
-            if response_clean.startswith("```json"):
-                response_clean = response_clean[7:]
-            if response_clean.endswith("```"):
-                response_clean = response_clean[:-3]
-            response_clean = response_clean.strip()
-
-            parsed = json_module.loads(response_clean)
-            issues = parsed.get("issues", [])
+        # 解析 LLM 响应（解析失败时不伪造问题，只降低置信度）
+        parsed = self._parse_json(response)
+        if parsed is None:
+            issues = []
+            reasoning = PARSE_FAILED_REASONING
+            confidence = PARSE_FAILED_CONFIDENCE
+        else:
+            issues = normalize_issues(parsed.get("issues"), "consistency")
             reasoning = parsed.get("reasoning", "LLM 分析完成")
-        except Exception as e:
-            # JSON 解析失败，记录警告但继续处理
-            logger.warning(f"LLM 响应 JSON 解析失败: {e}, 原始响应: {response[:200]}")
-            # 尝试简单解析
-            if "未发现" in response or "没有问题" in response:
-                issues = []
-            else:
-                issues.append({
-                    "type": "consistency",
-                    "issue": f"LLM 分析响应解析失败: {response[:100]}",
-                    "location": "",
-                    "suggestion": "请人工检查"
-                })
+            confidence = 0.85  # LLM 分析的置信度
 
         # 额外的时间线检查（基于规则的补充检查）
-        timeline_issues = self._check_timeline_consistency(chapter)
+        timeline_issues, _ = self.rule_findings(chapter, chapter_index)
         if timeline_issues:
             issues.extend(timeline_issues)
             reasoning += f"; 发现 {len(timeline_issues)} 个时间线问题"
 
         reasoning = reasoning if reasoning else "未发现一致性问题"
 
-        confidence = 0.85  # LLM 分析的置信度
-
         return self._create_report(
             category=CheckCategory.CONSISTENCY,
             issues=issues,
             reasoning=reasoning,
-            confidence=confidence
+            confidence=confidence,
+            parse_failed=parsed is None
         )
 
+    def _related_passages(self, chapter: str, chapter_index: int) -> str:
+        """用全书索引检索前文中本章出场角色的相关段落（含上一章，不含本章）"""
+        if self.novel_index is None:
+            return ""
+        try:
+            names = [name for name in self.novel_index.tracked_characters() if name in chapter]
+            # 存储中章节从 1 开始编号
+            passages = self.novel_index.retrieve_passages(
+                names, top_k=RELATED_PASSAGES_TOP_K, before_chapter=chapter_index + 1
+            ) if names else []
+        except Exception as e:
+            logger.debug(f"[ConsistencyChecker] 前文段落检索失败: {e}")
+            return ""
+        lines, used = [], 0
+        for chapter_number, text, _ in passages:
+            line = f"（第{chapter_number}章）{text}"
+            if used + len(line) > RELATED_PASSAGES_CHARS:
+                continue
+            lines.append(line)
+            used += len(line)
+        return "\n".join(lines)
+
+    def rule_findings(self, chapter: str, chapter_index: int) -> tuple:
+        return self._check_timeline_consistency(chapter), []
+
     def _check_timeline_consistency(self, chapter: str) -> List[Dict[str, Any]]:
         """检查时间线一致性"""
         issues = []
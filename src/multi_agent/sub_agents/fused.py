@@ -0,0 +1,176 @@
+"""
+FusedChecker - 单次调用完成四项检查 + 综合评估
+
+deep 模式下每章要把全文和分层上下文发送 5 次（4 个检查 Agent + ReflectionChecker）。
+fused 模式改为一次结构化调用，同一个 JSON 中返回 consistency / character_arc /
+plot_thread / world_state 四个分项和最终 verdict，再拆回 SubAgentReport 与 ReviewResult，
+StoryBible.update_from_sub_agent_reports 与 QualityEvaluation.from_review_result 无需改动。
+"""
+import logging
+import time
+from typing import List, Tuple
+
+from src.multi_agent.sub_agents.base import PARSE_FAILED_REASONING, as_list, normalize_issues, review_prefix
+from src.multi_agent.sub_agents.consistency import ConsistencyChecker
+from src.multi_agent.sub_agents.reflection import ReflectionChecker
+from src.multi_agent.sub_agents.world_state import WorldStateChecker
+from src.multi_agent.types import CheckCategory, ReviewResult, SubAgentReport
+
+logger = logging.getLogger(__name__)
+
+# 分项 -> (报告使用的 Agent 名称, 检查类别)，与独立检查器保持一致
+SECTIONS = {
+    "consistency": ("ConsistencyChecker", CheckCategory.CONSISTENCY),
+    "character_arc": ("CharacterArcChecker", CheckCategory.CHARACTER_ARC),
+    "plot_thread": ("PlotThreadChecker", CheckCategory.PLOT_THREAD),
+    "world_state": ("WorldStateChecker", CheckCategory.WORLD_STATE),
+}
+
+
+class FusedChecker(ReflectionChecker):
+    """合并检查器 - 一次 LLM 调用返回四项检查结果和最终评估"""
+
+    def __init__(self, model_manager=None):
+        super().__init__(model_manager)
+        self.agent_name = "FusedChecker"
+        # 只复用规则检查，不会发起 LLM 调用
+        self._consistency_rules = ConsistencyChecker(model_manager)
+        self._world_state_rules = WorldStateChecker(model_manager)
+
+    async def review(
+        self,
+        chapter: str,
+        chapter_index: int,
+        context_text: str
+    ) -> Tuple[List[SubAgentReport], ReviewResult]:
+        """一次调用完成审查
+
+        Returns:
+            (四个分项的 SubAgentReport, 最终 ReviewResult)
+        """
+        start_time = time.time()
+
+        system_prompt = """你是一位专业的小说审查专家，需要一次性完成四项检查并给出最终评估。
+
+四项检查：
+1. consistency：章节内时间线、角色行为、地点移动是否矛盾
+2. character_arc：角色情感状态是否与当前弧线阶段匹配，是否发生推动弧线的关键事件
+3. plot_thread：之前埋下的伏笔是否按期回收，新伏笔是否有关键词和预期回收时间
+4. world_state：地点、时间、势力关系是否与已有世界状态一致
+
+请严格按以下 JSON 结构输出：
+{
+  "consistency": {"issues": [...], "reasoning": "..."},
+  "character_arc": {"issues": [...], "updates": [{"character", "action", "from_stage", "to_stage"}], "reasoning": "..."},
+  "plot_thread": {"issues": [...], "updates": [{"thread_id", "action", "chapter"}], "reasoning": "..."},
+  "world_state": {"issues": [...], "updates": [...], "reasoning": "..."},
+  "verdict": {"quality_score": 0-10, "needs_revision": true/false, "suggestions": [...], "reasoning": "..."}
+}
+issues 中每个问题包含 type、issue、location、suggestion；没有问题时为空数组。
+
+评分标准：
+- 8.5-10: 优秀，无需修订
+- 7.0-8.5: 良好，小幅改进空间
+- 6.0-7.0: 合格，明显问题需修改
+- <6.0: 不合格，需要大幅修订
+
+【重要】verdict.suggestions 中每个对象包含 category、priority、issue、location、current_text、suggested_change，且：
+- category: "consistency" | "character_arc" | "plot_thread" | "world_state" | "quality"（必须使用英文小写）
+- priority: "high" | "medium" | "low"（必须使用英文小写）"""
+
+        user_prompt = "请对以上章节完成四项检查并给出最终评估，输出 JSON 格式。"
+
+        # 与 split 模式使用相同的前缀，修订复审时可命中缓存
+        response = await self._call_llm(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            chapter_index=chapter_index,
+            shared_prefix=review_prefix(chapter, chapter_index, context_text),
+        )
+
+        parsed = self._parse_json(response) or {}
+        reports = self._build_reports(chapter, chapter_index, parsed)
+        result = self._build_result(chapter, chapter_index, reports, parsed.get("verdict"), context_text)
+        result.parse_failed = not parsed
+        result.execution_time = time.time() - start_time
+        return reports, result
+
+    def _build_reports(self, chapter: str, chapter_index: int, parsed: dict) -> List[SubAgentReport]:
+        """按分项拆回 SubAgentReport，并补充各检查器原有的规则检查"""
+        reports = []
+        for key, (agent_name, category) in SECTIONS.items():
+            section = parsed.get(key)
+            if not isinstance(section, dict):
+                # 分项缺失时不伪造问题，只是该项没有结论
+                section = {"reasoning": "合并审查未返回该分项" if parsed else PARSE_FAILED_REASONING}
+            issues = normalize_issues(section.get("issues"), key)
+            updates = as_list(section.get("updates"))
+            reasoning = section.get("reasoning", "")
+
+            if key == "consistency":
+                timeline_issues = self._consistency_rules._check_timeline_consistency(chapter)
+                if timeline_issues:
+                    issues.extend(timeline_issues)
+                    reasoning += f"; 发现 {len(timeline_issues)} 个时间线问题"
+            elif key == "world_state":
+                new_state = self._world_state_rules._extract_world_state(chapter, chapter_index)
+                if new_state:
+                    updates.append({"type": "world_state_update", "state": new_state})
+                    reasoning += "; 检测到新的世界状态"
+
+            reports.append(SubAgentReport(
+                agent_name=agent_name,
+                category=category,
+                issues=issues,
+                updates=updates,
+                reasoning=reasoning,
+                confidence=0.85 if key in parsed else 0.3,
+                parse_failed=not parsed,
+            ))
+        return reports
+
+    def _build_result(
+        self,
+        chapter: str,
+        chapter_index: int,
+        reports: List[SubAgentReport],
+        verdict,
+        context_text: str
+    ) -> ReviewResult:
+        """按 ReflectionChecker.evaluate 的规则把 verdict 转为 ReviewResult"""
+        if not isinstance(verdict, dict):
+            verdict = None
+
+        suggestions = []
+        quality_score = None
+        needs_revision = False
+        reasoning = "合并审查完成"
+        if verdict is not None:
+            quality_score = verdict.get("quality_score")
+            if verdict.get("needs_revision") is not None:
+                needs_revision = bool(verdict["needs_revision"])
+            suggestions = self._parse_suggestions(verdict.get("suggestions"))
+            reasoning = verdict.get("reasoning", reasoning)
+
+        if not suggestions:
+            all_issues = [issue for report in reports for issue in report.issues]
+            suggestions = self._generate_suggestions(chapter, all_issues, context_text)
+            reasoning += f"; 补充规则检查: 发现 {len(suggestions)} 个建议"
+
+        if verdict is None:
+            # verdict 缺失时规则兜底，与 ReflectionChecker 解析失败时一致
+            quality_score = self._calculate_quality_score(chapter, [], suggestions)
+            needs_revision = len(suggestions) > 0 or quality_score < 7.0
+        else:
+            try:
+                quality_score = float(quality_score)
+            except (TypeError, ValueError):
+                quality_score = self._calculate_quality_score(chapter, [], suggestions)
+
+        return ReviewResult(
+            chapter_index=chapter_index,
+            needs_revision=needs_revision,
+            suggestions=suggestions,
+            reasoning=reasoning,
+            quality_score=quality_score,
+        )
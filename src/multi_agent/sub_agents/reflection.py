@@ -10,7 +10,8 @@ import logging
 import time
 from typing import Dict, Any, List
 
-from src.multi_agent.sub_agents.base import BaseSubAgent
+from src.multi_agent.chunking import review_excerpt
+from src.multi_agent.sub_agents.base import BaseSubAgent, PARSE_FAILED_REASONING, as_list, review_prefix
 from src.multi_agent.types import (
     SubAgentReport, ReviewResult, Suggestion,
     CheckCategory, Priority
@@ -50,7 +51,7 @@ class ReflectionChecker(BaseSubAgent):
         system_prompt = """你是一位专业的小说质量评审专家。请综合多个专业审查 Agent 的检查结果，对章节进行最终质量评估。
 
 你将收到：
-1. 章节内容摘要
+1. 章节内容（超长章节为覆盖全章的分段摘录）
 2. 多个专业 Agent 的检查结果（一致性、角色弧线、伏笔、世界状态）
 3. 各 Agent 发现的问题列表
 
@@ -84,28 +85,20 @@ class ReflectionChecker(BaseSubAgent):
                 "confidence": report.confidence
             })
 
-        user_prompt = f"""请综合以下专业审查 Agent 的检查结果，对章节进行最终评估：
-
-【章节索引】
-{chapter_index}
-
-【章节内容摘要】
-{chapter[:1500]}...
+        user_prompt = f"""请综合以下专业审查 Agent 的检查结果，对以上章节进行最终评估：
 
 【专业 Agent 检查结果】
 {agent_results_summary}
 
-【上下文信息】
-{context_text}
-
 请综合分析，给出最终的质量评分、是否需要修订、以及具体的修改建议。"""
 
-        # 调用 LLM 进行综合评估
+        # 调用 LLM 进行综合评估（与检查 Agent 共用章节前缀）
         response = await self._call_llm(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
             chapter_index=chapter_index,
-            require_json=True
+            require_json=True,
+            shared_prefix=review_prefix(review_excerpt(chapter), chapter_index, context_text)
         )
 
         # 解析 LLM 响应 - 使用 None 作为哨兵值，避免与有效评分混淆
@@ -115,44 +108,19 @@ class ReflectionChecker(BaseSubAgent):
         reasoning = "LLM 综合评估完成"
         llm_parsing_failed = False  # 跟踪 LLM 是否解析成功
 
-        try:
-            import json as json_module
-            response_clean = response.strip()
-            if response_clean.startswith("```json"):
-                response_clean = response_clean[7:]
-            if response_clean.endswith("```"):
-                response_clean = response_clean[:-3]
-            response_clean = response_clean.strip()
-
-            parsed = json_module.loads(response_clean)
+        parsed = self._parse_json(response)
+        if parsed is None:
+            llm_parsing_failed = True
+            # 回退到基于规则的方法
+            reasoning = f"{PARSE_FAILED_REASONING}，使用规则评估"
+        else:
             quality_score = parsed.get("quality_score", None)
             # 优先信任 LLM 返回的 needs_revision 决策
             llm_provided_revision = parsed.get("needs_revision")
             if llm_provided_revision is not None:
                 needs_revision = bool(llm_provided_revision)
-            suggestions_raw = parsed.get("suggestions", [])
-
-            # 转换 suggestions 格式
-            for s in suggestions_raw:
-                # 映射 LLM 返回的 category 名称到 CheckCategory
-                category_str = s.get("category", "quality")
-                category = self._map_category(category_str)
-
-                suggestions.append(Suggestion(
-                    category=category,
-                    priority=Priority(s.get("priority", "medium")),
-                    issue=s.get("issue", ""),
-                    location=s.get("location", ""),
-                    current_text=s.get("current_text", ""),
-                    suggested_change=s.get("suggested_change", "")
-                ))
-
+            suggestions = self._parse_suggestions(parsed.get("suggestions"))
             reasoning = parsed.get("reasoning", "LLM 综合评估完成")
-        except Exception as e:
-            logger.warning(f"LLM 响应解析失败: {e}")
-            llm_parsing_failed = True
-            # 回退到基于规则的方法
-            reasoning = f"LLM 解析失败，使用规则评估: {response[:100]}"
 
         # 如果 LLM 解析失败或没有建议，使用基于规则的方法补充
         if not suggestions:
@@ -183,9 +151,31 @@ class ReflectionChecker(BaseSubAgent):
             suggestions=suggestions,
             reasoning=reasoning,
             execution_time=execution_time,
-            quality_score=quality_score
+            quality_score=quality_score,
+            parse_failed=llm_parsing_failed
         )
 
+    def _parse_suggestions(self, suggestions_raw) -> List[Suggestion]:
+        """转换 LLM 返回的 suggestions，跳过无法识别的条目"""
+        suggestions = []
+        for s in as_list(suggestions_raw):
+            if not isinstance(s, dict):
+                continue
+            try:
+                priority = Priority(str(s.get("priority", "medium")).lower())
+            except ValueError:
+                priority = Priority.MEDIUM
+            suggestions.append(Suggestion(
+                # 映射 LLM 返回的 category 名称到 CheckCategory
+                category=self._map_category(s.get("category", "quality")),
+                priority=priority,
+                issue=s.get("issue", ""),
+                location=s.get("location", ""),
+                current_text=s.get("current_text", ""),
+                suggested_change=s.get("suggested_change", "")
+            ))
+        return suggestions
+
     def _generate_suggestions(
         self,
         chapter: str,
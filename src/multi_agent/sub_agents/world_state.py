@@ -6,7 +6,9 @@ WorldStateChecker - 检查世界状态
 import logging
 from typing import Dict, Any, List, Optional
 
-from src.multi_agent.sub_agents.base import BaseSubAgent
+from src.multi_agent.sub_agents.base import (
+    BaseSubAgent, PARSE_FAILED_CONFIDENCE, PARSE_FAILED_REASONING, as_list, normalize_issues, review_prefix,
+)
 from src.multi_agent.types import SubAgentReport, CheckCategory
 
 logger = logging.getLogger(__name__)
@@ -35,66 +37,37 @@ class WorldStateChecker(BaseSubAgent):
 3. 势力关系：势力之间的互动是否符合已知的关系设定
 
 请以 JSON 格式输出：
-- issues: 发现的问题列表，包含 type、issue、location、suggestion
+- issues: 发现的问题列表，包含 type、issue、location、suggestion、severity(严重程度：high/medium/low，只有必须返工的问题标 high)、confidence(对该问题的把握 0-1)
 - updates: 世界状态更新（如有新的地点、时间等）
 - reasoning: 分析理由"""
 
-        user_prompt = f"""请分析以下章节的世界状态一致性：
-
-【章节内容】
-{chapter}
-
-【上下文信息】
-{context_text}
-
-请检查地点、时间、势力关系的一致性，输出 JSON 格式。"""
+        user_prompt = "请分析以上章节的世界状态一致性，检查地点、时间、势力关系的一致性，输出 JSON 格式。"
 
         # 调用 LLM 进行分析
         response = await self._call_llm(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
             chapter_index=chapter_index,
-            require_json=True
+            require_json=True,
+            shared_prefix=review_prefix(chapter, chapter_index, context_text)
         )
 
-        # 解析 LLM 响应
-        updates = []
-        issues = []
-        reasoning = "LLM 世界状态分析完成"
-
-        try:
-            import json as json_module
-            response_clean = response.strip()
-            if response_clean.startswith("```json"):
-                response_clean = response_clean[7:]
-            if response_clean.endswith("```"):
-                response_clean = response_clean[:-3]
-            response_clean = response_clean.strip()
-
-            parsed = json_module.loads(response_clean)
-            issues = parsed.get("issues", []) or []
-            updates = parsed.get("updates", []) or []
+        # 解析 LLM 响应（解析失败时不伪造问题，只降低置信度）
+        parsed = self._parse_json(response)
+        if parsed is None:
+            updates, issues = [], []
+            reasoning = PARSE_FAILED_REASONING
+            confidence = PARSE_FAILED_CONFIDENCE
+        else:
+            updates = as_list(parsed.get("updates"))
+            issues = normalize_issues(parsed.get("issues"), "world_state")
             reasoning = parsed.get("reasoning", "LLM 分析完成")
-        except Exception as e:
-            logger.warning(f"LLM 响应解析失败: {e}")
-            if "正常" in response or "一致" in response:
-                issues = []
-            else:
-                issues.append({
-                    "type": "world_world_state",
-                    "issue": f"LLM 分析响应解析失败",
-                    "suggestion": "请人工检查世界状态"
-                })
+            confidence = 0.85
 
         # 补充：基于规则的世界状态提取
-        new_state = self._extract_world_state(chapter, chapter_index)
-        if new_state:
-            if not isinstance(updates, list):
-                updates = [updates]
-            updates.append({
-                "type": "world_state_update",
-                "state": new_state
-            })
+        _, state_updates = self.rule_findings(chapter, chapter_index)
+        if state_updates:
+            updates.extend(state_updates)
             reasoning += "; 检测到新的世界状态"
 
         return self._create_report(
@@ -102,9 +75,16 @@ class WorldStateChecker(BaseSubAgent):
             issues=issues,
             updates=updates,
             reasoning=reasoning,
-            confidence=0.85
+            confidence=confidence,
+            parse_failed=parsed is None
         )
 
+    def rule_findings(self, chapter: str, chapter_index: int) -> tuple:
+        new_state = self._extract_world_state(chapter, chapter_index)
+        if new_state is None:
+            return [], []
+        return [], [{"type": "world_state_update", "state": new_state}]
+
     def _check_location_conflict(self, chapter: str, current_location: str) -> Dict[str, Any] | None:
         """检查地点冲突"""
         # 简化：如果章节提到某个地点，但与当前地点相距甚远，可能有问题
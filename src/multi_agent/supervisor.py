@@ -5,12 +5,19 @@ WritingSupervisor - 主调度者（SuperAgent）
 - 并行调度所有 SubAgents
 - 收集结果，调用 ReflectionChecker 做最终决策
 - 返回 ReviewResult 给 WriterAgent
+
+fused 模式下改由 FusedChecker 单次调用完成四项检查和最终决策。
 """
 import asyncio
 import logging
 import time
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
+from src.multi_agent.chunking import CHUNK_CHARS, merge_window_reports, split_windows
+from src.multi_agent.convergence import RevisionController
+from src.multi_agent.dispatch import CheckDecision, CheckPlanner, DispatchStats, EarlyDecisionPolicy
+from src.multi_agent.incremental import DraftRecord, IncrementalPlan, paragraph_hashes, split_paragraphs
+from src.multi_agent.review_cache import ReviewCache
 from src.multi_agent.storybible import StoryBible
 from src.multi_agent.sub_agents import (
     ConsistencyChecker,
@@ -18,34 +25,77 @@ from src.multi_agent.sub_agents import (
     PlotThreadChecker,
     WorldStateChecker,
     ReflectionChecker,
+    FusedChecker,
 )
-from src.multi_agent.types import SubAgentReport, ReviewResult
+from src.multi_agent.types import SubAgentReport, ReviewResult, Suggestion, Priority
+from src.prompt_cache import PromptUsage, track_prompt_usage
 from src.thinking_logger import get_logger
+from src.tool import json_parse_stats
 
 logger = logging.getLogger(__name__)
 
+# 审查失败时 ReviewResult.reasoning 的前缀（失败结果不写入缓存）
+REVIEW_FAILED_PREFIX = "评估失败"
+
 
 class WritingSupervisor:
     """主调度者（SuperAgent）- 管理所有 SubAgents"""
 
-    def __init__(self, model_manager=None, novel_title: str = ""):
+    def __init__(self, model_manager=None, novel_title: str = "", specialist_model_manager=None):
+        """
+        Args:
+            model_manager: 综合评估（ReflectionChecker / FusedChecker）使用的模型管理器
+            novel_title: 小说标题（用于 thinking_logger）
+            specialist_model_manager: 检查型 SubAgent 使用的模型管理器（更快、更便宜的模型），
+                默认与 model_manager 相同
+        """
         # 初始化 thinking_logger，确保 SubAgent 的日志被正确记录
         self.thinking_logger = get_logger(novel_title=novel_title)
 
         # 世界观管理
         self.storybible = StoryBible()
+        # 审查产生但尚未提交的 StoryBible 分支 {chapter_index: 分支}
+        self._pending_reviews: Dict[int, StoryBible] = {}
 
         # 检查型 SubAgents（并行执行）
+        specialist_model_manager = specialist_model_manager or model_manager
         self.check_agents = [
-            ConsistencyChecker(model_manager),
-            CharacterArcChecker(model_manager),
-            PlotThreadChecker(model_manager),
-            WorldStateChecker(model_manager),
+            ConsistencyChecker(specialist_model_manager),
+            CharacterArcChecker(specialist_model_manager),
+            PlotThreadChecker(specialist_model_manager),
+            WorldStateChecker(specialist_model_manager),
         ]
 
         # 评估型 Sub-Agent（综合决策）
         self.reflection_agent = ReflectionChecker(model_manager)
 
+        # 合并型 Sub-Agent（fused 模式：一次调用完成检查和决策）
+        self.fused_agent = FusedChecker(model_manager)
+
+        # 派发前用规则跳过无事可查的检查 Agent
+        self.gate_checks = True
+        self.dispatch_stats = DispatchStats()
+
+        # 提前决策：出现高优先级、高置信度问题时取消其余检查并跳过综合评估
+        self.early_decision = EarlyDecisionPolicy()
+
+        # 修订稿增量复审：保存上一稿的段落哈希与报告 {chapter_index: DraftRecord}
+        self.incremental_review = True
+        self._drafts: Dict[int, DraftRecord] = {}
+
+        # 超长章节按段落分窗并发检查，0 表示不分窗
+        self.chunk_chars = CHUNK_CHARS
+
+        # 审查结果缓存：章节内容与 StoryBible 都未变化时不再调用 LLM（attach_review_cache 后持久化）
+        self.review_cache = ReviewCache()
+
+        # 提示词前缀缓存统计：最近一次审查与累计
+        self.last_prompt_usage = PromptUsage()
+        self.prompt_usage = PromptUsage()
+
+        # 修订收敛控制：评分不再提升、问题重复或全书修订预算用尽时停止修订
+        self.revision_controller = RevisionController()
+
         logger.info(
             f"[WritingSupervisor] 初始化完成: "
             f"{len(self.check_agents)} 个检查 Agent + 1 个评估 Agent"
@@ -81,12 +131,14 @@ class WritingSupervisor:
 
         logger.info(f"[WritingSupervisor] StoryBible 初始化完成: {self.storybible.summary()}")
 
-    async def review(self, chapter: str, chapter_index: int) -> ReviewResult:
+    async def review(self, chapter: str, chapter_index: int, chapter_outline=None, fused: bool = False) -> ReviewResult:
         """审查章节，返回修改建议
 
         Args:
             chapter: 章节内容
             chapter_index: 章节索引
+            chapter_outline: 本章大纲（可选），用于筛选与本章相关的 StoryBible 上下文
+            fused: 是否使用单次调用的合并审查（evaluation_mode="fused"）
 
         Returns:
             ReviewResult: 包含质量评分、是否需要修订、具体修改建议
@@ -101,33 +153,147 @@ class WritingSupervisor:
             _logger_var.set(self.thinking_logger)
             logger.info(f"[WritingSupervisor] thinking_logger 已初始化，输出目录: {self.thinking_logger.output_dir}")
 
-        # 1. 获取 StoryBible 上下文
-        context_text = self.storybible.format_layered_context(chapter_index)
+        # 1. 在当前版本的分支上审查，SubAgent 提取的更新只写入分支
+        bible = self.storybible.fork()
+        context_text = bible.format_layered_context(chapter_index, chapter_outline)
 
-        # 2. 并行执行 4 个检查型 SubAgents
-        try:
-            check_results = await asyncio.gather(
-                *[agent.check(chapter, context_text, chapter_index) for agent in self.check_agents],
-                return_exceptions=True
+        # 2-3. 检查并给出最终评估（内容与 StoryBible 未变化时直接复用缓存）
+        incremental = None if fused else self._incremental_plan(chapter, chapter_index)
+        cache_key = ReviewCache.make_key(
+            chapter, chapter_index, self.storybible.fingerprint(), "fused" if fused else "split",
+            early_decision=self.early_decision.enabled, incremental=incremental is not None
+        )
+        cached = self.review_cache.get(cache_key)
+        # 执行失败的检查器（结果不完整，不写入缓存）
+        failed_checks: List[str] = []
+        with track_prompt_usage() as usage:
+            if cached is not None:
+                valid_results, final_result = cached
+                logger.info(f"[WritingSupervisor] 第 {chapter_index+1} 章命中审查缓存，跳过 LLM 调用")
+            elif fused:
+                valid_results, final_result = await self._review_fused(chapter, chapter_index, context_text, start_time)
+            else:
+                valid_results, final_result = await self._review_split(
+                    chapter, chapter_index, context_text, start_time, bible, chapter_outline, incremental,
+                    failed_checks=failed_checks
+                )
+        self._record_prompt_usage(chapter_index, usage)
+        if failed_checks:
+            logger.warning(
+                f"[WritingSupervisor] 第 {chapter_index+1} 章 {', '.join(failed_checks)} 执行失败，结果不写入缓存"
             )
+        elif cached is None and self._cacheable(chapter_index, valid_results, final_result):
+            try:
+                self.review_cache.put(cache_key, valid_results, final_result)
+            except Exception as e:
+                logger.warning(f"[WritingSupervisor] 审查结果缓存写入失败: {e}")
+        self._drafts[chapter_index] = DraftRecord(
+            chapter_index, paragraph_hashes(split_paragraphs(chapter)), valid_results
+        )
 
-            # 处理异常结果
-            valid_results = []
-            for i, result in enumerate(check_results):
-                if isinstance(result, Exception):
-                    logger.error(
-                        f"[WritingSupervisor] {self.check_agents[i].agent_name} 执行失败: {result}"
-                    )
-                else:
-                    valid_results.append(result)
+        # 4. SubAgents 可能提取了新的世界状态/角色弧线/伏笔：先记入分支，
+        #    通过审查时立即提交；需要修订时暂存，被下一次审查替换（即回滚），或在强制接受时提交
+        if valid_results:
+            bible.update_from_sub_agent_reports(chapter_index, valid_results)
+            logger.info(f"[WritingSupervisor] StoryBible 分支已更新（{len(valid_results)} 个报告）")
+        self._pending_reviews[chapter_index] = bible
+        if not final_result.needs_revision:
+            self.commit_review(chapter_index)
+
+        elapsed = time.time() - start_time
+        logger.info(
+            f"[WritingSupervisor] 第 {chapter_index+1} 章审查完成: "
+            f"质量评分={final_result.quality_score:.1f}, "
+            f"需要修订={final_result.needs_revision}, "
+            f"耗时={elapsed:.1f}s"
+        )
+
+        return final_result
 
+    async def _review_split(
+        self,
+        chapter: str,
+        chapter_index: int,
+        context_text: str,
+        start_time: float,
+        bible: Optional[StoryBible] = None,
+        chapter_outline=None,
+        incremental: Optional[IncrementalPlan] = None,
+        failed_checks: Optional[List[str]] = None
+    ) -> Tuple[List[SubAgentReport], ReviewResult]:
+        """4 个检查 Agent 并行执行，再由 ReflectionChecker 综合决策
+
+        启用提前决策时，任一报告出现阻断性问题即取消其余检查，直接给出需要修订的结论。
+        给出 incremental 时检查器只审查改动段落的摘录，未改动区域沿用上一稿的问题。
+        执行失败的检查器名称追加到 failed_checks。
+        """
+        failed_checks = failed_checks if failed_checks is not None else []
+        check_text = incremental.excerpt if incremental else chapter
+        # 2. 规则预检后并行执行需要 LLM 的检查型 SubAgents
+        planner = CheckPlanner(self.check_agents)
+        decisions = self._plan_checks(planner, bible or self.storybible, chapter, chapter_index, chapter_outline)
+        # 被跳过的检查器只保留规则检查结果
+        reports: Dict[str, SubAgentReport] = {}
+        blocking = None
+        for decision in decisions:
+            if not decision.needed:
+                report = planner.skipped_report(decision, chapter, chapter_index)
+                if report is not None:
+                    reports[decision.agent_name] = report
+                    blocking = blocking or self._blocking(report)
+
+        dispatched = [] if blocking else [agent for agent, d in zip(self.check_agents, decisions) if d.needed]
+        try:
+            tasks = {
+                asyncio.ensure_future(self._timed_check(agent, check_text, context_text, chapter_index)): agent
+                for agent in dispatched
+            }
+            pending = set(tasks)
+            while pending and blocking is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    agent = tasks[task]
+                    if task.exception() is not None:
+                        logger.error(
+                            f"[WritingSupervisor] {agent.agent_name} 执行失败: {task.exception()}"
+                        )
+                        failed_checks.append(agent.agent_name)
+                        continue
+                    report = incremental.remap(task.result()) if incremental else task.result()
+                    reports[agent.agent_name] = report
+                    blocking = blocking or self._blocking(report)
+
+            # 提前决策：取消尚未完成的检查
+            if pending:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                logger.info(
+                    f"[WritingSupervisor] 提前决策，取消 {len(pending)} 个检查: "
+                    f"{', '.join(tasks[t].agent_name for t in pending)}"
+                )
+
+            # 保持 check_agents 的顺序
+            valid_results = [
+                reports[agent.agent_name] for agent in self.check_agents if agent.agent_name in reports
+            ]
+            if incremental:
+                valid_results = incremental.refresh_rules(
+                    incremental.merge(valid_results), self.check_agents, chapter_index
+                )
             logger.info(
-                f"[WritingSupervisor] 4 个检查 Agent 完成，{len(valid_results)} 个有效结果"
+                f"[WritingSupervisor] {len(dispatched)}/{len(self.check_agents)} 个检查 Agent 调用 LLM，"
+                f"{len(valid_results)} 个有效结果"
             )
 
         except Exception as e:
             logger.error(f"[WritingSupervisor] SubAgents 并行执行失败: {e}")
             valid_results = []
+            blocking = None
+            failed_checks.extend(agent.agent_name for agent in dispatched)
+
+        if blocking is not None:
+            return valid_results, self._early_result(chapter, chapter_index, valid_results, blocking, context_text, start_time)
 
         # 3. ReflectionChecker 综合所有结果，给出最终评估
         try:
@@ -143,25 +309,215 @@ class WritingSupervisor:
                 chapter_index=chapter_index,
                 needs_revision=False,
                 suggestions=[],
-                reasoning=f"评估失败: {e}",
+                reasoning=f"{REVIEW_FAILED_PREFIX}: {e}",
                 execution_time=time.time() - start_time,
                 quality_score=5.0
             )
 
-        # 4. 无论是否需要修订，都更新 StoryBible（SubAgents 可能提取了新的世界状态/角色弧线/伏笔）
-        if valid_results:
-            self.storybible.update_from_sub_agent_reports(chapter_index, valid_results)
-            logger.info(f"[WritingSupervisor] StoryBible 已更新（{len(valid_results)} 个报告）")
+        return valid_results, final_result
+
+    def _cacheable(self, chapter_index: int, reports: List[SubAgentReport], result: ReviewResult) -> bool:
+        """审查失败或有响应无法解析时不缓存，重试时重新调用 LLM"""
+        if not reports or result.reasoning.startswith(REVIEW_FAILED_PREFIX):
+            return False
+        unparsed = [r.agent_name for r in reports if r.parse_failed]
+        if result.parse_failed:
+            unparsed.append(self.reflection_agent.agent_name)
+        if unparsed:
+            rates = {
+                source: f"{stats['failure_rate']:.0%}"
+                for source, stats in json_parse_stats().items() if source in unparsed
+            }
+            logger.warning(
+                f"[WritingSupervisor] 第 {chapter_index+1} 章 {', '.join(unparsed)} 响应无法解析，"
+                f"结果不写入缓存; 累计解析失败率: {rates}"
+            )
+            return False
+        return True
 
-        elapsed = time.time() - start_time
+    def _record_prompt_usage(self, chapter_index: int, usage: PromptUsage) -> None:
+        self.last_prompt_usage = usage
+        self.prompt_usage.add(usage)
+        if usage.calls:
+            logger.info(
+                f"[WritingSupervisor] 第 {chapter_index+1} 章提示词缓存: "
+                f"{usage.calls} 次调用，输入 {usage.input_tokens} tokens，"
+                f"命中缓存 {usage.cached_tokens} tokens（{usage.hit_rate:.0%}），"
+                f"写入缓存 {usage.cache_write_tokens} tokens"
+            )
+
+    def _incremental_plan(self, chapter: str, chapter_index: int) -> Optional[IncrementalPlan]:
+        """本章有上一稿记录且改动不大时返回增量复审计划"""
+        previous = self._drafts.get(chapter_index)
+        if not self.incremental_review or previous is None:
+            return None
+        plan = IncrementalPlan(previous, chapter)
+        if not plan.worthwhile:
+            return None
         logger.info(
-            f"[WritingSupervisor] 第 {chapter_index+1} 章审查完成: "
-            f"质量评分={final_result.quality_score:.1f}, "
-            f"需要修订={final_result.needs_revision}, "
-            f"耗时={elapsed:.1f}s"
+            f"[WritingSupervisor] 第 {chapter_index+1} 章增量复审: "
+            f"改动 {len(plan.changed)}/{len(plan.paragraphs)} 段，复查 {len(plan.window)} 段"
+        )
+        return plan
+
+    def _plan_checks(
+        self, planner: CheckPlanner, bible: StoryBible, chapter: str, chapter_index: int, chapter_outline
+    ) -> List[CheckDecision]:
+        """决定哪些检查 Agent 需要 LLM 调用，并记录跳过率"""
+        decisions = None
+        if self.gate_checks:
+            try:
+                decisions = planner.plan(bible, chapter, chapter_index, chapter_outline)
+            except Exception as e:
+                logger.warning(f"[WritingSupervisor] 检查预检失败，执行全部检查: {e}")
+        if decisions is None:
+            decisions = [CheckDecision(agent.agent_name, True, "未预检") for agent in self.check_agents]
+
+        self.dispatch_stats.record_plan(decisions)
+        skipped = [f"{d.agent_name}（{d.reason}）" for d in decisions if not d.needed]
+        if skipped:
+            stats = self.dispatch_stats
+            logger.info(
+                f"[WritingSupervisor] 第 {chapter_index+1} 章跳过检查: {', '.join(skipped)}; "
+                f"累计跳过率={stats.skip_rate:.0%}, 估算节省={stats.saved_seconds:.1f}s"
+            )
+        return decisions
+
+    def _blocking(self, report: SubAgentReport) -> Optional[Tuple[SubAgentReport, List[dict]]]:
+        issues = self.early_decision.blocking_issues(report)
+        return (report, issues) if issues else None
+
+    def _early_result(
+        self,
+        chapter: str,
+        chapter_index: int,
+        reports: List[SubAgentReport],
+        blocking: Tuple[SubAgentReport, List[dict]],
+        context_text: str,
+        start_time: float
+    ) -> ReviewResult:
+        """根据部分报告直接给出需要修订的结论（跳过 ReflectionChecker）"""
+        source, blocking_issues = blocking
+        reflection = self.reflection_agent
+        suggestions = [
+            Suggestion(
+                category=source.category,
+                priority=Priority.HIGH,
+                issue=issue.get("issue", "发现阻断性问题"),
+                location=issue.get("location", ""),
+                current_text=reflection._extract_text_at_location(
+                    chapter, issue.get("location", ""), issue.get("issue", "")
+                ),
+                suggested_change=issue.get("suggestion", "请修正此问题"),
+            )
+            for issue in blocking_issues
+        ]
+        others = [
+            issue for report in reports for issue in report.issues
+            if not any(issue is b for b in blocking_issues)
+        ]
+        suggestions.extend(reflection._generate_suggestions(chapter, others, context_text))
+
+        return ReviewResult(
+            chapter_index=chapter_index,
+            needs_revision=True,
+            suggestions=suggestions,
+            reasoning=f"提前决策: {source.agent_name} 发现 {len(blocking_issues)} 个高优先级问题，跳过综合评估",
+            execution_time=time.time() - start_time,
+            quality_score=reflection._calculate_quality_score(chapter, [], suggestions),
         )
 
-        return final_result
+    async def _timed_check(self, agent, chapter: str, context_text: str, chapter_index: int) -> SubAgentReport:
+        """执行检查并记录耗时（用于估算跳过节省的时间）"""
+        started = time.time()
+        windows = split_windows(chapter, self.chunk_chars) if self.chunk_chars else []
+        if len(windows) > 1:
+            report = await self._chunked_check(agent, windows, context_text, chapter_index)
+        else:
+            report = await agent.check(chapter, context_text, chapter_index)
+        self.dispatch_stats.record_run(agent.agent_name, time.time() - started)
+        return report
+
+    async def _chunked_check(self, agent, windows, context_text: str, chapter_index: int) -> SubAgentReport:
+        """各窗口并发检查后合并；部分窗口失败时保留其余窗口的结果"""
+        results = await asyncio.gather(
+            *(agent.check(window.text, context_text, chapter_index) for window in windows),
+            return_exceptions=True
+        )
+        reports = []
+        for window, result in zip(windows, results):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if isinstance(result, BaseException):
+                logger.error(
+                    f"[WritingSupervisor] {agent.agent_name} 第 {window.start+1}-{window.end} 行检查失败: {result}"
+                )
+                result = None
+            reports.append(result)
+        if not any(reports):
+            raise next(r for r in results if isinstance(r, BaseException))
+        logger.info(
+            f"[WritingSupervisor] {agent.agent_name} 分 {len(windows)} 个窗口检查，"
+            f"{sum(r is not None for r in reports)} 个成功"
+        )
+        return merge_window_reports(windows, reports)
+
+    async def _review_fused(
+        self, chapter: str, chapter_index: int, context_text: str, start_time: float
+    ) -> Tuple[List[SubAgentReport], ReviewResult]:
+        """FusedChecker 一次调用完成四项检查和最终决策"""
+        try:
+            valid_results, final_result = await self.fused_agent.review(chapter, chapter_index, context_text)
+            logger.info(f"[WritingSupervisor] 合并审查完成，{len(valid_results)} 个分项报告")
+        except Exception as e:
+            logger.error(f"[WritingSupervisor] FusedChecker 审查失败: {e}")
+            valid_results = []
+            final_result = ReviewResult(
+                chapter_index=chapter_index,
+                needs_revision=False,
+                suggestions=[],
+                reasoning=f"{REVIEW_FAILED_PREFIX}: {e}",
+                execution_time=time.time() - start_time,
+                quality_score=5.0
+            )
+        return valid_results, final_result
+
+    def attach_review_cache(self, path) -> None:
+        """把审查结果缓存持久化到小说存储目录（同一路径不重复加载）"""
+        if self.review_cache.path != path:
+            self.review_cache = ReviewCache(path)
+
+    def attach_chapter_index(self, index) -> None:
+        """挂载全书倒排索引（NovelStorage.chapter_index），ConsistencyChecker 据此检索前文相关段落"""
+        for agent in self.check_agents:
+            if agent.agent_name == "ConsistencyChecker":
+                agent.novel_index = index
+
+    def commit_review(self, chapter_index: int) -> bool:
+        """提交该章最近一次审查产生的 StoryBible 增量，没有待提交分支时返回 False"""
+        self._drafts.pop(chapter_index, None)
+        bible = self._pending_reviews.pop(chapter_index, None)
+        if bible is None:
+            return False
+        self.storybible.commit(bible)
+        return True
+
+    def pending_review(self, chapter_index: int) -> Optional[StoryBible]:
+        """该章最近一次审查产生、尚未提交的 StoryBible 分支"""
+        return self._pending_reviews.get(chapter_index)
+
+    def restore_pending_review(self, chapter_index: int, bible: Optional[StoryBible]) -> None:
+        """回退到之前某一稿时，换回那一次审查的 StoryBible 分支"""
+        self._drafts.pop(chapter_index, None)
+        if bible is None:
+            self._pending_reviews.pop(chapter_index, None)
+        else:
+            self._pending_reviews[chapter_index] = bible
+
+    def discard_review(self, chapter_index: int) -> None:
+        """丢弃该章未提交的审查增量"""
+        self._pending_reviews.pop(chapter_index, None)
+        self._drafts.pop(chapter_index, None)
 
     def get_story_bible(self) -> StoryBible:
         """获取 StoryBible 实例"""
@@ -47,6 +47,7 @@ class SubAgentReport:
     updates: List[Dict[str, Any]] = field(default_factory=list)  # 更新的数据
     reasoning: str = ""                 # 检查推理过程
     confidence: float = 0.5            # 置信度 0-1
+    parse_failed: bool = False         # LLM 响应无法解析（结果不可缓存）
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -56,8 +57,21 @@ class SubAgentReport:
             "updates": self.updates,
             "reasoning": self.reasoning,
             "confidence": self.confidence,
+            "parse_failed": self.parse_failed,
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SubAgentReport":
+        return cls(
+            agent_name=data["agent"],
+            category=CheckCategory(data["category"]),
+            issues=data.get("issues", []),
+            updates=data.get("updates", []),
+            reasoning=data.get("reasoning", ""),
+            confidence=data.get("confidence", 0.5),
+            parse_failed=data.get("parse_failed", False),
+        )
+
 
 @dataclass
 class ReviewResult:
@@ -68,6 +82,7 @@ class ReviewResult:
     reasoning: str = ""                                          # 决策理由
     execution_time: float = 0.0
     quality_score: float = 0.0                                   # 质量评分 0-10
+    parse_failed: bool = False                                   # LLM 响应无法解析，评估由规则兜底
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -87,4 +102,27 @@ class ReviewResult:
             "reasoning": self.reasoning,
             "execution_time": self.execution_time,
             "quality_score": self.quality_score,
-        }
\ No newline at end of file
+            "parse_failed": self.parse_failed,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ReviewResult":
+        return cls(
+            chapter_index=data["chapter_index"],
+            needs_revision=data["needs_revision"],
+            suggestions=[
+                Suggestion(
+                    category=CheckCategory(s["category"]),
+                    priority=Priority(s["priority"]),
+                    issue=s.get("issue", ""),
+                    location=s.get("location", ""),
+                    current_text=s.get("current_text", ""),
+                    suggested_change=s.get("suggested_change", ""),
+                )
+                for s in data.get("suggestions", [])
+            ],
+            reasoning=data.get("reasoning", ""),
+            execution_time=data.get("execution_time", 0.0),
+            quality_score=data.get("quality_score", 0.0),
+            parse_failed=data.get("parse_failed", False),
+        )
\ No newline at end of file
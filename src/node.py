@@ -23,6 +23,7 @@ from src.state import NovelState
 from src.log_config import loggers
 from src.config_loader import OutlineConfig
 from src.storage import NovelStorage
+from src.summary import RollingSummaries
 
 
 logger = loggers['node']
@@ -527,26 +528,24 @@ def write_chapter_node(state: NovelState, writer_agent: WriterAgent) -> NovelSta
             "count": 1,
         }
 
+    outline = state.novel_storage.load_outline()
+
+    # 获取当前章节大纲
+    chapter_outline = outline.chapters[current_index]
+
     # 注入 StoryBible 上下文（分层注入：让 WriterAgent 知道当前角色状态和世界状态）
     if state.novel_storage:
         try:
-            from src.supervisor_node import _storybible
-            if _storybible:
+            from src.supervisor_node import get_storybible
+            storybible = get_storybible()
+            if storybible:
                 chapter_idx = state.current_chapter_index
-                state._story_bible_data = {
-                    'character_arcs': list(_storybible._character_arcs.values()),
-                    'plot_threads': list(_storybible._plot_threads.values()),
-                    'world_states': _storybible._world_states,
-                    'layered_context': _storybible.format_layered_context(chapter_idx),
-                }
+                # 读取当前版本的只读快照，审查期间的修改不会影响本次写作
+                state._story_bible_data = storybible.snapshot().writer_context(chapter_idx, chapter_outline)
                 logger.debug(f"📖 [WriteChapter] StoryBible 分层上下文已注入（第{chapter_idx}章）")
         except Exception as e:
             logger.debug(f"📖 [WriteChapter] StoryBible 注入失败（正常如果未初始化）: {e}")
 
-    outline = state.novel_storage.load_outline()
-
-    # 获取当前章节大纲
-    chapter_outline = outline.chapters[current_index]
     if revision_feedback:
         logger.info(f"根据反馈修改第{current_index + 1}章: {chapter_outline.title}(第{state.evaluate_attempt + 1}次修改)")
     else:
@@ -651,6 +650,16 @@ def batch_write_chapters_node(state: NovelState, writer_agent: WriterAgent) -> N
             "outline": outline.chapters[i]
         })
 
+    # 同一批次的章节共享同一个 StoryBible 只读快照，看到一致的版本
+    bible_snapshot = None
+    try:
+        from src.supervisor_node import get_storybible
+        storybible = get_storybible()
+        if storybible:
+            bible_snapshot = storybible.snapshot()
+    except Exception as e:
+        logger.debug(f"[BATCH] StoryBible 快照获取失败（正常如果未初始化）: {e}")
+
     # 批量生成
     async def write_one(idx: int, ch_outline):
         try:
@@ -663,6 +672,8 @@ def batch_write_chapters_node(state: NovelState, writer_agent: WriterAgent) -> N
             temp_state.validated_chapter_draft = None
             temp_state.evaluate_attempt = 0
             temp_state.current_chapter_validated_error = None
+            if bible_snapshot is not None:
+                temp_state._story_bible_data = bible_snapshot.writer_context(idx, ch_outline)
             result, client_id = await writer_agent.async_write_chapter(temp_state)
             # client_id 在 async_write_chapter 内部从 contextvar 捕获，此时 contextvar 还未被 reset
             logger.info(f"[BATCH WRITE] 章节 {idx + 1} ({ch_outline.title}) 使用 {client_id or 'direct'}")
@@ -900,7 +911,7 @@ def check_evaluation_chapter_node(state: NovelState) -> Literal["accept", "revis
 
     根据 evaluation_mode 决定路由:
     - fast 模式: accept/fast_accept → accpet_chapter (跳过 supervisor + entities)
-    - deep 模式: accept → supervisor_node, revise → write_chapter, force_accpet → accpet_chapter
+    - deep/fused 模式: accept → supervisor_node, revise → write_chapter, force_accpet → accpet_chapter
     """
     evaluation_mode = getattr(state, 'evaluation_mode', 'deep')
     evaluation = state.validated_evaluation
@@ -1078,6 +1089,14 @@ def check_entities_node(state: NovelState) -> Literal["success", "retry", "failu
         return "failure"
     
 # 接受章节节点
+def _summarize_accepted_chapter(storage: NovelStorage, chapter_number: int, chapter: ChapterContent):
+    """刷新分层滚动摘要（章节 → 卷 → 全书），失败不影响主流程"""
+    try:
+        RollingSummaries(storage).update(chapter_number, chapter, storage.load_outline())
+    except Exception as e:
+        logger.warning(f"章节{chapter_number}摘要更新失败: {e}")
+
+
 def accept_chapter_node(state: NovelState) -> NovelState:
     """接受章节, 将其添加到章节列表并准备处理下一章节"""
     current_draft = state.validated_chapter_draft
@@ -1086,6 +1105,7 @@ def accept_chapter_node(state: NovelState) -> NovelState:
     # 保存章节内容
     state.novel_storage.save_chapter(chapter_index=current_index+1, chapter= current_draft)
     logger.info(f"章节{current_index+1}已接受, 已添加到本地")
+    _summarize_accepted_chapter(state.novel_storage, current_index + 1, current_draft)
 
     # 保存章节修订版（用于观察修订效果）
     # revision 会修改 raw_current_chapter，所以只要执行过修订就应该保存
@@ -1101,9 +1121,14 @@ def accept_chapter_node(state: NovelState) -> NovelState:
     # 保存 StoryBible（包含 entities, character_arcs, plot_threads, world_states）
     # 从 supervisor_node 的全局 StoryBible 获取最新数据并保存
     try:
-        from src.supervisor_node import get_storybible
+        from src.supervisor_node import get_storybible, get_writing_supervisor
+        writing_supervisor = get_writing_supervisor()
+        if writing_supervisor is not None and writing_supervisor.commit_review(current_index):
+            logger.info(f"章节{current_index+1} 审查增量已提交到 StoryBible")
         storybible = get_storybible()
         if storybible is not None:
+            # 超出保留窗口的世界状态/实体归档到冷存储，保存的 StoryBible 大小保持稳定
+            storybible.compact_history(state.novel_storage)
             story_bible_content = storybible.to_content()
             state.novel_storage.save_story_bible(story_bible_content)
             logger.info(f"章节{current_index+1} StoryBible已保存 (entities:{len(story_bible_content.entities)}, arcs:{len(story_bible_content.character_arcs)}, threads:{len(story_bible_content.plot_threads)})")
@@ -1189,6 +1214,7 @@ def batch_validate_chapters_node(state: NovelState) -> NovelState:
 
             # 保存章节
             state.novel_storage.save_chapter(chapter_index + 1, chapter_content)
+            _summarize_accepted_chapter(state.novel_storage, chapter_index + 1, chapter_content)
             saved_count += 1
             batch_chapters.append(chapter_content)  # 收集验证通过的章节
             logger.info(f"[BATCH VALIDATE] 第 {chapter_index + 1} 章保存成功")
@@ -1264,7 +1290,7 @@ def supervisor_recheck_node(state: NovelState) -> Dict[str, Any]:
     2. 检查 revision_context 中的待处理项是否已解决
     3. 增加 supervisor_recheck_count 计数
     """
-    from src.supervisor_node import get_writing_supervisor
+    from src.supervisor_node import get_writing_supervisor, get_chapter_outline
 
     current_index = state.current_chapter_index
     chapter_content = state.raw_current_chapter
@@ -1303,7 +1329,9 @@ def supervisor_recheck_node(state: NovelState) -> Dict[str, Any]:
         import concurrent.futures
 
         def run_in_new_loop():
-            return asyncio.run(writing_supervisor.review(chapter_content, current_index))
+            return asyncio.run(writing_supervisor.review(
+                chapter_content, current_index, get_chapter_outline(state, current_index)
+            ))
 
         with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
             future = executor.submit(run_in_new_loop)
@@ -1343,21 +1371,6 @@ def supervisor_recheck_node(state: NovelState) -> Dict[str, Any]:
     }
 
 
-async def _run_incremental_specialists(supervisor: Any, chapter_index: int, chapter_content: str) -> Any:
-    """运行增量 specialists 检查（只检查高优先级项）"""
-    # 只运行 ConsistencyAgent（最重要的一致性检查）
-    tasks = [
-        ("ConsistencyAgent", supervisor.consistency_agent.process(chapter_index, chapter_content)),
-    ]
-
-    results = await asyncio.gather(*[t[1] for t in tasks], return_exceptions=True)
-
-    # 聚合结果
-    supervisor_result = supervisor.aggregate_feedback(chapter_index, [results[0]] if not isinstance(results[0], Exception) else [{"error": str(results[0])}])
-
-    return supervisor_result
-
-
 def check_revision_loop_node(state: NovelState) -> Literal["continue", "accept", "max_loops"]:
     """检查修订循环是否继续
 
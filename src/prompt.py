@@ -140,6 +140,12 @@ WRITER_PROMPT ="""你是专注于【{genre}】类型的专业小说章节撰写
 ## 核心依据
 1. 大纲内容：小说标题【{outline_title}】, 类型【{genre}】, 主题【{outline_theme}】, 背景【{outline_setting}】, 情节概要【{outline_plot_summary}】, 角色【{character_list}】
 2. 上下文：前文内容【{pre_summary}】:...{pre_context}, 后文内容【{post_summary}】
+   前情提要（已写正文的分层摘要）：
+{story_so_far}
+   相关前文段落（与本章事件相关的原文，供呼应伏笔）：
+{related_passages}
+   角色登场提醒（根据已写正文统计）：
+{character_presence}
 3. 章节锚点：严格遵循【{chapter_outline_title}】；关键事件【{chapter_outline_key_events}】；场景【{chapter_outline_setting}】；摘要【{chapter_outline_summary}】
 4. 角色驱动：依据【{character}】塑造角色行为和对话
 
@@ -0,0 +1,133 @@
+"""
+提示词前缀缓存 - 共享前缀的消息格式转换与缓存命中统计
+
+同一次审查中各检查 Agent 的提示词以相同的前缀（上下文 + 章节正文）开头，
+前缀放在单独的文本块中并带上 cache_control 断点：
+- Anthropic：原样发送内容块，断点生效
+- OpenAI 兼容接口 / 本地模型：内容块按顺序拼接为字符串，依靠服务端的自动前缀缓存
+
+各 ModelManager 在收到响应后调用 record_usage，把 usage 中的缓存 token 数
+累计到当前上下文的 PromptUsage（见 track_prompt_usage）。
+"""
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 内容块之间的分隔符，拼接后的字符串同样保持共享前缀
+BLOCK_SEPARATOR = "\n\n"
+
+
+def cached_block(text: str) -> Dict[str, Any]:
+    """带缓存断点的文本块"""
+    return {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+
+
+def text_block(text: str) -> Dict[str, Any]:
+    return {"type": "text", "text": text}
+
+
+def flatten_content(content: Any) -> str:
+    """内容块列表拼接为字符串（不支持内容块的接口使用）"""
+    if isinstance(content, list):
+        return BLOCK_SEPARATOR.join(
+            block.get("text", "") if isinstance(block, dict) else str(block) for block in content
+        )
+    return content
+
+
+def to_openai_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """去掉 cache_control，内容块拼接为字符串"""
+    if not any(isinstance(msg.get("content"), list) for msg in messages):
+        return messages
+    return [dict(msg, content=flatten_content(msg.get("content", ""))) for msg in messages]
+
+
+def to_anthropic_messages(messages: List[Dict[str, Any]]) -> Tuple[Any, List[Dict[str, Any]]]:
+    """拆出 system 提示，其余消息保留内容块（含 cache_control 断点）"""
+    system_prompt = ""
+    anthropic_messages = []
+    for msg in messages:
+        role = msg.get("role", "user")
+        content = msg.get("content", "")
+        if role == "system":
+            system_prompt = flatten_content(content)
+        elif role in ("user", "assistant"):
+            anthropic_messages.append({"role": role, "content": content})
+    return system_prompt, anthropic_messages
+
+
+@dataclass
+class PromptUsage:
+    """提示词 token 用量
+
+    Attributes:
+        calls: 统计到 usage 的调用次数
+        input_tokens: 输入 token 总数（含缓存命中与写入部分）
+        cached_tokens: 命中缓存的输入 token 数
+        cache_write_tokens: 写入缓存的输入 token 数（仅 Anthropic 返回）
+    """
+    calls: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    cache_write_tokens: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.cached_tokens / self.input_tokens if self.input_tokens else 0.0
+
+    def add(self, other: "PromptUsage") -> None:
+        self.calls += other.calls
+        self.input_tokens += other.input_tokens
+        self.cached_tokens += other.cached_tokens
+        self.cache_write_tokens += other.cache_write_tokens
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "input_tokens": self.input_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
+            "hit_rate": round(self.hit_rate, 3),
+        }
+
+
+_usage_var: ContextVar[Optional[PromptUsage]] = ContextVar("prompt_usage", default=None)
+
+
+@contextmanager
+def track_prompt_usage() -> Iterator[PromptUsage]:
+    """统计该上下文（及其中创建的 asyncio 任务）内所有 LLM 调用的 token 用量"""
+    usage = PromptUsage()
+    token = _usage_var.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage_var.reset(token)
+
+
+def _count(usage: Any, name: str) -> int:
+    value = getattr(usage, name, None)
+    return value if isinstance(value, int) else 0
+
+
+def record_usage(response: Any) -> None:
+    """从 OpenAI / Anthropic 响应的 usage 中累计 token 用量"""
+    current = _usage_var.get()
+    usage = getattr(response, "usage", None)
+    if current is None or usage is None:
+        return
+    if hasattr(usage, "prompt_tokens"):
+        # OpenAI：prompt_tokens 已包含缓存命中部分
+        input_tokens = _count(usage, "prompt_tokens")
+        cached = _count(getattr(usage, "prompt_tokens_details", None), "cached_tokens")
+        written = 0
+    else:
+        # Anthropic：input_tokens 不含缓存读写部分
+        cached = _count(usage, "cache_read_input_tokens")
+        written = _count(usage, "cache_creation_input_tokens")
+        input_tokens = _count(usage, "input_tokens") + cached + written
+    current.add(PromptUsage(1, input_tokens, cached, written))
@@ -0,0 +1,207 @@
+"""
+世界规则编译匹配 - Aho-Corasick 多模式单遍扫描
+
+WorldRule.check 每条规则都要把整章转小写再做若干次 `in` 子串扫描，
+规则数上百时每次审查就是上百遍全文扫描。这里把所有规则的主体、对象和关键词
+编译进一个 Aho-Corasick 自动机（规则集不变时只构建一次），扫描一遍正文得到全部命中位置，
+只对主体实际出现的规则求值，并把"同时出现"的判断限定在主体附近的窗口内，
+而不是整章 `in` 判断。
+
+判定逻辑与 WorldRule.check 一一对应；window=None 时与其整章语义完全一致。
+"""
+import bisect
+import logging
+from collections import defaultdict, deque
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from src.model import WorldRule
+
+logger = logging.getLogger(__name__)
+
+# 主体前后多少字内的对象/关键词视为同时出现（约一个自然段）
+DEFAULT_WINDOW = 150
+
+# 与 WorldRule.check 中的关键词保持一致
+ABILITY_KEYWORDS = ("穿越", "时间旅行", "回到过去", "前往未来")
+ACCESS_KEYWORDS = ("进入", "抵达", "来到", "试图")
+UNIQUE_KEYWORDS = ("只有一", "唯一", "仅有一")
+NEGATION_KEYWORDS = ("没有", "不存在")
+MOON_KEYWORDS = ("月亮", "明月", "月")
+
+
+class AhoCorasick:
+    """Aho-Corasick 多模式匹配自动机
+
+    Args:
+        patterns: 待匹配的模式串（空串会被忽略）
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        self.patterns = sorted({p for p in patterns if p})
+        for pattern in self.patterns:
+            self._insert(pattern)
+        self._build_failure_links()
+
+    def _insert(self, pattern: str) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = nxt
+        self._output[node].append(pattern)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find_all(self, text: str) -> Dict[str, List[int]]:
+        """扫描一遍文本，返回 {模式串: [起始位置, ...]}（位置升序）"""
+        hits: Dict[str, List[int]] = defaultdict(list)
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pattern in output[node]:
+                hits[pattern].append(i - len(pattern) + 1)
+        return hits
+
+
+class _Hits:
+    """一次扫描的命中结果，支持窗口内存在性查询"""
+
+    def __init__(self, hits: Dict[str, List[int]], window: Optional[int]):
+        self._hits = hits
+        self.window = window
+
+    def found(self) -> Iterable[str]:
+        """出现过的模式串"""
+        return self._hits.keys()
+
+    def positions(self, pattern: str) -> List[int]:
+        return self._hits.get(pattern, [])
+
+    def within(self, pattern: str, span: Optional[Tuple[int, int]]) -> bool:
+        """模式串是否完整出现在 span=[lo, hi) 内（span 为 None 表示整章）"""
+        if not pattern:
+            return True
+        positions = self._hits.get(pattern)
+        if not positions:
+            return False
+        if span is None:
+            return True
+        lo, hi = span
+        i = bisect.bisect_left(positions, lo)
+        return i < len(positions) and positions[i] + len(pattern) <= hi
+
+    def any_within(self, patterns: Sequence[str], span: Optional[Tuple[int, int]]) -> bool:
+        return any(self.within(p, span) for p in patterns)
+
+    def spans(self, subject: str) -> List[Optional[Tuple[int, int]]]:
+        """主体每次出现对应的窗口；不限窗口时只返回一个整章 span"""
+        if self.window is None:
+            return [None]
+        return [
+            (max(0, p - self.window), p + len(subject) + self.window)
+            for p in self.positions(subject)
+        ]
+
+
+def _violates(rule: "WorldRule", hits: _Hits, span: Optional[Tuple[int, int]]) -> bool:
+    """在一个主体窗口内按 WorldRule.check 的规则求值"""
+    subject = rule.subject.lower()
+    obj = rule.object.lower()
+
+    if rule.rule_type == "ability_constraint":
+        return hits.any_within(ABILITY_KEYWORDS, span) and hits.within(obj, span)
+
+    if rule.rule_type == "geographic_limit":
+        return hits.within(obj, span) and hits.any_within(ACCESS_KEYWORDS, span)
+
+    if rule.rule_type == "world_fact":
+        if rule.predicate != "有" or not hits.within(subject, span):
+            return False
+        if hits.any_within(UNIQUE_KEYWORDS, span):
+            if "月亮" in obj and hits.any_within(MOON_KEYWORDS[:2], span):
+                return True
+        if hits.any_within(NEGATION_KEYWORDS, span) and ("月亮" in obj or hits.within("月", span)):
+            return True
+        return False
+
+    if rule.rule_type == "faction_relationship":
+        return hits.within(obj, span)
+
+    return False
+
+
+class CompiledRuleSet:
+    """编译后的世界规则集
+
+    Args:
+        rules: WorldRule 列表（按原顺序输出违规）
+        window: 同现窗口（字数），None 表示整章，与 WorldRule.check 完全一致
+    """
+
+    def __init__(self, rules: Sequence["WorldRule"], window: Optional[int] = DEFAULT_WINDOW):
+        self.rules = list(rules)
+        self.window = window
+        self._rules_by_subject: Dict[str, List[int]] = defaultdict(list)
+        patterns = set(ABILITY_KEYWORDS + ACCESS_KEYWORDS + UNIQUE_KEYWORDS + NEGATION_KEYWORDS + MOON_KEYWORDS)
+        for i, rule in enumerate(self.rules):
+            subject = rule.subject.lower()
+            self._rules_by_subject[subject].append(i)
+            patterns.update((subject, rule.object.lower()))
+        self._matcher = AhoCorasick(patterns)
+        # 空主体在 WorldRule.check 中总是"出现"
+        self._always = self._rules_by_subject.get("", [])
+
+    def violated_rules(self, content: str, context: dict = None) -> List["WorldRule"]:
+        """扫描一遍正文，返回被违反的规则"""
+        hits = _Hits(self._matcher.find_all(content.lower()), self.window)
+        candidates = set(self._always)
+        for subject in hits.found():
+            candidates.update(self._rules_by_subject.get(subject, ()))
+
+        violated = []
+        for i in sorted(candidates):
+            rule = self.rules[i]
+            subject = rule.subject.lower()
+            spans = hits.spans(subject) if subject else [None]
+            if any(_violates(rule, hits, span) for span in spans):
+                violated.append(rule)
+        return violated
+
+
+def compile_rules(
+    rules: Sequence["WorldRule"],
+    cached: Optional[CompiledRuleSet] = None,
+    window: Optional[int] = DEFAULT_WINDOW
+) -> CompiledRuleSet:
+    """规则列表未变化（同一批对象、同一顺序）时复用 cached，否则重新编译"""
+    if (
+        cached is not None and cached.window == window
+        and len(cached.rules) == len(rules)
+        and all(a is b for a, b in zip(cached.rules, rules))
+    ):
+        return cached
+    logger.debug(f"[RuleEngine] 编译 {len(rules)} 条世界规则")
+    return CompiledRuleSet(rules, window)
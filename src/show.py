@@ -1,7 +1,10 @@
 """
 让生成的过程可视化, 可以选取哪部分用来可视化
 """
-import os
+from itertools import islice
+
+from src.storage import NovelStorage
+from src.export import NovelExporter
 
 def print_save(result):
     # 处理结果
@@ -10,9 +13,10 @@ def print_save(result):
     if result["result"] == "小说创作流程完成":
         outline = result['final_outline']
         character = result['final_characters']       
-        content = result['final_content']
+        storage = NovelStorage(outline.title)
+        chapter_count = result.get('final_chapter_count') or storage.get_completed_chapter_count()
         
-        print(f"\n小说创作流程完成! 共生成 {len(character)} 个章节")
+        print(f"\n小说创作流程完成! 共生成 {chapter_count} 个章节")
         print("-" * 80)
         print(f"小说标题: {outline.title}")
         print(f"类型: {outline.genre}")
@@ -27,74 +31,34 @@ def print_save(result):
             print(f"性格: {char.personality}")
             print(f"目标: {', '.join(char.goals)}")
 
-        # 显示章节内容预览
+        # 显示章节内容预览（逐章读取，只读前2章）
         print("\n" + "-" * 40)
         print("章节内容预览 (前2章):")
         print("-" * 40)
-        for i, chapter in enumerate(content[:2], 1):
+        for i, (_, chapter) in enumerate(islice(storage.iter_chapters(), 2), 1):
             print(f"\n第{i}章: {chapter.title}")
             print("-" * 30)
             preview = chapter.content
             print(preview)
             
-        if len(content) > 2:
-            print(f"\n... 还有 {len(result['final_content']) - 2} 章未显示")
+        if chapter_count > 2:
+            print(f"\n... 还有 {chapter_count - 2} 章未显示")
                 
-        # 提示保存选项
+        # 提示保存选项（从存储逐章流式导出）
         print("\n" + "-" * 80)
-        save_option = input("是否要将完整内容保存(y)或者分别保存(c)到文件? (y/c/n): ")
+        save_option = input("是否要将完整内容保存(y)、分别保存(c)、导出Markdown(m)或EPUB(e)到文件? (y/c/m/e/n): ")
+        exporter = NovelExporter(storage)
+        title = outline.title.replace(' ', '_')
         if save_option.lower() == 'y':
-            os.makedirs("./resultresult", exist_ok=True)
-            filename = f"./result/{outline.title.replace(' ', '_')}.txt"
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(f"小说标题: {outline.title.split('.')[-1]}\n")
-                f.write(f"类型: {outline.genre}\n")
-                f.write(f"主题: {outline.theme}\n")
-                f.write(f"背景: {outline.setting}\n\n")
-                f.write("情节概要:\n")
-                f.write(f"{outline.plot_summary}\n\n")
-                    
-                f.write("角色档案:\n")
-                for char in character:
-                    f.write(f"角色名称: {char.name}\n")
-                    f.write(f"背景: {char.background}\n")
-                    f.write(f"性格: {char.personality}\n")
-                    f.write(f"目标: {', '.join(char.goals)}\n")
-                    f.write(f"冲突: {', '.join(char.conflicts)}\n")
-                    f.write(f"成长弧线: {char.arc}\n\n")
-                    
-                f.write("章节内容:\n")
-                for i, chapter in enumerate(content, 1):
-                    f.write(f"第{i}章: {chapter.title}\n")
-                    f.write(f"{chapter.content}\n\n")
+            filename = exporter.export("txt", f"./result/{title}.txt")
             print(f"内容已保存到 {filename}")
         elif save_option.lower() == 'c':
-            filepath = f"./result/{outline.title.replace(' ', '_')}/"
-            os.makedirs(filepath, exist_ok=True)
-            with open(filepath+"outline.txt", 'w', encoding='utf-8') as f:
-                f.write(f"小说标题: {outline.title.split('.')[-1]}\n")
-                f.write(f"类型: {outline.genre}\n")
-                f.write(f"主题: {outline.theme}\n")
-                f.write(f"背景: {outline.setting}\n\n")
-                f.write("情节概要:\n")
-                f.write(f"{outline.plot_summary}\n\n")
-                    
-                f.write("角色档案:\n")
-                for char in character:
-                    f.write(f"角色名称: {char.name}\n")
-                    f.write(f"背景: {char.background}\n")
-                    f.write(f"性格: {char.personality}\n")
-                    f.write(f"目标: {', '.join(char.goals)}\n")
-                    f.write(f"冲突: {', '.join(char.conflicts)}\n")
-                    f.write(f"成长弧线: {char.arc}\n\n")
-                    
-            
-            for i, chapter in enumerate(content, 1):
-                with open(filepath+f"{i:02d}_{chapter.title}.txt", 'w', encoding='utf-8') as f:
-                    f.write(f"第{i}章: {chapter.title}\n")
-                    f.write(f"{chapter.content}\n\n")
-                
-        
+            filepath = f"./result/{title}/"
+            exporter.export_chapter_files(filepath)
             print(f"内容已保存到 {filepath}")
+        elif save_option.lower() in ('m', 'e'):
+            fmt = "md" if save_option.lower() == 'm' else "epub"
+            filename = exporter.export(fmt, f"./result/{title}.{fmt}")
+            print(f"内容已保存到 {filename}")
     else:
         print(f"\n生成失败: {result['final_error']}")
@@ -5,6 +5,7 @@
 from typing import Optional, List, Dict, Any
 from src.model import *
 from src.storage import NovelStorage
+from src.multi_agent.convergence import DEFAULT_MAX_LOOPS, DEFAULT_TOKEN_BUDGET
 from pydantic import BaseModel, ConfigDict
 
 class NovelState(BaseModel):
@@ -20,8 +21,14 @@ class NovelState(BaseModel):
     # 执行模式: "serial"（串行）或 "parallel"（并行）
     execution_mode: str = "serial"
 
-    # 评估模式: "fast"（快速，仅 ReflectAgent）或 "deep"（深度，5个 Specialists）
+    # 评估模式: "fast"（快速，仅 ReflectAgent）、"deep"（深度，5个 Specialists）
+    # 或 "fused"（深度检查合并为单次调用，流程与 deep 相同）
     evaluation_mode: str = "deep"
+    # Supervisor 提前决策：检查器发现高优先级问题时取消其余检查、跳过综合评估
+    early_decision: bool = False
+    # 提前决策阈值：LLM 标注的严重程度（high/medium/low）与对该问题的把握（0-1）
+    early_decision_priority: str = "high"
+    early_decision_confidence: float = 0.8
 
     # 每个环节重试次数记录
     attempt: int=0
@@ -78,7 +85,10 @@ class NovelState(BaseModel):
     revision_notes: str = ""
     revision_context: Optional[dict] = None  # {chapter_index, revision_requests, count}
     supervisor_recheck_count: int = 0  # 追踪修订循环次数
-    max_revision_loops: int = 3  # 最多允许3轮修订
+    max_revision_loops: int = DEFAULT_MAX_LOOPS  # 最多允许的修订轮数
+    revision_token_budget: int = DEFAULT_TOKEN_BUDGET  # 全书修订 token 预算（0 表示不限）
+    revision_tokens_spent: int = 0  # 全书已消耗的修订 token
+    revision_stats: Dict[str, dict] = {}  # 各章修订统计 {章节号: RevisionStats.to_dict()}
 
     # StoryBible 上下文数据（分层注入）
     _story_bible_data: Optional[Dict[str, Any]] = None
@@ -113,7 +123,7 @@ class NovelState(BaseModel):
     result: Optional[str] = None
     final_outline: Optional[NovelOutline] = None
     final_characters: Optional[List[Character]] = None
-    final_content: Optional[List[ChapterContent]] = None
+    final_chapter_count: int = 0
     final_error: Optional[str] = None
     
     # Gradio
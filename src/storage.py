@@ -1,13 +1,19 @@
 import json
 import logging
+import os
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Iterator
 from datetime import datetime
 from src.model import NovelOutline, Character, ChapterContent, EntityContent
 from src.model import (
     StoryBibleContent, StoryBibleEntry, PlotThread, CharacterArc,
     WorldState, ConsistencyNote
 )
+from src.catalog import get_novel_catalog
+from src.chapter_index import ChapterIndex
+from src.storage_codec import (
+    ChapterCodec, CODEC_NONE, DICT_TRAIN_MIN_SAMPLES, resolve_codec
+)
 
 logger = logging.getLogger(__name__)
 
@@ -48,25 +54,267 @@ def sanitize_novel_title(novel_title: str) -> str:
 
 
 class NovelStorage:
-    def __init__(self, novel_title: str):
+    """小说本地存储
+
+    Args:
+        novel_title: 小说标题
+        codec: 章节存储编码（none / gzip / zstd）。
+            未指定时沿用该小说已记录的编码，再退回环境变量 NOVEL_STORAGE_CODEC，默认 none。
+            启用压缩后章节只保存一份压缩记录（不再同时写 TXT 和 JSON），修订版同样压缩。
+    """
+
+    PACKED_SUFFIX = ".nsc"
+
+    def __init__(self, novel_title: str, codec: Optional[str] = None):
         sanitized_title = sanitize_novel_title(novel_title)
+        # 目录在首次写入时才创建，只读访问（列表、恢复检查、导出）不会产生空目录
         self.base_dir = Path("result").resolve() / f"{sanitized_title}_storage"
-        self.base_dir.mkdir(parents=True, exist_ok=True)
         self.chapter_dir = self.base_dir / "chapters"
         self.chapter_dir_json = self.base_dir / "chapters_json"
-        self.chapter_dir_json.mkdir(exist_ok=True)
-        self.chapter_dir.mkdir(exist_ok=True)
         self.story_bible_dir = self.base_dir / "story_bible"
-        self.story_bible_dir.mkdir(exist_ok=True)
         # 中间结果目录（用于观察修订效果）
         self.chapters_revised_dir = self.base_dir / "chapters_revised"
-        self.chapters_revised_dir.mkdir(exist_ok=True)
+        # 压缩存储目录
+        self.chapters_packed_dir = self.base_dir / "chapters_packed"
+        self.codec_dir = self.base_dir / "codec"
+        # 人工编辑用的未编码章节导出
+        self.chapters_edit_dir = self.base_dir / "chapters_edit"
+        # 工作流检查点引用的章节草稿（接受前尚未写入章节目录）
+        self.checkpoint_drafts_dir = self.base_dir / "checkpoint_drafts"
+        # 分层滚动摘要（章节 / 卷 / 全书）
+        self.summary_dir = self.base_dir / "summaries"
+
+        # 全文倒排索引（接受章节时增量更新）
+        self.chapter_index = ChapterIndex(self.base_dir / "chapter_index.sqlite")
+
+        # 小说列表索引（result/novels_catalog.json），写入时维护
+        self._catalog = get_novel_catalog(self.base_dir.parent)
+        self._dirs_ready = False
+        # 各类归档的记录数缓存（_archive_count）
+        self._archive_counts: Dict[str, int] = {}
+
+        self.codec = self._init_codec(codec)
+        self._codec: Optional[ChapterCodec] = None
+        if self.codec != CODEC_NONE:
+            self._codec = ChapterCodec(self.codec, self.codec_dir)
+
+    def _ensure_dirs(self):
+        """写入前创建存储目录"""
+        if self._dirs_ready:
+            return
+        if not self.base_dir.exists() and self._catalog.exists():
+            # 同名小说目录被删除后重新创建，旧摘要作废
+            self._catalog.remove(self.get_novel_title())
+        for directory in (self.chapter_dir, self.chapter_dir_json, self.story_bible_dir, self.chapters_revised_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        if self.codec != CODEC_NONE:
+            self.chapters_packed_dir.mkdir(exist_ok=True)
+        if self._codec_meta_dirty:
+            with open(self.base_dir / "storage_meta.json", "w", encoding="utf-8") as f:
+                json.dump({"codec": self.codec}, f, ensure_ascii=False, indent=2)
+            self._codec_meta_dirty = False
+        self._dirs_ready = True
+
+    def _update_catalog(self, **fields):
+        """更新小说列表索引中本小说的摘要"""
+        try:
+            # 首次使用索引时先扫描一次，纳入升级前已存在的小说
+            if not self._catalog.exists():
+                rebuild_novel_catalog()
+            self._catalog.upsert(self.get_novel_title(), {
+                "title": self.get_novel_title(), "codec": self.codec, **fields
+            })
+        except OSError as e:
+            logger.warning(f"[NovelStorage] 更新小说索引失败: {e}")
+
+    def _has_chapter(self, chapter_index: int) -> bool:
+        return (self._packed_path(chapter_index).exists()
+                or (self.chapter_dir_json / f"{chapter_index:03d}.json").exists())
+
+    # 存储编码
+    def _init_codec(self, codec: Optional[str]) -> str:
+        """确定存储编码，并记录到 storage_meta.json"""
+        meta_path = self.base_dir / "storage_meta.json"
+        stored = None
+        if meta_path.exists():
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    stored = json.load(f).get("codec")
+            except (json.JSONDecodeError, OSError):
+                stored = None
+
+        resolved = resolve_codec(codec if codec is not None else stored)
+        # 记录延后到首次写入，只读访问不落盘
+        self._codec_meta_dirty = resolved != stored and (stored is not None or resolved != CODEC_NONE)
+        return resolved
+
+    def _reader_codec(self) -> ChapterCodec:
+        """解压用的编解码器（未启用压缩时也需要能读取已有的压缩章节）"""
+        if self._codec is None:
+            self._codec = ChapterCodec("gzip", self.codec_dir)
+        return self._codec
+
+    def _packed_path(self, chapter_index: int) -> Path:
+        return self.chapters_packed_dir / f"{chapter_index:03d}{self.PACKED_SUFFIX}"
+
+    def _revised_packed_path(self, chapter_index: int) -> Path:
+        return self.chapters_revised_dir / f"{chapter_index:03d}{self.PACKED_SUFFIX}"
+
+    def _write_packed(self, path: Path, data: Dict[str, Any]):
+        raw = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        blob = self._codec.encode(raw)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_bytes(blob)
+        tmp_path.replace(path)
+
+    def _read_packed(self, path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            blob = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        return json.loads(self._reader_codec().decode(blob).decode("utf-8"))
+
+    def _maybe_train_dict(self):
+        """首次累积足够章节后训练共享字典"""
+        if self.codec == CODEC_NONE or self._codec.dict_id != 0:
+            return
+        packed = sorted(self.chapters_packed_dir.glob(f"*{self.PACKED_SUFFIX}"))
+        # 训练失败（样本过短等）时不在每次保存都重试，只在样本数翻过阈值倍数时再试
+        if len(packed) < DICT_TRAIN_MIN_SAMPLES or len(packed) % DICT_TRAIN_MIN_SAMPLES != 0:
+            return
+        samples = [self._reader_codec().decode(p.read_bytes()) for p in packed]
+        self._codec.train(samples)
+
+    def _chapter_indices(self) -> List[int]:
+        """所有已保存章节的索引（兼容压缩和未压缩两种布局）"""
+        indices = set()
+        for chapter_path in self.chapter_dir.glob("*.txt"):
+            try:
+                indices.add(int(chapter_path.stem.split("_")[0]))
+            except ValueError:
+                continue
+        if self.chapters_packed_dir.exists():
+            for chapter_path in self.chapters_packed_dir.glob(f"*{self.PACKED_SUFFIX}"):
+                try:
+                    indices.add(int(chapter_path.stem))
+                except ValueError:
+                    continue
+        return sorted(indices)
+
+    def repack_chapters(self) -> int:
+        """将已有章节统一转为当前编码（压缩 ↔ TXT/JSON 双向），压缩时用最新字典重新压缩
+
+        Returns:
+            处理的章节数量
+        """
+        self._ensure_dirs()
+
+        chapters = {idx: self.load_chapter(idx) for idx in self._chapter_indices()}
+        chapters = {idx: c for idx, c in chapters.items() if c is not None}
+        if self.codec != CODEC_NONE and self._codec.dict_id == 0:
+            samples = [json.dumps(c.model_dump(), ensure_ascii=False).encode("utf-8") for c in chapters.values()]
+            self._codec.train(samples)
+
+        revised = {}
+        for revised_path in self.chapters_revised_dir.glob("*.txt"):
+            try:
+                idx = int(revised_path.stem.split("_")[0])
+            except ValueError:
+                continue
+            revised[idx] = (revised_path.stem.split("_", 1)[-1], revised_path.read_text(encoding="utf-8"))
+        for revised_path in self.chapters_revised_dir.glob(f"*{self.PACKED_SUFFIX}"):
+            try:
+                idx = int(revised_path.stem)
+            except ValueError:
+                continue
+            data = self._read_packed(revised_path) or {}
+            revised[idx] = (data.get("title", ""), data.get("content", ""))
+
+        # 写入时会删除另一种格式的文件
+        for idx, chapter in chapters.items():
+            self._write_chapter(idx, chapter)
+        for idx, (title, content) in revised.items():
+            self.save_chapter_revised(idx, title, content)
+
+        logger.info(f"[NovelStorage] repack 完成: {len(chapters)} 章 -> {self.codec}")
+        return len(chapters)
+
+    @property
+    def review_cache_path(self) -> Path:
+        """WritingSupervisor 审查结果缓存文件"""
+        return self.base_dir / "review_cache.json"
+
+    def index_chapter(self, chapter_index: int, chapter: ChapterContent):
+        """将章节加入全文索引和角色出场索引（正文摘要未变化时跳过）"""
+        self._ensure_dirs()
+        if self.chapter_index.index_chapter(chapter_index, chapter.content):
+            self.chapter_index.index_appearances(chapter_index, chapter.content, self._character_names())
+
+    def _character_names(self) -> List[str]:
+        """角色出场索引使用的角色名（取自大纲角色列表）"""
+        outline = self.load_outline()
+        return list(outline.characters) if outline else []
 
+    def rebuild_chapter_index(self) -> int:
+        """按已保存的章节补建全文索引（未变化的章节会跳过）
+
+        Returns:
+            实际更新的章节数量
+        """
+        updated = 0
+        indexed = set()
+        names = self._character_names()
+        for chapter_index, chapter in self.iter_chapters():
+            indexed.add(chapter_index)
+            if self.chapter_index.index_chapter(chapter_index, chapter.content):
+                updated += 1
+            self.chapter_index.index_appearances(chapter_index, chapter.content, names)
+        for stale in set(self.chapter_index.indexed_chapters()) - indexed:
+            self.chapter_index.remove_chapter(stale)
+        return updated
+
+    # 滚动摘要存储
+    def _summary_path(self, level: str, key: int) -> Path:
+        return self.summary_dir / f"{level}_{key:04d}.txt"
+
+    def save_summary(self, level: str, key: int, text: str):
+        """保存摘要
+
+        Args:
+            level: chapter / volume / novel
+            key: 章节号（从 1 开始）/ 卷索引（从 0 开始）/ 0
+            text: 摘要文本
+        """
+        self._ensure_dirs()
+        self.summary_dir.mkdir(exist_ok=True)
+        with open(self._summary_path(level, key), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def load_summary(self, level: str, key: int) -> Optional[str]:
+        try:
+            with open(self._summary_path(level, key), "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def summary_indices(self, level: str) -> List[int]:
+        """某一层级已保存摘要的编号（升序）"""
+        if not self.summary_dir.exists():
+            return []
+        indices = []
+        for path in self.summary_dir.glob(f"{level}_*.txt"):
+            try:
+                indices.append(int(path.stem[len(level) + 1:]))
+            except ValueError:
+                continue
+        return sorted(indices)
 
     # 大纲存储
     def save_outline(self, outline: NovelOutline):
+        self._ensure_dirs()
         with open(self.base_dir / "outline.json", "w", encoding="utf-8") as f:
             json.dump(outline.model_dump(), f, ensure_ascii=False, indent=2)
+        self._update_catalog(has_outline=True)
 
     def load_outline(self) -> Optional[NovelOutline]:
         try:
@@ -78,8 +326,10 @@ class NovelStorage:
 
     # 角色存储
     def save_characters(self, characters: List[Character]):
+        self._ensure_dirs()
         with open(self.base_dir / "characters.json", "w", encoding="utf-8") as f:
             json.dump([c.model_dump() for c in characters], f, ensure_ascii=False, indent=2)
+        self._update_catalog(has_characters=True)
 
     def load_characters(self) -> Optional[List[Character]]:
         try:
@@ -91,12 +341,47 @@ class NovelStorage:
 
     # 章节存储
     def save_chapter(self, chapter_index: int, chapter: ChapterContent):
+        self._ensure_dirs()
+        is_new = not self._has_chapter(chapter_index)
+        self._write_chapter(chapter_index, chapter)
+
+        # 维护索引中的章节数，避免列表时逐个统计章节文件
+        entry = self._catalog.get(self.get_novel_title())
+        if entry is not None and "chapter_count" in entry:
+            chapter_count = entry["chapter_count"] + (1 if is_new else 0)
+        else:
+            chapter_count = self.get_completed_chapter_count()
+        self._update_catalog(chapter_count=chapter_count)
+
+        # 所有保存路径（接受章节、批量写作、UI 编辑）都经过这里，内容未变化时索引会跳过；失败不影响保存
+        try:
+            self.index_chapter(chapter_index, chapter)
+        except Exception as e:
+            logger.warning(f"[NovelStorage] 第{chapter_index}章全文索引更新失败: {e}")
+
+    def _write_chapter(self, chapter_index: int, chapter: ChapterContent):
+        """按当前编码写入章节，并删除另一种格式的旧文件（load_chapter 优先读取压缩文件，残留会读到旧内容）"""
+        if self.codec != CODEC_NONE:
+            self._write_packed(self._packed_path(chapter_index), chapter.model_dump())
+            (self.chapter_dir_json / f"{chapter_index:03d}.json").unlink(missing_ok=True)
+            self._remove_txt(self.chapter_dir, chapter_index)
+            self._maybe_train_dict()
+            return
         chapter_path_json = self.chapter_dir_json / f"{chapter_index:03d}.json"
         chapter_path = self.chapter_dir / f"{chapter_index:03d}_{chapter.title.split('.')[-1]}.txt"
+        self._remove_txt(self.chapter_dir, chapter_index, keep=chapter_path)
         with open(chapter_path, "w", encoding="utf-8") as f:
             f.write(chapter.content)
         with open(chapter_path_json, "w", encoding="utf-8") as f:
             json.dump(chapter.model_dump(), f, ensure_ascii=False, indent=2)
+        self._packed_path(chapter_index).unlink(missing_ok=True)
+
+    @staticmethod
+    def _remove_txt(directory: Path, chapter_index: int, keep: Optional[Path] = None):
+        """删除该章的 TXT 文件（标题变化后文件名不同，按章节号匹配）"""
+        for txt_path in directory.glob(f"{chapter_index:03d}_*.txt"):
+            if txt_path != keep:
+                txt_path.unlink()
 
     def save_chapter_revised(self, chapter_index: int, title: str, content: str):
         """保存章节修订版（revision 完成后）
@@ -106,12 +391,31 @@ class NovelStorage:
             title: 章节标题
             content: 修订后的内容
         """
+        self._ensure_dirs()
+        if self.codec != CODEC_NONE:
+            self._write_packed(self._revised_packed_path(chapter_index), {"title": title, "content": content})
+            self._remove_txt(self.chapters_revised_dir, chapter_index)
+            return
         safe_title = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in title)
         chapter_path = self.chapters_revised_dir / f"{chapter_index:03d}_{safe_title}.txt"
+        self._remove_txt(self.chapters_revised_dir, chapter_index, keep=chapter_path)
         with open(chapter_path, "w", encoding="utf-8") as f:
             f.write(content)
+        self._revised_packed_path(chapter_index).unlink(missing_ok=True)
+
+    def load_chapter_revised(self, chapter_index: int) -> Optional[str]:
+        """加载章节修订版内容（兼容压缩和未压缩两种布局）"""
+        data = self._read_packed(self._revised_packed_path(chapter_index))
+        if data is not None:
+            return data.get("content", "")
+        for revised_path in self.chapters_revised_dir.glob(f"{chapter_index:03d}_*.txt"):
+            return revised_path.read_text(encoding="utf-8")
+        return None
 
     def load_chapter(self, chapter_index: int) -> Optional[ChapterContent]:
+        data = self._read_packed(self._packed_path(chapter_index))
+        if data is not None:
+            return ChapterContent(**data)
         chapter_path_json = self.chapter_dir_json / f"{chapter_index:03d}.json"
         try:
             with open(chapter_path_json, "r", encoding="utf-8") as f:
@@ -120,20 +424,63 @@ class NovelStorage:
         except FileNotFoundError:
             return None
 
-    def load_all_chapters(self) -> List[ChapterContent]:
-        chapters = []
-        for chapter_path in self.chapter_dir.glob("*.txt"):
-            chapter_index = int(chapter_path.stem.split("_")[0])
+    def export_editable_chapter(self, chapter_index: int, chapter: ChapterContent) -> Path:
+        """导出未编码的章节 JSON 供人工编辑（启用压缩编码时章节源文件无法直接修改）
+
+        Returns:
+            导出文件路径
+        """
+        self._ensure_dirs()
+        path = self.chapters_edit_dir / f"{chapter_index:03d}.json"
+        path.parent.mkdir(exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(chapter.model_dump(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def save_checkpoint_draft(self, chapter_index: int, field: str, value: Any):
+        """保存检查点中的章节草稿字段（已序列化的值），检查点只记录引用"""
+        self._ensure_dirs()
+        self.checkpoint_drafts_dir.mkdir(exist_ok=True)
+        path = self.checkpoint_drafts_dir / f"{chapter_index:03d}_{field}.json"
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        tmp_path.replace(path)
+
+    def load_checkpoint_draft(self, chapter_index: int, field: str) -> Any:
+        """读取检查点引用的章节草稿字段，不存在时返回 None"""
+        try:
+            with open(self.checkpoint_drafts_dir / f"{chapter_index:03d}_{field}.json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def load_editable_chapter(self, chapter_index: int) -> Optional[ChapterContent]:
+        """读取人工编辑后的章节 JSON，文件不存在时返回 None（格式错误时抛出 ValueError）"""
+        try:
+            with open(self.chapters_edit_dir / f"{chapter_index:03d}.json", "r", encoding="utf-8") as f:
+                return ChapterContent(**json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def iter_chapters(self) -> Iterator[Tuple[int, ChapterContent]]:
+        """按章节顺序逐章读取（每次只在内存中保留一章，用于导出等场景）
+
+        Yields:
+            (章节索引, 章节内容)
+        """
+        for chapter_index in self._chapter_indices():
             chapter_content = self.load_chapter(chapter_index)
             if chapter_content is not None:
-                chapters.append(chapter_content)
-        return chapters
+                yield chapter_index, chapter_content
+
+    def load_all_chapters(self) -> List[ChapterContent]:
+        return [chapter for _, chapter in self.iter_chapters()]
 
     # 断点恢复相关方法
     def get_completed_chapter_count(self) -> int:
         """获取已完成的章节数量（用于断点恢复）"""
-        chapters = list(self.chapter_dir.glob("*.txt"))
-        return len(chapters)
+        return len(self._chapter_indices())
 
     def get_novel_title(self) -> str:
         """从存储目录名称提取小说标题
@@ -158,6 +505,7 @@ class NovelStorage:
             current_volume_index: 当前已完成的卷索引
             validated_chapters_count: 已验证的章节数量
         """
+        self._ensure_dirs()
         meta = {
             "current_volume_index": current_volume_index,
             "validated_chapters_count": validated_chapters_count,
@@ -188,6 +536,7 @@ class NovelStorage:
             "chapter_count": self.get_completed_chapter_count(),
             "has_outline": self.has_outline(),
             "has_characters": self.has_characters(),
+            "codec": self.codec,
         }
 
     # ============== StoryBible Methods ==============
@@ -198,6 +547,7 @@ class NovelStorage:
         Args:
             story_bible: StoryBibleContent对象
         """
+        self._ensure_dirs()
         story_bible.last_updated = datetime.now()
         with open(self.story_bible_dir / "story_bible.json", "w", encoding="utf-8") as f:
             json.dump(story_bible.model_dump(mode="json"), f, ensure_ascii=False, indent=2)
@@ -261,16 +611,11 @@ class NovelStorage:
         if story_bible is None:
             story_bible = StoryBibleContent(novel_title=self.get_novel_title())
 
-        # 检查是否已存在
-        existing = None
-        for t in story_bible.plot_threads:
-            if t.id == thread.id:
-                existing = t
-                break
+        # 检查是否已存在（按 id 定位下标，避免再用 list.index 做逐字段比较）
+        idx = next((i for i, t in enumerate(story_bible.plot_threads) if t.id == thread.id), None)
 
-        if existing:
+        if idx is not None:
             # 更新现有
-            idx = story_bible.plot_threads.index(existing)
             story_bible.plot_threads[idx] = thread
         else:
             # 添加新的
@@ -288,12 +633,7 @@ class NovelStorage:
         if story_bible is None:
             story_bible = StoryBibleContent(novel_title=self.get_novel_title())
 
-        existing = story_bible.get_character_arc(arc.name)
-        if existing:
-            idx = story_bible.character_arcs.index(existing)
-            story_bible.character_arcs[idx] = arc
-        else:
-            story_bible.character_arcs.append(arc)
+        story_bible.upsert_character_arc(arc)
 
         self.save_story_bible(story_bible)
 
@@ -310,6 +650,70 @@ class NovelStorage:
         story_bible.world_states.append(state)
         self.save_story_bible(story_bible)
 
+    # StoryBible 冷存储：超出保留窗口的世界状态/实体按行追加，按需查询
+    def _archive_path(self, kind: str) -> Path:
+        return self.story_bible_dir / f"archive_{kind}.jsonl"
+
+    def _append_archive(self, kind: str, items: List[Any], start: Optional[int] = None):
+        """追加归档记录；给出 start（这批条目的起始序号）时跳过冷存储中已有的部分，重复归档是幂等的"""
+        if start is not None:
+            items = items[max(0, self._archive_count(kind) - start):]
+        if not items:
+            return
+        self._ensure_dirs()
+        path = self._archive_path(kind)
+        with open(path, "a+b") as f:
+            # 上次追加中断留下的残行不带换行，先补上，避免与新记录拼在一行
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+            for item in items:
+                f.write((json.dumps(item.model_dump(mode="json"), ensure_ascii=False) + "\n").encode("utf-8"))
+        self._archive_counts[kind] = self._archive_count(kind) + len(items)
+
+    def _archive_count(self, kind: str) -> int:
+        """冷存储中的有效记录数（首次调用时统计一次，之后随追加维护）"""
+        if kind not in self._archive_counts:
+            self._archive_counts[kind] = sum(1 for _ in self._iter_archive(kind))
+        return self._archive_counts[kind]
+
+    def _iter_archive(self, kind: str) -> Iterator[dict]:
+        try:
+            with open(self._archive_path(kind), "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # 追加时中断留下的残行
+                        logger.warning(f"[NovelStorage] 跳过损坏的归档记录: archive_{kind}.jsonl")
+        except FileNotFoundError:
+            return
+
+    def archive_world_states(self, states: List[WorldState], start: Optional[int] = None):
+        """归档世界状态（StoryBible.compact_history 调用，start 为这批条目的起始序号）"""
+        self._append_archive("world_states", states, start)
+
+    def load_archived_world_states(self, start: Optional[int] = None, end: Optional[int] = None) -> List[WorldState]:
+        """读取归档的世界状态，可按章节范围 [start, end] 过滤"""
+        states = []
+        for data in self._iter_archive("world_states"):
+            chapter_index = data.get("chapter_index", 0)
+            if (start is None or chapter_index >= start) and (end is None or chapter_index <= end):
+                states.append(WorldState(**data))
+        return states
+
+    def archive_entities(self, entities: List[EntityContent], start: Optional[int] = None):
+        """归档实体（StoryBible.compact_history 调用，start 为这批条目的起始序号）"""
+        self._append_archive("entities", entities, start)
+
+    def load_archived_entities(self) -> List[EntityContent]:
+        """读取归档的实体（按归档顺序）"""
+        return [EntityContent(**data) for data in self._iter_archive("entities")]
+
     def query_story_bible(
         self,
         entry_type: Optional[str] = None,
@@ -366,3 +770,21 @@ class NovelStorage:
 
         story_bible.consistency_notes.append(note)
         self.save_story_bible(story_bible)
+
+
+def rebuild_novel_catalog() -> Dict[str, dict]:
+    """扫描 result 目录重建小说列表索引（索引缺失时调用一次）
+
+    Returns:
+        重建后的索引内容
+    """
+    result_dir = Path("result")
+    entries = {}
+    for storage_path in result_dir.glob("*_storage"):
+        try:
+            title = storage_path.name[:-len("_storage")]
+            entries[title] = NovelStorage(title).get_storage_info()
+        except Exception as e:
+            logger.warning(f"[NovelStorage] 跳过无法读取的存储目录 {storage_path.name}: {e}")
+    get_novel_catalog(result_dir).replace_all(entries)
+    return entries
@@ -0,0 +1,189 @@
+"""
+章节压缩存储编解码器
+
+长篇小说（上千章）在本地会同时保留 TXT、JSON 和修订版三份正文，体积增长很快。
+本模块提供可选的压缩编码：
+
+- ``none``: 不压缩（默认，保持原有 TXT + JSON 目录布局）
+- ``gzip``: 基于 zlib/deflate，支持预置字典（gzip 容器本身不支持字典，故使用 raw zlib 流）
+- ``zstd``: 基于 zstandard（可选依赖），支持训练字典
+
+同一部小说的章节文风、人名、术语高度重复，单章压缩效果有限，
+因此在累积足够章节后会用已有章节训练一个共享字典，之后的章节都用该字典压缩。
+每个压缩文件头部记录编码方式和字典 ID，旧字典不会被删除，已写入的文件始终可解码。
+"""
+import logging
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # zstd 为可选依赖
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+CODEC_NONE = "none"
+CODEC_GZIP = "gzip"
+CODEC_ZSTD = "zstd"
+SUPPORTED_CODECS = (CODEC_NONE, CODEC_GZIP, CODEC_ZSTD)
+
+# 环境变量，用于在不改代码的情况下启用压缩存储
+CODEC_ENV_VAR = "NOVEL_STORAGE_CODEC"
+
+# 文件头: magic(4) + codec_id(1) + dict_id(4)
+_MAGIC = b"NSC1"
+_HEADER = struct.Struct(">4sBI")
+_CODEC_IDS = {CODEC_GZIP: 1, CODEC_ZSTD: 2}
+_CODEC_NAMES = {v: k for k, v in _CODEC_IDS.items()}
+
+# 字典训练参数
+DICT_TRAIN_MIN_SAMPLES = 8
+DICT_MAX_SIZE = 64 * 1024
+# zlib 窗口只有 32KB，预置字典超出部分无效
+_ZLIB_DICT_MAX_SIZE = 32 * 1024
+
+
+def resolve_codec(codec: Optional[str]) -> str:
+    """解析编码名称，未指定时读取环境变量
+
+    Raises:
+        ValueError: 编码名称不支持，或 zstd 未安装
+    """
+    name = (codec or os.getenv(CODEC_ENV_VAR) or CODEC_NONE).strip().lower()
+    if name == "zlib":
+        name = CODEC_GZIP
+    if name not in SUPPORTED_CODECS:
+        raise ValueError(f"不支持的存储编码: {name}，可选: {', '.join(SUPPORTED_CODECS)}")
+    if name == CODEC_ZSTD and zstandard is None:
+        raise ValueError("zstd 编码需要安装 zstandard: pip install zstandard")
+    return name
+
+
+class ChapterCodec:
+    """章节编解码器，负责压缩、解压和字典管理
+
+    Args:
+        codec: 编码名称（gzip / zstd）
+        dict_dir: 字典存放目录
+        level: 压缩级别
+    """
+
+    def __init__(self, codec: str, dict_dir: Path, level: Optional[int] = None):
+        if codec not in _CODEC_IDS:
+            raise ValueError(f"ChapterCodec 不支持编码: {codec}")
+        self.codec = codec
+        self.dict_dir = dict_dir
+        self.level = level if level is not None else (9 if codec == CODEC_GZIP else 10)
+        self._dicts: Dict[int, bytes] = {}
+        self.dict_id = self._latest_dict_id()
+
+    # ========== 字典管理 ==========
+
+    def _dict_path(self, dict_id: int) -> Path:
+        return self.dict_dir / f"{self.codec}_{dict_id:04d}.dict"
+
+    def _latest_dict_id(self) -> int:
+        if not self.dict_dir.exists():
+            return 0
+        ids = []
+        for path in self.dict_dir.glob(f"{self.codec}_*.dict"):
+            try:
+                ids.append(int(path.stem.split("_")[-1]))
+            except ValueError:
+                continue
+        return max(ids) if ids else 0
+
+    def _load_dict(self, codec: str, dict_id: int) -> bytes:
+        if dict_id == 0:
+            return b""
+        key = (_CODEC_IDS[codec] << 24) | dict_id
+        if key not in self._dicts:
+            path = self.dict_dir / f"{codec}_{dict_id:04d}.dict"
+            try:
+                self._dicts[key] = path.read_bytes()
+            except FileNotFoundError:
+                raise ValueError(f"压缩字典缺失: {path.name}")
+        return self._dicts[key]
+
+    def train(self, samples: List[bytes]) -> int:
+        """用已有章节训练新字典
+
+        Args:
+            samples: 章节原文样本
+
+        Returns:
+            新字典 ID；样本不足或训练失败时返回当前字典 ID
+        """
+        samples = [s for s in samples if s]
+        if len(samples) < DICT_TRAIN_MIN_SAMPLES:
+            return self.dict_id
+
+        if self.codec == CODEC_ZSTD:
+            try:
+                dict_data = zstandard.train_dictionary(DICT_MAX_SIZE, samples).as_bytes()
+            except zstandard.ZstdError as e:
+                logger.warning(f"zstd 字典训练失败，继续使用无字典压缩: {e}")
+                return self.dict_id
+        else:
+            dict_data = self._build_zlib_dict(samples)
+
+        if not dict_data:
+            return self.dict_id
+
+        new_id = self.dict_id + 1
+        self.dict_dir.mkdir(parents=True, exist_ok=True)
+        self._dict_path(new_id).write_bytes(dict_data)
+        self.dict_id = new_id
+        logger.info(f"[ChapterCodec] 已训练 {self.codec} 字典 #{new_id}（{len(dict_data)} 字节，{len(samples)} 个样本）")
+        return new_id
+
+    @staticmethod
+    def _build_zlib_dict(samples: List[bytes]) -> bytes:
+        """构建 zlib 预置字典
+
+        zlib 没有训练接口，字典就是一段"最可能被引用"的原文。
+        从每个样本取等长片段拼接，越靠后的内容距离越近，匹配代价越低，
+        因此把较新的章节放在字典末尾。
+        """
+        per_sample = max(256, _ZLIB_DICT_MAX_SIZE // len(samples))
+        pieces = [s[:per_sample] for s in samples]
+        return b"".join(pieces)[-_ZLIB_DICT_MAX_SIZE:]
+
+    # ========== 编解码 ==========
+
+    def encode(self, data: bytes) -> bytes:
+        """压缩数据，使用当前字典"""
+        zdict = self._load_dict(self.codec, self.dict_id)
+        if self.codec == CODEC_ZSTD:
+            kwargs = {"level": self.level}
+            if zdict:
+                kwargs["dict_data"] = zstandard.ZstdCompressionDict(zdict)
+            payload = zstandard.ZstdCompressor(**kwargs).compress(data)
+        else:
+            compressor = zlib.compressobj(self.level, zdict=zdict) if zdict else zlib.compressobj(self.level)
+            payload = compressor.compress(data) + compressor.flush()
+        return _HEADER.pack(_MAGIC, _CODEC_IDS[self.codec], self.dict_id) + payload
+
+    def decode(self, blob: bytes) -> bytes:
+        """解压数据，编码方式和字典由文件头决定"""
+        if len(blob) < _HEADER.size:
+            raise ValueError("压缩数据损坏: 文件头不完整")
+        magic, codec_id, dict_id = _HEADER.unpack_from(blob)
+        if magic != _MAGIC or codec_id not in _CODEC_NAMES:
+            raise ValueError("压缩数据损坏: 无法识别的文件头")
+        codec = _CODEC_NAMES[codec_id]
+        zdict = self._load_dict(codec, dict_id)
+        payload = blob[_HEADER.size:]
+
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise ValueError("读取 zstd 压缩章节需要安装 zstandard")
+            kwargs = {"dict_data": zstandard.ZstdCompressionDict(zdict)} if zdict else {}
+            return zstandard.ZstdDecompressor(**kwargs).decompress(payload)
+
+        decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+        return decompressor.decompress(payload) + decompressor.flush()
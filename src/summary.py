@@ -0,0 +1,204 @@
+"""
+分层滚动摘要 - 章节 → 卷 → 全书
+
+WriterAgent 原本只能看到上一章大纲摘要和上一章末尾 100 字，已写正文中实际发生的事情无处汇总。
+这里在接受章节后基于正文生成抽取式摘要（不额外调用模型），并逐级汇总：
+
+- 章节摘要：从正文中挑选与本章大纲（关键事件、出场角色）最相关的句子
+- 卷摘要：汇总本卷各章摘要（有分卷大纲时按 chapters_range 划分，否则每 ARC_SIZE 章一组）
+- 全书摘要：汇总各卷摘要
+
+每接受一章只刷新该章、所属卷和全书三份摘要；注入写作 prompt 的是
+全书摘要 + 本卷摘要 + 最近几章摘要，长度与小说篇幅无关。
+"""
+import logging
+import re
+from typing import Iterable, List, Optional
+
+from src.model import ChapterContent, ChapterOutline, NovelOutline
+
+logger = logging.getLogger(__name__)
+
+CHAPTER_SUMMARY_CHARS = 200
+VOLUME_SUMMARY_CHARS = 400
+NOVEL_SUMMARY_CHARS = 600
+# 没有分卷大纲时，每多少章汇总为一卷
+ARC_SIZE = 10
+# 写作时回顾的最近章节数
+RECENT_CHAPTERS = 2
+
+_SENTENCE_END = re.compile(r"(?<=[。！？!?…])(?![”’」』\"'])|(?<=[。！？!?…][”’」』\"'])")
+
+
+def split_sentences(text: str) -> List[str]:
+    """按中文句末标点切句（保留标点和紧随的引号）"""
+    sentences = []
+    for paragraph in text.splitlines():
+        paragraph = paragraph.strip()
+        if paragraph:
+            sentences.extend(s.strip() for s in _SENTENCE_END.split(paragraph) if s.strip())
+    return sentences
+
+
+def _bigrams(text: str) -> set:
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def extractive_summary(text: str, max_chars: int, focus_terms: Iterable[str] = ()) -> str:
+    """抽取式摘要：按与焦点词的重叠和句子位置打分，选出不超过 max_chars 的句子并保持原文顺序"""
+    sentences = split_sentences(text)
+    if not sentences:
+        return ""
+    if sum(len(s) for s in sentences) <= max_chars:
+        return "".join(sentences)
+
+    focus_terms = [t for t in focus_terms if t]
+    focus_grams = set().union(*(_bigrams(t) for t in focus_terms)) if focus_terms else set()
+    last = len(sentences) - 1
+
+    def score(i: int) -> float:
+        s = sentences[i]
+        value = sum(2.0 for term in focus_terms if term in s)
+        if focus_grams:
+            value += 3.0 * len(_bigrams(s) & focus_grams) / max(len(focus_grams), 1)
+        # 开头交代情境，结尾通常是本章结果
+        if i == 0 or i == last:
+            value += 1.5
+        # 过短的对话碎句信息量低，过长的句子挤占篇幅
+        if len(s) < 8:
+            value -= 1.0
+        return value - len(s) / (4.0 * max_chars)
+
+    chosen, used = [], 0
+    for i in sorted(range(len(sentences)), key=lambda i: (-score(i), i)):
+        if used + len(sentences[i]) > max_chars:
+            continue
+        chosen.append(i)
+        used += len(sentences[i])
+    if not chosen:
+        return sentences[0][:max_chars]
+    return "".join(sentences[i] for i in sorted(chosen))
+
+
+def rollup(parts: List[str], max_chars: int) -> str:
+    """汇总多段下级摘要：每段按均分的篇幅保留开头的句子；段数过多时等间隔抽取"""
+    parts = [p for p in parts if p]
+    if not parts:
+        return ""
+    if sum(len(p) for p in parts) <= max_chars:
+        return "".join(parts)
+
+    min_share = 30
+    if len(parts) * min_share > max_chars:
+        keep = max(max_chars // min_share, 1)
+        step = len(parts) / keep
+        parts = [parts[int(k * step)] for k in range(keep - 1)] + [parts[-1]]
+
+    share = max_chars // len(parts)
+    pieces = []
+    for part in parts:
+        sentences = split_sentences(part) or [part]
+        piece = sentences[0][:share]
+        for sentence in sentences[1:]:
+            if len(piece) + len(sentence) > share:
+                break
+            piece += sentence
+        pieces.append(piece)
+    return "".join(pieces)
+
+
+def _parse_range(chapters_range: str) -> Optional[tuple]:
+    try:
+        start, end = (int(x) for x in chapters_range.split("-"))
+        return start, end
+    except ValueError:
+        return None
+
+
+def volume_index_of(chapter_number: int, outline: Optional[NovelOutline]) -> int:
+    """章节（从 1 开始）所属卷的索引（从 0 开始）
+
+    有分卷大纲时按 chapters_range 划分，超出范围的章节归入最后一卷；否则每 ARC_SIZE 章一组。
+    """
+    if outline and outline.master_outline:
+        for i, volume in enumerate(outline.master_outline):
+            bounds = _parse_range(volume.chapters_range)
+            if bounds and bounds[0] <= chapter_number <= bounds[1]:
+                return i
+        return len(outline.master_outline) - 1
+    return (chapter_number - 1) // ARC_SIZE
+
+
+def _volume_bounds(volume_index: int, outline: Optional[NovelOutline]) -> tuple:
+    """卷的章节范围 (start, end)，end 为 None 表示不设上限"""
+    if outline and outline.master_outline:
+        bounds = _parse_range(outline.master_outline[volume_index].chapters_range) or (1, None)
+        if volume_index == len(outline.master_outline) - 1:
+            return bounds[0], None
+        return bounds
+    return volume_index * ARC_SIZE + 1, (volume_index + 1) * ARC_SIZE
+
+
+class RollingSummaries:
+    """分层滚动摘要，读写 NovelStorage 中的 summaries/ 目录
+
+    Args:
+        storage: NovelStorage 实例
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def update(
+        self,
+        chapter_number: int,
+        chapter: ChapterContent,
+        outline: Optional[NovelOutline] = None
+    ) -> None:
+        """接受第 chapter_number 章（从 1 开始）后刷新章节、卷、全书摘要"""
+        chapter_outline: Optional[ChapterOutline] = None
+        if outline and 0 < chapter_number <= len(outline.chapters):
+            chapter_outline = outline.chapters[chapter_number - 1]
+        focus = []
+        if chapter_outline:
+            focus = [*chapter_outline.key_events, *chapter_outline.characters_involved]
+
+        summary = extractive_summary(chapter.content, CHAPTER_SUMMARY_CHARS, focus)
+        self.storage.save_summary("chapter", chapter_number, summary)
+
+        # 本卷：汇总本卷已写章节的摘要（不设上限的最后一卷汇总到本章为止）
+        volume_index = volume_index_of(chapter_number, outline)
+        start, end = _volume_bounds(volume_index, outline)
+        parts = []
+        for n in range(start, (end or chapter_number) + 1):
+            part = summary if n == chapter_number else self.storage.load_summary("chapter", n)
+            if isinstance(part, str) and part:
+                parts.append(part)
+        self.storage.save_summary("volume", volume_index, rollup(parts, VOLUME_SUMMARY_CHARS))
+
+        # 全书：汇总各卷摘要
+        volumes = self.storage.summary_indices("volume")
+        parts = [self.storage.load_summary("volume", v) or "" for v in volumes]
+        self.storage.save_summary("novel", 0, rollup(parts, NOVEL_SUMMARY_CHARS))
+        logger.debug(f"[Summary] 第{chapter_number}章摘要已更新（第{volume_index + 1}卷）")
+
+    def context_for(self, chapter_index: int, outline: Optional[NovelOutline] = None) -> str:
+        """写作第 chapter_index 章（从 0 开始）时的前情提要"""
+        chapter_number = chapter_index + 1
+        if chapter_number <= 1:
+            return "无"
+
+        lines = []
+        novel = self.storage.load_summary("novel", 0)
+        if novel:
+            lines.append(f"全书至今：{novel}")
+        volume_index = volume_index_of(chapter_number, outline)
+        if volume_index_of(chapter_number - 1, outline) == volume_index:
+            volume = self.storage.load_summary("volume", volume_index)
+            if volume and volume != novel:
+                lines.append(f"本卷至今：{volume}")
+        for n in range(max(1, chapter_number - RECENT_CHAPTERS), chapter_number):
+            summary = self.storage.load_summary("chapter", n)
+            if summary:
+                lines.append(f"第{n}章：{summary}")
+        return "\n".join(lines) if lines else "无"
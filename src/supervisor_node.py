@@ -11,35 +11,95 @@ Supervisor Node - 集成 WritingSupervisor 到 LangGraph workflow
 import logging
 import asyncio
 import concurrent.futures
-from typing import Dict, Any
+import functools
+import threading
+from contextvars import ContextVar
+from typing import Callable, Dict, Any, Optional
 
 from src.state import NovelState
-from src.model import QualityEvaluation
+from src.model import QualityEvaluation, ChapterOutline
 from src.multi_agent import (
     WritingSupervisor,
     StoryBible,
+    Priority,
 )
 
 logger = logging.getLogger(__name__)
 
-# 全局实例（由 workflow 初始化时注入）
+# 按 workflow_id 隔离的 WritingSupervisor（每个实例持有自己的 StoryBible），
+# 同一进程中并行运行的多部小说互不覆盖
+_supervisors: Dict[str, WritingSupervisor] = {}
+_supervisors_lock = threading.Lock()
+# 当前节点所属的工作流（由 scoped_node 在节点执行期间设置）
+_current_workflow_id: ContextVar[Optional[str]] = ContextVar("current_workflow_id", default=None)
+
+# 未指定 workflow_id 时的实例（单工作流场景，如 Gradio UI 与直接调用节点的测试）
 _writing_supervisor: WritingSupervisor = None
 _storybible: StoryBible = None
 
 
-def init_supervisor_node(model_manager=None):
+def init_supervisor_node(
+    model_manager=None,
+    workflow_id: Optional[str] = None,
+    specialist_model_manager=None
+) -> WritingSupervisor:
     """初始化 supervisor node
 
     Args:
-        model_manager: 模型管理器（可选），为 SubAgents 提供 LLM 支持
+        model_manager: 模型管理器（可选），为综合评估提供 LLM 支持
+        workflow_id: 工作流 ID；指定时实例只登记在该工作流下，不影响其他工作流
+        specialist_model_manager: 检查型 SubAgents 的模型管理器（可选），默认与 model_manager 相同
     """
     global _writing_supervisor, _storybible
 
-    _writing_supervisor = WritingSupervisor(model_manager)
-    # 复用 WritingSupervisor 的 StoryBible 实例，而不是创建新实例
-    _storybible = _writing_supervisor.storybible
+    supervisor = WritingSupervisor(model_manager, specialist_model_manager=specialist_model_manager)
+    if workflow_id is None:
+        _writing_supervisor = supervisor
+        # 复用 WritingSupervisor 的 StoryBible 实例，而不是创建新实例
+        _storybible = supervisor.storybible
+    else:
+        with _supervisors_lock:
+            _supervisors[workflow_id] = supervisor
+
+    logger.info(f"📖 [SupervisorNode] WritingSupervisor 初始化完成 (workflow={workflow_id or 'default'})")
+    return supervisor
+
+
+def release_supervisor(workflow_id: str) -> None:
+    """工作流结束后释放其 WritingSupervisor / StoryBible"""
+    with _supervisors_lock:
+        if _supervisors.pop(workflow_id, None) is not None:
+            logger.info(f"📖 [SupervisorNode] 已释放工作流 {workflow_id} 的 WritingSupervisor")
+
+
+def scoped_node(workflow_id: Optional[str], fn: Callable) -> Callable:
+    """包装节点函数：执行期间把当前工作流设为 workflow_id，节点内的 get_* 取到该工作流的实例"""
+    if workflow_id is None:
+        return fn
 
-    logger.info("📖 [SupervisorNode] WritingSupervisor 初始化完成")
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _current_workflow_id.set(workflow_id)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current_workflow_id.reset(token)
+
+    return wrapper
+
+
+def get_chapter_outline(state: NovelState, chapter_index: int) -> Optional[ChapterOutline]:
+    """获取本章大纲（供 StoryBible 按相关度筛选上下文），不可用时返回 None"""
+    if not state.novel_storage:
+        return None
+    try:
+        outline = state.novel_storage.load_outline()
+    except Exception as e:
+        logger.debug(f"📖 [SupervisorNode] 加载大纲失败: {e}")
+        return None
+    if outline and 0 <= chapter_index < len(outline.chapters):
+        return outline.chapters[chapter_index]
+    return None
 
 
 def supervisor_node(state: NovelState) -> Dict[str, Any]:
@@ -50,9 +110,8 @@ def supervisor_node(state: NovelState) -> Dict[str, Any]:
     - 返回 ReviewResult（包含具体修改建议）
     - 不再依赖 CouncilAgent
     """
-    global _writing_supervisor, _storybible
-
-    if _writing_supervisor is None:
+    writing_supervisor = get_writing_supervisor()
+    if writing_supervisor is None:
         logger.warning("📖 [SupervisorNode] WritingSupervisor 未初始化，跳过")
         return {
             "supervisor_result": None,
@@ -81,24 +140,43 @@ def supervisor_node(state: NovelState) -> Dict[str, Any]:
             # 尝试从存储加载已存在的 StoryBible
             story_bible_content = state.novel_storage.load_story_bible()
             if story_bible_content:
-                _writing_supervisor.load_story_bible(story_bible_content)
+                writing_supervisor.load_story_bible(story_bible_content)
+                writing_supervisor.storybible.attach_archive(state.novel_storage)
                 logger.info(f"📖 [SupervisorNode] StoryBible 已从存储加载")
             # 如果 StoryBible 为空（首次运行），从大纲初始化
-            elif not _writing_supervisor.storybible._character_arcs:
+            elif not writing_supervisor.storybible._character_arcs:
                 outline = state.novel_storage.load_outline()
                 characters = state.novel_storage.load_characters()
                 if outline:
-                    _writing_supervisor.init_storybible(outline, characters)
+                    writing_supervisor.init_storybible(outline, characters)
                     logger.info(f"📖 [SupervisorNode] StoryBible 已从大纲初始化")
         except Exception as e:
             logger.warning(f"📖 [SupervisorNode] StoryBible 初始化失败: {e}")
 
+    if state.novel_storage:
+        try:
+            writing_supervisor.attach_review_cache(state.novel_storage.review_cache_path)
+        except Exception as e:
+            logger.warning(f"📖 [SupervisorNode] 审查结果缓存不可用: {e}")
+        try:
+            writing_supervisor.attach_chapter_index(state.novel_storage.chapter_index)
+        except Exception as e:
+            logger.warning(f"📖 [SupervisorNode] 全书索引不可用: {e}")
+
     # 2. 调用 WritingSupervisor.review() 审查章节
+    chapter_outline = get_chapter_outline(state, current_index)
+    policy = writing_supervisor.early_decision
+    policy.enabled = state.early_decision
+    policy.min_priority = Priority(state.early_decision_priority)
+    policy.min_confidence = state.early_decision_confidence
     try:
         def run_in_new_loop():
             """在独立线程中创建新事件循环并执行异步函数"""
             return asyncio.run(
-                _writing_supervisor.review(chapter_content, current_index)
+                writing_supervisor.review(
+                    chapter_content, current_index, chapter_outline,
+                    fused=getattr(state, 'evaluation_mode', 'deep') == "fused"
+                )
             )
 
         with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
@@ -157,8 +235,38 @@ def supervisor_node(state: NovelState) -> Dict[str, Any]:
                 "revision_notes": f"审查结果类型错误: {type(review_result)}"
             }
 
-    # 4. 转换为 workflow 兼容的输出格式
-    needs_revision = review_result.needs_revision
+    # 4. 修订收敛控制：评分不再提升、问题重复或预算用尽时不再要求修订
+    controller = writing_supervisor.revision_controller
+    controller.max_loops = state.max_revision_loops
+    controller.token_budget = state.revision_token_budget
+    # 断点恢复后控制器是新实例，全书已用预算以 state 为准
+    controller.spent_tokens = max(controller.spent_tokens, state.revision_tokens_spent)
+    decision = controller.observe(
+        current_index, chapter_content, review_result,
+        review_tokens=writing_supervisor.last_prompt_usage.input_tokens,
+        revisions=state.supervisor_recheck_count,
+        draft=(state.validated_chapter_draft, writing_supervisor.pending_review(current_index)),
+    )
+    revision_stats = dict(state.revision_stats)
+    revision_stats[str(current_index + 1)] = controller.stats[current_index].to_dict()
+    restored = {}
+    if decision.best is not None:
+        # 修订没有带来提升：接受评分最高的一稿，并换回那次审查的 StoryBible 分支
+        best_draft, best_bible = decision.best.draft
+        writing_supervisor.restore_pending_review(current_index, best_bible)
+        review_result = decision.best.result
+        restored = {"raw_current_chapter": decision.best.chapter, "validated_chapter_draft": best_draft}
+    if decision.stop_reason:
+        logger.warning(
+            f"📖 [SupervisorNode] 第 {current_index+1} 章停止修订并接受"
+            f"{'评分最高的一稿' if restored else '当前稿'}: {decision.message} "
+            f"(评分={review_result.quality_score:.1f})"
+        )
+    if not decision.revise:
+        controller.finish(current_index)
+
+    # 5. 转换为 workflow 兼容的输出格式
+    needs_revision = decision.revise
     priority = "high" if (review_result.suggestions and
                           any(s.priority.value == "high" for s in review_result.suggestions)) else "medium"
 
@@ -170,6 +278,8 @@ def supervisor_node(state: NovelState) -> Dict[str, Any]:
         revision_notes = "; ".join(notes_parts)
     else:
         revision_notes = review_result.reasoning or "无需修订"
+    if decision.stop_reason:
+        revision_notes = f"[停止修订: {decision.message}] {revision_notes}"
 
     logger.info(
         f"📖 [SupervisorNode] 第 {current_index+1} 章审查完成: "
@@ -184,6 +294,11 @@ def supervisor_node(state: NovelState) -> Dict[str, Any]:
         "revision_needed": needs_revision,
         "revision_priority": priority,
         "revision_notes": revision_notes,
+        # 修订轮数：要求修订时累加，接受本章时清零
+        "supervisor_recheck_count": state.supervisor_recheck_count + 1 if needs_revision else 0,
+        "revision_tokens_spent": controller.spent_tokens,
+        "revision_stats": revision_stats,
+        **restored,
     }
 
 
@@ -202,17 +317,26 @@ def check_revision_node(state: NovelState) -> str:
     return "revise"
 
 
-def get_writing_supervisor() -> WritingSupervisor:
-    """获取 WritingSupervisor 实例"""
-    return _writing_supervisor
+def get_writing_supervisor(workflow_id: Optional[str] = None) -> Optional[WritingSupervisor]:
+    """获取 WritingSupervisor 实例
+
+    Args:
+        workflow_id: 工作流 ID；不传时取当前节点所属工作流，不在任何工作流中时取默认实例
+    """
+    workflow_id = workflow_id or _current_workflow_id.get()
+    if workflow_id is None:
+        return _writing_supervisor
+    with _supervisors_lock:
+        return _supervisors.get(workflow_id)
 
 
 # 向后兼容别名
-def get_supervisor_writer() -> WritingSupervisor:
+def get_supervisor_writer(workflow_id: Optional[str] = None) -> Optional[WritingSupervisor]:
     """获取 WritingSupervisor 实例（向后兼容别名）"""
-    return _writing_supervisor
+    return get_writing_supervisor(workflow_id)
 
 
-def get_storybible() -> StoryBible:
+def get_storybible(workflow_id: Optional[str] = None) -> Optional[StoryBible]:
     """获取 StoryBible 实例"""
-    return _storybible
\ No newline at end of file
+    supervisor = get_writing_supervisor(workflow_id)
+    return supervisor.storybible if supervisor is not None else None
\ No newline at end of file
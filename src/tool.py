@@ -1,10 +1,26 @@
 import json
 import logging
-from typing import Optional, Tuple
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
 import re
 
 logger = logging.getLogger(__name__)
 
+# parse_json_response 的解析结果
+PARSE_OK = "ok"              # 原样解析成功
+PARSE_REPAIRED = "repaired"  # 修复尾逗号、单引号等格式问题后解析成功
+PARSE_SALVAGED = "salvaged"  # 输出被截断，保留已完整的部分
+PARSE_FAILED = "failed"
+
+# 截断修补时最多尝试的截断点数量
+MAX_SALVAGE_ATTEMPTS = 64
+
+_FENCE_RE = re.compile(r"```[\w-]*[ \t]*\n?([\s\S]*?)(?:```|$)")
+_CLOSERS = {"{": "}", "[": "]"}
+
+# 按来源（通常是 SubAgent 名称）统计解析结果
+_parse_stats: Dict[str, Counter] = defaultdict(Counter)
+
 
 def is_json_truncated(json_str: str) -> bool:
     """检测JSON是否可能被截断（以不完整的结构结束）"""
@@ -101,3 +117,169 @@ def extract_json(generated_text: str) -> Optional[str]:
     except Exception as e:
         logger.debug(f"提取JSON时出错: {str(e)}")
         return None
+
+
+def _scan(text: str) -> Tuple[List[str], bool, List[int]]:
+    """逐字符扫描（跳过字符串内容），返回未闭合的括号栈、是否停在字符串内、可截断位置"""
+    stack: List[str] = []
+    cuts: List[int] = []
+    in_string = False
+    quote = ""
+    escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == quote:
+                in_string = False
+            continue
+        if ch in "\"'":
+            in_string, quote = True, ch
+        elif ch in "{[":
+            stack.append(ch)
+            cuts.append(i + 1)
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            cuts.append(i + 1)
+            if not stack:
+                break
+        elif ch == ",":
+            cuts.append(i)
+    return stack, in_string, cuts
+
+
+def _balanced_segment(text: str) -> Optional[str]:
+    """从第一个 { 或 [ 开始截取括号配平的片段；未配平（被截断）时截取到末尾"""
+    match = re.search(r"[{\[]", text)
+    if not match:
+        return None
+    segment = text[match.start():]
+    stack, in_string, cuts = _scan(segment)
+    if not stack and not in_string and cuts:
+        return segment[:cuts[-1]]
+    return segment
+
+
+def _transform_outside_strings(text: str, single_quotes: bool) -> str:
+    """删除尾逗号；single_quotes 为 True 时把单引号字符串改写为双引号字符串"""
+    out: List[str] = []
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if ch == '"' or (ch == "'" and single_quotes):
+            j = i + 1
+            chars: List[str] = []
+            while j < n and text[j] != ch:
+                if text[j] == "\\" and j + 1 < n:
+                    chars.append(text[j:j + 2])
+                    j += 2
+                    continue
+                chars.append('\\"' if ch == "'" and text[j] == '"' else text[j])
+                j += 1
+            body = "".join(chars)
+            if ch == "'":
+                body = body.replace("\\'", "'")
+            out.append('"' + body + ('"' if j < n else ""))
+            i = j + 1
+            continue
+        if ch == ",":
+            k = i + 1
+            while k < n and text[k].isspace():
+                k += 1
+            if k < n and text[k] in "}]":
+                i += 1
+                continue
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def _loads(text: str) -> Any:
+    # strict=False 允许字符串中出现未转义的换行
+    return json.loads(text, strict=False)
+
+
+def _salvage(text: str) -> Any:
+    """截断的 JSON：回退到最近的完整元素，补齐未闭合的括号"""
+    _, _, cuts = _scan(text)
+    for cut in reversed(cuts[-MAX_SALVAGE_ATTEMPTS:]):
+        head = text[:cut]
+        stack, in_string, _ = _scan(head)
+        if in_string or not stack:
+            continue
+        candidate = _transform_outside_strings(
+            head + "".join(_CLOSERS[c] for c in reversed(stack)), single_quotes=False
+        )
+        try:
+            return _loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("无法从截断的 JSON 中恢复")
+
+
+def parse_json_response(
+    text: str,
+    source: str = "",
+    require_object: bool = False
+) -> Tuple[Optional[Any], str]:
+    """宽松解析 LLM 返回的 JSON
+
+    依次尝试：代码块（```json / ```）与全文中括号配平的片段原样解析 → 修复尾逗号和单引号 →
+    截断修补（保留已完整的字段和数组元素）。
+
+    Args:
+        text: LLM 响应
+        source: 统计来源（如 SubAgent 名称），见 json_parse_stats
+        require_object: 只接受 JSON 对象
+
+    Returns:
+        (解析结果, 状态)；状态为 PARSE_OK / PARSE_REPAIRED / PARSE_SALVAGED / PARSE_FAILED，
+        失败时解析结果为 None
+    """
+    candidates: List[str] = []
+    if text and text.strip():
+        for block in _FENCE_RE.findall(text):
+            segment = _balanced_segment(block)
+            if segment and segment not in candidates:
+                candidates.append(segment)
+        segment = _balanced_segment(text)
+        if segment and segment not in candidates:
+            candidates.append(segment)
+
+    def accept(value: Any) -> bool:
+        return isinstance(value, dict) or (not require_object and isinstance(value, list))
+
+    attempts = (
+        (PARSE_OK, _loads),
+        (PARSE_REPAIRED, lambda c: _loads(_transform_outside_strings(c, single_quotes=True))),
+        (PARSE_SALVAGED, lambda c: _salvage(_transform_outside_strings(c, single_quotes=True))),
+    )
+    for status, parse in attempts:
+        for candidate in candidates:
+            try:
+                value = parse(candidate)
+            except ValueError:
+                continue
+            if accept(value):
+                _parse_stats[source][status] += 1
+                return value, status
+
+    _parse_stats[source][PARSE_FAILED] += 1
+    return None, PARSE_FAILED
+
+
+def json_parse_stats() -> Dict[str, Dict[str, Any]]:
+    """各来源的解析结果计数与失败率"""
+    stats = {}
+    for source, counter in _parse_stats.items():
+        total = sum(counter.values())
+        stats[source] = dict(counter, total=total, failure_rate=round(counter[PARSE_FAILED] / total, 3))
+    return stats
+
+
+def reset_json_parse_stats() -> None:
+    _parse_stats.clear()
@@ -1,7 +1,8 @@
 """
 定义工作状态, 核心部分
 """
-from typing import Dict
+import functools
+from typing import Dict, Optional
 from langgraph.graph import StateGraph, END
 from src.agent import (
     OutlineGeneratorAgent,
@@ -16,11 +17,11 @@ from src.feedback_nodes import (
     character_feedback_node, process_character_feedback_node, check_character_feedback_node,
     chapter_feedback_node, process_chapter_feedback_node, check_chapter_feedback_deep_mode_node
 )
-from src.supervisor_node import supervisor_node, init_supervisor_node
+from src.supervisor_node import supervisor_node, init_supervisor_node, scoped_node
 
 from src.state import NovelState
 from src.log_config import loggers
-from src.model_manager import create_model_manager
+from src.model_manager import create_model_registry
 from src.config_loader import (
     OutlineConfig,
     CharacterConfig,
@@ -55,10 +56,21 @@ def _get_agent(agent_name: str, model_manager, config) -> object:
         raise KeyError(f"Unknown agent: {agent_name}")
 
 # 构建工作流
-def create_workflow(model_config: ModelConfig, Agent_config: BaseConfig= None, execution_mode: str = "serial") -> StateGraph:
-    """创建包含章节写作和质量评审的完整工作流"""
-    # 获取共享模型实例
-    model_manager = create_model_manager(model_config, execution_mode)
+def create_workflow(
+    model_config: ModelConfig,
+    Agent_config: BaseConfig = None,
+    execution_mode: str = "serial",
+    workflow_id: Optional[str] = None
+) -> StateGraph:
+    """创建包含章节写作和质量评审的完整工作流
+
+    Args:
+        workflow_id: 工作流 ID；指定时 WritingSupervisor/StoryBible 只属于该工作流，
+            同一进程可以并行运行多部小说
+    """
+    # 获取共享模型实例（按角色：写作 / 综合评估 / 检查 Agent，同一端点共享连接池）
+    models = create_model_registry(model_config, execution_mode)
+    model_manager = models.default
     logger.info(f"成功加载{model_config.model_type}模型管理器")
 
     # Use agent_config for outline settings, fallback to defaults
@@ -73,11 +85,13 @@ def create_workflow(model_config: ModelConfig, Agent_config: BaseConfig= None, e
     # 初始化 Agent（优先从注册表获取）
     outline_agent = _get_agent("outline", model_manager, outline_cfg)    # 大纲
     character_agent = _get_agent("character", model_manager, CharacterConfig)         # 角色
-    writer_agent = _get_agent("writer", model_manager, WriterConfig)               # 写作
+    writer_agent = _get_agent("writer", models.get("writer"), WriterConfig)        # 写作
     reflect_agent = _get_agent("reflect", model_manager, ReflectConfig)             # 反思
 
     # 初始化 SupervisorNode（多 Agent 并行检查）
-    init_supervisor_node(model_manager)
+    init_supervisor_node(models.get("supervisor"), workflow_id, models.get("specialist"))
+    # 访问 WritingSupervisor/StoryBible 的节点在执行期间绑定到本工作流
+    scoped = functools.partial(scoped_node, workflow_id)
 
     logger.info("代理初始化完成, 开始构建工作流图...")
 
@@ -119,7 +133,7 @@ def create_workflow(model_config: ModelConfig, Agent_config: BaseConfig= None, e
     
     # 写作
     workflow.add_node("write_chapter",
-                      lambda state: write_chapter_node(state, writer_agent))
+                      scoped(lambda state: write_chapter_node(state, writer_agent)))
     workflow.add_node("validate_chapter", validate_chapter_node)
     
     # 章节反馈节点
@@ -136,14 +150,15 @@ def create_workflow(model_config: ModelConfig, Agent_config: BaseConfig= None, e
     workflow.add_node("evaluate2wirte", evaluation_to_chapter_node)
     
     # 接受本章
-    workflow.add_node("accpet_chapter", accept_chapter_node)
+    workflow.add_node("accpet_chapter", scoped(accept_chapter_node))
     
     
     workflow.add_node("success", lambda state: {
         "result": "小说创作流程完成",
         "final_outline": state.novel_storage.load_outline(),
         "final_characters":state.novel_storage.load_characters(),
-        "final_content": state.novel_storage.load_all_chapters()
+        # 章节保留在存储中，不再一次性加载；展示/导出时按需逐章读取
+        "final_chapter_count": state.novel_storage.get_completed_chapter_count()
     })
     
     workflow.add_node("failure", lambda state: {
@@ -249,7 +264,7 @@ def create_workflow(model_config: ModelConfig, Agent_config: BaseConfig= None, e
 
     # -------------------- 批量并行写作节点 --------------------
     workflow.add_node("batch_write_chapters",
-                      lambda state: batch_write_chapters_node(state, writer_agent))
+                      scoped(lambda state: batch_write_chapters_node(state, writer_agent)))
     workflow.add_node("batch_validate_chapters", batch_validate_chapters_node)
     workflow.add_edge("batch_write_chapters", "batch_validate_chapters")
 
@@ -316,7 +331,7 @@ def create_workflow(model_config: ModelConfig, Agent_config: BaseConfig= None, e
     )
 
     # Supervisor 检查节点（重构后：直接决策，不再经过 Council）
-    workflow.add_node("supervisor_node", supervisor_node)
+    workflow.add_node("supervisor_node", scoped(supervisor_node))
 
     # check_revision_node 根据 revision_needed 决定下一步
     workflow.add_conditional_edges(
@@ -0,0 +1,86 @@
+"""
+Integration tests for src/export.py streaming export
+"""
+import io
+import pytest
+import shutil
+import zipfile
+from pathlib import Path
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.routes import router
+from src.export import NovelExporter
+from src.storage import NovelStorage
+from src.model import ChapterContent
+
+TITLE = "测试导出小说"
+
+
+@pytest.fixture
+def storage(sample_novel_outline, sample_character):
+    storage = NovelStorage(TITLE)
+    storage.save_outline(sample_novel_outline.model_copy(update={"title": TITLE}))
+    storage.save_characters([sample_character])
+    for i in range(1, 4):
+        storage.save_chapter(i, ChapterContent(title=f"第{i}章 <试炼>", content=f"第一段{i}\n\n第二段{i} & 结尾"))
+    yield storage
+    result_dir = Path(f"result/{TITLE}_storage")
+    if result_dir.exists():
+        shutil.rmtree(result_dir, ignore_errors=True)
+
+
+class TestNovelExporter:
+    def test_txt_streams_chapters_in_order(self, storage):
+        text = b"".join(NovelExporter(storage).iter_bytes("txt")).decode("utf-8")
+        assert "【角色档案】" in text
+        assert text.index("第一段1") < text.index("第一段2") < text.index("第一段3")
+
+    def test_markdown(self, storage):
+        text = b"".join(NovelExporter(storage).iter_bytes("md")).decode("utf-8")
+        assert text.startswith(f"# {TITLE}")
+        assert "## 第3章 第3章 <试炼>" in text
+
+    def test_epub_is_valid_zip(self, storage):
+        data = b"".join(NovelExporter(storage).iter_bytes("epub"))
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            names = zf.namelist()
+            assert names[0] == "mimetype"
+            mimetype = zf.getinfo("mimetype")
+            assert mimetype.compress_type == zipfile.ZIP_STORED
+            assert mimetype.flag_bits == 0
+            assert zf.testzip() is None
+            assert zf.read("mimetype") == b"application/epub+zip"
+            assert "OEBPS/chapter_0003.xhtml" in names
+            assert "&lt;试炼&gt;" in zf.read("OEBPS/chapter_0001.xhtml").decode("utf-8")
+            assert "chapter_0002.xhtml" in zf.read("OEBPS/content.opf").decode("utf-8")
+        # 本地文件头：不带数据描述符标志，紧随其后是文件名和未压缩的内容
+        assert int.from_bytes(data[6:8], "little") == 0
+        assert data[30:58] == b"mimetypeapplication/epub+zip"
+
+    def test_export_chapter_files(self, storage, tmp_path):
+        main_file, chapter_paths = NovelExporter(storage).export_chapter_files(str(tmp_path))
+        assert main_file.exists()
+        assert len(chapter_paths) == 3
+
+    def test_unsupported_format(self, storage):
+        with pytest.raises(ValueError):
+            NovelExporter(storage).iter_bytes("pdf")
+
+
+class TestExportEndpoint:
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.include_router(router)
+        return TestClient(app)
+
+    def test_stream_epub(self, client, storage):
+        response = client.get(f"/api/v1/novels/{TITLE}/export", params={"format": "epub"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/epub+zip"
+        assert zipfile.ZipFile(io.BytesIO(response.content)).testzip() is None
+
+    def test_invalid_format(self, client, storage):
+        response = client.get(f"/api/v1/novels/{TITLE}/export", params={"format": "pdf"})
+        assert response.status_code == 400
@@ -223,6 +223,25 @@ class TestWriterAgent:
         assert hasattr(agent, 'feedback_processor')
         assert hasattr(agent, 'content_referencer')
 
+    def test_character_presence_uses_appearance_index(self, mock_model_manager, base_config, tmp_path):
+        """Test presence hints come from ChapterIndex and skip names the index does not track"""
+        from src.chapter_index import ChapterIndex
+
+        index = ChapterIndex(tmp_path / "chapter_index.sqlite")
+        index.index_appearances(1, "林风与苏瑶同行。", ["林风", "苏瑶", "赵虎"])
+        for chapter in range(2, 13):
+            index.index_appearances(chapter, "林风独自赶路。", ["林风", "苏瑶", "赵虎"])
+        state = MagicMock()
+        state.novel_storage.chapter_index = index
+        chapter_outline = ChapterOutline(title="第13章", summary="", key_events=[], setting="",
+                                         characters_involved=["林风", "苏瑶", "赵虎", "路人甲"])
+
+        presence = WriterAgent(mock_model_manager, base_config)._character_presence(state, chapter_outline, 12)
+        assert presence.splitlines() == [
+            "- 苏瑶：已有11章未出场（上次在第1章），重新登场时交代其去向",
+            "- 赵虎：首次登场，需交代身份",
+        ]
+
     def test_write_chapter_returns_string(self, mock_model_manager, base_config, sample_state):
         """Test write_chapter returns a string (raw LLM response)"""
         agent = WriterAgent(mock_model_manager, base_config)
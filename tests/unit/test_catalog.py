@@ -0,0 +1,101 @@
+"""
+Unit tests for src/catalog.py and the catalog-backed listing in StateManager / NovelStorage
+"""
+import json
+import pytest
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+from src.catalog import JsonCatalog
+from src.core.state_manager import StateManager
+from src.core.progress import WorkflowStatus
+from src.model import ChapterContent
+from src.storage import NovelStorage
+
+TITLE = "测试索引目录小说"
+
+
+@pytest.fixture
+def cleanup():
+    yield
+    shutil.rmtree(Path(f"result/{TITLE}_storage"), ignore_errors=True)
+
+
+class TestJsonCatalog:
+    def test_upsert_and_remove(self, tmp_path):
+        catalog = JsonCatalog(tmp_path / "catalog.json")
+        assert catalog.exists() is False
+        catalog.upsert("a", {"x": 1})
+        catalog.upsert("a", {"y": 2})
+        assert catalog.get("a") == {"x": 1, "y": 2}
+        catalog.remove("a")
+        assert catalog.all() == {}
+
+    def test_reload_after_external_write(self, tmp_path):
+        path = tmp_path / "catalog.json"
+        JsonCatalog(path).upsert("a", {"x": 1})
+        other = JsonCatalog(path)
+        assert other.get("a") == {"x": 1}
+
+
+class TestStateManagerCatalog:
+    def test_list_workflows_reads_catalog_only(self, temp_state_manager):
+        temp_state_manager.create_workflow_record("wf_1", "意图", {"user_intent": "意图"})
+        temp_state_manager.save_checkpoint("wf_1", {"current_chapter_index": 2, "current_node": "write"})
+        temp_state_manager.update_status("wf_1", WorkflowStatus.RUNNING)
+
+        # 删除状态文件本身，列表仍能从索引得到结果（证明未逐个读取文件）
+        (temp_state_manager.storage_dir / "wf_1.json").unlink()
+        workflows = temp_state_manager.list_workflows()
+        assert [w.workflow_id for w in workflows] == ["wf_1"]
+        assert workflows[0].status == WorkflowStatus.RUNNING
+
+        interrupted = temp_state_manager.get_interrupted_workflows()
+        assert interrupted[0].current_chapter_index == 2
+
+    def test_managers_share_catalog_per_directory(self, temp_state_manager):
+        other = StateManager(storage_dir=str(temp_state_manager.storage_dir))
+        assert other._catalog is temp_state_manager._catalog
+
+    def test_record_step_writes_catalog_once(self, temp_state_manager):
+        temp_state_manager.create_workflow_record("wf_3", "意图", {"user_intent": "意图"})
+        with patch.object(JsonCatalog, "_write", wraps=temp_state_manager._catalog._write) as write:
+            temp_state_manager.record_step("wf_3", "write_chapter", {"current_chapter_index": 1})
+        assert write.call_count == 1
+        entry = temp_state_manager._catalog.get("wf_3")
+        assert entry["state"]["current_node"] == "write_chapter"
+        assert entry["checkpoint"]["current_chapter_index"] == 1
+
+    def test_checkpoint_files_not_listed_as_workflows(self, temp_state_manager):
+        temp_state_manager.save_checkpoint("wf_2", {"current_node": "write"})
+        assert temp_state_manager.list_workflows() == []
+        temp_state_manager.clear_checkpoint("wf_2")
+        assert temp_state_manager.get_interrupted_workflows() == []
+
+    def test_rebuild_when_catalog_missing(self, temp_state_manager):
+        path = temp_state_manager.storage_dir / "legacy.json"
+        path.write_text(json.dumps({"user_intent": "旧工作流", "status": "completed"}), encoding="utf-8")
+        reopened = StateManager(storage_dir=str(temp_state_manager.storage_dir))
+        workflows = reopened.list_workflows(status=WorkflowStatus.COMPLETED)
+        assert [w.workflow_id for w in workflows] == ["legacy"]
+
+
+class TestNovelStorageCatalog:
+    def test_read_only_access_creates_nothing(self, cleanup):
+        storage = NovelStorage(TITLE)
+        assert storage.load_outline() is None
+        assert storage.get_storage_info()["chapter_count"] == 0
+        assert not storage.base_dir.exists()
+
+    def test_chapter_count_maintained(self, cleanup, temp_state_manager):
+        storage = NovelStorage(TITLE)
+        storage.save_chapter(1, ChapterContent(title="第1章", content="内容"))
+        storage.save_chapter(1, ChapterContent(title="第1章", content="改写"))
+        storage.save_chapter(2, ChapterContent(title="第2章", content="内容"))
+
+        novels = temp_state_manager.list_existing_novels()
+        entry = next(n for n in novels if n["title"] == TITLE)
+        assert entry["chapter_count"] == 2
+
+        shutil.rmtree(storage.base_dir)
+        assert all(n["title"] != TITLE for n in temp_state_manager.list_existing_novels())
@@ -0,0 +1,187 @@
+"""
+Unit tests for src/chapter_index.py
+"""
+import pytest
+from src.chapter_index import ChapterIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ChapterIndex(tmp_path / "chapter_index.sqlite")
+    index.index_chapter(1, "林渊拜入青云宗。长老会召开会议。")
+    index.index_chapter(2, "林渊闭关修炼，无人打扰。")
+    index.index_chapter(3, "长老会再次召集众弟子，长老会决定开启秘境。")
+    return index
+
+
+class TestChapterIndex:
+    def test_phrase_positions(self, index):
+        assert index.search("长老会") == {1: [8], 3: [0, 11]}
+
+    def test_last_and_first_occurrence(self, index):
+        assert index.last_occurrence("长老会") == (3, 11)
+        assert index.last_occurrence("长老会", before_chapter=3) == (1, 8)
+        assert index.first_occurrence("林渊") == (1, 0)
+
+    def test_phrase_requires_adjacent_bigrams(self, index):
+        # "长老" 和 "老会" 都存在，但 "长老召" 不连续
+        assert index.search("长老召") == {}
+        assert index.count("林渊") == 2
+
+    def test_single_char_and_range(self, index):
+        assert index.find_chapters("秘") == [3]
+        assert index.search("林渊", chapter_range=(2, 3)) == {2: [0]}
+
+    def test_reindex_replaces_postings(self, index):
+        assert index.index_chapter(2, "林渊闭关修炼，无人打扰。") is False
+        index.index_chapter(2, "长老会派人前来。")
+        assert index.find_chapters("长老会") == [1, 2, 3]
+        assert index.find_chapters("闭关") == []
+
+    def test_remove_chapter(self, index):
+        index.remove_chapter(3)
+        assert index.indexed_chapters() == [1, 2]
+        assert index.last_occurrence("长老会") == (1, 8)
+
+    def test_missing_index_file(self, tmp_path):
+        assert ChapterIndex(tmp_path / "none.sqlite").search("长老会") == {}
+
+
+class TestStorageChapterIndex:
+    def test_rebuild_from_storage(self):
+        import shutil
+        from pathlib import Path
+        from src.model import ChapterContent
+        from src.storage import NovelStorage
+
+        storage = NovelStorage("测试索引小说")
+        try:
+            storage.save_chapter(1, ChapterContent(title="第1章", content="长老会召开会议"))
+            storage.save_chapter(2, ChapterContent(title="第2章", content="林渊出关"))
+            # save_chapter 已同步索引，补建时只处理缺失的章节
+            assert storage.rebuild_chapter_index() == 0
+            storage.chapter_index.remove_chapter(2)
+            assert storage.rebuild_chapter_index() == 1
+            assert storage.chapter_index.last_occurrence("长老会") == (1, 0)
+        finally:
+            shutil.rmtree(Path("result/测试索引小说_storage"), ignore_errors=True)
+
+    def test_save_chapter_reindexes_edits(self):
+        import shutil
+        from pathlib import Path
+        from unittest.mock import patch
+        from src.model import ChapterContent
+        from src.storage import NovelStorage
+
+        storage = NovelStorage("测试索引小说")
+        try:
+            storage.save_chapter(1, ChapterContent(title="第1章", content="长老会召开会议"))
+            # UI 编辑后直接保存章节
+            storage.save_chapter(1, ChapterContent(title="第1章", content="林渊闯入藏经阁"))
+            assert storage.chapter_index.find_chapters("藏经阁") == [1]
+            assert storage.chapter_index.find_chapters("长老会") == []
+
+            with patch.object(storage.chapter_index, "index_appearances") as appearances:
+                storage.save_chapter(1, ChapterContent(title="第1章", content="林渊闯入藏经阁"))
+            appearances.assert_not_called()
+        finally:
+            shutil.rmtree(Path("result/测试索引小说_storage"), ignore_errors=True)
+
+
+class TestPassageRetrieval:
+    @pytest.fixture
+    def corpus(self, tmp_path):
+        index = ChapterIndex(tmp_path / "chapter_index.sqlite")
+        filler = "林远在山间赶路，风声阵阵，树影婆娑，一路无话。" * 4
+        for chapter in range(1, 41):
+            index.index_chapter(chapter, f"{filler}\n{filler}")
+        index.index_chapter(7, f"{filler}\n林远在古井边捡到一枚青铜钥匙，钥匙上刻着星图。\n{filler}")
+        return index
+
+    def test_split_passages_merges_short_paragraphs(self):
+        from src.chapter_index import split_passages, PASSAGE_MAX_CHARS
+        passages = split_passages("“走吧。”\n“好。”\n" + "长" * (PASSAGE_MAX_CHARS + 10))
+        assert passages[0].startswith("“走吧。”\n“好。”")
+        assert all(len(p) <= PASSAGE_MAX_CHARS for p in passages)
+
+    def test_bm25_finds_old_setup(self, corpus):
+        results = corpus.retrieve_passages(["打开青铜钥匙对应的星图密室", "林远"], top_k=2, before_chapter=40)
+        assert results[0][0] == 7
+        assert "青铜钥匙" in results[0][1]
+
+    def test_before_chapter_excludes_later_passages(self, corpus):
+        assert corpus.retrieve_passages(["青铜钥匙"], before_chapter=7) == []
+
+    def test_reindex_replaces_passages(self, corpus):
+        corpus.index_chapter(7, "林远继续赶路。")
+        assert corpus.retrieve_passages(["青铜钥匙"]) == []
+
+
+class TestCharacterAppearances:
+    NAMES = ["林渊", "林渊儿", "苏瑶", "赵虎"]
+
+    @pytest.fixture
+    def index(self, tmp_path):
+        index = ChapterIndex(tmp_path / "chapter_index.sqlite")
+        index.index_appearances(1, "林渊与苏瑶同行。\n\n赵虎在山下等候。", self.NAMES)
+        index.index_appearances(2, "林渊儿独自修炼。\n苏瑶来访，林渊儿起身相迎。", self.NAMES)
+        index.index_appearances(15, "林渊出关。", self.NAMES)
+        return index
+
+    def test_find_mentions_prefers_longest_name(self):
+        from src.chapter_index import find_mentions
+        mentions = find_mentions("林渊儿与林渊。\n\n苏瑶", self.NAMES)
+        assert mentions == {"林渊儿": [(0, 0)], "林渊": [(4, 0)], "苏瑶": [(9, 1)]}
+
+    def test_offsets_and_paragraphs(self, index):
+        assert index.character_appearances("林渊儿") == {2: {"offsets": [0, 14], "paragraphs": [0, 1]}}
+        assert list(index.character_appearances("林渊")) == [1, 15]
+
+    def test_stats_and_cooccurrence(self, index):
+        stats = index.appearance_stats()
+        assert stats["苏瑶"] == {"chapters": 2, "mentions": 2, "first_chapter": 1, "last_chapter": 2}
+        assert index.cooccurrence_counts() == {("林渊", "苏瑶"): 1, ("林渊儿", "苏瑶"): 1}
+        assert index.appearance_stats(before_chapter=2)["苏瑶"]["chapters"] == 1
+
+    def test_absent_characters(self, index):
+        assert index.absent_characters(["林渊", "苏瑶", "赵虎", "无名"], 16, threshold=10) == {"苏瑶": 13, "赵虎": 14}
+
+    def test_new_characters_only_tracked_names(self, index):
+        index.index_appearances(16, "林渊出关。", self.NAMES + ["白衣人"])
+        # 不在出场统计名单中的角色（无名）不会被当作首次登场
+        assert index.new_characters(["林渊", "白衣人", "无名"], 17) == ["白衣人"]
+        assert index.new_characters(["白衣人"], 1) == []
+
+    def test_reindex_replaces_rows(self, index):
+        assert index.index_appearances(1, "林渊与苏瑶同行。\n\n赵虎在山下等候。", self.NAMES) is False
+        index.index_appearances(1, "赵虎独行。", self.NAMES)
+        assert index.cooccurrence_counts() == {("林渊儿", "苏瑶"): 1}
+        index.remove_chapter(2)
+        assert index.character_appearances("林渊儿") == {}
+
+
+class TestConsistencyEvidence:
+    def test_checker_prompt_includes_earlier_passages(self, tmp_path):
+        import asyncio
+        from unittest.mock import AsyncMock
+        from src.multi_agent import StoryBible, WritingSupervisor
+
+        index = ChapterIndex(tmp_path / "chapter_index.sqlite")
+        index.index_chapter(1, "苏瑶自幼畏水，从不靠近寒潭。")
+        index.index_chapter(2, "林渊独自下山采药。")
+        for chapter in (1, 2):
+            index.index_appearances(chapter, "苏瑶" if chapter == 1 else "林渊", ["林渊", "苏瑶"])
+
+        supervisor = WritingSupervisor(None)
+        supervisor.storybible = StoryBible()
+        supervisor.attach_chapter_index(index)
+        checker = supervisor.check_agents[0]
+        checker._call_llm = AsyncMock(return_value='{"issues": [], "reasoning": "ok"}')
+
+        asyncio.run(checker.check("苏瑶纵身跃入寒潭。", "", 2))
+        user_prompt = checker._call_llm.call_args.kwargs["user_prompt"]
+        assert "【前文相关段落】" in user_prompt
+        assert "（第1章）苏瑶自幼畏水" in user_prompt
+
+        asyncio.run(checker.check("苏瑶纵身跃入寒潭。", "", 0))
+        assert "【前文相关段落】" not in checker._call_llm.call_args.kwargs["user_prompt"]
@@ -0,0 +1,158 @@
+"""
+Unit tests for rule-based checker gating in WritingSupervisor.review
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from src.model import CharacterArc, CharacterArcStage, ChapterOutline, PlotThread, WorldState
+from src.multi_agent import StoryBible, WritingSupervisor
+from src.multi_agent.dispatch import CheckPlanner
+from src.multi_agent.types import CheckCategory, ReviewResult, SubAgentReport
+
+
+def _outline(characters) -> ChapterOutline:
+    return ChapterOutline(title="第三章", summary="赶路", key_events=["赶路"], characters_involved=characters, setting="山道")
+
+
+def _supervisor(storybible: StoryBible) -> WritingSupervisor:
+    supervisor = WritingSupervisor(MagicMock())
+    supervisor.storybible = storybible
+    for agent in supervisor.check_agents:
+        agent.check = AsyncMock(return_value=SubAgentReport(agent_name=agent.agent_name,
+                                                             category=CheckCategory.QUALITY))
+    supervisor.reflection_agent.evaluate = AsyncMock(return_value=ReviewResult(
+        chapter_index=2, needs_revision=False, quality_score=8.0
+    ))
+    return supervisor
+
+
+def _called(supervisor: WritingSupervisor):
+    return {agent.agent_name for agent in supervisor.check_agents if agent.check.called}
+
+
+class TestCheckPlanner:
+    """Tests for CheckPlanner decisions"""
+
+    def test_empty_storybible_only_runs_consistency(self):
+        """Test checkers with nothing to compare against are skipped"""
+        supervisor = _supervisor(StoryBible())
+        asyncio.run(supervisor.review("林风独自赶路。", 2, _outline(["林风"])))
+
+        assert _called(supervisor) == {"ConsistencyChecker"}
+        assert supervisor.dispatch_stats.skipped == 3
+        assert supervisor.dispatch_stats.to_dict()["skip_rate"] == 0.75
+        reports = supervisor.reflection_agent.evaluate.call_args.kwargs["check_results"]
+        assert len(reports) == 4
+        assert "规则预检" in reports[1].reasoning
+
+    def test_relevant_state_dispatches_checkers(self):
+        """Test staged arcs, threads in payoff range and moved locations trigger checks"""
+        storybible = StoryBible()
+        storybible.add_character_arc(CharacterArc(name="林风", arc_stages=[
+            CharacterArcStage(stage_name="迷茫", chapter_range="1-5", emotional_state="", key_moment="")
+        ]))
+        storybible.add_plot_thread(PlotThread(id="t1", name="失踪的师父", status="foreshadowed",
+                                              setup_chapter=1, expected_payoff_range="3-4"))
+        storybible.append_world_state(WorldState(chapter_index=1, location="青云城", time="春"))
+        supervisor = _supervisor(storybible)
+
+        asyncio.run(supervisor.review("林风独自赶路。", 2, _outline(["林风"])))
+        assert _called(supervisor) == {
+            "ConsistencyChecker", "CharacterArcChecker", "PlotThreadChecker", "WorldStateChecker"
+        }
+
+    def test_unrelated_thread_and_unstaged_arc_are_skipped(self):
+        """Test threads far from this chapter and arcs without stages do not trigger checks"""
+        storybible = StoryBible()
+        storybible.add_character_arc(CharacterArc(name="林风"))
+        storybible.add_plot_thread(PlotThread(id="t1", name="魔宗秘宝", status="foreshadowed",
+                                              setup_chapter=1, expected_payoff_range="20-30"))
+        decisions = CheckPlanner(_supervisor(storybible).check_agents).plan(
+            storybible, "林风独自赶路。", 2, _outline(["林风"])
+        )
+        assert [d.needed for d in decisions] == [True, False, False, False]
+
+    def test_gate_can_be_disabled(self):
+        """Test gate_checks=False restores the full dispatch"""
+        supervisor = _supervisor(StoryBible())
+        supervisor.gate_checks = False
+        asyncio.run(supervisor.review("林风独自赶路。", 2))
+        assert len(_called(supervisor)) == 4
+        assert supervisor.dispatch_stats.skipped == 0
+
+
+class TestEarlyDecision:
+    """Tests for the early-decision short-circuit"""
+
+    def _supervisor(self) -> WritingSupervisor:
+        supervisor = _supervisor(StoryBible())
+        supervisor.gate_checks = False
+        supervisor.early_decision.enabled = True
+        blocking = SubAgentReport(
+            agent_name="ConsistencyChecker", category=CheckCategory.CONSISTENCY, confidence=0.9,
+            issues=[{"type": "timeline", "issue": "时间倒流", "location": "第1行", "suggestion": "调整顺序",
+                     "severity": "high", "confidence": 0.9}],
+        )
+        supervisor.check_agents[0].check = AsyncMock(return_value=blocking)
+
+        async def slow_check(*args):
+            await asyncio.sleep(10)
+        for agent in supervisor.check_agents[1:]:
+            agent.check = AsyncMock(side_effect=slow_check)
+        return supervisor
+
+    def test_blocking_issue_cancels_remaining_checks(self):
+        """Test a high-priority issue ends the review without the reflection call"""
+        supervisor = self._supervisor()
+        result = asyncio.run(asyncio.wait_for(supervisor.review("第三天。\n第一天。", 2), timeout=5))
+
+        assert result.needs_revision is True
+        assert result.suggestions[0].issue == "时间倒流"
+        assert result.suggestions[0].current_text == "第三天。"
+        assert "提前决策" in result.reasoning
+        assert not supervisor.reflection_agent.evaluate.called
+
+    def test_low_confidence_or_disabled_waits_for_all(self):
+        """Test issues below the thresholds do not short-circuit"""
+        from src.multi_agent.dispatch import EarlyDecisionPolicy, issue_priority
+        from src.multi_agent.types import Priority
+
+        policy = EarlyDecisionPolicy(enabled=True, min_confidence=0.95)
+        report = SubAgentReport(agent_name="x", category=CheckCategory.CONSISTENCY, confidence=0.9,
+                                issues=[{"type": "timeline", "issue": "时间倒流", "severity": "high", "confidence": 0.9}])
+        assert policy.blocking_issues(report) == []
+        assert EarlyDecisionPolicy().blocking_issues(report) == []
+        # 按类型推断的优先级（如规则检查的时间线命中）不触发提前决策
+        unrated = SubAgentReport(agent_name="x", category=CheckCategory.CONSISTENCY, confidence=0.85,
+                                 issues=[{"type": "timeline", "issue": "时间倒流"},
+                                         {"type": "consistency", "issue": "称呼不一致", "confidence": 0.99}])
+        assert EarlyDecisionPolicy(enabled=True).blocking_issues(unrated) == []
+        medium = EarlyDecisionPolicy(enabled=True, min_priority=Priority.MEDIUM)
+        assert medium.blocking_issues(SubAgentReport(
+            agent_name="x", category=CheckCategory.CONSISTENCY,
+            issues=[{"type": "arc", "issue": "动机不足", "severity": "medium", "confidence": 0.85}],
+        ))
+        assert issue_priority({"type": "world_state", "severity": "error"}) == Priority.HIGH
+        assert issue_priority({"type": "arc"}) == Priority.MEDIUM
+
+        supervisor = _supervisor(StoryBible())
+        asyncio.run(supervisor.review("林风赶路。", 2))
+        assert supervisor.reflection_agent.evaluate.called
+
+    def test_policy_follows_novel_state(self):
+        """Test supervisor_node applies the NovelState switch and thresholds on every review"""
+        from src.multi_agent.types import Priority
+        from src.state import NovelState
+        from src.supervisor_node import init_supervisor_node, supervisor_node
+
+        supervisor = init_supervisor_node(MagicMock())
+        supervisor.review = AsyncMock(return_value=ReviewResult(chapter_index=0, needs_revision=False, quality_score=8.0))
+        state = NovelState(user_intent="测试", raw_current_chapter="林风赶路。", early_decision=True,
+                           early_decision_priority="medium", early_decision_confidence=0.6)
+        supervisor_node(state)
+        assert supervisor.early_decision.enabled is True
+        assert supervisor.early_decision.min_priority == Priority.MEDIUM
+        assert supervisor.early_decision.min_confidence == 0.6
+
+        supervisor_node(state.model_copy(update={"early_decision": False}))
+        assert supervisor.early_decision.enabled is False
@@ -0,0 +1,134 @@
+"""
+Unit tests for delta-based checkpoints in StateManager
+"""
+import json
+import pytest
+import shutil
+from pathlib import Path
+from src.core.state_manager import StateManager
+from src.storage import NovelStorage
+from src.model import ChapterContent
+
+TITLE = "测试增量检查点小说"
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return StateManager(storage_dir=str(tmp_path))
+
+
+@pytest.fixture
+def storage(sample_novel_outline):
+    storage = NovelStorage(TITLE)
+    storage.save_outline(sample_novel_outline)
+    yield storage
+    shutil.rmtree(Path(f"result/{TITLE}_storage"), ignore_errors=True)
+
+
+class TestCheckpointDelta:
+    def test_only_changed_fields_are_appended(self, manager, tmp_path):
+        manager.save_checkpoint("wf", {"user_intent": "修仙", "current_chapter_index": 0})
+        manager.save_checkpoint("wf", {"user_intent": "修仙", "current_chapter_index": 1})
+
+        lines = (tmp_path / "wf_checkpoint.log").read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 1
+        delta = json.loads(lines[0])
+        assert delta["current_chapter_index"] == 1
+        assert "user_intent" not in delta
+
+    def test_partial_update_keeps_previous_fields(self, manager):
+        manager.save_checkpoint("wf", {"user_intent": "修仙", "completed_chapters": [{"title": "一"}]})
+        manager.save_checkpoint("wf", {"current_node": "evaluate_chapter"})
+
+        reloaded = StateManager(storage_dir=str(manager.storage_dir)).load_checkpoint("wf")
+        assert reloaded["user_intent"] == "修仙"
+        assert reloaded["completed_chapters"] == [{"title": "一"}]
+        assert reloaded["current_node"] == "evaluate_chapter"
+
+    def test_compaction_folds_log_into_snapshot(self, manager, tmp_path):
+        manager.CHECKPOINT_COMPACT_EVERY = 3
+        for i in range(5):
+            manager.save_checkpoint("wf", {"current_chapter_index": i})
+
+        # 第 1 次写快照，第 2~4 次追加日志，第 5 次合并
+        assert not (tmp_path / "wf_checkpoint.log").exists()
+        raw = json.loads((tmp_path / "wf_checkpoint.json").read_text(encoding="utf-8"))
+        assert raw["current_chapter_index"] == 4
+
+    def test_truncated_log_line_is_skipped(self, manager, tmp_path):
+        manager.save_checkpoint("wf", {"current_chapter_index": 0})
+        manager.save_checkpoint("wf", {"current_chapter_index": 2})
+        with open(tmp_path / "wf_checkpoint.log", "a", encoding="utf-8") as f:
+            f.write('{"current_chapter_index": 3')
+
+        assert StateManager(storage_dir=str(tmp_path)).load_checkpoint("wf")["current_chapter_index"] == 2
+
+    def test_clear_removes_snapshot_and_log(self, manager):
+        manager.save_checkpoint("wf", {"current_chapter_index": 0})
+        manager.save_checkpoint("wf", {"current_chapter_index": 1})
+        assert manager.clear_checkpoint("wf") is True
+        assert manager.has_checkpoint("wf") is False
+        assert manager.load_checkpoint("wf") is None
+
+    def test_cache_sees_writes_from_other_manager(self, manager, tmp_path):
+        manager.save_checkpoint("wf", {"user_intent": "修仙", "current_chapter_index": 0})
+        other = StateManager(storage_dir=str(tmp_path))
+        other.save_checkpoint("wf", {"current_chapter_index": 3})
+
+        assert manager.load_checkpoint("wf")["current_chapter_index"] == 3
+        manager.save_checkpoint("wf", {"current_node": "write_chapter"})
+        reloaded = StateManager(storage_dir=str(tmp_path)).load_checkpoint("wf")
+        assert reloaded["current_chapter_index"] == 3
+        assert reloaded["current_node"] == "write_chapter"
+
+    def test_rebuild_catalog_does_not_fill_cache(self, manager, tmp_path):
+        manager.save_checkpoint("wf", {"current_chapter_index": 1})
+        (tmp_path / "_catalog.json").unlink()
+        fresh = StateManager(storage_dir=str(tmp_path))
+
+        assert [w.workflow_id for w in fresh.get_interrupted_workflows()] == ["wf"]
+        assert fresh._checkpoint_cache == {}
+
+    def test_outline_saved_in_storage_is_referenced(self, manager, tmp_path, storage, sample_novel_outline):
+        manager.save_checkpoint("wf", {"novel_title": TITLE, "validated_outline": sample_novel_outline})
+
+        raw = json.loads((tmp_path / "wf_checkpoint.json").read_text(encoding="utf-8"))
+        assert raw["validated_outline"] == {"$ref": "storage:load_outline"}
+        loaded = manager.load_checkpoint("wf")
+        assert loaded["validated_outline"] == sample_novel_outline.model_dump(mode="json")
+
+    def test_chapter_draft_stored_as_reference(self, manager, tmp_path, storage):
+        draft = ChapterContent(title="第3章", content="林风推开山门。" * 200)
+        manager.save_checkpoint("wf", {
+            "novel_title": TITLE, "current_chapter_index": 2,
+            "validated_chapter_draft": draft, "raw_current_chapter": draft.model_dump_json(),
+        })
+        raw = json.loads((tmp_path / "wf_checkpoint.json").read_text(encoding="utf-8"))
+        assert raw["validated_chapter_draft"] == {"$ref": "storage:checkpoint_draft", "chapter": 2}
+        assert raw["raw_current_chapter"] == {"$ref": "storage:checkpoint_draft", "chapter": 2}
+
+        revised = draft.model_copy(update={"content": "林风转身下山。"})
+        manager.save_checkpoint("wf", {"validated_chapter_draft": revised})
+        # 引用未变，增量日志不再重复整章正文
+        assert "林风" not in (tmp_path / "wf_checkpoint.log").read_text(encoding="utf-8")
+
+        loaded = StateManager(storage_dir=str(tmp_path)).load_checkpoint("wf")
+        assert loaded["validated_chapter_draft"] == revised.model_dump(mode="json")
+        assert loaded["raw_current_chapter"] == draft.model_dump_json()
+
+
+
+class TestRecordStep:
+    def test_state_file_keeps_config_and_summary(self, manager):
+        manager.create_workflow_record("wf", "修仙", {"config": {"model_type": "api"}})
+        manager.record_step("wf", "generate_chapter", {
+            "current_chapter_index": 3,
+            "completed_chapters": [{"title": "一"}],
+        }, progress=0.4)
+
+        state = manager.load_state("wf")
+        assert state["config"] == {"model_type": "api"}
+        assert state["current_node"] == "generate_chapter"
+        assert state["progress"] == 0.4
+        assert "completed_chapters" not in state
+        assert manager.load_checkpoint("wf")["completed_chapters"] == [{"title": "一"}]
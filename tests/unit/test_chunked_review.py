@@ -0,0 +1,135 @@
+"""
+Unit tests for map-reduce chunked checking of long chapters
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from src.multi_agent import StoryBible, WritingSupervisor
+from src.multi_agent.chunking import merge_window_reports, review_excerpt, split_windows
+from src.multi_agent.types import CheckCategory, ReviewResult, SubAgentReport
+
+PARAGRAPHS = [f"第{i}段，林风沿着山道继续前行，夜色渐深。" for i in range(40)]
+CHAPTER = "\n".join(PARAGRAPHS)
+
+
+def _report(issues, updates=None) -> SubAgentReport:
+    return SubAgentReport(agent_name="ConsistencyChecker", category=CheckCategory.CONSISTENCY,
+                          issues=issues, updates=updates or [], reasoning="ok", confidence=0.85)
+
+
+class TestSplitWindows:
+    """Tests for split_windows"""
+
+    def test_short_chapter_single_window(self):
+        """Test chapters under the limit are checked whole"""
+        windows = split_windows(CHAPTER, max_chars=len(CHAPTER))
+        assert len(windows) == 1
+        assert windows[0].text == CHAPTER
+
+    def test_windows_cover_chapter_with_overlap(self):
+        """Test windows follow paragraph boundaries, overlap and cover every paragraph"""
+        windows = split_windows(CHAPTER, max_chars=200, overlap=2)
+
+        assert len(windows) > 1
+        assert all(len(w.text) <= 200 for w in windows)
+        assert windows[0].start == 0 and windows[-1].end == len(PARAGRAPHS)
+        for previous, current in zip(windows, windows[1:]):
+            assert current.start == previous.end - 2
+        for w in windows:
+            assert w.paragraphs == PARAGRAPHS[w.start:w.end]
+
+    def test_oversized_paragraph_is_own_window(self):
+        """Test a paragraph longer than the limit is not cut"""
+        chapter = "短段\n" + "长" * 300 + "\n短段"
+        windows = split_windows(chapter, max_chars=100, overlap=0)
+        assert [len(w.paragraphs) for w in windows] == [1, 1, 1]
+        assert windows[1].text == "长" * 300
+
+
+class TestMergeWindowReports:
+    """Tests for merge_window_reports"""
+
+    def test_relocate_and_dedupe_overlap(self):
+        """Test window line numbers map to chapter lines and overlap duplicates collapse"""
+        windows = split_windows(CHAPTER, max_chars=200, overlap=2)
+        second = windows[1]
+        shared_line = second.start + 1  # 1-based 全文行号，位于重叠区域
+        reports = [
+            _report([{"type": "timeline", "issue": "时间矛盾", "location": f"第{shared_line}行"}]),
+            _report([
+                {"type": "timeline", "issue": "时间前后矛盾", "location": "第1行"},
+                {"type": "consistency", "issue": "地点跳跃", "location": "第3段"},
+            ]),
+        ] + [None] * (len(windows) - 2)
+
+        merged = merge_window_reports(windows, reports)
+        locations = [(i["type"], i["location"]) for i in merged.issues]
+        assert locations == [("timeline", f"第{shared_line}行"), ("consistency", f"第{second.start + 3}段")]
+
+    def test_same_window_issues_on_one_line_are_kept(self):
+        """Test distinct issues of one type on the same line within a window are not merged"""
+        windows = split_windows(CHAPTER, max_chars=200)[:1]
+        reports = [_report([
+            {"type": "consistency", "issue": "地点跳跃", "location": "第2行"},
+            {"type": "consistency", "issue": "人物称呼不一致", "location": "第2行"},
+        ])]
+        merged = merge_window_reports(windows, reports)
+        assert [i["issue"] for i in merged.issues] == ["地点跳跃", "人物称呼不一致"]
+
+    def test_keeps_last_world_state(self):
+        """Test only the final window's world state update is kept"""
+        windows = split_windows(CHAPTER, max_chars=200)[:2]
+        reports = [
+            _report([], [{"type": "world_state_update", "state": "山脚"}]),
+            _report([], [{"type": "world_state_update", "state": "山顶"}]),
+        ]
+        merged = merge_window_reports(windows, reports)
+        assert merged.updates == [{"type": "world_state_update", "state": "山顶"}]
+
+    def test_parse_failure_in_any_window_marks_report(self):
+        """Test one unparsed window marks the merged report as unparsed"""
+        windows = split_windows(CHAPTER, max_chars=200)[:2]
+        failed = _report([])
+        failed.parse_failed = True
+        merged = merge_window_reports(windows, [_report([]), failed])
+        assert merged.parse_failed is True
+        assert merge_window_reports(windows, [_report([]), _report([])]).parse_failed is False
+
+
+class TestReviewExcerpt:
+    """Tests for review_excerpt"""
+
+    def test_excerpt_covers_whole_chapter(self):
+        """Test the judge sees text from the end of a long chapter, not just the head"""
+        excerpt = review_excerpt(CHAPTER, max_chars=600)
+        assert len(excerpt) < len(CHAPTER)
+        assert PARAGRAPHS[0] in excerpt
+        assert any(p in excerpt for p in PARAGRAPHS[30:])
+        assert review_excerpt(CHAPTER, max_chars=len(CHAPTER)) == CHAPTER
+
+
+class TestSupervisorChunkedReview:
+    """Tests for WritingSupervisor chunked checking"""
+
+    def test_long_chapter_checked_per_window(self):
+        """Test each checker runs once per window and issues come back with chapter lines"""
+        supervisor = WritingSupervisor(MagicMock())
+        supervisor.storybible = StoryBible()
+        supervisor.gate_checks = False
+        supervisor.chunk_chars = 200
+        for agent in supervisor.check_agents:
+            agent.check = AsyncMock(return_value=SubAgentReport(
+                agent_name=agent.agent_name, category=CheckCategory.QUALITY,
+                issues=[{"type": "quality", "issue": "节奏拖沓", "location": "第2行"}],
+            ))
+        supervisor.reflection_agent.evaluate = AsyncMock(return_value=ReviewResult(
+            chapter_index=0, needs_revision=False, quality_score=8.0
+        ))
+
+        asyncio.run(supervisor.review(CHAPTER, 0))
+
+        windows = split_windows(CHAPTER, 200)
+        agent = supervisor.check_agents[0]
+        assert agent.check.await_count == len(windows)
+        reports = supervisor.reflection_agent.evaluate.call_args.kwargs["check_results"]
+        assert [i["location"] for i in reports[0].issues] == [f"第{w.start + 2}行" for w in windows]
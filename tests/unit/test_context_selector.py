@@ -0,0 +1,77 @@
+"""
+Unit tests for relevance-ranked, token-budgeted StoryBible context selection
+"""
+from src.model import ChapterOutline, CharacterArc, PlotThread
+from src.multi_agent import StoryBible
+from src.multi_agent.context_selector import (
+    ChapterFocus, score_character_arc, score_plot_thread, select_lines
+)
+from src.utils import estimate_tokens
+
+
+def _outline(characters, events):
+    return ChapterOutline(
+        title="第五百章 重返青云山", summary="林远回到青云山寻找师父的下落",
+        key_events=events, characters_involved=characters, setting="青云山"
+    )
+
+
+def _large_storybible(n_threads=1000, n_arcs=200):
+    sb = StoryBible()
+    for i in range(n_arcs):
+        sb.add_character_arc(CharacterArc(name=f"路人{i}", emotional_state="平静"))
+    sb.add_character_arc(CharacterArc(name="林远", emotional_state="焦急"))
+    for i in range(n_threads):
+        sb.add_plot_thread(PlotThread(
+            id=f"t{i}", name=f"情节线 {i}", status="active", setup_chapter=i + 1,
+            description=f"第{i}章的日常事件"
+        ))
+    return sb
+
+
+class TestScoring:
+    def test_involved_character_scores_highest(self):
+        focus = ChapterFocus(499, _outline(["林远"], ["林远发现师父留下的玉简"]))
+        assert score_character_arc(CharacterArc(name="林远"), focus) > score_character_arc(CharacterArc(name="路人"), focus)
+
+    def test_overdue_thread_outranks_distant_thread(self):
+        focus = ChapterFocus(499)
+        overdue = PlotThread(id="a", name="神秘玉简", status="foreshadowed", setup_chapter=3, expected_payoff_range="10-20")
+        distant = PlotThread(id="b", name="集市风波", status="foreshadowed", setup_chapter=3)
+        assert score_plot_thread(overdue, focus) > score_plot_thread(distant, focus)
+
+    def test_select_lines_respects_budget_and_order(self):
+        entries = [("a", 1.0, "甲" * 30), ("b", 5.0, "乙" * 30), ("c", 3.0, "丙" * 30)]
+        selected, omitted = select_lines(entries, token_budget=25)
+        assert [item for item, _ in selected] == ["b", "c"]
+        assert omitted == 1
+
+
+class TestBudgetedLayeredContext:
+    def test_small_storybible_is_not_filtered(self):
+        sb = StoryBible()
+        sb.add_plot_thread(PlotThread(id="t", name="失踪的师父", status="active", setup_chapter=1))
+        assert "未列出" not in sb.format_layered_context(0, _outline(["林远"], []))
+
+    def test_prompt_size_stays_flat(self):
+        outline = _outline(["林远"], ["林远寻找师父"])
+        small = _large_storybible(n_threads=200, n_arcs=50).format_layered_context(499, outline)
+        large = _large_storybible(n_threads=2000, n_arcs=400).format_layered_context(499, outline)
+        assert estimate_tokens(large) < 1.2 * estimate_tokens(small)
+        assert estimate_tokens(large) < StoryBible.DEFAULT_CONTEXT_TOKEN_BUDGET + 200
+
+    def test_relevant_items_survive_selection(self):
+        sb = _large_storybible()
+        sb.add_plot_thread(PlotThread(
+            id="jade", name="师父的玉简", status="foreshadowed", setup_chapter=5,
+            expected_payoff_range="10-20", description="师父留下的玉简"
+        ))
+        text = sb.format_layered_context(499, _outline(["林远"], ["林远寻找师父的玉简"]))
+        assert "- 林远：焦急" in text
+        assert "[伏笔] 师父的玉简" in text
+        assert "未列出" in text
+        assert "[进行] 情节线 499" in text
+
+    def test_explicit_budget_overrides_default(self):
+        sb = _large_storybible(n_threads=50, n_arcs=5)
+        assert "未列出" not in sb.format_layered_context(10, token_budget=0)
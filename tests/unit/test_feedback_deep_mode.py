@@ -108,3 +108,10 @@ class TestCheckChapterFeedbackDeepModeNode:
                           chapter_feedback_action="unknown_action")
         result = check_chapter_feedback_deep_mode_node(state)
         assert result == "failure"
+
+    def test_fused_mode_routes_like_deep(self):
+        """evaluation_mode=fused also skips the evaluation chain"""
+        from src.feedback_nodes import check_chapter_feedback_deep_mode_node
+
+        assert check_chapter_feedback_deep_mode_node(make_state(gradio_mode=True, evaluation_mode="fused")) == "deep_skip"
+        assert check_chapter_feedback_deep_mode_node(make_state(evaluation_mode="fused")) == "deep_skip"
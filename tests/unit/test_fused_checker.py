@@ -0,0 +1,83 @@
+"""
+Unit tests for the fused single-call supervisor review
+"""
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+from src.model import PlotThread
+from src.multi_agent import FusedChecker, WritingSupervisor
+from src.multi_agent.types import CheckCategory, Priority
+from src.state import QualityEvaluation
+
+RESPONSE = {
+    "consistency": {"issues": [], "reasoning": "无矛盾"},
+    "character_arc": {"issues": [], "updates": [], "reasoning": "符合弧线"},
+    "plot_thread": {"issues": [], "updates": [{"action": "payoff", "thread_id": "t1"}], "reasoning": "回收伏笔"},
+    "world_state": {"issues": [{"type": "world_state", "issue": "地点跳跃", "suggestion": "补充过渡"}],
+                    "updates": [], "reasoning": "地点突变"},
+    "verdict": {
+        "quality_score": 6.5, "needs_revision": True, "reasoning": "需修订地点过渡",
+        "suggestions": [{"category": "world_state", "priority": "high", "issue": "地点跳跃",
+                         "location": "第2段", "current_text": "", "suggested_change": "补充过渡"}],
+    },
+}
+
+
+def _model(response: str) -> MagicMock:
+    model = MagicMock()
+    model.generate.return_value = response
+    return model
+
+
+class TestFusedChecker:
+    """Tests for FusedChecker"""
+
+    def test_sections_map_to_reports_and_result(self):
+        """Test one call yields four reports plus a ReviewResult"""
+        model = _model("```json\n" + json.dumps(RESPONSE, ensure_ascii=False) + "\n```")
+        reports, result = asyncio.run(FusedChecker(model).review("林风赶路。", 3, "上下文"))
+
+        assert model.generate.call_count == 1
+        assert [r.category for r in reports] == [
+            CheckCategory.CONSISTENCY, CheckCategory.CHARACTER_ARC,
+            CheckCategory.PLOT_THREAD, CheckCategory.WORLD_STATE,
+        ]
+        assert reports[2].agent_name == "PlotThreadChecker"
+        assert reports[2].updates == [{"action": "payoff", "thread_id": "t1"}]
+        assert reports[3].issues[0]["issue"] == "地点跳跃"
+        assert result.needs_revision is True
+        assert result.quality_score == 6.5
+        assert result.suggestions[0].priority == Priority.HIGH
+        assert QualityEvaluation.from_review_result(result).passes is False
+
+    def test_unparseable_response_does_not_invent_issues(self):
+        """Test a parse failure leaves reports empty and falls back to rule scoring"""
+        reports, result = asyncio.run(FusedChecker(_model("无法输出")).review("林风赶路。", 0, ""))
+        assert all(r.issues == [] for r in reports)
+        assert all(r.parse_failed for r in reports) and result.parse_failed
+        assert result.needs_revision is False
+        assert result.quality_score > 7.0
+
+
+class TestSupervisorFusedMode:
+    """Tests for WritingSupervisor.review(fused=True)"""
+
+    def test_fused_review_skips_split_agents(self):
+        """Test fused mode makes one call and still updates the StoryBible"""
+        model = _model(json.dumps(dict(RESPONSE, verdict={"quality_score": 9, "needs_revision": False}),
+                                  ensure_ascii=False))
+        supervisor = WritingSupervisor(model)
+        supervisor.storybible.add_plot_thread(PlotThread(id="t1", name="失踪的师父", status="foreshadowed",
+                                                         setup_chapter=1))
+        for agent in supervisor.check_agents:
+            agent.check = AsyncMock()
+        supervisor.reflection_agent.evaluate = AsyncMock()
+
+        result = asyncio.run(supervisor.review("林风赶路。", 2, fused=True))
+
+        assert result.needs_revision is False
+        assert model.generate.call_count == 1
+        assert all(not agent.check.called for agent in supervisor.check_agents)
+        assert not supervisor.reflection_agent.evaluate.called
+        assert supervisor.storybible.get_plot_thread("t1").status == "resolved"
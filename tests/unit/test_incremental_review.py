@@ -0,0 +1,122 @@
+"""
+Unit tests for diff-aware incremental re-review of revised chapters
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from src.multi_agent import StoryBible, WritingSupervisor
+from src.multi_agent.incremental import ELISION, DraftRecord, IncrementalPlan, paragraph_hashes, split_paragraphs
+from src.multi_agent.sub_agents import WorldStateChecker
+from src.multi_agent.types import CheckCategory, ReviewResult, SubAgentReport
+
+PARAGRAPHS = [f"第{i}段，林风继续赶路。" for i in range(20)]
+DRAFT = "\n".join(PARAGRAPHS)
+
+
+def _revised(index: int, text: str) -> str:
+    paragraphs = list(PARAGRAPHS)
+    paragraphs[index] = text
+    return "\n".join(paragraphs)
+
+
+def _record(issues, updates=(), agent_name="ConsistencyChecker", draft=DRAFT) -> DraftRecord:
+    report = SubAgentReport(agent_name=agent_name, category=CheckCategory.CONSISTENCY,
+                            issues=issues, updates=list(updates))
+    return DraftRecord(0, paragraph_hashes(split_paragraphs(draft)), [report])
+
+
+class TestIncrementalPlan:
+    """Tests for IncrementalPlan"""
+
+    def test_excerpt_covers_changed_region_and_window(self):
+        """Test only the changed paragraph plus context lines are sent"""
+        plan = IncrementalPlan(_record([]), _revised(10, "林风改道向西。"), context_lines=2)
+
+        assert plan.changed == {10}
+        assert plan.window == {8, 9, 10, 11, 12}
+        lines = plan.excerpt.split("\n")
+        assert lines[0] == ELISION and lines[-1] == ELISION
+        assert lines[3] == "林风改道向西。"
+        assert plan.worthwhile
+
+    def test_remap_and_carry_forward(self):
+        """Test excerpt line numbers map back and issues outside the window are kept"""
+        old_issues = [
+            {"type": "timeline", "issue": "远处矛盾", "location": "第3行"},
+            {"type": "timeline", "issue": "改动处矛盾", "location": "第11行"},
+            {"type": "consistency", "issue": "无定位问题"},
+        ]
+        plan = IncrementalPlan(_record(old_issues), "新增开头\n" + _revised(10, "林风改道向西。"), context_lines=1)
+
+        new_report = SubAgentReport(agent_name="ConsistencyChecker", category=CheckCategory.CONSISTENCY,
+                                    issues=[{"type": "timeline", "issue": "新问题", "location": "第4行"}])
+        remapped = plan.remap(new_report)
+        # 摘录第 4 行是新稿第 11 行（插入开头后原第 10 段的上一段）
+        assert remapped.issues[0]["location"] == "第11行"
+
+        merged = plan.merge([remapped])[0]
+        issues = {i["issue"]: i.get("location") for i in merged.issues}
+        assert issues == {"新问题": "第11行", "远处矛盾": "第4行"}
+
+    def test_only_updates_outside_window_are_carried(self):
+        """Test old updates are kept only when located on unchanged paragraphs outside the window"""
+        old_updates = [
+            {"thread_id": "t1", "action": "payoff", "location": "第3行"},
+            {"thread_id": "t2", "action": "payoff", "location": "第11行"},
+            {"thread_id": "t3", "action": "payoff"},
+        ]
+        plan = IncrementalPlan(_record([], old_updates, "PlotThreadChecker"), _revised(10, "林风改道向西。"),
+                               context_lines=1)
+        new_report = SubAgentReport(agent_name="PlotThreadChecker", category=CheckCategory.PLOT_THREAD)
+
+        merged = plan.merge([new_report])[0]
+        assert merged.updates == [{"thread_id": "t1", "action": "payoff", "location": "第3行"}]
+
+    def test_world_state_extracted_from_full_draft(self):
+        """Test old world-state updates are dropped and re-extracted from the full revised draft"""
+        checker = WorldStateChecker(MagicMock())
+        old_draft = _revised(5, "林风在山门看到师兄。")
+        new_draft = _revised(5, "林风在京城看到师兄。")
+        old_state = checker.rule_findings(old_draft, 0)[1]
+        plan = IncrementalPlan(_record([], old_state, "WorldStateChecker", old_draft), new_draft, context_lines=1)
+        new_report = SubAgentReport(agent_name="WorldStateChecker", category=CheckCategory.WORLD_STATE,
+                                    updates=checker.rule_findings(plan.excerpt, 0)[1])
+
+        merged = plan.refresh_rules(plan.merge([new_report]), [checker], 0)[0]
+        assert [u["state"].location for u in merged.updates] == ["京城"]
+
+    def test_large_rewrite_falls_back_to_full_review(self):
+        """Test rewriting most paragraphs is not worth an incremental pass"""
+        plan = IncrementalPlan(_record([]), "\n".join(f"全新的第{i}段" for i in range(20)))
+        assert not plan.worthwhile
+        assert not IncrementalPlan(_record([]), DRAFT).worthwhile
+
+
+class TestSupervisorIncrementalReview:
+    """Tests for WritingSupervisor incremental re-review"""
+
+    def test_revision_sends_excerpt_to_checkers(self):
+        """Test the second review of a rejected chapter only checks the diff"""
+        supervisor = WritingSupervisor(MagicMock())
+        supervisor.storybible = StoryBible()
+        supervisor.gate_checks = False
+        for agent in supervisor.check_agents:
+            agent.check = AsyncMock(return_value=SubAgentReport(agent_name=agent.agent_name,
+                                                                 category=CheckCategory.QUALITY))
+        supervisor.reflection_agent.evaluate = AsyncMock(return_value=ReviewResult(
+            chapter_index=0, needs_revision=True, quality_score=6.0
+        ))
+
+        asyncio.run(supervisor.review(DRAFT, 0))
+        first_text = supervisor.check_agents[0].check.call_args.args[0]
+        assert first_text == DRAFT
+
+        asyncio.run(supervisor.review(_revised(5, "林风改道向西。"), 0))
+        second_text = supervisor.check_agents[0].check.call_args.args[0]
+        assert "林风改道向西。" in second_text
+        assert len(second_text) < len(DRAFT) / 2
+        # 反思评估仍然看到完整新稿
+        assert supervisor.reflection_agent.evaluate.call_args.kwargs["chapter"] == _revised(5, "林风改道向西。")
+
+        supervisor.commit_review(0)
+        assert supervisor._drafts == {}
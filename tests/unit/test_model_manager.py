@@ -5,8 +5,11 @@ import pytest
 import asyncio
 from contextlib import asynccontextmanager
 from unittest.mock import MagicMock, patch, AsyncMock
-from src.model_manager import ModelManager, APIModelManager, LocalModelManager, create_model_manager
-from src.config_loader import BaseConfig, ModelConfig
+from src.model_manager import ModelManager, APIModelManager, LocalModelManager, create_model_manager, create_model_registry
+from src.config_loader import AgentModelConfig, BaseConfig, ModelConfig
+
+# config_loader 导出的是从环境变量加载的实例，测试需要它的类
+AgentModels = type(AgentModelConfig)
 
 
 class TestModelManagerInterface:
@@ -383,3 +386,37 @@ class TestCreateModelManager:
         config = ModelConfig(model_type="unknown")
         manager = create_model_manager(config)
         assert isinstance(manager, APIModelManager)
+
+
+class TestModelManagerRegistry:
+    """Tests for create_model_registry per-role routing"""
+
+    @staticmethod
+    def _config(**kwargs):
+        return ModelConfig(model_type="api", model_name="writer-model", api_url="https://api.test.com",
+                           api_key="test-key", **kwargs)
+
+    def test_roles_use_configured_models_and_share_clients(self):
+        """Test role managers switch model but share the default manager's clients and limiter"""
+        agent_models = AgentModels(specialist_model="fast-model", supervisor_model="judge-model")
+        registry = create_model_registry(self._config(), agent_models=agent_models)
+
+        specialist = registry.get("specialist")
+        assert registry.get("writer") is registry.default
+        assert specialist.model_name == "fast-model"
+        assert registry.model_name("supervisor") == "judge-model"
+        assert registry.default.model_name == "writer-model"
+        assert specialist.async_client is registry.default.async_client
+        assert specialist.semaphore is registry.default.semaphore
+
+    def test_roles_with_same_model_share_manager(self):
+        """Test roles configured with the same model reuse one manager"""
+        agent_models = AgentModels(specialist_model="fast-model", supervisor_model="fast-model")
+        registry = create_model_registry(self._config(api_type="anthropic"), agent_models=agent_models)
+        assert registry.get("specialist") is registry.get("supervisor")
+
+    def test_unconfigured_roles_use_default(self):
+        """Test class defaults are not applied unless set explicitly"""
+        registry = create_model_registry(self._config(), agent_models=AgentModels())
+        assert all(registry.get(role) is registry.default for role in ("writer", "supervisor", "specialist"))
+
@@ -0,0 +1,90 @@
+"""
+Unit tests for the shared review prompt prefix and prompt cache accounting
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from src.config_loader import BaseConfig
+from src.model_manager import APIModelManager
+from src.multi_agent import StoryBible, WritingSupervisor
+from src.prompt_cache import (
+    cached_block, record_usage, text_block, to_anthropic_messages, to_openai_messages, track_prompt_usage,
+)
+
+CHAPTER = "林风推开山门，夜色正浓。\n他握紧长剑，踏上石阶。"
+MESSAGES = [
+    {"role": "system", "content": "系统"},
+    {"role": "user", "content": [cached_block("共享前缀"), text_block("任务")]},
+]
+
+
+def _anthropic_response(text: str = "{}", **usage):
+    return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)], usage=SimpleNamespace(**usage))
+
+
+class TestMessageConversion:
+    """Tests for content block conversion per API type"""
+
+    def test_openai_flattens_blocks(self):
+        """Test cache_control never reaches OpenAI-compatible APIs"""
+        messages = to_openai_messages(MESSAGES)
+        assert messages[1]["content"] == "共享前缀\n\n任务"
+        assert to_openai_messages(messages) is messages
+
+    def test_anthropic_keeps_breakpoint(self):
+        """Test Anthropic messages keep the cache_control breakpoint on the prefix"""
+        system, messages = to_anthropic_messages(MESSAGES)
+        assert system == "系统"
+        assert messages[0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+
+    def test_anthropic_manager_sends_cache_control_and_records_usage(self):
+        """Test APIModelManager emits breakpoints and reports cached tokens"""
+        manager = APIModelManager(api_url="http://test", api_key="k", model_name="m", api_type="anthropic")
+        manager.async_client = MagicMock()
+        manager.async_client.messages.create = AsyncMock(return_value=_anthropic_response(
+            input_tokens=20, cache_read_input_tokens=900, cache_creation_input_tokens=0
+        ))
+
+        async def run():
+            with track_prompt_usage() as usage:
+                await manager.async_generate(MESSAGES, BaseConfig())
+            return usage
+
+        usage = asyncio.run(run())
+        sent = manager.async_client.messages.create.call_args.kwargs["messages"]
+        assert sent[0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+        assert (usage.calls, usage.input_tokens, usage.cached_tokens) == (1, 920, 900)
+
+    def test_openai_usage(self):
+        """Test OpenAI cached_tokens are read from prompt_tokens_details"""
+        response = SimpleNamespace(usage=SimpleNamespace(
+            prompt_tokens=1000, prompt_tokens_details=SimpleNamespace(cached_tokens=768)
+        ))
+        with track_prompt_usage() as usage:
+            record_usage(response)
+        record_usage(response)  # 不在统计上下文中时忽略
+        assert (usage.input_tokens, usage.cached_tokens) == (1000, 768)
+        assert round(usage.hit_rate, 3) == 0.768
+
+
+class TestSharedReviewPrefix:
+    """Tests for the canonical prefix shared by all review calls"""
+
+    def test_all_review_calls_share_prefix(self):
+        """Test the four checkers and ReflectionChecker send an identical leading prefix"""
+        manager = MagicMock(spec=["async_generate"])
+        manager.async_generate = AsyncMock(return_value='{"issues": [], "reasoning": "ok"}')
+        supervisor = WritingSupervisor(manager)
+        supervisor.storybible = StoryBible()
+        supervisor.gate_checks = False
+
+        asyncio.run(supervisor.review(CHAPTER, 0))
+
+        calls = [c.args[0] for c in manager.async_generate.await_args_list]
+        assert len(calls) == 5
+        prefixes = {(m[0]["content"], m[1]["content"][0]["text"]) for m in calls}
+        assert len(prefixes) == 1
+        assert CHAPTER in next(iter(prefixes))[1]
+        tasks = {m[1]["content"][1]["text"] for m in calls}
+        assert len(tasks) == 5
@@ -0,0 +1,140 @@
+"""
+Unit tests for the supervisor review-result cache
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from src.model import WorldState
+from src.multi_agent import StoryBible, WritingSupervisor
+from src.multi_agent.review_cache import ReviewCache
+from src.multi_agent.types import CheckCategory, Priority, ReviewResult, SubAgentReport, Suggestion
+
+CHAPTER = "林风推开山门，夜色正浓。\n他握紧长剑，踏上石阶。"
+
+
+def _supervisor() -> WritingSupervisor:
+    supervisor = WritingSupervisor(MagicMock())
+    supervisor.storybible = StoryBible()
+    supervisor.gate_checks = False
+    for agent in supervisor.check_agents:
+        agent.check = AsyncMock(return_value=SubAgentReport(agent_name=agent.agent_name,
+                                                             category=CheckCategory.QUALITY))
+    supervisor.reflection_agent.evaluate = AsyncMock(return_value=ReviewResult(
+        chapter_index=0, needs_revision=False, quality_score=8.5
+    ))
+    return supervisor
+
+
+class TestReviewCache:
+    """Tests for ReviewCache"""
+
+    def test_persistence_round_trip(self, tmp_path):
+        """Test reports with model updates survive a reload from disk"""
+        path = tmp_path / "review_cache.json"
+        state = WorldState(chapter_index=0, location="山门", time="夜")
+        report = SubAgentReport(agent_name="WorldStateChecker", category=CheckCategory.WORLD_STATE,
+                                updates=[{"type": "world_state_update", "state": state}])
+        result = ReviewResult(chapter_index=0, needs_revision=True, quality_score=6.5, suggestions=[
+            Suggestion(category=CheckCategory.CONSISTENCY, priority=Priority.HIGH, issue="时间矛盾",
+                       location="第1行", current_text="", suggested_change="统一时间")
+        ])
+        key = ReviewCache.make_key(CHAPTER, 0, "fp")
+        ReviewCache(path).put(key, [report], result)
+
+        reports, restored = ReviewCache(path).get(key)
+        assert reports[0].updates[0]["state"] == state
+        assert restored.suggestions[0].priority == Priority.HIGH
+        assert restored.quality_score == 6.5
+
+    def test_lru_cap(self):
+        """Test the least recently used entry is evicted past max_entries"""
+        cache = ReviewCache(max_entries=2)
+        result = ReviewResult(chapter_index=0, needs_revision=False)
+        for key in ("a", "b"):
+            cache.put(key, [], result)
+        cache.get("a")
+        cache.put("c", [], result)
+
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+
+
+class TestSupervisorReviewCache:
+    """Tests for WritingSupervisor review caching"""
+
+    def test_identical_review_skips_llm(self):
+        """Test re-reviewing the same chapter on the same StoryBible reuses the result"""
+        supervisor = _supervisor()
+        first = asyncio.run(supervisor.review(CHAPTER, 0))
+        second = asyncio.run(supervisor.review(CHAPTER, 0))
+
+        assert supervisor.reflection_agent.evaluate.await_count == 1
+        for agent in supervisor.check_agents:
+            assert agent.check.await_count == 1
+        assert second.quality_score == first.quality_score
+        assert supervisor.review_cache.hits == 1
+
+    def test_storybible_change_invalidates(self):
+        """Test a StoryBible change makes the next review miss the cache"""
+        supervisor = _supervisor()
+        asyncio.run(supervisor.review(CHAPTER, 0))
+        supervisor.storybible.append_world_state(WorldState(chapter_index=0, location="后山", time="清晨"))
+        asyncio.run(supervisor.review(CHAPTER, 0))
+
+        assert supervisor.reflection_agent.evaluate.await_count == 2
+        assert supervisor.review_cache.hits == 0
+
+    def test_failed_review_not_cached(self):
+        """Test a failed evaluation is retried rather than served from the cache"""
+        supervisor = _supervisor()
+        supervisor.reflection_agent.evaluate = AsyncMock(side_effect=RuntimeError("timeout"))
+        asyncio.run(supervisor.review(CHAPTER, 0))
+
+        assert len(supervisor.review_cache) == 0
+
+    def test_hit_after_reload(self, tmp_path):
+        """Test a new supervisor with a reloaded StoryBible hits the persisted cache"""
+        path = tmp_path / "review_cache.json"
+        first = _supervisor()
+        first.storybible.append_world_state(WorldState(chapter_index=0, location="山门", time="夜"))
+        content = first.storybible.to_content()
+        first.review_cache = ReviewCache(path)
+        asyncio.run(first.review(CHAPTER, 0))
+
+        second = _supervisor()
+        second.load_story_bible(content)
+        second.review_cache = ReviewCache(path)
+        asyncio.run(second.review(CHAPTER, 0))
+
+        assert second.reflection_agent.evaluate.await_count == 0
+        assert second.review_cache.hits == 1
+
+    def test_failed_checker_not_cached(self):
+        """Test a review missing a crashed checker is not served on retry"""
+        supervisor = _supervisor()
+        supervisor.check_agents[0].check = AsyncMock(side_effect=RuntimeError("timeout"))
+        asyncio.run(supervisor.review(CHAPTER, 0))
+
+        assert len(supervisor.review_cache) == 0
+
+    def test_unparsed_report_not_cached(self):
+        """Test a report flagged as unparsed is not cached even when its reasoning is prefixed"""
+        supervisor = _supervisor()
+        agent = supervisor.check_agents[0]
+        agent.check = AsyncMock(return_value=SubAgentReport(
+            agent_name=agent.agent_name, category=CheckCategory.QUALITY,
+            reasoning="[第1-20行] LLM 响应解析失败", parse_failed=True,
+        ))
+        asyncio.run(supervisor.review(CHAPTER, 0))
+
+        assert len(supervisor.review_cache) == 0
+
+    def test_key_includes_review_flags(self):
+        """Test early-decision and incremental reviews use separate cache entries"""
+        keys = {
+            ReviewCache.make_key(CHAPTER, 0, "fp"),
+            ReviewCache.make_key(CHAPTER, 0, "fp", early_decision=True),
+            ReviewCache.make_key(CHAPTER, 0, "fp", incremental=True),
+        }
+        assert len(keys) == 3
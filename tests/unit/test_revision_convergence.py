@@ -0,0 +1,149 @@
+"""
+Unit tests for revision-loop convergence control
+"""
+from unittest.mock import AsyncMock, MagicMock
+
+from src.multi_agent.convergence import (
+    STOP_BUDGET,
+    STOP_CONVERGED,
+    STOP_MAX_LOOPS,
+    STOP_REPEATED,
+    RevisionController,
+)
+from src.model import ChapterContent
+from src.multi_agent.types import CheckCategory, Priority, ReviewResult, Suggestion
+from src.state import NovelState
+from src.supervisor_node import init_supervisor_node, supervisor_node
+from src.utils import estimate_tokens
+
+CHAPTER = "林风推开山门，夜色正浓。\n他握紧长剑，踏上石阶。"
+
+
+def _result(score: float, issues=(), needs_revision: bool = True) -> ReviewResult:
+    return ReviewResult(chapter_index=0, needs_revision=needs_revision, quality_score=score, suggestions=[
+        Suggestion(category=CheckCategory.CONSISTENCY, priority=Priority.HIGH, issue=issue,
+                   location="", current_text="", suggested_change="")
+        for issue in issues
+    ])
+
+
+class TestRevisionController:
+    """Tests for RevisionController"""
+
+    def test_improving_chapter_keeps_revising(self):
+        """Test revision continues while the score improves and issues change"""
+        controller = RevisionController()
+        assert controller.observe(0, CHAPTER, _result(5.0, ["时间矛盾"])).revise
+        assert controller.observe(0, CHAPTER, _result(6.0, ["人物动机不足"])).revise
+        assert controller.stats[0].revisions == 2
+
+    def test_score_plateau_converges(self):
+        """Test a score gain below epsilon stops the loop"""
+        controller = RevisionController(epsilon=0.3)
+        controller.observe(0, CHAPTER, _result(6.8, ["时间矛盾"]))
+        decision = controller.observe(0, CHAPTER, _result(6.9, ["人物动机不足"]))
+
+        assert not decision.revise
+        assert decision.stop_reason == STOP_CONVERGED
+
+    def test_repeated_issues_stop(self):
+        """Test the same issues reappearing after a rewrite stop the loop"""
+        controller = RevisionController()
+        controller.observe(0, CHAPTER, _result(5.0, ["时间矛盾：白天写成夜晚"]))
+        decision = controller.observe(0, CHAPTER, _result(6.0, ["时间矛盾， 白天写成夜晚"]))
+
+        assert decision.stop_reason == STOP_REPEATED
+
+    def test_max_loops(self):
+        """Test revisions stop at max_loops"""
+        controller = RevisionController(max_loops=1)
+        controller.observe(0, CHAPTER, _result(4.0, ["a"]))
+        decision = controller.observe(0, CHAPTER, _result(6.0, ["b"]))
+
+        assert decision.stop_reason == STOP_MAX_LOOPS
+
+    def test_max_loops_counts_revisions_from_state(self):
+        """Test a resumed run counts revisions done before the restart"""
+        controller = RevisionController(max_loops=2)
+        decision = controller.observe(0, CHAPTER, _result(4.0, ["a"]), revisions=2)
+
+        assert decision.stop_reason == STOP_MAX_LOOPS
+
+    def test_converged_keeps_best_draft(self):
+        """Test a rewrite that scores lower is dropped in favour of the best earlier draft"""
+        controller = RevisionController()
+        controller.observe(0, "第一稿", _result(6.5, ["a"]), draft="draft-1")
+        decision = controller.observe(0, "第二稿", _result(6.0, ["b"]), draft="draft-2")
+
+        assert decision.stop_reason == STOP_CONVERGED
+        assert decision.best.chapter == "第一稿"
+        assert decision.best.draft == "draft-1"
+
+    def test_budget_is_novel_wide(self):
+        """Test revision tokens spent on earlier chapters count against later ones"""
+        round_cost = estimate_tokens(CHAPTER) + 100
+        controller = RevisionController(token_budget=round_cost * 2)
+        controller.observe(0, CHAPTER, _result(4.0, ["a"]), review_tokens=100)
+        controller.observe(0, CHAPTER, _result(8.0, needs_revision=False), review_tokens=100)
+        controller.finish(0)
+        controller.observe(1, CHAPTER, _result(4.0, ["c"]), review_tokens=100)
+        decision = controller.observe(1, CHAPTER, _result(6.0, ["d"]), review_tokens=100)
+
+        assert controller.spent_tokens == round_cost * 2
+        assert decision.stop_reason == STOP_BUDGET
+        assert controller.report()["1"]["tokens"] == round_cost
+
+    def test_finish_resets_chapter(self):
+        """Test reviewing an accepted chapter again starts fresh stats"""
+        controller = RevisionController()
+        controller.observe(0, CHAPTER, _result(8.0, needs_revision=False))
+        controller.finish(0)
+        controller.observe(0, CHAPTER, _result(8.0, needs_revision=False))
+
+        assert controller.stats[0].rounds == 1
+
+
+class TestSupervisorNodeConvergence:
+    """Tests for convergence control in supervisor_node"""
+
+    def test_plateau_accepts_chapter(self):
+        """Test supervisor_node stops revising once the score plateaus"""
+        supervisor = init_supervisor_node(MagicMock())
+        supervisor.review = AsyncMock(side_effect=[
+            _result(6.8, ["时间矛盾"]), _result(6.8, ["人物动机不足"])
+        ])
+        state = NovelState(user_intent="测试", current_chapter_index=0, raw_current_chapter=CHAPTER)
+
+        first = supervisor_node(state)
+        assert first["revision_needed"] is True
+        assert first["supervisor_recheck_count"] == 1
+
+        state = state.model_copy(update=first)
+        second = supervisor_node(state)
+        assert second["revision_needed"] is False
+        assert second["supervisor_recheck_count"] == 0
+        assert second["revision_notes"].startswith("[停止修订")
+        assert second["revision_stats"]["1"]["stop_reason"] == STOP_CONVERGED
+        assert second["revision_tokens_spent"] == estimate_tokens(CHAPTER)
+
+    def test_plateau_restores_best_draft(self):
+        """Test supervisor_node hands back the higher-scoring earlier draft when it stops"""
+        supervisor = init_supervisor_node(MagicMock())
+        supervisor.review = AsyncMock(side_effect=[
+            _result(6.8, ["时间矛盾"]), _result(6.2, ["人物动机不足"])
+        ])
+        first_draft = ChapterContent(title="第1章", content=CHAPTER)
+        state = NovelState(user_intent="测试", current_chapter_index=0, raw_current_chapter=CHAPTER,
+                           validated_chapter_draft=first_draft)
+        state = state.model_copy(update=supervisor_node(state))
+
+        rewrite = "林风转身下山。"
+        state = state.model_copy(update={
+            "raw_current_chapter": rewrite,
+            "validated_chapter_draft": ChapterContent(title="第1章", content=rewrite),
+        })
+        second = supervisor_node(state)
+        assert second["revision_needed"] is False
+        assert second["raw_current_chapter"] == CHAPTER
+        assert second["validated_chapter_draft"] == first_draft
+        assert second["supervisor_result"]["quality_score"] == 6.8
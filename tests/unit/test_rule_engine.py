@@ -0,0 +1,92 @@
+"""
+Unit tests for the compiled WorldRule matcher
+"""
+import random
+
+from src.model import WorldRule, WorldRuleSet
+from src.multi_agent import StoryBible
+from src.rule_engine import AhoCorasick, CompiledRuleSet, compile_rules
+
+
+RULES = [
+    WorldRule(rule_type="ability_constraint", subject="平衡者", predicate="不能",
+              object="穿越时间", description="平衡者不能穿越时间"),
+    WorldRule(rule_type="geographic_limit", subject="林风", predicate="不能",
+              object="禁地", description="林风不能进入禁地"),
+    WorldRule(rule_type="world_fact", subject="埃拉西亚", predicate="有",
+              object="2个月亮", description="埃拉西亚有2个月亮"),
+    WorldRule(rule_type="faction_relationship", subject="长老会", predicate="是",
+              object="结盟", description="长老会与魔宗敌对"),
+    WorldRule(rule_type="character_limit", subject="苏瑶", predicate="不能",
+              object="飞行", description="苏瑶不能飞行"),
+]
+
+FRAGMENTS = [
+    "平衡者", "穿越时间", "穿越", "林风", "进入", "禁地", "埃拉西亚", "唯一", "月亮", "明月",
+    "没有", "长老会", "结盟", "苏瑶", "飞行", "。", "他们沉默良久", "山风吹过",
+]
+
+
+class TestAhoCorasick:
+    """Tests for the automaton"""
+
+    def test_overlapping_patterns(self):
+        """Test all overlapping matches are reported with start positions"""
+        matcher = AhoCorasick(["he", "she", "his", "hers", ""])
+        hits = matcher.find_all("ushers")
+        assert hits == {"she": [1], "he": [2], "hers": [2]}
+
+    def test_matches_str_find(self):
+        """Test positions agree with str.find on random text"""
+        rng = random.Random(7)
+        patterns = ["月", "月亮", "明月", "亮月", "月月"]
+        matcher = AhoCorasick(patterns)
+        text = "".join(rng.choice("月亮明") for _ in range(300))
+        hits = matcher.find_all(text)
+        for pattern in patterns:
+            expected = [i for i in range(len(text)) if text.startswith(pattern, i)]
+            assert hits.get(pattern, []) == expected
+
+
+class TestCompiledRuleSet:
+    """Tests for compiled rule evaluation"""
+
+    def test_whole_chapter_mode_matches_rule_check(self):
+        """Test window=None gives exactly the WorldRule.check results"""
+        rng = random.Random(11)
+        compiled = CompiledRuleSet(RULES, window=None)
+        for _ in range(300):
+            content = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 12)))
+            expected = [r for r in RULES if r.check(content)]
+            assert compiled.violated_rules(content) == expected, content
+
+    def test_window_requires_co_occurrence(self):
+        """Test object and keywords far from the subject no longer count"""
+        content = "平衡者站在山巅。" + "山风吹过。" * 60 + "有人谈起穿越时间的传说。"
+        assert RULES[0].check(content)
+        assert CompiledRuleSet(RULES).violated_rules(content) == []
+        assert CompiledRuleSet(RULES).violated_rules("平衡者试图穿越时间。") == [RULES[0]]
+
+    def test_compile_reused_until_rules_change(self):
+        """Test compile_rules reuses the automaton for the same rule list"""
+        rules = list(RULES)
+        compiled = compile_rules(rules)
+        assert compile_rules(rules, compiled) is compiled
+        rules.append(WorldRule(rule_type="faction_relationship", subject="魔宗", predicate="是",
+                               object="盟友", description="魔宗不是盟友"))
+        assert compile_rules(rules, compiled) is not compiled
+
+    def test_storybible_and_ruleset_use_compiled_rules(self):
+        """Test StoryBible and WorldRuleSet report violations through the compiled matcher"""
+        storybible = StoryBible()
+        rule_set = WorldRuleSet(rules=list(RULES))
+        for rule in RULES:
+            storybible.add_world_rule(rule)
+
+        content = "林风抵达禁地边缘。"
+        assert [v["rule"] for v in storybible.check_world_rule_violations(content)] == [RULES[1]]
+        assert [v["rule"] for v in rule_set.check_violation(content)] == [RULES[1]]
+
+        storybible.add_world_rule(WorldRule(rule_type="geographic_limit", subject="林风", predicate="不能",
+                                            object="边缘", description="林风不能去边缘"))
+        assert len(storybible.check_world_rule_violations(content)) == 2
@@ -0,0 +1,159 @@
+"""
+Unit tests for src/storage_codec.py and compressed NovelStorage layout
+"""
+import pytest
+import shutil
+from pathlib import Path
+from src.storage import NovelStorage
+from src.storage_codec import ChapterCodec, DICT_TRAIN_MIN_SAMPLES, resolve_codec, zstandard
+from src.model import ChapterContent
+
+TITLE = "测试压缩小说"
+
+CODECS = ["gzip"] + (["zstd"] if zstandard is not None else [])
+
+
+def _chapter(i: int) -> ChapterContent:
+    body = "".join(f"林渊踏入宗门大殿，长老会众人神色凝重。第{i}章第{j}段，剑气纵横三千里。\n" for j in range(40))
+    return ChapterContent(title=f"第{i + 1}章 试炼{i}", content=body, notes="")
+
+
+@pytest.fixture
+def cleanup():
+    yield
+    result_dir = Path(f"result/{TITLE}_storage")
+    if result_dir.exists():
+        shutil.rmtree(result_dir, ignore_errors=True)
+
+
+class TestResolveCodec:
+    def test_default_is_none(self, monkeypatch):
+        monkeypatch.delenv("NOVEL_STORAGE_CODEC", raising=False)
+        assert resolve_codec(None) == "none"
+
+    def test_env_var(self, monkeypatch):
+        monkeypatch.setenv("NOVEL_STORAGE_CODEC", "zlib")
+        assert resolve_codec(None) == "gzip"
+
+    def test_invalid_codec(self):
+        with pytest.raises(ValueError):
+            resolve_codec("lzma")
+
+
+class TestChapterCodec:
+    @pytest.mark.parametrize("codec", CODECS)
+    def test_roundtrip_with_trained_dict(self, codec, tmp_path):
+        chapter_codec = ChapterCodec(codec, tmp_path)
+        samples = [_chapter(i).content.encode("utf-8") * 4 for i in range(DICT_TRAIN_MIN_SAMPLES * 4)]
+        old_blob = chapter_codec.encode(samples[0])
+
+        dict_id = chapter_codec.train(samples)
+        assert dict_id >= 0
+        new_blob = chapter_codec.encode(samples[1])
+
+        # 新旧字典写入的数据都可解码
+        reader = ChapterCodec(codec, tmp_path)
+        assert reader.decode(old_blob) == samples[0]
+        assert reader.decode(new_blob) == samples[1]
+
+    def test_corrupted_header(self, tmp_path):
+        with pytest.raises(ValueError):
+            ChapterCodec("gzip", tmp_path).decode(b"not a chapter")
+
+
+class TestCompressedStorage:
+    @pytest.mark.parametrize("codec", CODECS)
+    def test_single_record_per_chapter(self, codec, cleanup):
+        storage = NovelStorage(TITLE, codec=codec)
+        for i in range(DICT_TRAIN_MIN_SAMPLES + 2):
+            storage.save_chapter(i, _chapter(i))
+
+        assert list(storage.chapter_dir.glob("*.txt")) == []
+        assert list(storage.chapter_dir_json.glob("*.json")) == []
+        assert storage.get_completed_chapter_count() == DICT_TRAIN_MIN_SAMPLES + 2
+        assert storage.load_chapter(3) == _chapter(3)
+        assert [c.title for c in storage.load_all_chapters()] == [_chapter(i).title for i in range(DICT_TRAIN_MIN_SAMPLES + 2)]
+
+    def test_codec_persisted(self, cleanup):
+        NovelStorage(TITLE, codec="gzip").save_chapter(0, _chapter(0))
+        reopened = NovelStorage(TITLE)
+        assert reopened.codec == "gzip"
+        assert reopened.load_chapter(0) == _chapter(0)
+        assert reopened.get_storage_info()["codec"] == "gzip"
+
+    def test_revised_chapter_compressed(self, cleanup):
+        storage = NovelStorage(TITLE, codec="gzip")
+        storage.save_chapter_revised(0, "第1章", "修订后的内容")
+        assert list(storage.chapters_revised_dir.glob("*.txt")) == []
+        assert storage.load_chapter_revised(0) == "修订后的内容"
+
+    def test_repack_legacy_chapters(self, cleanup):
+        legacy = NovelStorage(TITLE, codec="none")
+        for i in range(3):
+            legacy.save_chapter(i, _chapter(i))
+        legacy.save_chapter_revised(1, "第2章", "修订版")
+
+        storage = NovelStorage(TITLE, codec="gzip")
+        assert storage.load_chapter(1) == _chapter(1)
+
+        assert storage.repack_chapters() == 3
+        assert list(storage.chapter_dir.glob("*.txt")) == []
+        assert storage.get_completed_chapter_count() == 3
+        assert storage.load_chapter(2) == _chapter(2)
+        assert storage.load_chapter_revised(1) == "修订版"
+
+    def test_switching_codec_replaces_other_format(self, cleanup):
+        packed = NovelStorage(TITLE, codec="gzip")
+        packed.save_chapter(0, _chapter(0))
+        packed.save_chapter_revised(0, "第1章", "压缩版修订")
+
+        plain = NovelStorage(TITLE, codec="none")
+        edited = _chapter(0).model_copy(update={"content": "改写后的正文"})
+        plain.save_chapter(0, edited)
+        plain.save_chapter_revised(0, "第1章", "明文修订")
+        assert not plain._packed_path(0).exists()
+        assert plain.load_chapter(0) == edited
+        assert plain.load_chapter_revised(0) == "明文修订"
+
+        repacked = NovelStorage(TITLE, codec="gzip")
+        repacked.save_chapter(0, _chapter(0))
+        assert list(repacked.chapter_dir.glob("*.txt")) == []
+        assert list(repacked.chapter_dir_json.glob("*.json")) == []
+        assert repacked.load_chapter(0) == _chapter(0)
+
+    def test_repack_to_plain(self, cleanup):
+        packed = NovelStorage(TITLE, codec="gzip")
+        for i in range(2):
+            packed.save_chapter(i, _chapter(i))
+        packed.save_chapter_revised(1, "第2章", "修订版")
+
+        plain = NovelStorage(TITLE, codec="none")
+        assert plain.repack_chapters() == 2
+        assert list(plain.chapters_packed_dir.glob("*.nsc")) == []
+        assert list(plain.chapters_revised_dir.glob("*.nsc")) == []
+        assert plain.load_chapter(1) == _chapter(1)
+        assert plain.load_chapter_revised(1) == "修订版"
+
+    def test_chapter_feedback_edits_exported_draft(self, cleanup, monkeypatch):
+        from src.feedback_nodes import chapter_feedback_node, process_chapter_feedback_node
+        from src.state import NovelState
+
+        storage = NovelStorage(TITLE, codec="gzip")
+        state = NovelState(user_intent="测试", novel_storage=storage, current_chapter_index=0,
+                           validated_chapter_draft=_chapter(0))
+        edited = ChapterContent(title=_chapter(0).title, content="用户修改后的正文", notes="")
+
+        def answer(prompt):
+            if "修改完了" in prompt:
+                storage.export_editable_chapter(1, edited)
+                return ""
+            assert "chapters_edit" in prompt
+            return "y"
+
+        monkeypatch.setattr("builtins.input", answer)
+        state = state.model_copy(update=chapter_feedback_node(state))
+        result = process_chapter_feedback_node(state)
+
+        assert result["validated_chapter_draft"] == edited
+        assert "用户修改后的正文" in result["raw_current_chapter"]
+        assert storage.get_completed_chapter_count() == 0
@@ -0,0 +1,134 @@
+"""
+Unit tests for StoryBible query indexes (world states / entities / plot threads)
+"""
+from src.model import CharacterArc, PlotThread, StoryBibleContent, WorldState
+from src.multi_agent import StoryBible
+
+
+def _world_state(chapter_index: int) -> WorldState:
+    return WorldState(chapter_index=chapter_index, location="青云城", time=f"第{chapter_index}天")
+
+
+def _thread(i: int, status: str = "foreshadowed", payoff: str = "") -> PlotThread:
+    return PlotThread(
+        id=f"t{i}", name=f"情节线{i}", status=status, setup_chapter=i,
+        expected_payoff_range=payoff,
+    )
+
+
+def _build(chapters: int) -> StoryBible:
+    storybible = StoryBible()
+    for i in range(chapters):
+        storybible.append_world_state(_world_state(i))
+        storybible.add_plot_thread(_thread(i, "foreshadowed" if i % 2 else "active", f"{i + 1}-{i + 5}"))
+    return storybible
+
+
+def _count_scans(storybible: StoryBible, monkeypatch, rounds: int = 200) -> int:
+    """对前 100 章内做同一组查询，统计检查的世界状态与情节线条目数"""
+    scanned = 0
+
+    class CountingList(list):
+        def __getitem__(self, item):
+            nonlocal scanned
+            result = super().__getitem__(item)
+            # bisect 的单点探查是对数级的，只统计切片取出的条目
+            if isinstance(item, slice):
+                scanned += len(result)
+            return result
+
+    is_overdue = PlotThread.is_overdue
+
+    def counting_is_overdue(thread, current_chapter):
+        nonlocal scanned
+        scanned += 1
+        return is_overdue(thread, current_chapter)
+
+    storybible._world_states_sorted = CountingList(storybible._world_states_sorted)
+    storybible._payoff_deadlines = CountingList(storybible._payoff_deadlines)
+    monkeypatch.setattr(PlotThread, "is_overdue", counting_is_overdue)
+    for k in range(rounds):
+        c = (k * 37) % 90
+        storybible.get_world_states_in_range(c, c + 3)
+        storybible.get_entities_for_chapter(c)
+        # 只查询最早几章的逾期伏笔，结果规模与总章节数无关
+        storybible.get_overdue_plot_threads(k % 10)
+    monkeypatch.undo()
+    return scanned
+
+
+class TestStoryBibleIndexes:
+    """Tests for indexed StoryBible queries"""
+
+    def test_world_states_in_range_out_of_order(self):
+        """Test range query is sorted by chapter and keeps append order within a chapter"""
+        storybible = StoryBible()
+        a, b, c, d = _world_state(5), _world_state(1), _world_state(3), _world_state(3)
+        for state in (a, b, c, d):
+            storybible.append_world_state(state)
+
+        assert storybible.get_world_states_in_range(2, 5) == [c, d, a]
+        assert storybible.get_world_states_in_range(6, 9) == []
+        assert storybible.get_latest_world_state() is d
+
+    def test_thread_buckets_follow_resolution(self):
+        """Test status buckets and overdue queue after resolve_plot_thread"""
+        storybible = StoryBible()
+        storybible.add_plot_thread(_thread(1, "active"))
+        storybible.add_plot_thread(_thread(2, "foreshadowed", "3-4"))
+        storybible.add_plot_thread(_thread(3, "foreshadowed", "2-3"))
+
+        assert [t.id for t in storybible.get_active_plot_threads()] == ["t1"]
+        assert [t.id for t in storybible.get_overdue_plot_threads(5)] == ["t3", "t2"]
+        assert storybible.get_overdue_plot_threads(4) == [storybible.get_plot_thread("t3")]
+
+        storybible.resolve_plot_thread("t3", 4)
+        assert [t.id for t in storybible.get_overdue_plot_threads(5)] == ["t2"]
+        assert {t.id for t in storybible.get_unresolved_plot_threads()} == {"t1", "t2"}
+
+    def test_load_from_content_rebuilds_indexes(self):
+        """Test indexes are rebuilt from StoryBibleContent"""
+        content = StoryBibleContent(
+            plot_threads=[_thread(1, "foreshadowed", "1-2"), _thread(2, "resolved")],
+            world_states=[_world_state(2), _world_state(0)],
+        )
+        storybible = StoryBible()
+        storybible.load_from_content(content)
+
+        assert [s.chapter_index for s in storybible.get_world_states_in_range(0, 9)] == [0, 2]
+        assert [t.id for t in storybible.get_overdue_plot_threads(3)] == ["t1"]
+        assert storybible.get_active_plot_threads() == []
+
+    def test_content_character_arc_lookup_tracks_list_edits(self):
+        """Test StoryBibleContent.get_character_arc stays correct after direct list edits"""
+        content = StoryBibleContent(character_arcs=[CharacterArc(name="林风"), CharacterArc(name="苏瑶")])
+        assert content.get_character_arc("苏瑶").name == "苏瑶"
+
+        content.character_arcs[1] = CharacterArc(name="赵虎")
+        assert content.get_character_arc("苏瑶") is None
+        assert content.get_character_arc("赵虎") is content.character_arcs[1]
+
+        replacement = CharacterArc(name="林风", emotional_state="愤怒")
+        content.upsert_character_arc(replacement)
+        assert content.get_character_arc("林风") is replacement
+        assert len(content.character_arcs) == 2
+
+    def test_content_unknown_arc_lookup_does_not_rebuild(self):
+        """Test missing names hit the existing index instead of rebuilding it"""
+        content = StoryBibleContent(character_arcs=[CharacterArc(name=f"角色{i}") for i in range(50)])
+        content.get_character_arc("角色0")
+        index = content._arc_index
+
+        for _ in range(10):
+            assert content.get_character_arc("路人") is None
+        content.upsert_character_arc(CharacterArc(name="新角色"))
+        assert content.get_character_arc("新角色").name == "新角色"
+        assert content._arc_index is index
+
+    def test_query_cost_flat_at_scale(self, monkeypatch):
+        """Test queries examine the same number of entries at 2000 chapters as at 100"""
+        small = _count_scans(_build(100), monkeypatch)
+        large = _count_scans(_build(2000), monkeypatch)
+        # 线性扫描时检查条目数随章节数增长约 20 倍
+        assert small > 0
+        assert large == small
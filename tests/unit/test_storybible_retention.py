@@ -0,0 +1,124 @@
+"""
+Unit tests for StoryBible world state / entity retention and cold storage
+"""
+import pytest
+import shutil
+from pathlib import Path
+
+from src.model import EntityContent, WorldState
+from src.multi_agent import StoryBible
+from src.storage import NovelStorage
+
+TITLE = "测试归档小说"
+
+
+@pytest.fixture
+def storage():
+    storage = NovelStorage(TITLE)
+    yield storage
+    shutil.rmtree(Path(f"result/{TITLE}_storage"), ignore_errors=True)
+
+
+def _state(i: int) -> WorldState:
+    return WorldState(chapter_index=i, location=f"地点{i % 3}", time=f"第{i}天", active_factions=[f"势力{i % 2}"])
+
+
+def _entity(i: int) -> EntityContent:
+    return EntityContent(characters=[f"角色{i}"], organizations=[], locations=[], events=[], entities=[])
+
+
+def _bible(chapters: int) -> StoryBible:
+    storybible = StoryBible()
+    for i in range(chapters):
+        storybible.append_world_state(_state(i))
+        storybible.append_entity(_entity(i))
+    return storybible
+
+
+class TestStoryBibleRetention:
+    """Tests for compact_history"""
+
+    def test_compaction_keeps_window_and_archives_rest(self, storage):
+        """Test old states move to cold storage and per-volume summaries"""
+        storybible = _bible(100)
+        moved = storybible.compact_history(storage)
+
+        assert moved == (100 - StoryBible.WORLD_STATE_RETENTION) + (100 - StoryBible.ENTITY_RETENTION)
+        content = storybible.to_content()
+        assert len(content.world_states) == StoryBible.WORLD_STATE_RETENTION
+        assert len(content.entities) == StoryBible.ENTITY_RETENTION
+        assert storybible.get_latest_world_state().chapter_index == 99
+
+        summaries = storybible.get_world_state_summaries()
+        assert sorted(summaries) == list(range(7))
+        assert summaries[0]["start"] == 0 and summaries[0]["end"] == 9
+        assert summaries[0]["times"] == ["第0天", "第9天"]
+        assert "此前变迁：第61-70章" in storybible.format_layered_context(100)
+
+        assert len(storage.load_archived_world_states()) == 70
+        assert storage.load_archived_entities()[0].characters == ["角色0"]
+
+    def test_range_query_reads_archive_on_demand(self, storage):
+        """Test range queries spanning archived chapters read cold storage"""
+        storybible = _bible(50)
+        storybible.compact_history(storage)
+
+        states = storybible.get_world_states_in_range(15, 25)
+        assert [s.chapter_index for s in states] == list(range(15, 26))
+
+        # 重新加载后依旧可按需查询
+        reloaded = StoryBible()
+        reloaded.load_from_content(storybible.to_content())
+        reloaded.attach_archive(storage)
+        assert [s.chapter_index for s in reloaded.get_world_states_in_range(0, 2)] == [0, 1, 2]
+        assert reloaded.get_world_state_summaries() == storybible.get_world_state_summaries()
+
+    def test_saved_size_flat_with_chapter_count(self, storage):
+        """Test the persisted StoryBible does not grow once the window is full"""
+        storybible = StoryBible()
+        sizes = []
+        for i in range(300):
+            storybible.append_world_state(_state(i))
+            storybible.append_entity(_entity(i))
+            storybible.compact_history(storage)
+            if i in (99, 299):
+                storage.save_story_bible(storybible.to_content())
+                sizes.append((storage.story_bible_dir / "story_bible.json").stat().st_size)
+        # 只多出少量分卷汇总
+        assert sizes[1] < sizes[0] * 1.5
+
+    def test_without_archive_nothing_is_dropped(self):
+        """Test compaction is a no-op without cold storage"""
+        storybible = _bible(60)
+        assert storybible.compact_history() == 0
+        assert len(storybible.to_content().world_states) == 60
+
+    def test_entity_queries_include_archive(self, storage):
+        """Test entity queries fall back to archived entities"""
+        storybible = _bible(60)
+        storybible.compact_history(storage)
+
+        entities = storybible.get_all_entities()
+        assert len(entities) == 60
+        assert entities[0].characters == ["角色0"]
+        assert entities[-1].characters == ["角色59"]
+
+        reloaded = StoryBible()
+        reloaded.load_from_content(storybible.to_content())
+        reloaded.attach_archive(storage)
+        assert len(reloaded.get_all_entities()) == 60
+
+    def test_archive_replay_is_idempotent(self, storage):
+        """Test compacting again after a crash before saving does not duplicate the archive"""
+        storybible = _bible(60)
+        saved = storybible.to_content()
+        storybible.compact_history(storage)
+
+        # 归档后、保存 StoryBible 前中断：从旧的 StoryBible 恢复并再次压缩
+        replayed = StoryBible()
+        replayed.load_from_content(saved)
+        replayed.compact_history(NovelStorage(TITLE))
+
+        assert [s.chapter_index for s in storage.load_archived_world_states()] == list(range(60 - StoryBible.WORLD_STATE_RETENTION))
+        assert len(storage.load_archived_entities()) == 60 - StoryBible.ENTITY_RETENTION
+        assert replayed.to_content().archived_counts == storybible.to_content().archived_counts
@@ -0,0 +1,115 @@
+"""
+Unit tests for copy-on-write StoryBible snapshots, branches and rollback
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.model import CharacterArc, CharacterArcStage, PlotThread, WorldState
+from src.multi_agent import StoryBible, WritingSupervisor
+from src.multi_agent.types import CheckCategory, ReviewResult, SubAgentReport
+
+
+def _bible() -> StoryBible:
+    storybible = StoryBible()
+    storybible.add_character_arc(CharacterArc(
+        name="林风",
+        arc_stages=[CharacterArcStage(stage_name="迷茫", chapter_range="1-3", emotional_state="", key_moment=""),
+                    CharacterArcStage(stage_name="觉醒", chapter_range="4-6", emotional_state="", key_moment="")],
+    ))
+    storybible.add_plot_thread(PlotThread(id="t1", name="失踪的师父", status="foreshadowed",
+                                          setup_chapter=1, expected_payoff_range="2-3"))
+    storybible.append_world_state(WorldState(chapter_index=0, location="青云城", time="春"))
+    return storybible
+
+
+class TestStoryBibleSnapshot:
+    """Tests for snapshot / fork / commit / rollback"""
+
+    def test_snapshot_is_isolated_and_shares_unchanged_data(self):
+        """Test a snapshot keeps its view and shares containers the writer did not touch"""
+        storybible = _bible()
+        snap = storybible.snapshot()
+        version = storybible.version
+
+        storybible.append_world_state(WorldState(chapter_index=1, location="王城", time="夏"))
+        storybible.resolve_plot_thread("t1", 2)
+
+        assert storybible.version > version
+        assert len(snap.get_world_states_in_range(0, 9)) == 1
+        assert snap.get_plot_thread("t1").status == "foreshadowed"
+        assert [t.id for t in snap.get_overdue_plot_threads(5)] == ["t1"]
+        assert storybible.get_overdue_plot_threads(5) == []
+        # 未修改的角色弧线容器仍然共享，没有复制
+        assert snap._character_arcs is storybible._character_arcs
+        assert storybible.snapshot() is storybible.snapshot()
+
+    def test_snapshot_is_read_only(self):
+        """Test mutating a snapshot raises"""
+        snap = _bible().snapshot()
+        with pytest.raises(RuntimeError):
+            snap.add_plot_thread(PlotThread(id="t2", name="x", status="active", setup_chapter=1))
+
+    def test_fork_commits_delta_in_order(self):
+        """Test branch deltas apply on top of changes committed since the fork"""
+        storybible = _bible()
+        first, second = storybible.fork(), storybible.fork()
+        first.resolve_plot_thread("t1", 3)
+        second.append_world_state(WorldState(chapter_index=2, location="魔域", time="秋"))
+
+        assert storybible.get_plot_thread("t1").status == "foreshadowed"
+        storybible.commit(first)
+        storybible.commit(second)
+
+        assert storybible.get_plot_thread("t1").status == "resolved"
+        assert [s.location for s in storybible.get_world_states_in_range(0, 9)] == ["青云城", "魔域"]
+
+    def test_rollback_restores_snapshot(self):
+        """Test rollback returns to a saved version"""
+        storybible = _bible()
+        version = storybible.version
+        storybible.snapshot()
+        storybible.resolve_plot_thread("t1", 2)
+        storybible.append_world_state(WorldState(chapter_index=1, location="王城", time="夏"))
+
+        storybible.rollback(version)
+        assert storybible.version == version
+        assert storybible.get_plot_thread("t1").status == "foreshadowed"
+        assert storybible.get_latest_world_state().location == "青云城"
+        with pytest.raises(KeyError):
+            storybible.rollback(version + 100)
+
+
+class TestReviewBranches:
+    """Tests for WritingSupervisor review deltas"""
+
+    def _supervisor(self, needs_revision: bool) -> WritingSupervisor:
+        supervisor = WritingSupervisor(MagicMock())
+        supervisor.storybible = _bible()
+        report = SubAgentReport(
+            agent_name="PlotThreadChecker", category=CheckCategory.PLOT_THREAD,
+            updates=[{"action": "payoff", "thread_id": "t1"}],
+        )
+        for agent in supervisor.check_agents:
+            agent.check = AsyncMock(return_value=report)
+        supervisor.reflection_agent.evaluate = AsyncMock(return_value=ReviewResult(
+            chapter_index=2, needs_revision=needs_revision, quality_score=6.0
+        ))
+        return supervisor
+
+    def test_accepted_review_commits(self):
+        """Test a passing review commits its StoryBible updates immediately"""
+        supervisor = self._supervisor(needs_revision=False)
+        asyncio.run(supervisor.review("正文", 2))
+        assert supervisor.storybible.get_plot_thread("t1").status == "resolved"
+        assert supervisor.commit_review(2) is False
+
+    def test_rejected_review_is_held_until_accept(self):
+        """Test a rejected review leaves the StoryBible untouched until commit_review"""
+        supervisor = self._supervisor(needs_revision=True)
+        asyncio.run(supervisor.review("正文", 2))
+        assert supervisor.storybible.get_plot_thread("t1").status == "foreshadowed"
+
+        assert supervisor.commit_review(2) is True
+        assert supervisor.storybible.get_plot_thread("t1").status == "resolved"
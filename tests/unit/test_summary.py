@@ -0,0 +1,89 @@
+"""
+Unit tests for src/summary.py hierarchical rolling summaries
+"""
+import pytest
+import shutil
+from pathlib import Path
+
+from src.model import ChapterContent, ChapterOutline, NovelOutline, VolumeOutline
+from src.storage import NovelStorage
+from src.summary import (
+    ARC_SIZE, CHAPTER_SUMMARY_CHARS, NOVEL_SUMMARY_CHARS,
+    RollingSummaries, extractive_summary, rollup, split_sentences, volume_index_of
+)
+
+TITLE = "测试滚动摘要小说"
+
+
+@pytest.fixture
+def storage():
+    storage = NovelStorage(TITLE)
+    yield storage
+    shutil.rmtree(Path(f"result/{TITLE}_storage"), ignore_errors=True)
+
+
+def _chapter(n):
+    filler = "".join(f"山风吹过第{n}章的松林，落叶一片接一片地飘下。" for _ in range(20))
+    return ChapterContent(title=f"第{n}章", content=f"林远在第{n}章踏入青云山。\n{filler}\n林远在第{n}章取得了玉简。")
+
+
+def _outline(n_chapters, master=None):
+    return NovelOutline(
+        title=TITLE, genre="仙侠", theme="成长", setting="青云山", plot_summary="修行",
+        master_outline=master,
+        chapters=[
+            ChapterOutline(title=f"第{i}章", summary="", key_events=["取得了玉简"],
+                           characters_involved=["林远"], setting="青云山")
+            for i in range(1, n_chapters + 1)
+        ],
+        characters=["林远"],
+    )
+
+
+class TestExtractive:
+    def test_split_sentences_keeps_closing_quotes(self):
+        assert split_sentences("他说：“走吧。”她点头。") == ["他说：“走吧。”", "她点头。"]
+
+    def test_summary_prefers_focus_sentences(self):
+        text = _chapter(3).content
+        summary = extractive_summary(text, 60, ["取得了玉简", "林远"])
+        assert len(summary) <= 60
+        assert "取得了玉简" in summary
+
+    def test_rollup_is_bounded(self):
+        parts = [f"第{i}章发生了很多事情。后来又发生了别的事情。" for i in range(500)]
+        assert len(rollup(parts, 400)) <= 400
+
+
+class TestVolumes:
+    def test_fixed_arcs_without_master_outline(self):
+        assert volume_index_of(1, None) == 0
+        assert volume_index_of(ARC_SIZE + 1, None) == 1
+
+    def test_master_outline_ranges(self):
+        outline = _outline(4, [
+            VolumeOutline(title="卷一", chapters_range="1-2", theme="", key_turning_points=[]),
+            VolumeOutline(title="卷二", chapters_range="3-4", theme="", key_turning_points=[]),
+        ])
+        assert volume_index_of(3, outline) == 1
+        assert volume_index_of(9, outline) == 1
+
+
+class TestRollingSummaries:
+    def test_update_and_context(self, storage):
+        outline = _outline(25)
+        summaries = RollingSummaries(storage)
+        for n in range(1, 25):
+            summaries.update(n, _chapter(n), outline)
+
+        assert len(storage.load_summary("chapter", 24)) <= CHAPTER_SUMMARY_CHARS
+        assert storage.summary_indices("volume") == [0, 1, 2]
+        assert len(storage.load_summary("novel", 0)) <= NOVEL_SUMMARY_CHARS
+
+        context = summaries.context_for(24, outline)
+        assert context.startswith("全书至今：")
+        assert "本卷至今：" in context
+        assert "第24章：" in context and "第23章：" in context
+
+    def test_first_chapter_has_no_context(self, storage):
+        assert RollingSummaries(storage).context_for(0) == "无"
@@ -43,6 +43,25 @@ class TestWritingSupervisorInit:
         assert supervisor.reflection_agent.model_manager is mock_manager
 
 
+class TestWritingSupervisorModelRouting:
+    """Tests for routing checkers and reflection to different model managers"""
+
+    def test_checkers_use_specialist_manager(self):
+        """Test check agents get the specialist manager and reflection keeps the supervisor manager"""
+        judge, specialist = MagicMock(), MagicMock()
+        supervisor = WritingSupervisor(judge, specialist_model_manager=specialist)
+
+        assert all(agent.model_manager is specialist for agent in supervisor.check_agents)
+        assert supervisor.reflection_agent.model_manager is judge
+        assert supervisor.fused_agent.model_manager is judge
+
+    def test_specialist_defaults_to_model_manager(self):
+        """Test a single manager is used for every agent when no specialist is given"""
+        manager = MagicMock()
+        supervisor = WritingSupervisor(manager)
+        assert all(agent.model_manager is manager for agent in supervisor.check_agents)
+
+
 class TestStoryBible:
     """Tests for StoryBible"""
 
@@ -63,6 +82,27 @@ class TestStoryBible:
         assert "chapter_index" in context
         assert context["chapter_index"] == 1
 
+    def test_layered_context_cached_until_mutation(self):
+        """Test format_layered_context re-renders only the sections touched by mutators"""
+        from src.model import PlotThread, WorldRule, WorldState
+        storybible = StoryBible()
+        storybible.add_world_rule(WorldRule(
+            rule_type="ability_constraint", subject="平衡者", predicate="不能",
+            object="穿越时间", description="平衡者不能穿越时间"
+        ))
+        storybible.add_plot_thread(PlotThread(id="t1", name="失踪的师父", status="active", setup_chapter=1))
+
+        first = storybible.format_layered_context(1)
+        head = first.split("## 当前世界状态")[0]
+        storybible.append_world_state(WorldState(chapter_index=2, location="王城", time="春"))
+        second = storybible.format_layered_context(2)
+        assert second.startswith(head)
+        assert "- 地点：王城" in second
+
+        storybible.resolve_plot_thread("t1", 2)
+        assert "[已回收] 失踪的师父" in storybible.format_layered_context(3)
+        assert "## 世界观规则（硬约束）\n- 【严重】平衡者不能穿越时间\n" in second
+
 
 class TestReviewResult:
     """Tests for ReviewResult"""
@@ -342,4 +382,39 @@ class TestSupervisorNodeStoryBibleInitialization:
 
         # After init, they should be the same object
         assert sn._storybible is sn._writing_supervisor.storybible, \
-            "_storybible should reference the same StoryBible instance as _writing_supervisor.storybible"
\ No newline at end of file
+            "_storybible should reference the same StoryBible instance as _writing_supervisor.storybible"
+
+class TestSupervisorRegistry:
+    """Tests for per-workflow WritingSupervisor / StoryBible instances"""
+
+    def test_workflows_get_isolated_instances(self):
+        """Test two workflows in one process do not share or clobber StoryBibles"""
+        import src.supervisor_node as sn
+
+        default = sn.init_supervisor_node(MagicMock())
+        first = sn.init_supervisor_node(MagicMock(), workflow_id="wf-a")
+        second = sn.init_supervisor_node(MagicMock(), workflow_id="wf-b")
+
+        try:
+            assert first is not second
+            assert first.storybible is not second.storybible
+            # 指定 workflow_id 的初始化不影响默认实例
+            assert sn.get_writing_supervisor() is default
+            assert sn.get_storybible("wf-a") is first.storybible
+
+            seen = {}
+
+            def node(state):
+                seen[state] = (sn.get_writing_supervisor(), sn.get_storybible())
+
+            sn.scoped_node("wf-a", node)("a")
+            sn.scoped_node("wf-b", node)("b")
+            assert seen["a"] == (first, first.storybible)
+            assert seen["b"] == (second, second.storybible)
+            # 离开节点后恢复为默认实例
+            assert sn.get_writing_supervisor() is default
+        finally:
+            sn.release_supervisor("wf-a")
+            sn.release_supervisor("wf-b")
+
+        assert sn.get_writing_supervisor("wf-a") is None
@@ -1,8 +1,13 @@
 """
 Unit tests for src/tool.py
 """
+import asyncio
+
 import pytest
-from src.tool import extract_json, is_json_truncated
+from src.tool import (
+    PARSE_FAILED, PARSE_OK, PARSE_REPAIRED, PARSE_SALVAGED,
+    extract_json, is_json_truncated, json_parse_stats, parse_json_response, reset_json_parse_stats,
+)
 
 
 class TestIsJsonTruncated:
@@ -152,3 +157,69 @@ class TestExtractJson:
         result = extract_json(text)
         assert '{"first": true}' in result
         assert '{"second": true}' not in result
+
+
+class TestParseJsonResponse:
+    """Tests for the tolerant parse_json_response"""
+
+    def test_fenced_block_with_surrounding_prose(self):
+        """Test fenced JSON is found even with explanation around it"""
+        text = '好的，检查结果如下：\n```json\n{"issues": [], "reasoning": "无问题"}\n```\n以上。'
+        assert parse_json_response(text) == ({"issues": [], "reasoning": "无问题"}, PARSE_OK)
+
+    def test_brace_balanced_ignores_trailing_text(self):
+        """Test braces inside strings do not end the object early"""
+        text = '{"issue": "含}括号{的描述", "n": [1, 2]} 附加说明 {"other": 1}'
+        assert parse_json_response(text) == ({"issue": "含}括号{的描述", "n": [1, 2]}, PARSE_OK)
+
+    def test_repairs_trailing_commas_and_single_quotes(self):
+        """Test common formatting mistakes are repaired"""
+        assert parse_json_response('{"issues": [{"a": 1},], "reasoning": "x",}') == (
+            {"issues": [{"a": 1}], "reasoning": "x"}, PARSE_REPAIRED
+        )
+        value, status = parse_json_response("{'reasoning': '他说\"好\"'}")
+        assert value == {"reasoning": '他说"好"'} and status == PARSE_REPAIRED
+
+    def test_salvages_truncated_output(self):
+        """Test complete elements of a truncated response are kept"""
+        text = '```json\n{"issues": [{"type": "timeline", "issue": "时间矛盾"}], "reasoning": "分析未写'
+        value, status = parse_json_response(text)
+        assert status == PARSE_SALVAGED
+        assert value == {"issues": [{"type": "timeline", "issue": "时间矛盾"}]}
+
+    def test_failure_and_stats(self):
+        """Test unparseable text fails and failure rates are reported per source"""
+        reset_json_parse_stats()
+        assert parse_json_response("没有发现问题", source="Checker") == (None, PARSE_FAILED)
+        assert parse_json_response("[1, 2]", source="Checker", require_object=True)[1] == PARSE_FAILED
+        parse_json_response('{"a": 1}', source="Checker")
+
+        stats = json_parse_stats()["Checker"]
+        assert stats["total"] == 3 and stats[PARSE_FAILED] == 2
+        assert stats["failure_rate"] == 0.667
+        reset_json_parse_stats()
+
+
+class TestSubAgentParseFailure:
+    """Tests for sub-agent behaviour on unparseable responses"""
+
+    @pytest.mark.parametrize("checker_name", [
+        "ConsistencyChecker", "CharacterArcChecker", "PlotThreadChecker", "WorldStateChecker",
+    ])
+    def test_no_fake_issue_on_parse_failure(self, checker_name):
+        """Test formatting noise yields no issues and low confidence instead of a fake issue"""
+        from unittest.mock import AsyncMock, MagicMock
+        import src.multi_agent.sub_agents as sub_agents
+        from src.multi_agent.sub_agents.base import PARSE_FAILED_CONFIDENCE, PARSE_FAILED_REASONING
+
+        manager = MagicMock(spec=["async_generate"])
+        manager.async_generate = AsyncMock(return_value="抱歉，我无法按格式输出。")
+        checker = getattr(sub_agents, checker_name)(manager)
+
+        report = asyncio.run(checker.check("林风走进大殿。", "", 0))
+
+        assert report.issues == []
+        assert report.confidence == PARSE_FAILED_CONFIDENCE
+        assert report.parse_failed is True
+        assert report.reasoning.startswith(PARSE_FAILED_REASONING)
+
@@ -296,11 +296,7 @@ class NovelGeneratorUI:
 
                     # 保存检查点
                     state_dict["workflow_id"] = self.workflow_id
-                    state_dict["current_node"] = node
-                    if "novel_storage" in state_dict and hasattr(state_dict["novel_storage"], "base_dir"):
-                        state_dict["novel_title"] = state_dict["novel_storage"].base_dir.name.replace("_storage", "")
-                    self.state_manager.save_checkpoint(self.workflow_id, state_dict)
-                    self.state_manager.save_state(self.workflow_id, state_dict)
+                    self.state_manager.record_step(self.workflow_id, node, state_dict)
 
                     yield status, outline_box, characters_box, chapter_box, evaluation_box, chapter_selector, gr.update(), gr.update(visible=False), gr.update(visible=False)
 
@@ -447,11 +443,7 @@ class NovelGeneratorUI:
 
                     # 保存检查点
                     state_dict["workflow_id"] = self.workflow_id
-                    state_dict["current_node"] = node
-                    if "novel_storage" in state_dict and hasattr(state_dict["novel_storage"], "base_dir"):
-                        state_dict["novel_title"] = state_dict["novel_storage"].base_dir.name.replace("_storage", "")
-                    service.state_manager.save_checkpoint(self.workflow_id, state_dict)
-                    service.state_manager.save_state(self.workflow_id, state_dict)
+                    service.state_manager.record_step(self.workflow_id, node, state_dict)
 
                     yield status, outline_box, characters_box, chapter_box, evaluation_box, chapter_selector, gr.update(), gr.update(visible=False), gr.update(visible=False)
 
@@ -1215,12 +1207,13 @@ class NovelGeneratorUI:
             else:
                 status = self.__update_status("🎉 小说生成完成！可以点击保存按钮保存内容")
                 # 并行模式完成后，加载所有章节到选择器
-                final_content = final_state.get('final_content', []) if final_state and hasattr(final_state, 'get') else []
-                if final_content and not self.all_chapters:
-                    self.all_chapters = final_content
+                # success 节点不再返回全部章节，需要时从存储加载
+                if not self.all_chapters and self.validated_outline:
+                    from src.storage import NovelStorage
+                    self.all_chapters = NovelStorage(self.validated_outline.title).load_all_chapters()
+                if self.all_chapters:
                     chapter_selector = self._update_chapter_selection(self.all_chapters)
-                    if self.all_chapters:
-                        chapter_box = self._format_chapter(self.all_chapters[0], 0)
+                    chapter_box = self._format_chapter(self.all_chapters[0], 0)
                 yield status, outline_box, characters_box, chapter_box, evaluation_box, chapter_selector
 
         except Exception as e:
@@ -1247,35 +1240,14 @@ class NovelGeneratorUI:
                 os.makedirs(default_dir, exist_ok=True)
                 save_path = os.path.join(default_dir, f"{title}_{timestamp}.txt")
             
-            with open(save_path, 'w', encoding='utf-8') as f:
-                f.write("=" * 50 + "\n")
-                f.write("【小说大纲】\n")
-                f.write("=" * 50 + "\n")
-                f.write(f"标题: {self.validated_outline.title}\n")
-                f.write(f"类型: {self.validated_outline.genre}\n")
-                f.write(f"主题: {self.validated_outline.theme}\n")
-                f.write(f"背景: {self.validated_outline.setting}\n\n")
-                f.write("情节概要:\n")
-                f.write(f"{self.validated_outline.plot_summary}\n\n")
-                
-                f.write("\n" + "=" * 50 + "\n")
-                f.write("【角色档案】\n")
-                f.write("=" * 50 + "\n")
-                for char in self.validated_characters:
-                    f.write(f"角色名称: {char.name}\n")
-                    f.write(f"背景: {char.background}\n")
-                    f.write(f"性格: {char.personality}\n")
-                    f.write(f"目标: {', '.join(char.goals)}\n")
-                    f.write(f"冲突: {', '.join(char.conflicts)}\n")
-                    f.write(f"成长弧线: {char.arc}\n\n")
-                
-                f.write("\n" + "=" * 50 + "\n")
-                f.write("【章节内容】\n")
-                f.write("=" * 50 + "\n")
-                for i, chapter in enumerate(self.all_chapters, 1):
-                    f.write(f"第{i}章: {chapter.title}\n")
-                    f.write("-" * 40 + "\n")
-                    f.write(f"{chapter.content}\n\n")
+            # 从存储逐章流式导出，按扩展名选择格式（.md / .epub，默认 txt）
+            from src.storage import NovelStorage
+            from src.export import NovelExporter, EXPORT_FORMATS
+            fmt = os.path.splitext(save_path)[1].lstrip('.').lower()
+            if fmt not in EXPORT_FORMATS:
+                fmt = "txt"
+            exporter = NovelExporter(NovelStorage(self.validated_outline.title))
+            exporter.export(fmt, save_path)
             
             success_msg = f"✅ 保存成功！文件路径：{save_path}"
             logger.info(success_msg)
@@ -1314,43 +1286,11 @@ class NovelGeneratorUI:
                 os.makedirs(main_dir, exist_ok=True)
                 main_file_path = os.path.join(main_dir, "00_main_info.txt")
             
-            with open(main_file_path, 'w', encoding='utf-8') as f:
-                f.write("=" * 50 + "\n")
-                f.write("【小说大纲】\n")
-                f.write("=" * 50 + "\n")
-                f.write(f"标题: {self.validated_outline.title}\n")
-                f.write(f"类型: {self.validated_outline.genre}\n")
-                f.write(f"主题: {self.validated_outline.theme}\n")
-                f.write(f"背景: {self.validated_outline.setting}\n\n")
-                f.write("情节概要:\n")
-                f.write(f"{self.validated_outline.plot_summary}\n\n")
-                
-                f.write("\n" + "=" * 50 + "\n")
-                f.write("【角色档案】\n")
-                f.write("=" * 50 + "\n")
-                for char in self.validated_characters:
-                    f.write(f"角色名称: {char.name}\n")
-                    f.write(f"背景: {char.background}\n")
-                    f.write(f"性格: {char.personality}\n")
-                    f.write(f"目标: {', '.join(char.goals)}\n")
-                    f.write(f"冲突: {', '.join(char.conflicts)}\n")
-                    f.write(f"成长弧线: {char.arc}\n\n")
-
-            # 分章保存章节内容
-            chapter_paths = []
-            for i, chapter in enumerate(self.all_chapters, 1):
-                # 处理章节标题特殊字符
-                chapter_title = chapter.title.replace(' ', '_').replace('/', '_')
-                # 章节文件名格式：01_章节标题.txt、02_章节标题.txt...
-                chapter_filename = f"{i:02d}_{chapter_title}.txt"
-                chapter_path = os.path.join(main_dir, chapter_filename)
-                
-                with open(chapter_path, 'w', encoding='utf-8') as f:
-                    f.write(f"第{i}章: {chapter.title}\n")
-                    f.write("-" * 40 + "\n")
-                    f.write(f"{chapter.content}\n")
-                
-                chapter_paths.append(chapter_path)
+            # 从存储逐章写出，不在内存中拼接整本小说
+            from src.storage import NovelStorage
+            from src.export import NovelExporter
+            exporter = NovelExporter(NovelStorage(self.validated_outline.title))
+            main_file_path, chapter_paths = exporter.export_chapter_files(main_dir)
 
             # 构建成功消息
             success_msg = f"✅ 保存成功！\n"
@@ -1584,10 +1524,10 @@ class NovelGeneratorUI:
                     )
 
                     evaluation_mode = gr.Radio(
-                        choices=["deep", "fast"],
+                        choices=["deep", "fused", "fast"],
                         value="deep",
                         label="评估模式",
-                        info="deep: 完整检查（5个Specialists + Council协商）| fast: 快速评估"
+                        info="deep: 完整检查（5个Specialists + Council协商）| fused: 完整检查合并为单次调用 | fast: 快速评估"
                     )
 
                 # 右侧内容展示区（占3份宽度）